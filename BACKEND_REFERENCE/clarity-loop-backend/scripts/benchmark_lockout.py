@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark AccountLockoutService under a credential-stuffing login storm.
+
+Attackers hammer a set of target accounts with failed logins while
+legitimate users log in (lockout check + reset) at the same time. Each login
+follows the calls made by the login endpoint. Compares the current service
+with a condensed replica of the previous one (a global asyncio.Lock for the
+in-memory store; separate Redis calls for check, increment, expiry and lock).
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_lockout.py [--redis-url URL]
+
+Without --redis-url only the in-memory store is measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import logging
+import statistics
+import time
+from typing import Any
+import uuid
+
+import redis.asyncio as redis
+
+from clarity.auth.lockout_service import AccountLockoutService
+
+ATTACKERS = 200
+LEGIT_USERS = 50
+TARGET_ACCOUNTS = 20
+ATTEMPTS_PER_ATTACKER = 50
+LOGINS_PER_USER = 20
+
+
+class LegacyLockoutService:
+    """Condensed replica of the pre-pipelining service."""
+
+    def __init__(self, redis_url: str | None) -> None:
+        self.max_attempts = 3
+        self.lockout_secs = 900
+        self._prefix = "lockout:v1:"
+        self._mem: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._r = redis.from_url(redis_url) if redis_url else None
+
+    async def is_locked(self, user: str) -> bool:
+        if self._r:
+            key = self._prefix + user
+            if await self._r.ttl(key) <= 0:
+                return False
+            return await self._r.hget(key, "locked") == b"1"
+        async with self._lock:
+            rec = self._mem.get(user)
+            return bool(rec and rec["locked_until"] > time.time())
+
+    async def record_failed_attempt(self, user: str) -> None:
+        if self._r:
+            key = self._prefix + user
+            pipe = self._r.pipeline()
+            pipe.hincrby(key, "attempts", 1)
+            pipe.hget(key, "attempts")
+            attempts = int((await pipe.execute())[1])
+            if attempts == 1:
+                await self._r.expire(key, self.lockout_secs)
+            if attempts >= self.max_attempts:
+                await self._r.hset(key, mapping={"locked": 1})
+        else:
+            async with self._lock:
+                now = time.time()
+                rec = self._mem.setdefault(user, {"attempts": [], "locked_until": 0})
+                rec["attempts"].append(now)
+                if len(rec["attempts"]) >= self.max_attempts:
+                    rec["locked_until"] = now + self.lockout_secs
+        await self.is_locked(user)  # logging check in record_failed_attempt
+
+    async def failed_login(self, user: str) -> None:
+        if not await self.is_locked(user):
+            await self.record_failed_attempt(user)
+            await self.is_locked(user)  # CloudWatch check in the endpoint
+
+    async def successful_login(self, user: str) -> None:
+        await self.is_locked(user)
+        if self._r:
+            await self._r.delete(self._prefix + user)
+        else:
+            async with self._lock:
+                self._mem.pop(user, None)
+
+
+class CurrentLockoutService:
+    """Login flow against the current service, as the endpoint drives it."""
+
+    def __init__(self, redis_url: str | None) -> None:
+        self.service = AccountLockoutService(
+            lockout_duration=timedelta(minutes=15), redis_url=redis_url
+        )
+
+    async def failed_login(self, user: str) -> None:
+        if not await self.service.lock_remaining(user):
+            await self.service.record_failed_attempt(user)
+
+    async def successful_login(self, user: str) -> None:
+        await self.service.check_lockout(user)
+        await self.service.reset_attempts(user)
+
+
+async def storm(
+    service: LegacyLockoutService | CurrentLockoutService,
+) -> list[float]:
+    """Run the storm and return legitimate login latencies in milliseconds."""
+    latencies: list[float] = []
+    run_id = uuid.uuid4().hex  # Fresh accounts, also in a shared Redis
+
+    async def attacker(n: int) -> None:
+        for i in range(ATTEMPTS_PER_ATTACKER):
+            target = (n + i) % TARGET_ACCOUNTS
+            await service.failed_login(f"target{target}-{run_id}@x.com")
+
+    async def legit_user(n: int) -> None:
+        for _ in range(LOGINS_PER_USER):
+            started = time.perf_counter()
+            await service.successful_login(f"user{n}-{run_id}@x.com")
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(
+        *(attacker(n) for n in range(ATTACKERS)),
+        *(legit_user(n) for n in range(LEGIT_USERS)),
+    )
+    return latencies
+
+
+async def run(name: str, redis_url: str | None) -> None:
+    print(f"\n{name}")
+    print(f"{'service':<10}{'total s':>10}{'login p50 ms':>15}{'login p99 ms':>15}")
+    for label, factory in (
+        ("legacy", LegacyLockoutService),
+        ("current", CurrentLockoutService),
+    ):
+        service = factory(redis_url)
+        started = time.perf_counter()
+        latencies = await storm(service)
+        total = time.perf_counter() - started
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(
+            f"{label:<10}{total:>10.2f}{statistics.median(latencies):>15.3f}"
+            f"{p99:>15.3f}"
+        )
+
+
+async def main(redis_url: str | None) -> None:
+    print(
+        f"{ATTACKERS} attackers x {ATTEMPTS_PER_ATTACKER} failures on "
+        f"{TARGET_ACCOUNTS} accounts, {LEGIT_USERS} users x {LOGINS_PER_USER} logins"
+    )
+    await run("In-memory", None)
+    if redis_url:
+        await run(f"Redis ({redis_url})", redis_url)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    logging.getLogger("clarity").setLevel(logging.ERROR)  # One line per lockout
+    asyncio.run(main(args.redis_url))
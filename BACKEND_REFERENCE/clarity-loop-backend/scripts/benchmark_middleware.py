@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Benchmark the middleware stack against its BaseHTTPMiddleware predecessor.
+
+Runs the same small endpoints through two stacks in-process (no network):
+
+- legacy: request logger, auth, size limiter and security headers written as
+  ``BaseHTTPMiddleware`` subclasses, the way they were before the pure ASGI
+  rewrite (condensed replicas, kept here only for comparison)
+- current: the pure ASGI middlewares from ``clarity.middleware``
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_middleware.py [--requests N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from fastapi import FastAPI, Request, Response
+import httpx
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from clarity.middleware.auth_middleware import PUBLIC_PATHS, CognitoAuthMiddleware
+from clarity.middleware.request_logger import RequestLoggingMiddleware
+from clarity.middleware.request_size_limiter import RequestSizeLimiterMiddleware
+from clarity.middleware.security_headers import (
+    DOCS_AND_STATIC_PATHS,
+    RELAXED_CSP,
+    STRICT_CSP,
+    SecurityHeadersMiddleware,
+)
+
+DEFAULT_REQUESTS = 2000
+CONCURRENCY = 20
+PAYLOAD = {"user_id": "bench", "values": list(range(50))}
+
+logger = logging.getLogger("benchmark.legacy")
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        response = await call_next(request)
+        relaxed = request.url.path.startswith(DOCS_AND_STATIC_PATHS)
+        response.headers["Strict-Transport-Security"] = (
+            "max-age=31536000; includeSubDomains"
+        )
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Content-Security-Policy"] = (
+            RELAXED_CSP if relaxed else STRICT_CSP
+        )
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Cache-Control"] = "no-store, private"
+        response.headers["Permissions-Policy"] = "camera=(), microphone=()"
+        return response
+
+
+class LegacySizeLimiter(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if request.method in {"POST", "PUT", "PATCH"}:
+            content_length = request.headers.get("content-length")
+            if content_length and int(content_length) > 5 * 1024 * 1024:
+                return Response(status_code=413)
+            body = await request.body()
+            if len(body) > 5 * 1024 * 1024:
+                return Response(status_code=413)
+        return await call_next(request)
+
+
+class LegacyAuth(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        request.state.user = None
+        if request.url.path in PUBLIC_PATHS:
+            return await call_next(request)
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header.startswith("Bearer "):
+            return await call_next(request)
+        return await call_next(request)
+
+
+class LegacyRequestLogger(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        logger.info("REQUEST: %s %s", request.method, request.url.path)
+        logger.info("  Headers: %s", dict(request.headers))
+        if request.method in {"POST", "PUT", "PATCH"}:
+            body = await request.body()
+            logger.info("  Body preview: %s...", body[:200])
+        response = await call_next(request)
+        logger.info("  Response: %s", response.status_code)
+        return response
+
+
+def create_app(*, legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.post("/api/v1/echo")
+    async def echo(payload: dict[str, object]) -> dict[str, int]:
+        return {"fields": len(payload)}
+
+    # Same order as main.configure_middleware_from_env (last added runs first)
+    if legacy:
+        app.add_middleware(LegacySecurityHeaders)
+        app.add_middleware(LegacySizeLimiter)
+        app.add_middleware(LegacyAuth)
+        app.add_middleware(LegacyRequestLogger)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RequestSizeLimiterMiddleware)
+        app.add_middleware(CognitoAuthMiddleware)
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, method: str, requests: int) -> float:
+    """Return requests per second for ``requests`` calls to one endpoint."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def call() -> None:
+            if method == "GET":
+                response = await client.get("/api/v1/ping")
+            else:
+                response = await client.post("/api/v1/echo", json=PAYLOAD)
+            response.raise_for_status()
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                await call()
+
+        for _ in range(50):  # warm up
+            await call()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(requests // CONCURRENCY) for _ in range(CONCURRENCY))
+        )
+        return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int) -> None:
+    stacks = {
+        "legacy": create_app(legacy=True),
+        "current": create_app(legacy=False),
+    }
+    print(f"{'endpoint':<10}{'legacy rps':>14}{'current rps':>14}{'speedup':>10}")
+    for method in ("GET", "POST"):
+        legacy = await measure(stacks["legacy"], method, requests)
+        current = await measure(stacks["current"], method, requests)
+        print(f"{method:<10}{legacy:>14.0f}{current:>14.0f}{current / legacy:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    args = parser.parse_args()
+
+    # Auth provider stays disabled so only the middleware plumbing is measured
+    os.environ["ENABLE_AUTH"] = "false"
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.requests))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark ModelRegistry cold downloads and warm cache checks.
+
+Serves a model file from a local HTTP server that caps each connection's
+throughput, as a long-RTT link to S3 does for a single TCP stream. Compares
+the current registry (parallel ranges, streaming checksum, recorded digest)
+with a condensed replica of the previous one (one stream in 8 KB chunks
+through aiofiles, then a full 8 KB re-read to verify the SHA-256, and the
+same re-read on every cache check).
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_model_download.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+from pathlib import Path
+import re
+import tempfile
+import threading
+import time
+from typing import Any
+
+import aiofiles
+import aiohttp
+
+from clarity.ml.models.registry import (
+    ModelMetadata,
+    ModelRegistry,
+    ModelRegistryConfig,
+    ModelTier,
+)
+
+SIZE_MB = 64
+CONNECTION_MBPS = 16.0  # Per-connection throughput cap
+CHUNK = 64 * 1024
+
+DATA = bytes(range(256)) * (SIZE_MB * 1024 * 4)
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        start, end = 0, len(DATA) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start, end = int(match[1]), int(match[2] or end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        for offset in range(start, end + 1, CHUNK):
+            self.wfile.write(DATA[offset : min(offset + CHUNK, end + 1)])
+            time.sleep(CHUNK / (CONNECTION_MBPS * 1024 * 1024))
+
+    def log_message(self, *_: Any) -> None:
+        pass
+
+
+async def legacy_checksum(path: Path) -> str:
+    sha = hashlib.sha256()
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(8192):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+async def legacy_download(url: str, path: Path) -> None:
+    async with aiohttp.ClientSession() as session, session.get(url) as response:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in response.content.iter_chunked(8192):
+                await f.write(chunk)
+    await legacy_checksum(path)
+
+
+async def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/PAT-L.h5"
+    checksum = hashlib.sha256(DATA).hexdigest()
+
+    print(f"{SIZE_MB} MB model, {CONNECTION_MBPS:.0f} MB/s per connection")
+    print(f"{'registry':<10}{'cold s':>10}{'cache check ms':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "legacy.h5"
+        started = time.perf_counter()
+        await legacy_download(url, path)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        await legacy_checksum(path)
+        warm_ms = (time.perf_counter() - started) * 1000
+        print(f"{'legacy':<10}{cold:>10.2f}{warm_ms:>16.1f}")
+
+        registry = ModelRegistry(
+            ModelRegistryConfig(
+                base_path=Path(tmp),
+                cache_dir=Path(tmp) / "cache",
+                registry_file=Path(tmp) / "registry.json",
+            )
+        )
+        metadata = ModelMetadata(
+            model_id="pat",
+            name="PAT Large",
+            version="1.2.0",
+            tier=ModelTier.LARGE,
+            size_bytes=len(DATA),
+            checksum_sha256=checksum,
+            source_url=url,
+        )
+        await registry.register_model(metadata)
+        started = time.perf_counter()
+        assert await registry.download_model("pat", "1.2.0")
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        assert await registry._is_model_cached(metadata, Path(metadata.local_path))
+        warm_ms = (time.perf_counter() - started) * 1000
+        print(f"{'current':<10}{cold:>10.2f}{warm_ms:>16.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    logging.getLogger("clarity").setLevel(logging.ERROR)
+    asyncio.run(main())
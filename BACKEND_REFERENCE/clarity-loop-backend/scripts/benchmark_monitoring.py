@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark ModelMonitoringService inference recording and dashboard reads.
+
+Records inferences spread over several model versions, then reads the
+all-models dashboard. Compares the current service with a condensed replica
+of the previous one (one shared deque of metric objects, scanned and sorted
+on every read; an alert task created per inference).
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_monitoring.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+import random
+import time
+from typing import Any
+
+from clarity.ml.models.monitoring import ModelMonitoringConfig, ModelMonitoringService
+
+MODELS = 20
+INFERENCES = 50_000
+READS = 20
+
+
+@dataclass
+class LegacyMetric:
+    model_id: str
+    version: str
+    timestamp: float
+    latency_ms: float
+    success: bool
+
+
+class LegacyMonitoringService:
+    """Condensed replica of the deque-scanning service."""
+
+    def __init__(self) -> None:
+        self.metrics: deque[LegacyMetric] = deque(maxlen=10000)
+        self.alert_state: dict[str, Any] = {}
+
+    def record_inference(
+        self, model_id: str, version: str, latency_ms: float, *, success: bool
+    ) -> None:
+        metric = LegacyMetric(model_id, version, time.time(), latency_ms, success)
+        self.metrics.append(metric)
+        self._task = asyncio.create_task(self._check_alerts(metric))
+
+    async def _check_alerts(self, metric: LegacyMetric) -> None:
+        recent = [
+            m
+            for m in self.metrics
+            if m.model_id == metric.model_id
+            and m.version == metric.version
+            and m.timestamp >= time.time() - 300
+        ]
+        if len(recent) >= 10:
+            _ = sum(1 for m in recent if not m.success) / len(recent)
+
+    async def get_all_models_metrics(self) -> dict[str, Any]:
+        result = {}
+        for model_id, version in {(m.model_id, m.version) for m in self.metrics}:
+            window_start = time.time() - 3600
+            latencies = sorted(
+                m.latency_ms
+                for m in self.metrics
+                if m.model_id == model_id
+                and m.version == version
+                and m.timestamp >= window_start
+            )
+            result[f"{model_id}:{version}"] = {
+                "p95": latencies[int(len(latencies) * 0.95)],
+                "p99": latencies[int(len(latencies) * 0.99)],
+            }
+        return result
+
+
+async def measure(service: Any) -> tuple[float, float]:
+    """Return (microseconds per inference, milliseconds per dashboard read)."""
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for i in range(INFERENCES):
+        service.record_inference(
+            f"model{i % MODELS}",
+            "1.0",
+            rng.lognormvariate(3, 1),
+            success=rng.random() > 0.01,
+        )
+        if i % 1000 == 0:
+            await asyncio.sleep(0)  # Let queued alert tasks run, as in a server
+    await asyncio.sleep(0)
+    record_us = (time.perf_counter() - started) / INFERENCES * 1e6
+
+    started = time.perf_counter()
+    for _ in range(READS):
+        await service.get_all_models_metrics()
+    read_ms = (time.perf_counter() - started) / READS * 1000
+    return record_us, read_ms
+
+
+async def main() -> None:
+    print(f"{INFERENCES} inferences over {MODELS} models, {READS} dashboard reads")
+    print(f"{'service':<10}{'record us':>12}{'read ms':>12}")
+    for label, service in (
+        ("legacy", LegacyMonitoringService()),
+        (
+            "current",
+            ModelMonitoringService(ModelMonitoringConfig(enable_prometheus=False)),
+        ),
+    ):
+        record_us, read_ms = await measure(service)
+        print(f"{label:<10}{record_us:>12.2f}{read_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    logging.getLogger("clarity").setLevel(logging.ERROR)
+    asyncio.run(main())
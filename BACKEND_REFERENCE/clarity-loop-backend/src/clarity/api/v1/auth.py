@@ -9,9 +9,8 @@ import boto3
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr, Field
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
+from clarity.auth.aws_auth_provider import invalidate_user_context
 from clarity.auth.aws_cognito_provider import CognitoAuthProvider
 from clarity.auth.dependencies import get_auth_provider, get_current_user
 from clarity.auth.dependencies import get_current_user as get_user_func
@@ -35,6 +34,7 @@ from clarity.core.exceptions import (
     UserAlreadyExistsError,
     UserNotFoundError,
 )
+from clarity.middleware.rate_limiting import RateLimitingMiddleware
 from clarity.models.auth import TokenResponse, UserLoginRequest
 from clarity.ports.auth_ports import IAuthProvider
 
@@ -52,8 +52,11 @@ cloudwatch = boto3.client(
 )
 USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID", "")
 
-# Create rate limiter for auth endpoints
-auth_limiter = Limiter(key_func=get_remote_address)
+# Create rate limiter for auth endpoints (shared across workers via Redis).
+# Headers stay off because the endpoints return models, not Response objects.
+auth_limiter = RateLimitingMiddleware.get_auth_limiter(
+    storage_uri=os.getenv("REDIS_URL"), headers_enabled=False
+)
 
 
 class UserRegister(BaseModel):
@@ -280,7 +283,9 @@ async def login(
 
         # Track failed attempt for lockout protection
         try:
-            await lockout_service.record_failed_attempt(credentials.email, client_ip)
+            locked = await lockout_service.record_failed_attempt(
+                credentials.email, client_ip
+            )
             logger.info(
                 "🚨 Failed login attempt recorded for %s from %s",
                 credentials.email,
@@ -288,7 +293,7 @@ async def login(
             )
 
             # Check if account just got locked and emit CloudWatch metric
-            if await lockout_service.is_locked(credentials.email):
+            if locked:
                 try:
                     cloudwatch.put_metric_data(
                         Namespace="Clarity/Auth",
@@ -416,6 +421,9 @@ async def update_user(
         msg = f"User {user_id} not found"
         raise UserNotFoundError(msg)
 
+    # Cached contexts would otherwise serve the old profile until they expire
+    invalidate_user_context(user_id)
+
     return UserUpdateResponse(
         user_id=updated_user.uid,
         email=updated_user.email,
@@ -21,6 +21,8 @@ from pydantic import BaseModel, Field
 
 from clarity.auth.dependencies import AuthenticatedUser
 from clarity.core.config_aws import get_settings
+from clarity.core.exceptions import InferenceTimeoutError, ServiceUnavailableError
+from clarity.ml.gemini_scheduler import InsightPriority, get_gemini_scheduler
 from clarity.ml.gemini_service import (
     GeminiService,
     HealthInsightRequest,
@@ -292,8 +294,10 @@ async def generate_insights(
             insight_type=insight_request.insight_type,
         )
 
-        # Generate insights
-        insight_response = await gemini_service.generate_health_insights(gemini_request)
+        # Generate insights (interactive lane: the user is waiting on the response)
+        insight_response = await get_gemini_scheduler().generate_health_insights(
+            gemini_service, gemini_request, priority=InsightPriority.INTERACTIVE
+        )
 
         # Save insight to DynamoDB
         dynamodb_client = _get_dynamodb_client()
@@ -340,6 +344,21 @@ async def generate_insights(
             metadata=create_metadata(request_id, processing_time),
         )
 
+    except (ServiceUnavailableError, InferenceTimeoutError) as e:
+        logger.warning(
+            "⏳ Insight generation deferred for user %s (request: %s): %s",
+            current_user.user_id,
+            request_id,
+            e,
+        )
+        raise create_error_response(
+            error_code="INSIGHT_SERVICE_BUSY",
+            message="Insight generation is at capacity, please retry shortly",
+            request_id=request_id,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            details={"error_type": type(e).__name__},
+            suggested_action="retry_later",
+        ) from e
     except Exception as e:
         processing_time = (datetime.now(UTC) - start_time).total_seconds() * 1000
         logger.exception(
@@ -38,6 +38,7 @@ from clarity.core.pagination import (
     PaginationBuilder,
     validate_pagination_params,
 )
+from clarity.core.tracing import start_span
 from clarity.middleware.rate_limiting import get_user_id_or_ip
 from clarity.models.health_data import HealthDataResponse, HealthDataUpload
 from clarity.ports.auth_ports import IAuthProvider
@@ -282,9 +283,12 @@ async def upload_health_data(
                     "metrics": [metric.model_dump() for metric in health_data.metrics],
                 }
 
-                blob.upload_from_string(
-                    json.dumps(raw_data), content_type="application/json"
-                )
+                body = json.dumps(raw_data)
+                with start_span(
+                    "storage.write_raw",
+                    {"storage.backend": "gcs", "storage.bytes": len(body)},
+                ):
+                    blob.upload_from_string(body, content_type="application/json")
                 logger.info("Saved health data to GCS: %s", gcs_path)
             except Exception:
                 logger.exception("Failed to save to GCS")
@@ -17,6 +17,7 @@ from google.cloud import storage
 from pydantic import BaseModel, Field
 
 from clarity.auth.dependencies import AuthenticatedUser
+from clarity.core.tracing import start_span
 from clarity.services.messaging.publisher import get_publisher
 
 # Configure logger
@@ -145,9 +146,11 @@ async def upload_healthkit_data(
         upload_data["upload_timestamp"] = datetime.now(UTC).isoformat()
         upload_data["upload_id"] = upload_id
 
-        blob.upload_from_string(
-            request.model_dump_json(indent=2), content_type="application/json"
-        )
+        body = request.model_dump_json(indent=2)
+        with start_span(
+            "storage.write_raw", {"storage.backend": "gcs", "storage.bytes": len(body)}
+        ):
+            blob.upload_from_string(body, content_type="application/json")
 
         # 4. Publish to Pub/Sub for processing
         publisher = await get_publisher()
@@ -12,7 +12,7 @@ Endpoints:
 
 # removed - breaks FastAPI
 
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 import logging
 import os
 from typing import Any, cast
@@ -21,13 +21,18 @@ import uuid
 from boto3.dynamodb.conditions import Key
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field, validator
-from slowapi import Limiter
 
 from clarity.auth.dependencies import AuthenticatedUser
-from clarity.middleware.rate_limiting import get_user_id_or_ip
+from clarity.core.constants import LONGITUDINAL_MAX_WEEKS, MINUTES_PER_WEEK
+from clarity.core.exceptions import DataValidationError
+from clarity.middleware.rate_limiting import RateLimitingMiddleware
 from clarity.ml.inference_engine import AsyncInferenceEngine, get_inference_engine
+from clarity.ml.longitudinal_analysis import (
+    LongitudinalAnalysis,
+    LongitudinalPATEngine,
+    get_longitudinal_engine,
+)
 from clarity.ml.pat_service import ActigraphyAnalysis, ActigraphyInput
-from clarity.ml.preprocessing import ActigraphyDataPoint
 from clarity.ml.proxy_actigraphy import (
     StepCountData,
     create_proxy_actigraphy_transformer,
@@ -40,7 +45,9 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["pat-analysis"])
 
 # Create rate limiter for AI endpoints (more restrictive due to resource intensity)
-ai_limiter = Limiter(key_func=get_user_id_or_ip)
+ai_limiter = RateLimitingMiddleware.get_ai_limiter(
+    storage_uri=os.getenv("REDIS_URL"), headers_enabled=False
+)
 
 
 # 🔥 FIXED: Response model for PAT analysis results - moved before usage
@@ -104,6 +111,23 @@ class DirectActigraphyRequest(BaseModel):
     )
 
 
+class LongitudinalAnalysisRequest(BaseModel):
+    """Request for multi-week PAT analysis of a long activity history."""
+
+    activity_values: list[float] = Field(
+        description="Minute-level activity values, oldest first",
+        min_length=MINUTES_PER_WEEK,
+        max_length=LONGITUDINAL_MAX_WEEKS * MINUTES_PER_WEEK,
+    )
+    start_time: datetime = Field(description="Timestamp of the first value")
+    stride_minutes: int | None = Field(
+        default=None,
+        description="Minutes between window starts (default: one week, no overlap)",
+        ge=60,
+        le=MINUTES_PER_WEEK,
+    )
+
+
 class AnalysisResponse(BaseModel):
     """Response for analysis requests."""
 
@@ -198,21 +222,15 @@ async def analyze_step_data(
             proxy_result.quality_score,
         )
 
-        # Convert to ActigraphyDataPoint format for PAT model
-        actigraphy_points = [
-            ActigraphyDataPoint(
-                timestamp=step_request.timestamps[i],
-                value=float(proxy_result.vector[i]),
-            )
-            for i in range(len(proxy_result.vector))
-        ]
-
-        # Create PAT input
-        pat_input = ActigraphyInput(
-            user_id=current_user.user_id,
-            data_points=actigraphy_points,
+        # Create PAT input straight from the proxy vector, which ends at the
+        # last step sample
+        vector_minutes = len(proxy_result.vector)
+        pat_input = ActigraphyInput.from_array(
+            current_user.user_id,
+            proxy_result.vector,
+            step_request.timestamps[-1] - timedelta(minutes=vector_minutes - 1),
             sampling_rate=1.0,  # 1 sample per minute
-            duration_hours=len(proxy_result.vector) // 60,
+            duration_hours=vector_minutes // 60,
         )
 
         # Submit for async inference
@@ -280,23 +298,19 @@ async def analyze_actigraphy_data(
             analysis_id,
         )
 
-        # Convert request data to ActigraphyDataPoint format
-        actigraphy_points = [
-            ActigraphyDataPoint(
-                timestamp=(
-                    datetime.fromisoformat(point["timestamp"])
-                    if isinstance(point["timestamp"], str)
-                    else point["timestamp"]
-                ),
-                value=float(point["value"]),
-            )
-            for point in request.data_points
-        ]
-
-        # Create PAT input
-        pat_input = ActigraphyInput(
-            user_id=current_user.user_id,
-            data_points=actigraphy_points,
+        # Create PAT input straight from the values; the points are in
+        # sampling order, so only the first timestamp is parsed
+        start_time = (
+            request.data_points[0]["timestamp"] if request.data_points else None
+        )
+        pat_input = ActigraphyInput.from_array(
+            current_user.user_id,
+            [float(point["value"]) for point in request.data_points],
+            (
+                datetime.fromisoformat(start_time)
+                if isinstance(start_time, str)
+                else start_time
+            ),
             sampling_rate=request.sampling_rate,
             duration_hours=request.duration_hours,
         )
@@ -336,6 +350,54 @@ async def analyze_actigraphy_data(
         ) from e
 
 
+@router.post(
+    "/longitudinal-analysis",
+    response_model=LongitudinalAnalysis,
+    summary="Analyze Multi-Week Actigraphy Trends",
+    description=(
+        "Score a multi-week activity history as a time series of weekly "
+        "(or overlapping) PAT windows; previously seen windows come from cache"
+    ),
+)
+@router.post(
+    "/longitudinal-analysis/",
+    response_model=LongitudinalAnalysis,
+    include_in_schema=False,  # Don't show duplicate in OpenAPI docs
+)
+@ai_limiter.limit("20/hour")  # AI endpoints are resource-intensive
+async def analyze_longitudinal(
+    request: Request,
+    longitudinal_request: LongitudinalAnalysisRequest,
+    current_user: AuthenticatedUser,
+    engine: LongitudinalPATEngine = Depends(get_longitudinal_engine),
+) -> LongitudinalAnalysis:
+    """Analyze how PAT scores trend across a long activity history."""
+    _ = request  # Used by rate limiter
+    pat_input = ActigraphyInput.from_array(
+        current_user.user_id,
+        longitudinal_request.activity_values,
+        longitudinal_request.start_time,
+    )
+
+    try:
+        return await engine.analyze(
+            pat_input, stride_minutes=longitudinal_request.stride_minutes
+        )
+    except DataValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"error": "Invalid activity history", "message": str(e)},
+        ) from e
+    except Exception as e:
+        logger.exception(
+            "Longitudinal analysis failed for user %s", current_user.user_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": "Analysis failed", "message": str(e)},
+        ) from e
+
+
 @router.get(
     "/analysis/{processing_id}",
     summary="Get PAT Analysis Results",
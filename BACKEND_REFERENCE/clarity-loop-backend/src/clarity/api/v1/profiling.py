@@ -0,0 +1,137 @@
+"""On-demand profiling endpoints for a running worker.
+
+Opt-in (``ENABLE_PROFILING=true``) and restricted to administrators. Each
+request profiles only the worker process that serves it; the ``pid`` in
+every response tells which one, so repeat the request to cover other
+Gunicorn workers. Durations are capped and only one profile runs per
+worker at a time (409 otherwise).
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import os
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from clarity.core.constants import (
+    PROFILE_DEFAULT_SAMPLE_INTERVAL_MS,
+    PROFILE_MAX_DETERMINISTIC_SECONDS,
+    PROFILE_MAX_PAT_RUNS,
+    PROFILE_MAX_SECONDS,
+    PROFILE_MIN_SAMPLE_INTERVAL_MS,
+)
+from clarity.core.profiling import (
+    MAX_SAMPLE_INTERVAL_MS,
+    ProfilerBusyError,
+    profiling_session,
+    run_cprofile,
+    sample_stacks,
+    snapshot_allocations,
+)
+from clarity.ml.pat_service import PATModelService, get_pat_service
+from clarity.services.health_data_service import MLPredictionError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["profiling"])
+
+WORKER_PID_HEADER = "X-Worker-PID"
+
+
+@contextmanager
+def _exclusive(kind: str) -> Iterator[None]:
+    try:
+        with profiling_session(kind):
+            yield
+    except ProfilerBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(e)
+        ) from e
+
+
+@router.post("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(
+        PROFILE_DEFAULT_SAMPLE_INTERVAL_MS,
+        ge=PROFILE_MIN_SAMPLE_INTERVAL_MS,
+        le=MAX_SAMPLE_INTERVAL_MS,
+    ),
+    include_idle: bool = Query(default=False),
+) -> PlainTextResponse:
+    """Sample all threads' stacks and return them as collapsed stacks.
+
+    The body feeds straight into ``flamegraph.pl`` or speedscope. Sampling
+    statistics are returned in ``X-Profile-*`` headers.
+    """
+    with _exclusive("cpu"):
+        profile = await asyncio.to_thread(
+            sample_stacks, seconds, interval_ms, include_idle=include_idle
+        )
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={
+            WORKER_PID_HEADER: str(os.getpid()),
+            "X-Profile-Samples": str(profile.samples),
+            "X-Profile-Idle-Samples": str(profile.idle_samples),
+            "X-Profile-Interval-Ms": f"{profile.interval_ms:.1f}",
+            "X-Profile-Overhead-Ratio": f"{profile.overhead_ratio:.4f}",
+        },
+    )
+
+
+@router.post("/cprofile", response_class=PlainTextResponse)
+async def profile_event_loop(
+    seconds: float = Query(5.0, gt=0, le=PROFILE_MAX_DETERMINISTIC_SECONDS),
+    limit: int = Query(50, ge=1, le=500),
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+) -> PlainTextResponse:
+    """Run cProfile on the event-loop thread and return the pstats report."""
+    with _exclusive("cprofile"):
+        report = await run_cprofile(seconds, limit, sort)
+    return PlainTextResponse(report, headers={WORKER_PID_HEADER: str(os.getpid())})
+
+
+@router.post("/memory")
+async def profile_memory(
+    response: Response,
+    seconds: float = Query(5.0, ge=0, le=PROFILE_MAX_DETERMINISTIC_SECONDS),
+    limit: int = Query(25, ge=1, le=200),
+) -> dict[str, Any]:
+    """Report allocation sites that grew over the window (tracemalloc)."""
+    with _exclusive("memory"):
+        report = await snapshot_allocations(seconds, limit)
+    response.headers[WORKER_PID_HEADER] = str(os.getpid())
+    return {"pid": os.getpid(), **report}
+
+
+@router.post("/pat", response_class=PlainTextResponse)
+async def profile_pat_forward(
+    runs: int = Query(3, ge=1, le=PROFILE_MAX_PAT_RUNS),
+    output: Literal["table", "chrome"] = "table",
+    pat_service: PATModelService = Depends(get_pat_service),
+) -> Response:
+    """Profile the PAT forward pass with the torch profiler.
+
+    ``output=chrome`` returns a trace for ``chrome://tracing`` or Perfetto.
+    """
+    with _exclusive("pat"):
+        try:
+            result = await asyncio.to_thread(
+                pat_service.profile_inference, runs, chrome_trace=output == "chrome"
+            )
+        except MLPredictionError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+            ) from e
+
+    headers = {WORKER_PID_HEADER: str(os.getpid())}
+    if output == "chrome":
+        return Response(result, media_type="application/json", headers=headers)
+    return PlainTextResponse(result, headers=headers)
@@ -15,9 +15,10 @@ from clarity.api.v1.health_data import router as health_data_router
 from clarity.api.v1.healthkit_upload import router as healthkit_router
 from clarity.api.v1.metrics import router as metrics_router
 from clarity.api.v1.pat_analysis import router as pat_router
+from clarity.api.v1.profiling import router as profiling_router
 from clarity.api.v1.test import router as test_router
 from clarity.api.v1.websocket.chat_handler import router as websocket_router
-from clarity.auth.dependencies import get_current_user
+from clarity.auth.dependencies import get_current_user, require_admin
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -81,6 +82,15 @@ if os.getenv("ENVIRONMENT", "development") == "development":
         tags=["debug"],
     )
 
+# Include profiling router only when explicitly enabled, for admins
+if os.getenv("ENABLE_PROFILING", "false").lower() == "true":
+    api_router.include_router(
+        profiling_router,
+        prefix="/profiling",
+        tags=["profiling"],
+        dependencies=[Depends(require_admin)],
+    )
+
 api_router.include_router(
     test_router,
     prefix="/test",
@@ -15,11 +15,14 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
+import numpy as np
 from pydantic import ValidationError
 
 from clarity.api.v1.websocket.connection_manager import ConnectionManager
+from clarity.api.v1.websocket.health_stream import HealthDataStreamCoalescer
 from clarity.api.v1.websocket.lifespan import get_connection_manager
 from clarity.api.v1.websocket.models import (
+    AnalysisUpdateMessage,
     ChatMessage,
     ErrorMessage,
     HeartbeatAckMessage,
@@ -33,6 +36,7 @@ from clarity.auth.aws_cognito_provider import CognitoAuthProvider
 from clarity.core.config_aws import get_settings
 
 # Removed circular import - will use direct initialization
+from clarity.ml.gemini_scheduler import InsightPriority, get_gemini_scheduler
 from clarity.ml.gemini_service import (
     GeminiService,
     HealthInsightRequest,
@@ -43,7 +47,6 @@ from clarity.ml.pat_service import (
     PATModelService,
     get_pat_service,
 )
-from clarity.ml.preprocessing import ActigraphyDataPoint
 from clarity.models.auth import UserContext, UserRole
 
 logger = logging.getLogger(__name__)
@@ -96,8 +99,10 @@ class WebSocketChatHandler:
             insight_type="chat_response",
         )
         try:
-            gemini_response = await self.gemini_service.generate_health_insights(
-                gemini_request
+            gemini_response = await get_gemini_scheduler().generate_health_insights(
+                self.gemini_service,
+                gemini_request,
+                priority=InsightPriority.INTERACTIVE,
             )
             # Extract content from narrative or key_insights
             ai_response_content = gemini_response.narrative
@@ -173,25 +178,26 @@ class WebSocketChatHandler:
             duration_hours = 24
             data_points_from_payload = health_data_payload.data_points
 
+            start_time = None
             if data_points_from_payload and len(data_points_from_payload) > 1:
-                timestamps = [dp.timestamp for dp in data_points_from_payload]
-                if timestamps:
-                    min_ts = min(timestamps)
-                    max_ts = max(timestamps)
-                    duration_seconds = (max_ts - min_ts).total_seconds()
-                    if duration_seconds > 0:
-                        duration_hours = max(1, int(duration_seconds / 3600))
+                start_time = min(dp.timestamp for dp in data_points_from_payload)
+                max_ts = max(dp.timestamp for dp in data_points_from_payload)
+                duration_seconds = (max_ts - start_time).total_seconds()
+                if duration_seconds > 0:
+                    duration_hours = max(1, int(duration_seconds / 3600))
             elif data_points_from_payload and len(data_points_from_payload) == 1:
+                start_time = data_points_from_payload[0].timestamp
                 duration_hours = 1
 
-            actigraphy_data_points = [
-                ActigraphyDataPoint(timestamp=dp.timestamp, value=dp.value)
-                for dp in data_points_from_payload
-            ]
-
-            actigraphy_input = ActigraphyInput(
-                user_id=user_id,
-                data_points=actigraphy_data_points,
+            # Values go straight into the float32 buffer PAT consumes
+            actigraphy_input = ActigraphyInput.from_array(
+                user_id,
+                np.fromiter(
+                    (dp.value for dp in data_points_from_payload),
+                    dtype=np.float32,
+                    count=len(data_points_from_payload),
+                ),
+                start_time,
                 sampling_rate=1.0,
                 duration_hours=duration_hours,
             )
@@ -206,8 +212,10 @@ class WebSocketChatHandler:
                 context="Based on recent health data.",
                 insight_type="health_analysis",
             )
-            insight_response = await self.gemini_service.generate_health_insights(
-                insight_request
+            insight_response = await get_gemini_scheduler().generate_health_insights(
+                self.gemini_service,
+                insight_request,
+                priority=InsightPriority.INTERACTIVE,
             )
 
             insight_message = ChatMessage(
@@ -477,6 +485,7 @@ async def _handle_health_analysis_message(
     handler: WebSocketChatHandler,
     connection_manager: ConnectionManager,
     websocket: WebSocket,
+    coalescer: HealthDataStreamCoalescer | None = None,
 ) -> None:
     try:
         message_data = json.loads(raw_message)
@@ -488,9 +497,13 @@ async def _handle_health_analysis_message(
                 validated_payload = WebSocketHealthDataPayload.model_validate(
                     health_data_content
                 )
-                await handler.trigger_health_analysis(
-                    user_id, validated_payload, connection_manager
-                )
+                if coalescer is not None:
+                    # Streaming mode: buffer the frame, analyze per window
+                    await coalescer.ingest(user_id, validated_payload)
+                else:
+                    await handler.trigger_health_analysis(
+                        user_id, validated_payload, connection_manager
+                    )
             except ValidationError as e:
                 logger.warning(
                     "Invalid health_data payload: %s. Errors: %s",
@@ -540,6 +553,13 @@ async def websocket_health_analysis_endpoint(
     websocket: WebSocket,
     user_id: str,
     token: str | None = Query(...),
+    stream: bool = Query(
+        default=False,
+        description=(
+            "Incremental ingestion: buffer health_data frames and analyze per "
+            "window instead of per frame"
+        ),
+    ),
     connection_manager: ConnectionManager = Depends(get_connection_manager),
     gemini_service: GeminiService = Depends(get_gemini_service),
     pat_service: PATModelService = Depends(get_pat_model_service),
@@ -547,7 +567,9 @@ async def websocket_health_analysis_endpoint(
     """WebSocket endpoint for real-time health analysis updates.
 
     This endpoint provides real-time updates during health data processing,
-    including PAT analysis and AI insight generation.
+    including PAT analysis and AI insight generation. With ``stream=true``
+    frames are coalesced into windowed analyses and progress frames are sent
+    in between.
     """
     # Authenticate the user first
     current_user = await _authenticate_websocket_user(token, websocket)
@@ -564,6 +586,25 @@ async def websocket_health_analysis_endpoint(
     handler = WebSocketChatHandler(
         gemini_service=gemini_service, pat_service=pat_service
     )
+    coalescer: HealthDataStreamCoalescer | None = None
+    if stream:
+
+        async def _analyze_window(
+            window_user_id: str, payload: WebSocketHealthDataPayload
+        ) -> None:
+            await handler.trigger_health_analysis(
+                window_user_id, payload, connection_manager
+            )
+
+        async def _send_progress(update: AnalysisUpdateMessage) -> None:
+            await connection_manager.send_to_connection(websocket, update)
+
+        coalescer = HealthDataStreamCoalescer(
+            _analyze_window,
+            _send_progress,
+            analysis_interval_seconds=settings.health_stream_analysis_interval_seconds,
+            min_new_minutes=settings.health_stream_min_new_minutes,
+        )
     logger.info("WebSocket connection attempt: %s", token)
     try:
         await websocket.accept()
@@ -586,7 +627,12 @@ async def websocket_health_analysis_endpoint(
                 if not await connection_manager.handle_message(websocket, raw_message):
                     continue
                 await _handle_health_analysis_message(
-                    raw_message, user_id, handler, connection_manager, websocket
+                    raw_message,
+                    user_id,
+                    handler,
+                    connection_manager,
+                    websocket,
+                    coalescer,
                 )
             except WebSocketDisconnect as e:
                 logger.warning(
@@ -600,6 +646,8 @@ async def websocket_health_analysis_endpoint(
     except Exception:
         logger.exception("Error in health analysis WebSocket connection")
     finally:
+        if coalescer is not None:
+            await coalescer.close(user_id)
         await connection_manager.disconnect(
             websocket, "Health analysis connection closed"
         )
@@ -0,0 +1,282 @@
+"""Incremental ingestion of streamed health_data WebSocket frames.
+
+Phones that stream minute-level actigraphy send many small ``health_data``
+frames. Running a full PAT + Gemini analysis per frame is wasteful, so in
+streaming mode frames are appended to a per-user rolling minute buffer and
+analysis is debounced: it runs once enough new minutes have arrived or the
+analysis interval has elapsed, whichever comes first. Between analyses the
+client receives ``AnalysisUpdateMessage`` progress frames. An analysis works
+on a snapshot of the window, so frames keep being buffered while it runs.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import contextlib
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import logging
+import time
+
+from clarity.api.v1.websocket.models import (
+    ActigraphyDataPointSchema,
+    AnalysisUpdateMessage,
+    WebSocketHealthDataPayload,
+)
+from clarity.core.constants import (
+    HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS,
+    HEALTH_STREAM_MIN_NEW_MINUTES,
+    MINUTES_PER_WEEK,
+    SECONDS_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+
+AnalyzeCallback = Callable[[str, WebSocketHealthDataPayload], Awaitable[None]]
+NotifyCallback = Callable[[AnalysisUpdateMessage], Awaitable[None]]
+
+
+@dataclass
+class _UserStream:
+    """Rolling minute buffer and debounce state for one user."""
+
+    minutes: dict[int, float] = field(default_factory=dict)
+    new_minutes: set[int] = field(default_factory=set)
+    window_started_at: float | None = None
+    analyses_run: int = 0
+    timer: asyncio.Task[None] | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Serializes analyses without blocking ingestion while one runs
+    analysis_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class HealthDataStreamCoalescer:
+    """Coalesces streamed health_data frames into windowed analyses."""
+
+    def __init__(
+        self,
+        analyze: AnalyzeCallback,
+        notify: NotifyCallback,
+        *,
+        analysis_interval_seconds: float = HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS,
+        min_new_minutes: int = HEALTH_STREAM_MIN_NEW_MINUTES,
+        max_buffer_minutes: int = MINUTES_PER_WEEK,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            analyze: Runs a full analysis over the buffered window
+            notify: Sends a progress frame to the client
+            analysis_interval_seconds: Maximum time new data waits for analysis
+            min_new_minutes: New minutes that trigger analysis immediately
+            max_buffer_minutes: Size of the rolling buffer (oldest minutes drop)
+            clock: Monotonic clock, injectable for tests
+        """
+        self._analyze = analyze
+        self._notify = notify
+        self.analysis_interval_seconds = analysis_interval_seconds
+        self.min_new_minutes = max(min_new_minutes, 1)
+        self.max_buffer_minutes = max_buffer_minutes
+        self._clock = clock
+        self._streams: dict[str, _UserStream] = {}
+
+    def buffered_minutes(self, user_id: str) -> int:
+        """Number of minutes currently buffered for a user."""
+        stream = self._streams.get(user_id)
+        return len(stream.minutes) if stream else 0
+
+    def pending_minutes(self, user_id: str) -> int:
+        """Number of new minutes not yet covered by an analysis."""
+        stream = self._streams.get(user_id)
+        return len(stream.new_minutes) if stream else 0
+
+    async def ingest(self, user_id: str, payload: WebSocketHealthDataPayload) -> bool:
+        """Append a frame to the user's buffer and analyze if due.
+
+        Args:
+            user_id: Owner of the stream
+            payload: Validated health_data frame
+
+        Returns:
+            True if the frame triggered an analysis
+        """
+        stream = self._streams.setdefault(user_id, _UserStream())
+
+        async with stream.lock:
+            self._append(stream, payload.data_points)
+            if not stream.new_minutes:
+                return False
+
+            if stream.window_started_at is None:
+                stream.window_started_at = self._clock()
+
+            if not self._is_due(stream):
+                self._ensure_timer(user_id, stream)
+                await self._notify(self._progress_message(user_id, stream))
+                return False
+
+            window = self._take_window(user_id, stream)
+
+        await self._run_analysis(user_id, stream, window)
+        return True
+
+    async def flush(self, user_id: str) -> bool:
+        """Analyze any pending data for a user now.
+
+        Returns:
+            True if an analysis ran
+        """
+        stream = self._streams.get(user_id)
+        if stream is None:
+            return False
+
+        async with stream.lock:
+            if not stream.new_minutes:
+                return False
+            window = self._take_window(user_id, stream)
+
+        await self._run_analysis(user_id, stream, window)
+        return True
+
+    async def close(self, user_id: str) -> None:
+        """Drop a user's buffer and cancel its pending debounce timer."""
+        stream = self._streams.pop(user_id, None)
+        if stream is None:
+            return
+        timer = stream.timer
+        stream.timer = None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await timer
+
+    def _append(
+        self, stream: _UserStream, data_points: list[ActigraphyDataPointSchema]
+    ) -> None:
+        """Bin samples into minutes; activity counts within a minute add up."""
+        for point in data_points:
+            timestamp = point.timestamp
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=UTC)
+            minute = int(timestamp.timestamp()) // SECONDS_PER_MINUTE
+            stream.minutes[minute] = stream.minutes.get(minute, 0.0) + point.value
+            stream.new_minutes.add(minute)
+
+        overflow = len(stream.minutes) - self.max_buffer_minutes
+        if overflow > 0:
+            for minute in sorted(stream.minutes)[:overflow]:
+                del stream.minutes[minute]
+                stream.new_minutes.discard(minute)
+
+    def _is_due(self, stream: _UserStream) -> bool:
+        if len(stream.new_minutes) >= self.min_new_minutes:
+            return True
+        if stream.window_started_at is None:
+            return False
+        elapsed = self._clock() - stream.window_started_at
+        return elapsed >= self.analysis_interval_seconds
+
+    def _ensure_timer(self, user_id: str, stream: _UserStream) -> None:
+        """Schedule a trailing analysis so sparse streams are not starved."""
+        if stream.timer is not None and not stream.timer.done():
+            return
+        if stream.window_started_at is None:
+            return
+
+        delay = max(
+            0.0,
+            stream.window_started_at
+            + self.analysis_interval_seconds
+            - self._clock(),
+        )
+        stream.timer = asyncio.create_task(self._flush_after(user_id, delay))
+
+    async def _flush_after(self, user_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self.flush(user_id)
+        except Exception:
+            logger.exception("Debounced health analysis failed for user %s", user_id)
+
+    def _take_window(
+        self, user_id: str, stream: _UserStream
+    ) -> WebSocketHealthDataPayload:
+        """Snapshot the rolling window and reset the debounce state.
+
+        The caller holds the stream lock; frames arriving after the snapshot
+        count towards the next window.
+        """
+        timer = stream.timer
+        stream.timer = None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        new_minutes = len(stream.new_minutes)
+        stream.new_minutes.clear()
+        stream.window_started_at = None
+        stream.analyses_run += 1
+
+        # HIPAA-compliant logging - no PHI data
+        logger.info(
+            "Running windowed health analysis for user %s "
+            "(%d buffered minutes, %d new)",
+            user_id,
+            len(stream.minutes),
+            new_minutes,
+        )
+        return self._window_payload(stream)
+
+    async def _run_analysis(
+        self, user_id: str, stream: _UserStream, window: WebSocketHealthDataPayload
+    ) -> None:
+        """Analyze a window snapshot outside the stream lock."""
+        minutes = len(window.data_points)
+        async with stream.analysis_lock:
+            await self._notify(
+                AnalysisUpdateMessage(
+                    user_id=user_id,
+                    status="processing",
+                    progress=0,
+                    details=f"Analyzing {minutes} buffered minutes",
+                )
+            )
+            await self._analyze(user_id, window)
+            await self._notify(
+                AnalysisUpdateMessage(
+                    user_id=user_id,
+                    status="completed",
+                    progress=100,
+                    details=f"Analyzed {minutes} buffered minutes",
+                )
+            )
+
+    @staticmethod
+    def _window_payload(stream: _UserStream) -> WebSocketHealthDataPayload:
+        return WebSocketHealthDataPayload(
+            data_points=[
+                ActigraphyDataPointSchema(
+                    timestamp=datetime.fromtimestamp(
+                        minute * SECONDS_PER_MINUTE, tz=UTC
+                    ),
+                    value=value,
+                )
+                for minute, value in sorted(stream.minutes.items())
+            ]
+        )
+
+    def _progress_message(
+        self, user_id: str, stream: _UserStream
+    ) -> AnalysisUpdateMessage:
+        pending = len(stream.new_minutes)
+        progress = min(99, pending * 100 // self.min_new_minutes)
+        return AnalysisUpdateMessage(
+            user_id=user_id,
+            status="buffering",
+            progress=progress,
+            details=(
+                f"{pending}/{self.min_new_minutes} new minutes buffered; "
+                f"analysis within {self.analysis_interval_seconds:.0f}s"
+            ),
+        )
@@ -5,22 +5,25 @@ This module provides AWS Cognito integration with AWS-native solutions.
 
 # removed - breaks FastAPI
 
+import asyncio
+from collections import OrderedDict
 from datetime import UTC, datetime
-import json
+import hashlib
 import logging
 import time
-from typing import TYPE_CHECKING, Any, cast
-import urllib.parse
-import urllib.request
+from typing import TYPE_CHECKING, Any
+import weakref
 
 import boto3
 from botocore.exceptions import ClientError
 from jose import JWTError, jwt
 from mypy_boto3_cognito_idp import CognitoIdentityProviderClient
+from prometheus_client import Counter
 
 if TYPE_CHECKING:
     pass  # Only for type stubs now
 
+from clarity.auth.jwks import JWKSManager
 from clarity.models.auth import (
     AuthError,
     Permission,
@@ -32,6 +35,160 @@ from clarity.ports.auth_ports import IAuthProvider
 
 logger = logging.getLogger(__name__)
 
+USER_CONTEXT_TTL_SECONDS = 300  # upper bound; token expiry may cut it shorter
+LAST_LOGIN_WRITE_INTERVAL_SECONDS = 300  # at most one last_login write per user
+TOKEN_CACHE_SWEEP_BATCH = 2  # cold entries checked for expiry per insert
+
+AUTH_TOKEN_CACHE_REQUESTS_TOTAL = Counter(
+    "clarity_auth_token_cache_requests_total",
+    "Verified-token cache lookups",
+    ["outcome"],
+)
+
+
+class VerifiedTokenCache:
+    """LRU cache of verified token claims keyed by a SHA-256 token digest.
+
+    Raw bearer tokens are never kept as keys. An entry expires at the
+    earlier of the cache TTL and the token's ``exp`` claim, and the cache
+    never holds more than ``max_size`` entries. Expired entries are dropped
+    when looked up, and every insert checks a few of the least recently
+    used entries, so cleanup stays amortised O(1) instead of scanning.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Cached tokens before the least recently used is evicted
+            ttl_seconds: Longest time a verification result is reused
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Get the claims of a previously verified, unexpired token."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() >= entry[1]:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            AUTH_TOKEN_CACHE_REQUESTS_TOTAL.labels(outcome="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        AUTH_TOKEN_CACHE_REQUESTS_TOTAL.labels(outcome="hit").inc()
+        return entry[0]
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        """Cache a verified token's claims until the TTL or its ``exp``."""
+        now = time.monotonic()
+        ttl = float(self.ttl_seconds)
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, int | float):
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (claims, now + ttl)
+        self._entries.move_to_end(key)
+        self._sweep(now)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries among the least recently used few."""
+        for _ in range(TOKEN_CACHE_SWEEP_BATCH):
+            oldest = next(iter(self._entries))
+            if now < self._entries[oldest][1]:
+                return
+            del self._entries[oldest]
+
+    def clear(self) -> None:
+        """Drop all cached tokens."""
+        self._entries.clear()
+
+    def __contains__(self, token: object) -> bool:
+        """Whether a token has a cache entry (expired or not)."""
+        return isinstance(token, str) and self._key(token) in self._entries
+
+    def __len__(self) -> int:
+        """Number of cached tokens, including expired ones not yet evicted."""
+        return len(self._entries)
+
+
+class UserContextCache:
+    """LRU cache of user contexts keyed by Cognito ``sub``.
+
+    Entries expire at their own deadline, so a context never outlives the
+    token it was resolved for. Every cache registers itself so that
+    ``invalidate_user_context`` can drop a user after a profile update.
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Cached users before the least recently used is evicted
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[UserContext, float]] = OrderedDict()
+        _user_context_caches.add(self)
+
+    def get(self, user_id: str) -> UserContext | None:
+        """Get a user's context if cached and not expired."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        context, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return context
+
+    def set(self, user_id: str, context: UserContext, ttl_seconds: float) -> None:
+        """Cache a user's context for ``ttl_seconds`` (ignored if not positive)."""
+        if ttl_seconds <= 0:
+            return
+        self._entries[user_id] = (context, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's cached context."""
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached contexts."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Number of cached contexts, including expired ones not yet evicted."""
+        return len(self._entries)
+
+
+_user_context_caches: "weakref.WeakSet[UserContextCache]" = weakref.WeakSet()
+
+
+def invalidate_user_context(user_id: str) -> None:
+    """Drop a user's cached context from every auth provider in this process.
+
+    Call after changing anything a ``UserContext`` is built from (profile,
+    role, status), so the next request re-reads the user record.
+    """
+    for cache in list(_user_context_caches):
+        cache.invalidate(user_id)
+
 
 class CognitoAuthProvider(IAuthProvider):
     """AWS Cognito authentication provider.
@@ -81,10 +238,21 @@ class CognitoAuthProvider(IAuthProvider):
             "cache_ttl_seconds", 300
         )
         self._token_cache_max_size = auth_provider_config.get("cache_max_size", 1000)
-        self._token_cache: dict[str, dict[str, Any]] = {}
-        self._jwks_cache: dict[str, Any] | None = None
-        self._jwks_cache_time: float = 0
-        self._jwks_cache_ttl = 3600  # 1 hour
+        self._token_cache = VerifiedTokenCache(
+            self._token_cache_max_size, self._token_cache_ttl_seconds
+        )
+        self._jwks = JWKSManager(self.jwks_url)
+
+        # User contexts and debounced last-login writes
+        self._user_context_ttl_seconds = auth_provider_config.get(
+            "user_context_ttl_seconds", USER_CONTEXT_TTL_SECONDS
+        )
+        self._last_login_interval_seconds = auth_provider_config.get(
+            "last_login_interval_seconds", LAST_LOGIN_WRITE_INTERVAL_SECONDS
+        )
+        self._user_contexts = UserContextCache(self._token_cache_max_size)
+        self._last_login_writes: dict[str, float] = {}
+        self._login_write_tasks: set[asyncio.Task[None]] = set()
 
         self._initialized = False
         logger.info("Cognito Authentication Provider initialized.")
@@ -122,48 +290,7 @@ class CognitoAuthProvider(IAuthProvider):
 
     async def _get_jwks(self) -> dict[str, Any]:
         """Get JSON Web Key Set from Cognito for token verification."""
-        current_time = time.time()
-
-        # Check cache
-        if (
-            self._jwks_cache
-            and (current_time - self._jwks_cache_time) < self._jwks_cache_ttl
-        ):
-            return self._jwks_cache
-
-        try:
-            # Validate URL scheme before opening
-            parsed_url = urllib.parse.urlparse(self.jwks_url)
-            if parsed_url.scheme != "https":
-                msg = f"Invalid URL scheme: {parsed_url.scheme}. Only HTTPS is allowed."
-                raise ValueError(msg)
-
-            with urllib.request.urlopen(self.jwks_url) as response:  # noqa: S310
-                jwks = json.loads(response.read())
-                self._jwks_cache = jwks
-                self._jwks_cache_time = current_time
-                return cast("dict[str, Any]", jwks)
-        except Exception as e:
-            logger.exception("Failed to fetch JWKS: %s", e)
-            if self._jwks_cache:
-                # Return stale cache if available
-                return self._jwks_cache
-            raise
-
-    def _remove_expired_tokens(self) -> None:
-        """Remove expired tokens from the cache based on TTL."""
-        if not self.cache_is_enabled:
-            return
-        current_time = time.time()
-        expired_tokens = [
-            t
-            for t, data in self._token_cache.items()
-            if current_time - data["timestamp"] > self._token_cache_ttl_seconds
-        ]
-        for t in expired_tokens:
-            if t in self._token_cache:
-                del self._token_cache[t]
-                logger.debug("Removed expired token from cache")
+        return await self._jwks.get_jwks()
 
     async def verify_token(self, token: str) -> dict[str, Any] | None:
         """Verify Cognito ID token and return user information.
@@ -177,31 +304,24 @@ class CognitoAuthProvider(IAuthProvider):
         if not self._initialized:
             await self.initialize()
 
-        self._remove_expired_tokens()
-
         # Check cache first if enabled
-        if self.cache_is_enabled and token in self._token_cache:
-            logger.debug("Token found in cache")
-            return cast("dict[str, Any]", self._token_cache[token]["user_data"])
+        if self.cache_is_enabled:
+            cached = self._token_cache.get(token)
+            if cached is not None:
+                logger.debug("Token found in cache")
+                return cached
 
         logger.debug("🔐 COGNITO VERIFY_TOKEN CALLED")
 
         try:
-            # Get JWKS for verification
-            jwks = await self._get_jwks()
-
             # Decode and verify the token
             # First, decode without verification to get the header
             unverified_header = jwt.get_unverified_header(token)
 
             # Find the correct key
-            rsa_key = None
-            for key in jwks["keys"]:
-                if key["kid"] == unverified_header["kid"]:
-                    rsa_key = key
-                    break
+            rsa_key = await self._jwks.get_key(unverified_header["kid"])
 
-            if not rsa_key:
+            if rsa_key is None:
                 raise AuthError(
                     message="Unable to find appropriate key",
                     status_code=401,
@@ -225,14 +345,12 @@ class CognitoAuthProvider(IAuthProvider):
                 "custom_claims": payload.get("custom", {}),
                 "cognito_username": payload.get("cognito:username"),
                 "token_use": payload.get("token_use"),
+                "exp": payload.get("exp"),
             }
 
             # Cache the result
             if self.cache_is_enabled:
-                self._token_cache[token] = {
-                    "user_data": user_info,
-                    "timestamp": time.time(),
-                }
+                self._token_cache.set(token, user_info)
 
             logger.debug("✅ COGNITO TOKEN VERIFIED SUCCESSFULLY")
             return user_info
@@ -334,6 +452,10 @@ class CognitoAuthProvider(IAuthProvider):
     ) -> UserContext:
         """Get user context, creating DynamoDB record if needed.
 
+        Contexts are cached per user for at most the token's remaining
+        lifetime, so repeat requests skip DynamoDB. The last-login update
+        is written behind, at most once per user per configured interval.
+
         Args:
             cognito_user_info: User info from Cognito token verification
 
@@ -346,6 +468,12 @@ class CognitoAuthProvider(IAuthProvider):
 
         user_id = cognito_user_info["user_id"]
 
+        if self.cache_is_enabled:
+            cached = self._user_contexts.get(user_id)
+            if cached is not None:
+                self._schedule_last_login(user_id)
+                return cached
+
         try:
             # Try to get existing user record
             user_data = await self.dynamodb_service.get_item(
@@ -357,27 +485,74 @@ class CognitoAuthProvider(IAuthProvider):
                 # User doesn't exist in DynamoDB, create it
                 logger.info("Creating new DynamoDB user record for %s", user_id)
                 user_data = await self._create_user_record(cognito_user_info)
+                self._last_login_writes[user_id] = time.monotonic()
             else:
-                # Update last login
-                await self.dynamodb_service.update_item(
-                    table_name=self.users_table,
-                    key={"user_id": user_id},
-                    update_expression="SET last_login = :login_time, login_count = login_count + :inc",
-                    expression_attribute_values={
-                        ":login_time": datetime.now(UTC).isoformat(),
-                        ":inc": 1,
-                    },
-                    user_id=user_id,
-                )
+                self._schedule_last_login(user_id)
 
             # Create UserContext from database record
-            return self._create_user_context_from_db(user_data, cognito_user_info)
+            context = self._create_user_context_from_db(user_data, cognito_user_info)
 
         except Exception:
             logger.exception("Error creating/fetching user context")
             # Fall back to basic context creation
             return self._create_basic_user_context(cognito_user_info)
 
+        if self.cache_is_enabled:
+            self._user_contexts.set(
+                user_id, context, self._user_context_ttl(cognito_user_info)
+            )
+        return context
+
+    def _user_context_ttl(self, cognito_user_info: dict[str, Any]) -> float:
+        """Seconds a context may be cached: the TTL, capped by token expiry."""
+        ttl = float(self._user_context_ttl_seconds)
+        expires_at = cognito_user_info.get("exp")
+        if isinstance(expires_at, int | float):
+            ttl = min(ttl, expires_at - time.time())
+        return ttl
+
+    def _schedule_last_login(self, user_id: str) -> None:
+        """Queue a last-login write unless one ran within the interval."""
+        now = time.monotonic()
+        interval = self._last_login_interval_seconds
+        last_write = self._last_login_writes.get(user_id)
+        if last_write is not None and now - last_write < interval:
+            return
+
+        if len(self._last_login_writes) >= self._token_cache_max_size:
+            # Writes older than the interval no longer debounce anything
+            self._last_login_writes = {
+                uid: written
+                for uid, written in self._last_login_writes.items()
+                if now - written < interval
+            }
+        self._last_login_writes[user_id] = now
+
+        task = asyncio.create_task(self._write_last_login(user_id))
+        self._login_write_tasks.add(task)
+        task.add_done_callback(self._login_write_tasks.discard)
+
+    async def _write_last_login(self, user_id: str) -> None:
+        """Record a login in the user record (background task)."""
+        try:
+            await self.dynamodb_service.update_item(
+                table_name=self.users_table,
+                key={"user_id": user_id},
+                update_expression="SET last_login = :login_time, login_count = login_count + :inc",
+                expression_attribute_values={
+                    ":login_time": datetime.now(UTC).isoformat(),
+                    ":inc": 1,
+                },
+                user_id=user_id,
+            )
+        except Exception:
+            logger.exception("Failed to record last login for %s", user_id)
+
+    async def flush_login_writes(self) -> None:
+        """Wait for queued last-login writes to finish."""
+        if self._login_write_tasks:
+            await asyncio.gather(*self._login_write_tasks, return_exceptions=True)
+
     def _create_basic_user_context(self, user_info: dict[str, Any]) -> UserContext:
         """Create basic UserContext from Cognito user info."""
         # Extract user role from custom claims
@@ -553,8 +728,11 @@ class CognitoAuthProvider(IAuthProvider):
 
     async def cleanup(self) -> None:
         """Cleanup resources when shutting down."""
+        await self.flush_login_writes()
         self._token_cache.clear()
-        self._jwks_cache = None
+        self._user_contexts.clear()
+        self._last_login_writes.clear()
+        await self._jwks.close()
         logger.info("Cognito authentication provider cleanup complete")
         self._initialized = False
 
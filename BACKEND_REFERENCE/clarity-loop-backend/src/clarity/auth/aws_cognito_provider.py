@@ -11,11 +11,11 @@ from typing import TYPE_CHECKING, Any
 
 import boto3
 from botocore.exceptions import ClientError
-from jose import JWTError, jwk, jwt
+from jose import JWTError, jwt
 from jose.utils import base64url_decode
 from mypy_boto3_cognito_idp.type_defs import AttributeTypeTypeDef
-import requests
 
+from clarity.auth.jwks import JWKSManager
 from clarity.core.exceptions import (
     AuthenticationError,
     EmailNotVerifiedError,
@@ -46,38 +46,11 @@ class CognitoAuthProvider(IAuthProvider):
         self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
         self.jwks_url = f"{self.issuer}/.well-known/jwks.json"
 
-        # Cache for JWKS keys
-        self._jwks_cache: dict[str, Any] | None = None
-        self._jwks_cache_time: float = 0.0
-        self._jwks_cache_ttl = 3600  # 1 hour
+        # Public keys by kid, refreshed in the background
+        self._jwks = JWKSManager(self.jwks_url)
 
         logger.info("Initialized Cognito auth provider for pool: %s", user_pool_id)
 
-    @property
-    def jwks(self) -> dict[str, Any]:
-        """Get JWKS keys with caching."""
-        current_time = time.time()
-        if (
-            self._jwks_cache is None
-            or current_time - self._jwks_cache_time > self._jwks_cache_ttl
-        ):
-            try:
-                response = requests.get(self.jwks_url, timeout=30)
-                response.raise_for_status()
-                self._jwks_cache = response.json()
-                self._jwks_cache_time = current_time
-                logger.debug("Updated JWKS cache")
-            except Exception as e:
-                logger.exception("Failed to fetch JWKS")
-                if self._jwks_cache is None:
-                    msg = "Failed to fetch JWKS keys"
-                    raise AuthenticationError(msg) from e
-        # Type narrowing - at this point _jwks_cache cannot be None
-        if self._jwks_cache is None:
-            msg = "JWKS cache is unexpectedly None after fetch"
-            raise AuthenticationError(msg)
-        return self._jwks_cache
-
     async def verify_token(self, token: str) -> dict[str, Any] | None:
         """Verify Cognito JWT token."""
         try:
@@ -85,20 +58,12 @@ class CognitoAuthProvider(IAuthProvider):
             headers = jwt.get_unverified_headers(token)
             kid = headers["kid"]
 
-            # Search for the kid in the downloaded public keys
-            key_index = -1
-            for i in range(len(self.jwks["keys"])):
-                if kid == self.jwks["keys"][i]["kid"]:
-                    key_index = i
-                    break
-
-            if key_index == -1:
+            # Look up the public key for the kid
+            public_key = await self._jwks.get_key(kid)
+            if public_key is None:
                 logger.error("Public key not found in jwks.json")
                 return None
 
-            # Construct the public key
-            public_key = jwk.construct(self.jwks["keys"][key_index])
-
             # Get the last two sections of the token (message and signature)
             message, encoded_signature = str(token).rsplit(".", 1)
 
@@ -339,7 +304,7 @@ class CognitoAuthProvider(IAuthProvider):
         """Initialize Cognito provider."""
         try:
             # Test connection by fetching JWKS
-            _ = self.jwks
+            await self._jwks.get_jwks()
             logger.info("Cognito provider initialized successfully")
         except Exception:
             logger.exception("Failed to initialize Cognito provider")
@@ -347,7 +312,7 @@ class CognitoAuthProvider(IAuthProvider):
 
     async def shutdown(self) -> None:
         """Cleanup resources."""
-        self._jwks_cache = None
+        await self._jwks.close()
         logger.info("Cognito provider shutdown complete")
 
     async def cleanup(self) -> None:
@@ -16,7 +16,7 @@ from fastapi.security import HTTPBearer
 from clarity.auth.aws_cognito_provider import get_cognito_provider
 from clarity.auth.lockout_service import get_lockout_service  # noqa: F401
 from clarity.auth.modal_auth_fix import get_user_context
-from clarity.models.auth import UserContext
+from clarity.models.auth import Permission, UserContext, UserRole
 from clarity.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -200,6 +200,28 @@ def require_active_account(
     return user
 
 
+def require_admin(
+    user: UserContext = Depends(get_authenticated_user),
+) -> UserContext:
+    """Require an authenticated administrator.
+
+    Args:
+        user: Authenticated user context
+
+    Returns:
+        UserContext if the user is an admin or has the system admin permission
+
+    Raises:
+        HTTPException: 403 if the user is not an administrator
+    """
+    if user.role != UserRole.ADMIN and Permission.SYSTEM_ADMIN not in user.permissions:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+    return user
+
+
 # Convenience function for transitioning from old User model
 def user_context_to_simple_user(context: UserContext) -> User:
     """Convert UserContext to simple User model for backward compatibility.
@@ -0,0 +1,225 @@
+"""JSON Web Key Set manager for Cognito token verification.
+
+Keeps the signing keys of a JWKS endpoint as pre-constructed public key
+objects indexed by ``kid``, so verifying a token is a dict lookup instead of
+a scan of the key list plus ``jwk.construct``. The set is fetched with a
+non-blocking HTTP client and refreshed in the background shortly before it
+expires; a token signed with an unknown ``kid`` (key rotation) triggers one
+shared refresh for all concurrent requests. When a refresh fails the last
+known keys keep being served.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any
+import urllib.parse
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+
+logger = logging.getLogger(__name__)
+
+JWKS_TTL_SECONDS = 3600  # 1 hour
+JWKS_REFRESH_AHEAD_SECONDS = 300  # start refreshing this long before expiry
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30  # rate limit for unknown-kid refreshes
+JWKS_TIMEOUT_SECONDS = 10.0
+DEFAULT_KEY_ALGORITHM = "RS256"
+
+
+class JWKSManager:
+    """Asynchronously refreshed, ``kid``-indexed cache of JWKS public keys."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        ttl_seconds: float = JWKS_TTL_SECONDS,
+        refresh_ahead_seconds: float = JWKS_REFRESH_AHEAD_SECONDS,
+        min_refresh_interval_seconds: float = JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+        timeout_seconds: float = JWKS_TIMEOUT_SECONDS,
+        allow_insecure: bool = False,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            url: JWKS endpoint
+            ttl_seconds: Age after which the key set is considered expired
+            refresh_ahead_seconds: How long before expiry a background
+                refresh is started
+            min_refresh_interval_seconds: Minimum time between fetch attempts
+                triggered by unknown key IDs or failed refreshes
+            timeout_seconds: HTTP timeout of a fetch
+            allow_insecure: Accept non-HTTPS URLs (local test servers only)
+
+        Raises:
+            ValueError: If the URL is not HTTPS and ``allow_insecure`` is off
+        """
+        scheme = urllib.parse.urlparse(url).scheme
+        if scheme != "https" and not allow_insecure:
+            msg = f"Invalid URL scheme: {scheme}. Only HTTPS is allowed."
+            raise ValueError(msg)
+
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds)
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.timeout_seconds = timeout_seconds
+
+        self._jwks: dict[str, Any] | None = None
+        self._keys: dict[str, Key] = {}
+        self._fetched_at = -math.inf
+        self._last_attempt = -math.inf
+        self._refresh_task: asyncio.Task[bool] | None = None
+        self.stats = {"fetches": 0, "failures": 0, "unknown_kid_refreshes": 0}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a key set has been fetched at least once."""
+        return self._jwks is not None
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the last successful fetch (``inf`` if never)."""
+        return time.monotonic() - self._fetched_at
+
+    async def get_key(self, kid: str) -> Key | None:
+        """Get the public key for a key ID.
+
+        Unknown key IDs refresh the key set once (shared by concurrent
+        callers and rate limited), so keys rotated in by Cognito are picked
+        up without waiting for the TTL.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            The public key, or None if the key set does not contain it
+
+        Raises:
+            RuntimeError: If no key set could ever be fetched
+        """
+        await self._ensure_fresh()
+        key = self._keys.get(kid)
+        if key is None and self._may_attempt():
+            self.stats["unknown_kid_refreshes"] += 1
+            logger.info("Unknown JWKS key ID %s, refreshing key set", kid)
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    async def get_jwks(self) -> dict[str, Any]:
+        """Get the raw JSON Web Key Set document.
+
+        Raises:
+            RuntimeError: If no key set could ever be fetched
+        """
+        await self._ensure_fresh()
+        assert self._jwks is not None  # noqa: S101 - set by _ensure_fresh
+        return self._jwks
+
+    async def refresh(self) -> None:
+        """Fetch the key set now, joining a refresh already in flight.
+
+        A failed refresh keeps the previous keys.
+
+        Raises:
+            RuntimeError: If the fetch failed and no key set was ever loaded
+        """
+        await asyncio.shield(self._start_refresh())
+        if self._jwks is None:
+            msg = f"Failed to fetch JWKS keys from {self.url}"
+            raise RuntimeError(msg)
+
+    async def close(self) -> None:
+        """Cancel a refresh in flight and drop the cached keys."""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._jwks = None
+        self._keys = {}
+        self._fetched_at = -math.inf
+        self._last_attempt = -math.inf
+
+    async def _ensure_fresh(self) -> None:
+        """Load the key set on first use; refresh ahead of expiry otherwise."""
+        if self._jwks is None:
+            await self.refresh()
+            return
+        if (
+            self.age_seconds >= self.ttl_seconds - self.refresh_ahead_seconds
+            and self._may_attempt()
+        ):
+            # Requests keep using the current keys while the refresh runs
+            self._start_refresh()
+            if self.age_seconds >= self.ttl_seconds:
+                logger.warning(
+                    "Serving JWKS keys %.0fs old from %s", self.age_seconds, self.url
+                )
+
+    def _may_attempt(self) -> bool:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return True  # joining the refresh in flight costs no extra fetch
+        elapsed = time.monotonic() - self._last_attempt
+        return elapsed >= self.min_refresh_interval_seconds
+
+    def _start_refresh(self) -> asyncio.Task[bool]:
+        """Start a refresh unless one is in flight (single flight)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        return self._refresh_task
+
+    async def _fetch(self) -> bool:
+        """Fetch and index the key set; never raises except on cancellation."""
+        self._last_attempt = time.monotonic()
+        self.stats["fetches"] += 1
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                document = response.json()
+            keys = self._construct_keys(document)
+        except Exception:
+            self.stats["failures"] += 1
+            logger.exception("Failed to fetch JWKS from %s", self.url)
+            return False
+
+        self._jwks = document
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.debug("Updated JWKS cache with %d keys", len(keys))
+        return True
+
+    @staticmethod
+    def _construct_keys(document: Any) -> dict[str, Key]:
+        """Build the ``kid`` -> public key index of a JWKS document.
+
+        Raises:
+            ValueError: If the document has no ``keys`` list
+        """
+        if not isinstance(document, dict) or not isinstance(
+            document.get("keys"), list
+        ):
+            msg = "JWKS document has no 'keys' list"
+            raise ValueError(msg)
+
+        keys: dict[str, Key] = {}
+        for key_data in document["keys"]:
+            kid = key_data.get("kid") if isinstance(key_data, dict) else None
+            if kid is None:
+                continue
+            try:
+                keys[kid] = jwk.construct(
+                    key_data, key_data.get("alg", DEFAULT_KEY_ALGORITHM)
+                )
+            except Exception:  # noqa: BLE001 - one bad key must not drop the set
+                logger.warning("Skipping unusable JWKS key %s", kid)
+        return keys
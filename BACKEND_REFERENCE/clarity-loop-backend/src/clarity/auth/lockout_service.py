@@ -2,14 +2,20 @@
 
 Provides brute force protection by tracking failed login attempts
 and temporarily locking accounts after too many failures.
+
+Each login touches Redis once per operation: the lock check and the failure
+update (increment, start the window, lock) each run as one atomic Lua script.
+The in-memory fallback keeps one record per user and updates it without
+awaiting, which is atomic on the event loop, so a burst against one account
+never queues logins for other accounts; expired records are swept
+periodically.
 """
 
-import asyncio
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 import logging
 import os
 import time
-from typing import Any
 
 import redis.asyncio as redis
 
@@ -17,6 +23,32 @@ from clarity.core.exceptions import AuthenticationError
 
 logger = logging.getLogger(__name__)
 
+SWEEP_INTERVAL_SECONDS = 60.0  # How often expired in-memory records are dropped
+
+# KEYS[1] = user key; ARGV[1] = max attempts, ARGV[2] = lockout seconds.
+# Returns 1 if the account is locked after this failure, else 0.
+_REGISTER_FAILURE_SCRIPT = """
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if attempts >= tonumber(ARGV[1]) then
+    if redis.call('HSETNX', KEYS[1], 'locked', 1) == 1 then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+    return 1
+end
+return 0
+"""
+
+# KEYS[1] = user key. Returns the remaining lockout in milliseconds, or 0.
+_LOCK_REMAINING_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'locked') == '1' then
+    return redis.call('PTTL', KEYS[1])
+end
+return 0
+"""
+
 
 class AccountLockoutError(AuthenticationError):
     """Raised when an account is temporarily locked due to too many failed attempts."""
@@ -30,6 +62,15 @@ class AccountLockoutError(AuthenticationError):
         )
 
 
+@dataclass
+class _FailureRecord:
+    """In-memory failure window for one user."""
+
+    attempts: int
+    expires_at: float  # Window end, or lockout end once locked
+    locked: bool = False
+
+
 class AccountLockoutService:
     """Account lockout service with Redis persistence and in-memory fallback."""
 
@@ -43,9 +84,16 @@ class AccountLockoutService:
     ) -> None:
         self.max_attempts = max_attempts
         self.lockout_secs = int(lockout_duration.total_seconds())
-        self._mem: dict[str, dict[str, Any]] = {}
-        self._lock = asyncio.Lock()
+        self._mem: dict[str, _FailureRecord] = {}
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
         self._r = redis.from_url(redis_url) if redis_url else None
+        if self._r is not None:
+            self._register_failure_script = self._r.register_script(
+                _REGISTER_FAILURE_SCRIPT
+            )
+            self._lock_remaining_script = self._r.register_script(
+                _LOCK_REMAINING_SCRIPT
+            )
 
         logger.info(
             "🔒 AccountLockoutService initialized: max_attempts=%d, lockout_duration=%s, persistence=%s",
@@ -56,83 +104,71 @@ class AccountLockoutService:
 
     # ---------- public API ----------
     async def is_locked(self, user: str) -> bool:
+        return await self.lock_remaining(user) > 0
+
+    async def lock_remaining(self, user: str) -> float:
+        """Seconds until the account unlocks, or 0 if it is not locked."""
         if self._r:
-            return await self._redis_is_locked(user)
-        return await self._mem_is_locked(user)
+            return await self._redis_lock_remaining(user)
+        return self._mem_lock_remaining(user)
+
+    async def register_failure(self, user: str) -> bool:
+        """Count a failed attempt.
 
-    async def register_failure(self, user: str) -> None:
+        Returns:
+            True if the account is locked after this attempt
+        """
         if self._r:
-            await self._redis_register_failure(user)
-        else:
-            await self._mem_register_failure(user)
+            return await self._redis_register_failure(user)
+        return self._mem_register_failure(user)
 
     async def reset(self, user: str) -> None:
         if self._r is not None:
             await self._r.delete(self._key(user))
         else:
-            async with self._lock:
-                self._mem.pop(user, None)
+            self._mem.pop(self._key(user), None)
 
     # ---------- Redis impl ----------
-    async def _redis_is_locked(self, user: str) -> bool:
-        if self._r is None:
-            msg = "Redis client not initialized"
-            raise RuntimeError(msg)
-        key = self._key(user)
-        ttl = await self._r.ttl(key)
-        if ttl <= 0:
-            return False
-        locked_value = await self._r.hget(key, "locked")
-        return locked_value == b"1"
-
-    async def _redis_register_failure(self, user: str) -> None:
-        if self._r is None:
-            msg = "Redis client not initialized"
-            raise RuntimeError(msg)
+    async def _redis_lock_remaining(self, user: str) -> float:
+        remaining_ms = await self._lock_remaining_script(keys=[self._key(user)])
+        return max(0, int(remaining_ms)) / 1000
+
+    async def _redis_register_failure(self, user: str) -> bool:
+        locked = await self._register_failure_script(
+            keys=[self._key(user)], args=[self.max_attempts, self.lockout_secs]
+        )
+        return bool(locked)
+
+    # ---------- in-memory impl (no awaits, so atomic on the event loop) ----------
+    def _mem_lock_remaining(self, user: str) -> float:
+        rec = self._mem.get(self._key(user))
+        if rec is None or not rec.locked:
+            return 0
+        return max(0.0, rec.expires_at - time.monotonic())
+
+    def _mem_register_failure(self, user: str) -> bool:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
         key = self._key(user)
-        pipe = self._r.pipeline()
-        pipe.hincrby(key, "attempts", 1)
-        pipe.hget(key, "attempts")
-        res = await pipe.execute()
-        attempt_count = int(res[1])
-        if attempt_count == 1:
-            await self._r.expire(key, self.lockout_secs)
-        if attempt_count >= self.max_attempts:
-            # mark as locked; keep same TTL
-            await self._r.hset(key, mapping={"locked": 1})
-
-    # ---------- in-memory impl (unchanged, but guarded) ----------
-    async def _mem_is_locked(self, user: str) -> bool:
-        async with self._lock:
-            rec = self._mem.get(user)
-            if not rec:
-                return False
-
-            current_time = time.time()
-            locked_until = rec.get("locked_until", 0)
-
-            # If lockout has expired, clean up
-            if locked_until > 0 and locked_until <= current_time:
-                rec["attempts"] = []
-                rec["locked_until"] = 0
-                return False
-
-            return bool(locked_until > current_time)
-
-    async def _mem_register_failure(self, user: str) -> None:
-        async with self._lock:
-            rec = self._mem.setdefault(user, {"attempts": [], "locked_until": 0})
-
-            # Clean up expired attempts
-            current_time = time.time()
-            if rec["locked_until"] > 0 and rec["locked_until"] <= current_time:
-                # Lockout has expired, reset attempts
-                rec["attempts"] = []
-                rec["locked_until"] = 0
-
-            rec["attempts"].append(current_time)
-            if len(rec["attempts"]) >= self.max_attempts:
-                rec["locked_until"] = current_time + self.lockout_secs
+        rec = self._mem.get(key)
+        if rec is None or rec.expires_at <= now:
+            # First failure, or the previous window or lockout has expired
+            rec = self._mem[key] = _FailureRecord(0, now + self.lockout_secs)
+        rec.attempts += 1
+        if rec.attempts >= self.max_attempts and not rec.locked:
+            rec.locked = True
+            rec.expires_at = now + self.lockout_secs
+        return rec.locked
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, rec in self._mem.items() if rec.expires_at <= now]
+        for key in expired:
+            del self._mem[key]
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        if expired:
+            logger.debug("Swept %d expired lockout records", len(expired))
 
     # ---------- helpers ----------
     @staticmethod
@@ -146,10 +182,14 @@ class AccountLockoutService:
 
     async def record_failed_attempt(
         self, username: str, ip_address: str | None = None
-    ) -> None:
-        """Alias for register_failure for backward compatibility."""
-        await self.register_failure(username)
-        if await self.is_locked(username):
+    ) -> bool:
+        """Alias for register_failure for backward compatibility.
+
+        Returns:
+            True if the account is locked after this attempt
+        """
+        locked = await self.register_failure(username)
+        if locked:
             logger.warning(
                 "🔒 Account locked: username=%s, max_attempts=%d, ip=%s",
                 username,
@@ -160,6 +200,7 @@ class AccountLockoutService:
             logger.info(
                 "🚨 Failed attempt recorded: username=%s, ip=%s", username, ip_address
             )
+        return locked
 
     async def reset_attempts(self, username: str) -> None:
         """Alias for reset for backward compatibility."""
@@ -168,9 +209,9 @@ class AccountLockoutService:
 
     async def check_lockout(self, username: str) -> None:
         """Check if account is locked and raise exception if so."""
-        if await self.is_locked(username):
-            # Calculate unlock time (approximate)
-            unlock_time = datetime.now(UTC) + timedelta(seconds=self.lockout_secs)
+        remaining = await self.lock_remaining(username)
+        if remaining > 0:
+            unlock_time = datetime.now(UTC) + timedelta(seconds=remaining)
             raise AccountLockoutError(username, unlock_time)
 
 
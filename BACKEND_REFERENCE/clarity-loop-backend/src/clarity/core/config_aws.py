@@ -13,6 +13,22 @@ from typing import Self
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
 
+from clarity.core.constants import (
+    FEATURE_STORE_MAX_BYTES,
+    FEATURE_STORE_TTL_SECONDS,
+    GEMINI_DEFAULT_BURST_SIZE,
+    GEMINI_DEFAULT_MAX_CONCURRENCY,
+    GEMINI_DEFAULT_MAX_QUEUE_SIZE,
+    GEMINI_DEFAULT_REQUESTS_PER_MINUTE,
+    GEMINI_DEFAULT_RESERVED_INTERACTIVE_SLOTS,
+    HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS,
+    HEALTH_STREAM_MIN_NEW_MINUTES,
+    SQS_CONSUMER_DEFAULT_CONCURRENCY,
+    SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS,
+    SQS_CONSUMER_VISIBILITY_TIMEOUT_SECONDS,
+    SQS_MAX_WAIT_TIME_SECONDS,
+)
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -134,12 +150,66 @@ class Settings(BaseSettings):
         description="SQS endpoint URL (for local testing)",
     )
 
+    # SQS consumer runtime (pull-mode analysis/insight workers)
+    sqs_consumer_enabled: bool = Field(default=False, alias="SQS_CONSUMER_ENABLED")
+    sqs_consumer_concurrency: int = Field(
+        default=SQS_CONSUMER_DEFAULT_CONCURRENCY, alias="SQS_CONSUMER_CONCURRENCY"
+    )
+    sqs_consumer_wait_time_seconds: int = Field(
+        default=SQS_MAX_WAIT_TIME_SECONDS, alias="SQS_CONSUMER_WAIT_TIME_SECONDS"
+    )
+    sqs_consumer_visibility_timeout: int = Field(
+        default=SQS_CONSUMER_VISIBILITY_TIMEOUT_SECONDS,
+        alias="SQS_CONSUMER_VISIBILITY_TIMEOUT",
+    )
+    sqs_consumer_drain_timeout_seconds: float = Field(
+        default=SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS,
+        alias="SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS",
+    )
+
     # Gemini API Settings (keeping this for AI functionality)
     gemini_api_key: str | None = Field(default=None, alias="GEMINI_API_KEY")
     gemini_model: str = Field(default="gemini-1.5-flash", alias="GEMINI_MODEL")
     gemini_temperature: float = Field(default=0.7, alias="GEMINI_TEMPERATURE")
     gemini_max_tokens: int = Field(default=1000, alias="GEMINI_MAX_TOKENS")
 
+    # Gemini request scheduler (global per-worker limits in front of the LLM)
+    gemini_max_concurrency: int = Field(
+        default=GEMINI_DEFAULT_MAX_CONCURRENCY, alias="GEMINI_MAX_CONCURRENCY"
+    )
+    gemini_requests_per_minute: int = Field(
+        default=GEMINI_DEFAULT_REQUESTS_PER_MINUTE, alias="GEMINI_REQUESTS_PER_MINUTE"
+    )
+    gemini_burst_size: int = Field(
+        default=GEMINI_DEFAULT_BURST_SIZE, alias="GEMINI_BURST_SIZE"
+    )
+    gemini_max_queue_size: int = Field(
+        default=GEMINI_DEFAULT_MAX_QUEUE_SIZE, alias="GEMINI_MAX_QUEUE_SIZE"
+    )
+    gemini_reserved_interactive_slots: int = Field(
+        default=GEMINI_DEFAULT_RESERVED_INTERACTIVE_SLOTS,
+        alias="GEMINI_RESERVED_INTERACTIVE_SLOTS",
+    )
+
+    # Incremental feature store; process-local, so only for single-instance
+    # deployments
+    feature_store_enabled: bool = Field(default=False, alias="FEATURE_STORE_ENABLED")
+    feature_store_max_bytes: int = Field(
+        default=FEATURE_STORE_MAX_BYTES, alias="FEATURE_STORE_MAX_BYTES"
+    )
+    feature_store_ttl_seconds: int = Field(
+        default=FEATURE_STORE_TTL_SECONDS, alias="FEATURE_STORE_TTL_SECONDS"
+    )
+
+    # Streaming health_data ingestion over WebSocket
+    health_stream_analysis_interval_seconds: float = Field(
+        default=HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS,
+        alias="HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS",
+    )
+    health_stream_min_new_minutes: int = Field(
+        default=HEALTH_STREAM_MIN_NEW_MINUTES, alias="HEALTH_STREAM_MIN_NEW_MINUTES"
+    )
+
     # Middleware configuration
     middleware_config: MiddlewareConfig = Field(default_factory=MiddlewareConfig)
 
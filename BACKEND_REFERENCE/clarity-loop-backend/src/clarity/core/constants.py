@@ -67,6 +67,28 @@ DEFAULT_BATCH_TIMEOUT_MS: Final[int] = 100
 DEFAULT_INFERENCE_TIMEOUT_SECONDS: Final[float] = 30.0
 BATCH_PROCESSOR_ERROR_SLEEP_SECONDS: Final[float] = 0.1
 
+# Gemini request scheduler settings
+GEMINI_DEFAULT_MAX_CONCURRENCY: Final[int] = 8
+GEMINI_DEFAULT_REQUESTS_PER_MINUTE: Final[int] = 60
+GEMINI_DEFAULT_BURST_SIZE: Final[int] = 10
+GEMINI_DEFAULT_MAX_QUEUE_SIZE: Final[int] = 500
+GEMINI_DEFAULT_RESERVED_INTERACTIVE_SLOTS: Final[int] = 2
+GEMINI_INTERACTIVE_DEADLINE_SECONDS: Final[float] = 30.0
+GEMINI_BACKGROUND_DEADLINE_SECONDS: Final[float] = 600.0
+
+# Streaming WebSocket health data (windowed analysis)
+HEALTH_STREAM_ANALYSIS_INTERVAL_SECONDS: Final[float] = 300.0  # 5 minutes
+HEALTH_STREAM_MIN_NEW_MINUTES: Final[int] = MINUTES_PER_HOUR
+
+# Incremental feature store (per-user, per-day partial aggregates)
+FEATURE_STORE_MAX_BYTES: Final[int] = 256 * 1024 * 1024  # 256 MiB per process
+FEATURE_STORE_TTL_SECONDS: Final[int] = 8 * 24 * 3600  # one feature window + 1 day
+
+# Longitudinal (multi-week) PAT analysis
+LONGITUDINAL_MAX_WEEKS: Final[int] = 52
+LONGITUDINAL_BATCH_SIZE: Final[int] = 8  # windows per PAT forward pass
+LONGITUDINAL_CACHE_TTL_SECONDS: Final[int] = 7 * 24 * 3600  # 1 week
+
 # Performance monitoring
 PERFORMANCE_TIMEOUT_WARNING_THRESHOLD_MS: Final[float] = 1000.0
 CACHE_CLEANUP_BATCH_SIZE: Final[int] = 100
@@ -165,8 +187,32 @@ S3_LIFECYCLE_TRANSITION_IA_DAYS: Final[int] = 30
 S3_LIFECYCLE_TRANSITION_GLACIER_DAYS: Final[int] = 90
 S3_LIFECYCLE_EXPIRATION_DAYS: Final[int] = 365
 DYNAMODB_BATCH_WRITE_ITEM_LIMIT: Final[int] = 25
+SQS_MAX_BATCH_SIZE: Final[int] = 10  # receive/delete/visibility batch limit
+SQS_MAX_WAIT_TIME_SECONDS: Final[int] = 20  # long-poll ceiling
+SQS_MAX_MESSAGE_BYTES: Final[int] = 262144  # 256 KiB, also the SQS/SNS batch limit
+
+# Batched SQS/SNS publishing
+PUBLISH_BATCH_LINGER_SECONDS: Final[float] = 0.02
+MESSAGE_COMPRESS_THRESHOLD_BYTES: Final[int] = 65536  # 64 KiB
+MESSAGE_MAX_INLINE_BYTES: Final[int] = 245760  # 240 KiB, headroom for attributes
+
+# SQS consumer runtime (analysis and insight workers)
+SQS_CONSUMER_DEFAULT_CONCURRENCY: Final[int] = 10
+SQS_CONSUMER_VISIBILITY_TIMEOUT_SECONDS: Final[int] = 300  # 5 minutes
+SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS: Final[float] = 30.0
+SQS_CONSUMER_ACK_LINGER_SECONDS: Final[float] = 0.05
 COGNITO_PASSWORD_MIN_LENGTH: Final[int] = 8
 
+# On-demand profiling (admin profiling endpoints)
+PROFILE_MAX_SECONDS: Final[float] = 60.0  # stack sampler
+PROFILE_MAX_DETERMINISTIC_SECONDS: Final[float] = 30.0  # cProfile and tracemalloc
+PROFILE_DEFAULT_SAMPLE_INTERVAL_MS: Final[float] = 10.0
+PROFILE_MIN_SAMPLE_INTERVAL_MS: Final[float] = 5.0
+PROFILE_MAX_OVERHEAD_RATIO: Final[float] = 0.05  # sampler backs off above this
+PROFILE_MAX_STACK_DEPTH: Final[int] = 64
+PROFILE_TRACEMALLOC_FRAMES: Final[int] = 10
+PROFILE_MAX_PAT_RUNS: Final[int] = 20
+
 # ==============================================================================
 # Validation Constants
 # ==============================================================================
@@ -0,0 +1,295 @@
+"""On-demand profiling of a running worker process.
+
+Three profilers, each bounded in duration so they are safe to run against
+production traffic:
+
+* ``sample_stacks`` - a statistical stack sampler in the style of py-spy.
+  A background thread reads every thread's Python stack at a fixed
+  interval and aggregates them as collapsed stacks (``root;caller;leaf N``),
+  the input format of ``flamegraph.pl`` and speedscope. The sampler times
+  itself and doubles its interval whenever its cost would exceed
+  ``PROFILE_MAX_OVERHEAD_RATIO`` of the profiled threads' time.
+* ``run_cprofile`` - deterministic ``cProfile`` of the event-loop thread.
+* ``snapshot_allocations`` - ``tracemalloc`` diff of the allocations made
+  and still alive over a window.
+
+Only one profile runs per process at a time (``profiling_session``).
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass, field
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from types import CodeType, FrameType
+from typing import Any
+
+from clarity.core.constants import (
+    PROFILE_DEFAULT_SAMPLE_INTERVAL_MS,
+    PROFILE_MAX_OVERHEAD_RATIO,
+    PROFILE_MAX_STACK_DEPTH,
+    PROFILE_TRACEMALLOC_FRAMES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads parked waiting for work; dropped unless requested
+IDLE_FRAMES = frozenset(
+    {
+        ("selectors.py", "select"),
+        ("threading.py", "wait"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("queue.py", "get"),
+        ("thread.py", "_worker"),
+    }
+)
+MAX_SAMPLE_INTERVAL_MS = 1000.0
+
+_session_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+@contextmanager
+def profiling_session(kind: str) -> Iterator[None]:
+    """Hold the per-process profiling slot for the duration of the block.
+
+    Args:
+        kind: Profiler name, for logging
+
+    Raises:
+        ProfilerBusyError: If another profile is already running
+    """
+    if not _session_lock.acquire(blocking=False):
+        msg = "Another profile is already running in this process"
+        raise ProfilerBusyError(msg)
+    started = time.perf_counter()
+    logger.info("Profiling started: %s (pid %d)", kind, os.getpid())
+    try:
+        yield
+    finally:
+        _session_lock.release()
+        logger.info(
+            "Profiling finished: %s after %.1fs", kind, time.perf_counter() - started
+        )
+
+
+@dataclass(slots=True)
+class SamplingProfile:
+    """Aggregated stack samples of one ``sample_stacks`` run."""
+
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+    idle_samples: int = 0
+    duration_seconds: float = 0.0
+    interval_ms: float = PROFILE_DEFAULT_SAMPLE_INTERVAL_MS
+    overhead_ratio: float = 0.0
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, one ``frame;frame;frame count`` per line."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def _frame_label(code: CodeType, labels: dict[CodeType, str]) -> str:
+    label = labels.get(code)
+    if label is None:
+        # ';' separates frames in the collapsed format
+        label = f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+        label = labels[code] = label.replace(";", ":")
+    return label
+
+
+def _collapse(
+    frame: FrameType,
+    thread_name: str,
+    labels: dict[CodeType, str],
+    *,
+    include_idle: bool,
+) -> str | None:
+    leaf = frame.f_code
+    if (
+        not include_idle
+        and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_FRAMES
+    ):
+        return None
+
+    names: list[str] = []
+    current: FrameType | None = frame
+    while current is not None and len(names) < PROFILE_MAX_STACK_DEPTH:
+        names.append(_frame_label(current.f_code, labels))
+        current = current.f_back
+    names.append(thread_name.replace(";", ":"))
+    names.reverse()
+    return ";".join(names)
+
+
+def _take_sample(
+    profile: SamplingProfile,
+    labels: dict[CodeType, str],
+    own_ident: int,
+    *,
+    include_idle: bool,
+) -> None:
+    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():  # noqa: SLF001
+        if ident == own_ident:
+            continue
+        stack = _collapse(
+            frame,
+            thread_names.get(ident, f"thread-{ident}"),
+            labels,
+            include_idle=include_idle,
+        )
+        if stack is None:
+            profile.idle_samples += 1
+        else:
+            profile.stacks[stack] += 1
+
+
+def sample_stacks(
+    seconds: float,
+    interval_ms: float = PROFILE_DEFAULT_SAMPLE_INTERVAL_MS,
+    *,
+    include_idle: bool = False,
+    max_overhead_ratio: float = PROFILE_MAX_OVERHEAD_RATIO,
+) -> SamplingProfile:
+    """Sample the Python stacks of all other threads for ``seconds``.
+
+    Blocks the calling thread, so call it through ``asyncio.to_thread``.
+
+    Args:
+        seconds: Sampling duration
+        interval_ms: Initial time between samples
+        include_idle: Keep samples of threads parked in ``IDLE_FRAMES``
+        max_overhead_ratio: Sampling cost per interval above which the
+            interval is doubled
+
+    Returns:
+        The aggregated profile
+    """
+    profile = SamplingProfile(interval_ms=interval_ms)
+    labels: dict[CodeType, str] = {}
+    own_ident = threading.get_ident()
+    interval = interval_ms / 1000
+    busy = 0.0
+    started = time.perf_counter()
+    deadline = started + seconds
+
+    while True:
+        sample_started = time.perf_counter()
+        _take_sample(profile, labels, own_ident, include_idle=include_idle)
+        profile.samples += 1
+
+        now = time.perf_counter()
+        cost = now - sample_started
+        busy += cost
+        if cost > interval * max_overhead_ratio:
+            interval = min(interval * 2, MAX_SAMPLE_INTERVAL_MS / 1000)
+            logger.debug("Stack sampler backing off to %.1fms", interval * 1000)
+
+        if now >= deadline:
+            break
+        time.sleep(min(max(interval - cost, 0.0), deadline - now))
+
+    profile.duration_seconds = time.perf_counter() - started
+    profile.interval_ms = interval * 1000
+    profile.overhead_ratio = busy / profile.duration_seconds
+    return profile
+
+
+async def run_cprofile(
+    seconds: float, limit: int = 50, sort: str = "cumulative"
+) -> str:
+    """Deterministically profile the event-loop thread for ``seconds``.
+
+    Everything the loop runs in the window (request handlers, consumers,
+    callbacks) is traced; work in thread pools is not - use the stack
+    sampler for that.
+
+    Args:
+        seconds: Profiling duration
+        limit: Number of functions to report
+        sort: ``pstats`` sort key
+
+    Returns:
+        The ``pstats`` report
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+async def snapshot_allocations(seconds: float, limit: int = 25) -> dict[str, Any]:
+    """Report the allocations made over ``seconds`` that are still alive.
+
+    Starts ``tracemalloc`` for the window unless it is already tracing, in
+    which case the existing trace (and its frame depth) is reused and left
+    running.
+
+    Args:
+        seconds: Window between the two snapshots
+        limit: Number of allocation sites to report
+
+    Returns:
+        Top allocation sites by retained size, plus traced memory totals
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    ignore = [
+        tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+        tracemalloc.Filter(
+            inclusive=False, filename_pattern="<frozen importlib._bootstrap*>"
+        ),
+    ]
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    growth = [
+        stat for stat in after.compare_to(before, "traceback") if stat.size_diff > 0
+    ]
+    top = [
+        {
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+            "traceback": stat.traceback.format(),
+        }
+        for stat in growth[:limit]
+    ]
+    return {
+        "window_seconds": seconds,
+        "traced_current_bytes": current_bytes,
+        "traced_peak_bytes": peak_bytes,
+        "started_tracing": started_tracing,
+        "top_allocations": top,
+    }
@@ -0,0 +1,285 @@
+"""Request tracing across the upload and analysis path.
+
+A small tracing surface modelled on the OpenTelemetry API: spans carry a
+W3C trace ID, span ID, parent span ID, attributes and a status, and nest
+through ``contextvars`` so they follow ``await`` chains. Each trace also
+carries a request ID (the ``X-Request-ID`` of the originating HTTP request)
+so logs, spans and queue messages can be joined.
+
+Context crosses process boundaries as string attributes: ``inject`` writes
+a W3C ``traceparent`` plus ``request_id`` into a carrier (HTTP headers or
+SQS message attributes) and ``extract`` reads them back on the other side,
+so an OpenTelemetry collector can continue the same trace.
+
+Every finished span is observed in the ``clarity_trace_span_duration_seconds``
+histogram (per-stage latency breakdown) and handed to the registered
+exporters. ``InMemorySpanExporter`` collects spans for tests.
+"""
+
+# removed - breaks FastAPI
+
+from collections.abc import Iterator, Mapping, MutableMapping, Sequence
+from contextlib import contextmanager
+import contextvars
+from dataclasses import dataclass, field
+from enum import StrEnum
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Protocol, TypeVar
+import uuid
+
+from prometheus_client import Histogram
+
+from clarity.core.constants import MAX_REQUEST_ID_LENGTH
+
+logger = logging.getLogger(__name__)
+
+CarrierT = TypeVar("CarrierT", bound=MutableMapping[str, str])
+
+TRACEPARENT_KEY = "traceparent"
+REQUEST_ID_KEY = "request_id"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+TRACE_SPAN_DURATION_SECONDS = Histogram(
+    "clarity_trace_span_duration_seconds",
+    "Duration of traced stages on the upload and analysis path",
+    ["span"],
+)
+
+
+class StatusCode(StrEnum):
+    """Span status, as in OpenTelemetry."""
+
+    UNSET = "UNSET"
+    OK = "OK"
+    ERROR = "ERROR"
+
+
+@dataclass(frozen=True, slots=True)
+class SpanContext:
+    """Identifiers that link a span to its trace and request."""
+
+    trace_id: str
+    span_id: str
+    request_id: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value (always sampled)."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    context: SpanContext
+    parent_span_id: str | None
+    start_time_ns: int
+    end_time_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: StatusCode = StatusCode.UNSET
+    status_description: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (0 while the span is open)."""
+        if self.end_time_ns is None:
+            return 0.0
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: StatusCode, description: str | None = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+        self.set_status(StatusCode.ERROR, type(exc).__name__)
+
+
+class SpanExporter(Protocol):
+    """Receives finished spans."""
+
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in memory, for tests."""
+
+    def __init__(self) -> None:
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> tuple[Span, ...]:
+        with self._lock:
+            return tuple(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "clarity_current_span", default=None
+)
+_exporters: list[SpanExporter] = []
+
+
+def add_span_exporter(exporter: SpanExporter) -> None:
+    """Register an exporter for finished spans."""
+    _exporters.append(exporter)
+
+
+def remove_span_exporter(exporter: SpanExporter) -> None:
+    """Unregister an exporter added with ``add_span_exporter``."""
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def get_current_span() -> Span | None:
+    """Return the innermost open span of the current context."""
+    return _current_span.get()
+
+
+def get_request_id() -> str | None:
+    """Return the request ID of the current trace, if any."""
+    span = _current_span.get()
+    return span.context.request_id if span else None
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Mapping[str, Any] | None = None,
+    *,
+    parent: SpanContext | None = None,
+    request_id: str | None = None,
+) -> Iterator[Span]:
+    """Open a span as the current span for the duration of the block.
+
+    The span is a child of ``parent`` when given (e.g. extracted from a queue
+    message), otherwise of the current span; without either it starts a new
+    trace. Exceptions raised in the block mark the span as failed and are
+    re-raised.
+
+    Args:
+        name: Low-cardinality stage name, also used as the metric label
+        attributes: Initial span attributes
+        parent: Remote parent context
+        request_id: Request ID for a new trace (generated when omitted)
+
+    Yields:
+        The open span
+    """
+    if parent is None:
+        current = _current_span.get()
+        parent = current.context if current else None
+
+    if parent is not None:
+        context = SpanContext(
+            parent.trace_id, _new_id(64), request_id or parent.request_id
+        )
+        # A request-ID-only carrier has no parent span to point at
+        parent_span_id: str | None = (
+            parent.span_id if parent.span_id != _INVALID_SPAN_ID else None
+        )
+    else:
+        context = SpanContext(_new_id(128), _new_id(64), request_id or uuid.uuid4().hex)
+        parent_span_id = None
+
+    span = Span(
+        name=name,
+        context=context,
+        parent_span_id=parent_span_id,
+        start_time_ns=time.time_ns(),
+        attributes=dict(attributes or {}),
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        _end_span(span)
+
+
+def _end_span(span: Span) -> None:
+    span.end_time_ns = time.time_ns()
+    TRACE_SPAN_DURATION_SECONDS.labels(span=span.name).observe(
+        (span.end_time_ns - span.start_time_ns) / 1e9
+    )
+    for exporter in list(_exporters):
+        try:
+            exporter.export([span])
+        except Exception:
+            logger.exception("Span exporter %r failed", exporter)
+
+
+def inject(carrier: CarrierT) -> CarrierT:
+    """Write the current trace context into a string carrier.
+
+    Args:
+        carrier: HTTP headers or message attributes to update in place
+
+    Returns:
+        The same carrier, for chaining
+    """
+    span = _current_span.get()
+    if span is not None:
+        carrier[TRACEPARENT_KEY] = span.context.traceparent
+        if span.context.request_id:
+            carrier[REQUEST_ID_KEY] = span.context.request_id
+    return carrier
+
+
+def extract(carrier: Mapping[str, str]) -> SpanContext | None:
+    """Read a trace context written by ``inject``.
+
+    Args:
+        carrier: HTTP headers or message attributes
+
+    Returns:
+        The remote span context, or None if the carrier has no valid one
+    """
+    request_id = sanitize_request_id(carrier.get(REQUEST_ID_KEY))
+    match = _TRACEPARENT_RE.match(carrier.get(TRACEPARENT_KEY) or "")
+    if match is None or match[1] == _INVALID_TRACE_ID or match[2] == _INVALID_SPAN_ID:
+        if request_id is None:
+            return None
+        # No usable trace, but keep the request ID for the new one
+        return SpanContext(_new_id(128), _INVALID_SPAN_ID, request_id)
+    return SpanContext(match[1], match[2], request_id)
+
+
+def sanitize_request_id(value: str | None) -> str | None:
+    """Return a client-supplied request ID if it is safe to log and echo."""
+    if (
+        not value
+        or len(value) > MAX_REQUEST_ID_LENGTH
+        or not value.isascii()
+        or not value.isprintable()
+    ):
+        return None
+    return value
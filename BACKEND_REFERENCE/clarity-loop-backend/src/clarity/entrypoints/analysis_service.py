@@ -1,7 +1,8 @@
 """Analysis Service Entry Point.
 
 Standalone FastAPI service for health data analysis processing.
-Handles Pub/Sub push subscriptions for async health data processing.
+Handles Pub/Sub push subscriptions for async health data processing, or
+long-polls SQS in batches when the pull-mode consumer is enabled.
 """
 
 # removed - breaks FastAPI
@@ -13,7 +14,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from clarity.services.messaging.analysis_subscriber import analysis_app
+from clarity.services.messaging.analysis_subscriber import (
+    analysis_app,
+    get_analysis_subscriber,
+)
+from clarity.services.messaging.sqs_consumer import sqs_consumer_lifespan
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +31,10 @@ app = FastAPI(
     title="CLARITY Analysis Service",
     description="Health data analysis processing service",
     version="1.0.0",
+    # Pull-mode SQS consumer (enabled with SQS_CONSUMER_ENABLED + SQS_QUEUE_URL)
+    lifespan=sqs_consumer_lifespan(
+        lambda: get_analysis_subscriber().process_queue_message
+    ),
 )
 
 # Configure CORS - HARDENED SECURITY (NO WILDCARDS!)
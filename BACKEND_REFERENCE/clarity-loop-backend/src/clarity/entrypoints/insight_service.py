@@ -1,7 +1,8 @@
 """Insight Service Entry Point.
 
 Standalone FastAPI service for AI-powered health insight generation.
-Handles Pub/Sub push subscriptions for async insight generation using Gemini.
+Handles Pub/Sub push subscriptions for async insight generation using Gemini,
+or long-polls SQS in batches when the pull-mode consumer is enabled.
 """
 
 # removed - breaks FastAPI
@@ -13,7 +14,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from clarity.services.messaging.insight_subscriber import insight_app
+from clarity.services.messaging.insight_subscriber import (
+    get_insight_subscriber,
+    insight_app,
+)
+from clarity.services.messaging.sqs_consumer import sqs_consumer_lifespan
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +31,10 @@ app = FastAPI(
     title="CLARITY Insight Service",
     description="AI-powered health insight generation service",
     version="1.0.0",
+    # Pull-mode SQS consumer (enabled with SQS_CONSUMER_ENABLED + SQS_QUEUE_URL)
+    lifespan=sqs_consumer_lifespan(
+        lambda: get_insight_subscriber().process_queue_message
+    ),
 )
 
 # Configure CORS - HARDENED SECURITY (NO WILDCARDS!)
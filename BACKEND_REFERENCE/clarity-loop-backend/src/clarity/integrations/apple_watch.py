@@ -2,21 +2,34 @@
 
 Specialized processing and transformation of Apple Watch data
 for optimal integration with PAT (Pretrained Actigraphy Transformer) models.
+
+High-frequency modalities (heart rate, HRV, respiratory rate, steps) are
+processed column-wise: samples are held as ``SampleSeries`` timestamp and
+value arrays, binned onto the minute grid with ``np.bincount`` and resampled
+with ``np.interp``, so a week of per-second heart rate never round-trips
+through Python objects. Callers that already hold arrays can pass a
+``ColumnarHealthBatch`` directly.
+
+These modality stages are CPU-bound (NumPy/SciPy release the GIL for most
+of it), so they run concurrently on an executor and their features are
+merged into ``ProcessedHealthData`` afterwards; the event loop stays free.
 """
 
 # removed - breaks FastAPI
 
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from enum import StrEnum
+import functools
 import logging
 import operator
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import numpy as np
 import numpy.typing as npt
-import pandas as pd  # type: ignore[import-untyped]
-from scipy.interpolate import interp1d
 import scipy.signal
 
 from clarity.core.exceptions import ProcessingError
@@ -27,6 +40,12 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# 4th-order Butterworth low-pass for minute-level heart rate, cutoff at
+# 0.5 Hz (30 bpm variation), to remove motion artifacts. Computed once.
+HR_LOWPASS_FILTER = scipy.signal.butter(4, 0.5 / (0.5 * 60), btype="low")
+
 
 class ActivityLevel(StrEnum):
     """Apple Watch activity levels."""
@@ -91,6 +110,153 @@ class ProcessedHealthData:
     data_completeness: float = 0.0  # Percentage of expected data points
 
 
+@dataclass(frozen=True)
+class SampleSeries:
+    """Samples of one modality as columns, ordered by time."""
+
+    times: npt.NDArray[np.float64]  # epoch seconds
+    values: npt.NDArray[np.float64]
+
+    def __len__(self) -> int:
+        """Number of samples."""
+        return len(self.values)
+
+    @classmethod
+    def from_arrays(
+        cls, times: npt.ArrayLike, values: npt.ArrayLike
+    ) -> "SampleSeries":
+        """Build a series from epoch-second and value arrays of any dtype.
+
+        float64 inputs that are already sorted are used without copying.
+        """
+        times_arr = np.asarray(times, dtype=np.float64)
+        values_arr = np.asarray(values, dtype=np.float64)
+        if times_arr.shape != values_arr.shape or times_arr.ndim != 1:
+            msg = "Sample times and values must be 1-D arrays of equal length"
+            raise ValueError(msg)
+        if len(times_arr) > 1 and np.any(np.diff(times_arr) < 0):
+            order = np.argsort(times_arr, kind="stable")
+            times_arr, values_arr = times_arr[order], values_arr[order]
+        return cls(times_arr, values_arr)
+
+    @classmethod
+    def from_points(cls, samples: Sequence[HealthDataPoint]) -> "SampleSeries":
+        """Convert HealthKit data points to columns."""
+        count = len(samples)
+        return cls.from_arrays(
+            np.fromiter(
+                (s.timestamp.timestamp() for s in samples), np.float64, count
+            ),
+            np.fromiter((s.value for s in samples), np.float64, count),
+        )
+
+    def select(self, mask: npt.NDArray[np.bool_]) -> "SampleSeries":
+        """Samples where ``mask`` is set."""
+        return SampleSeries(self.times[mask], self.values[mask])
+
+
+@dataclass
+class ColumnarHealthBatch:
+    """High-frequency modalities of one user as ``SampleSeries`` columns."""
+
+    end_time: datetime | None = None
+    heart_rate: SampleSeries | None = None
+    hrv: SampleSeries | None = None
+    respiratory_rate: SampleSeries | None = None
+    steps: SampleSeries | None = None
+
+    @classmethod
+    def from_batch(cls, batch: HealthDataBatch) -> "ColumnarHealthBatch":
+        """Columns for the high-frequency samples of a HealthKit batch."""
+
+        def column(samples: list[HealthDataPoint] | None) -> SampleSeries | None:
+            return SampleSeries.from_points(samples) if samples else None
+
+        return cls(
+            end_time=batch.end_time,
+            heart_rate=column(batch.heart_rate_samples),
+            hrv=column(batch.hrv_samples),
+            respiratory_rate=column(batch.respiratory_rate_samples),
+            steps=column(batch.step_count_samples),
+        )
+
+
+def bin_by_minute(
+    series: Sequence[SampleSeries | None],
+    start_ts: Sequence[float],
+    minutes: int,
+) -> npt.NDArray[np.float64]:
+    """Sum samples into minute bins for many series in one pass.
+
+    Args:
+        series: One series per row (None for an empty row)
+        start_ts: Epoch seconds of minute 0, per row
+        minutes: Bins per row
+
+    Returns:
+        ``(len(series), minutes)`` array of per-minute sums
+    """
+    rows = [
+        (row, s) for row, s in enumerate(series) if s is not None and len(s) > 0
+    ]
+    if not rows:
+        return np.zeros((len(series), minutes))
+
+    starts = np.asarray(start_ts, dtype=np.float64)
+    times = np.concatenate([s.times for _, s in rows])
+    values = np.concatenate([s.values for _, s in rows])
+    row_index = np.repeat([row for row, _ in rows], [len(s) for _, s in rows])
+
+    offsets = times - starts[row_index]
+    minute = np.floor(offsets / 60).astype(np.int64)
+    keep = (offsets >= 0) & (minute < minutes)
+    flat = row_index[keep] * minutes + minute[keep]
+    binned = np.bincount(flat, weights=values[keep], minlength=len(series) * minutes)
+    return binned.reshape(len(series), minutes)
+
+
+def _interpolate(
+    series: SampleSeries, grid: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """Linear interpolation onto ``grid``; NaN outside the sampled range."""
+    values = np.interp(grid, series.times, series.values)
+    values[(grid < series.times[0]) | (grid > series.times[-1])] = np.nan
+    return values
+
+
+def _forward_fill(
+    values: npt.NDArray[np.float64], limit: int
+) -> npt.NDArray[np.float64]:
+    """Fill at most ``limit`` consecutive NaNs after each valid value."""
+    valid = ~np.isnan(values)
+    if valid.all() or not valid.any():
+        return values
+
+    positions = np.arange(len(values))
+    last_valid = np.where(valid, positions, -1)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    fill = ~valid & (last_valid >= 0) & (positions - last_valid <= limit)
+    values[fill] = values[last_valid[fill]]
+    return values
+
+
+def _minute_grid(
+    start_time: datetime, end_time: datetime, step_seconds: int = 60
+) -> npt.NDArray[np.float64]:
+    return np.arange(start_time.timestamp(), end_time.timestamp(), step_seconds)
+
+
+def _as_series(samples: Sequence[HealthDataPoint] | SampleSeries) -> SampleSeries:
+    if isinstance(samples, SampleSeries):
+        return samples
+    return SampleSeries.from_points(samples)
+
+
+def _merge(result: ProcessedHealthData, features: dict[str, Any]) -> None:
+    for name, value in features.items():
+        setattr(result, name, value)
+
+
 class AppleWatchDataProcessor:
     """Processes raw Apple Watch health data into ML-ready formats.
 
@@ -123,117 +289,275 @@ class AppleWatchDataProcessor:
     VO2_MAX_MIN = 10
     VO2_MAX_MAX = 90
 
-    def __init__(self) -> None:
+    # Length of the movement proxy vector (one week of minutes)
+    MINUTES_PER_WEEK = 7 * 24 * 60
+
+    def __init__(self, executor: Executor | None = None) -> None:
+        """Initialize the processor.
+
+        Args:
+            executor: Pool for the CPU-bound modality stages; defaults to the
+                event loop's thread pool
+        """
         self.logger = logging.getLogger(__name__)
+        self._executor = executor
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Stages are bound methods; a process pool pickles them without
+        # pickling itself
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
 
     async def process_health_batch(
-        self, batch: HealthDataBatch, target_duration_days: int = 7
+        self,
+        batch: HealthDataBatch | ColumnarHealthBatch,
+        target_duration_days: int = 7,
     ) -> ProcessedHealthData:
         """Process a batch of health data into ML-ready format.
 
         Args:
-            batch: Raw health data batch from HealthKit
+            batch: Raw health data batch from HealthKit, or its columns
             target_duration_days: Target duration for time series (default 7 days)
 
         Returns:
             ProcessedHealthData with all modalities processed and aligned
         """
+        results = await self.process_health_batches([batch], target_duration_days)
+        return results[0]
+
+    async def process_health_batches(
+        self,
+        batches: Sequence[HealthDataBatch | ColumnarHealthBatch],
+        target_duration_days: int = 7,
+    ) -> list[ProcessedHealthData]:
+        """Process many users' batches, binning all their steps in one pass.
+
+        Args:
+            batches: One raw or columnar batch per user
+            target_duration_days: Target duration for time series (default 7 days)
+
+        Returns:
+            ProcessedHealthData per batch, in order
+        """
         try:
-            # Determine time range
-            end_time = batch.end_time or datetime.now(UTC)
-            start_time = end_time - timedelta(days=target_duration_days)
+            columns = await self._run_stage(self._to_columns, batches)
+
+            # Determine time ranges
+            duration = timedelta(days=target_duration_days)
+            windows = []
+            for user_columns in columns:
+                end_time = user_columns.end_time or datetime.now(UTC)
+                windows.append((end_time - duration, end_time))
+
+            minute_steps = await self._run_stage(
+                bin_by_minute,
+                [
+                    self._steps_in_window(c.steps, end) if c.steps is not None else None
+                    for c, (_, end) in zip(columns, windows, strict=True)
+                ],
+                [start.timestamp() for start, _ in windows],
+                self.MINUTES_PER_WEEK,
+            )
 
-            # Initialize result
-            result = ProcessedHealthData(start_time=start_time, end_time=end_time)
+            results = [
+                ProcessedHealthData(start_time=start_time, end_time=end_time)
+                for start_time, end_time in windows
+            ]
+            await asyncio.gather(
+                *(
+                    self._process_modalities(
+                        batch, user_columns, result, minute_steps[index]
+                    )
+                    for index, (batch, user_columns, result) in enumerate(
+                        zip(batches, columns, results, strict=True)
+                    )
+                )
+            )
+            for result in results:
+                # Calculate data completeness
+                result.data_completeness = self._calculate_completeness(result)
 
-            # Process each modality
-            if batch.heart_rate_samples:
-                await self._process_heart_rate(
-                    batch.heart_rate_samples, result, start_time, end_time
+        except Exception as e:
+            self.logger.exception("Error processing health batch")
+            msg = f"Failed to process health data: {e!s}"
+            raise ProcessingError(msg) from e
+        else:
+            return results
+
+    async def _process_modalities(
+        self,
+        batch: HealthDataBatch | ColumnarHealthBatch,
+        columns: ColumnarHealthBatch,
+        result: ProcessedHealthData,
+        minute_steps: npt.NDArray[np.float64],
+    ) -> None:
+        """Process each modality of one user into ``result``."""
+        assert result.start_time is not None  # noqa: S101
+        assert result.end_time is not None  # noqa: S101
+        start_time, end_time = result.start_time, result.end_time
+
+        # Dense modalities are independent, so run them side by side
+        stages: list[Awaitable[dict[str, Any]]] = []
+        if columns.heart_rate is not None and len(columns.heart_rate) > 0:
+            stages.append(
+                self._run_stage(
+                    self._heart_rate_features, columns.heart_rate, start_time, end_time
                 )
+            )
 
-            if batch.hrv_samples:
-                await self._process_hrv(batch.hrv_samples, result, start_time, end_time)
+        if columns.hrv is not None and len(columns.hrv) > 0:
+            stages.append(
+                self._run_stage(self._hrv_features, columns.hrv, start_time, end_time)
+            )
 
-            if batch.respiratory_rate_samples:
-                await self._process_respiratory_rate(
-                    batch.respiratory_rate_samples, result, start_time, end_time
+        if columns.respiratory_rate is not None and len(columns.respiratory_rate) > 0:
+            stages.append(
+                self._run_stage(
+                    self._respiratory_rate_features,
+                    columns.respiratory_rate,
+                    start_time,
+                    end_time,
                 )
+            )
 
-            if batch.step_count_samples:
-                await self._process_steps(
-                    batch.step_count_samples, result, start_time, end_time
+        if columns.steps is not None and len(columns.steps) > 0:
+            stages.append(
+                self._run_stage(
+                    functools.partial(self._steps_features, minute_steps=minute_steps),
+                    columns.steps,
+                    start_time,
+                    end_time,
                 )
+            )
 
-            if batch.blood_oxygen_samples:
-                await self._process_spo2(batch.blood_oxygen_samples, result)
+        for features in await asyncio.gather(*stages):
+            _merge(result, features)
 
-            if batch.blood_pressure_samples:
-                await self._process_blood_pressure(batch.blood_pressure_samples, result)
+        # Sparse and episodic modalities stay in object form; workouts read
+        # the resting heart rate, so they run after the dense stages
+        if not isinstance(batch, HealthDataBatch):
+            return
 
-            if batch.body_temperature_samples:
-                await self._process_temperature(batch.body_temperature_samples, result)
+        if batch.blood_oxygen_samples:
+            await self._process_spo2(batch.blood_oxygen_samples, result)
 
-            if batch.vo2_max_samples:
-                await self._process_vo2_max(batch.vo2_max_samples, result)
+        if batch.blood_pressure_samples:
+            await self._process_blood_pressure(batch.blood_pressure_samples, result)
 
-            if batch.workout_samples:
-                await self._process_workouts(batch.workout_samples, result)
+        if batch.body_temperature_samples:
+            await self._process_temperature(batch.body_temperature_samples, result)
 
-            if batch.electrocardiogram_samples:
-                await self._process_ecg(batch.electrocardiogram_samples, result)
+        if batch.vo2_max_samples:
+            await self._process_vo2_max(batch.vo2_max_samples, result)
 
-        except Exception as e:
-            self.logger.exception("Error processing health batch")
-            msg = f"Failed to process health data: {e!s}"
-            raise ProcessingError(msg) from e
-        else:
-            # Calculate data completeness
-            result.data_completeness = self._calculate_completeness(result)
-            return result
+        if batch.workout_samples:
+            await self._process_workouts(batch.workout_samples, result)
+
+        if batch.electrocardiogram_samples:
+            await self._process_ecg(batch.electrocardiogram_samples, result)
 
     async def _process_heart_rate(
         self,
-        samples: list[HealthDataPoint],
+        samples: Sequence[HealthDataPoint] | SampleSeries,
         result: ProcessedHealthData,
         start_time: datetime,
         end_time: datetime,
     ) -> None:
         """Process heart rate data with advanced filtering."""
-        # Extract time series
-        times = np.array([s.timestamp.timestamp() for s in samples])
-        values = np.array([s.value for s in samples])
+        _merge(
+            result,
+            await self._run_stage(
+                self._heart_rate_features, samples, start_time, end_time
+            ),
+        )
+
+    async def _process_hrv(
+        self,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
+        result: ProcessedHealthData,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> None:
+        """Process HRV data with outlier removal and normalization."""
+        _merge(
+            result,
+            await self._run_stage(self._hrv_features, samples, start_time, end_time),
+        )
+
+    async def _process_respiratory_rate(
+        self,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
+        result: ProcessedHealthData,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> None:
+        """Process respiratory rate with median filtering."""
+        _merge(
+            result,
+            await self._run_stage(
+                self._respiratory_rate_features, samples, start_time, end_time
+            ),
+        )
+
+    async def _process_steps(
+        self,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
+        result: ProcessedHealthData,
+        start_time: datetime,
+        end_time: datetime,
+        *,
+        minute_steps: npt.NDArray[np.float64] | None = None,
+    ) -> None:
+        """Process steps into PAT-compatible movement proxy vector.
+
+        ``minute_steps`` takes steps already binned by ``bin_by_minute``.
+        """
+        _merge(
+            result,
+            await self._run_stage(
+                functools.partial(self._steps_features, minute_steps=minute_steps),
+                samples,
+                start_time,
+                end_time,
+            ),
+        )
+
+    async def _run_stage(self, stage: Callable[..., _T], *args: Any) -> _T:
+        """Run a CPU-bound stage on the executor, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(stage, *args)
+        )
+
+    def _heart_rate_features(
+        self,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> dict[str, Any]:
+        """Heart rate series and summary statistics."""
+        series = _as_series(samples)
 
         # Remove outliers using physiological bounds
-        mask = (values >= self.HR_MIN) & (values <= self.HR_MAX)
-        times = times[mask]
-        values = values[mask]
+        series = series.select(
+            (series.values >= self.HR_MIN) & (series.values <= self.HR_MAX)
+        )
 
-        if len(values) == 0:
-            return
+        if len(series) == 0:
+            return {}
 
         # Resample to minute-level (1440 points per day)
-        minute_timestamps = np.arange(
-            start_time.timestamp(),
-            end_time.timestamp(),
-            60,  # 60 seconds
-        )
+        minute_timestamps = _minute_grid(start_time, end_time)
 
         # Interpolate to regular grid
-        if len(values) > 1:
-            # Use linear interpolation for gaps < 5 minutes
-            f = interp1d(
-                times, values, kind="linear", bounds_error=False, fill_value=np.nan
-            )
-            minute_values = f(minute_timestamps)
-
-            # Forward fill for small gaps (< 5 minutes)
-            minute_values = pd.Series(minute_values).ffill(limit=5).to_numpy()
+        if len(series) > 1:
+            # Use linear interpolation, then forward fill small gaps (< 5 minutes)
+            minute_values = _forward_fill(_interpolate(series, minute_timestamps), 5)
 
             # Apply Butterworth low-pass filter to remove motion artifacts
-            # Cutoff at 0.5 Hz (30 bpm variation)
             if not np.all(np.isnan(minute_values)):
-                b, a = scipy.signal.butter(4, 0.5 / (0.5 * 60), btype="low")
+                b, a = HR_LOWPASS_FILTER
                 valid_mask = ~np.isnan(minute_values)
                 min_filter_points = 12
                 if (
@@ -243,15 +567,17 @@ class AppleWatchDataProcessor:
                         b, a, minute_values[valid_mask]
                     )
         else:
-            minute_values = np.full(len(minute_timestamps), values[0])
+            minute_values = np.full(len(minute_timestamps), series.values[0])
+
+        features: dict[str, Any] = {}
 
         # Calculate summary statistics
         valid_values = minute_values[~np.isnan(minute_values)]
         if len(valid_values) > 0:
-            result.avg_hr = float(np.mean(valid_values))
-            result.max_hr = float(np.max(valid_values))
+            features["avg_hr"] = float(np.mean(valid_values))
+            features["max_hr"] = float(np.max(valid_values))
             # Resting HR as 5th percentile
-            result.resting_hr = float(np.percentile(valid_values, 5))
+            features["resting_hr"] = float(np.percentile(valid_values, 5))
 
         # Z-score normalization
         if len(valid_values) > 1:
@@ -259,102 +585,86 @@ class AppleWatchDataProcessor:
             hr_std = 12  # Population std
             minute_values = (minute_values - hr_mean) / hr_std
 
-        result.heart_rate_series = minute_values
+        features["heart_rate_series"] = minute_values
+        return features
 
-    async def _process_hrv(
+    def _hrv_features(
         self,
-        samples: list[HealthDataPoint],
-        result: ProcessedHealthData,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
         start_time: datetime,
         end_time: datetime,
-    ) -> None:
-        """Process HRV data with outlier removal and normalization."""
-        # Extract time series
-        times = np.array([s.timestamp.timestamp() for s in samples])
-        values = np.array([s.value for s in samples])  # SDNN in ms
+    ) -> dict[str, Any]:
+        """HRV series and median."""
+        series = _as_series(samples)  # SDNN in ms
 
         # Remove outliers (5x median filter)
         min_outlier_points = 3
-        if len(values) > min_outlier_points:
-            median_val = np.median(values)
-            mask = values < 5 * median_val
-            times = times[mask]
-            values = values[mask]
+        if len(series) > min_outlier_points:
+            series = series.select(series.values < 5 * np.median(series.values))
 
-        if len(values) == 0:
-            return
+        if len(series) == 0:
+            return {}
 
         # Resample to minute-level
-        minute_timestamps = np.arange(start_time.timestamp(), end_time.timestamp(), 60)
+        minute_timestamps = _minute_grid(start_time, end_time)
 
         # Interpolate (HRV changes slowly, so interpolation is reasonable)
-        if len(values) > 1:
-            f = interp1d(
-                times, values, kind="linear", bounds_error=False, fill_value=np.nan
-            )
-            minute_values = f(minute_timestamps)
-
+        if len(series) > 1:
             # Fill small gaps only
-            minute_values = pd.Series(minute_values).ffill(limit=10).to_numpy()
+            minute_values = _forward_fill(_interpolate(series, minute_timestamps), 10)
         else:
             minute_values = np.full(len(minute_timestamps), np.nan)
 
+        features: dict[str, Any] = {}
+
         # Calculate summary statistics
         valid_values = minute_values[~np.isnan(minute_values)]
         if len(valid_values) > 0:
-            result.hrv_median = float(np.median(valid_values))
+            features["hrv_median"] = float(np.median(valid_values))
 
-        # Log transform for normalization (HRV is often log-normal)
-        if len(valid_values) > 0:
+            # Log transform for normalization (HRV is often log-normal)
             minute_values = np.log1p(minute_values)  # log(1 + x) to handle zeros
 
-        result.hrv_series = minute_values
+        features["hrv_series"] = minute_values
+        return features
 
-    async def _process_respiratory_rate(
+    def _respiratory_rate_features(
         self,
-        samples: list[HealthDataPoint],
-        result: ProcessedHealthData,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
         start_time: datetime,
         end_time: datetime,
-    ) -> None:
-        """Process respiratory rate with median filtering."""
-        # Extract time series
-        times = np.array([s.timestamp.timestamp() for s in samples])
-        values = np.array([s.value for s in samples])
+    ) -> dict[str, Any]:
+        """Respiratory rate series and average."""
+        series = _as_series(samples)
 
         # Remove physiologically implausible values
-        mask = (values >= self.RR_MIN) & (values <= self.RR_MAX)
-        times = times[mask]
-        values = values[mask]
+        series = series.select(
+            (series.values >= self.RR_MIN) & (series.values <= self.RR_MAX)
+        )
 
-        if len(values) == 0:
-            return
+        if len(series) == 0:
+            return {}
 
         # Resample to 5-minute intervals (respiratory rate changes slowly)
-        five_min_timestamps = np.arange(
-            start_time.timestamp(),
-            end_time.timestamp(),
-            300,  # 5 minutes
-        )
+        five_min_timestamps = _minute_grid(start_time, end_time, 300)
 
-        if len(values) > 1:
+        if len(series) > 1:
             # Interpolate
-            f = interp1d(
-                times, values, kind="linear", bounds_error=False, fill_value=np.nan
-            )
-            five_min_values = f(five_min_timestamps)
+            five_min_values = _interpolate(series, five_min_timestamps)
 
             # Apply 3-point median filter to remove transient spikes
             min_median_points = 3
             if len(five_min_values) > min_median_points:
                 five_min_values = scipy.signal.medfilt(five_min_values, kernel_size=3)
         else:
-            five_min_values = np.full(len(five_min_timestamps), values[0])
+            five_min_values = np.full(len(five_min_timestamps), series.values[0])
+
+        features: dict[str, Any] = {}
 
         # Calculate average
         valid_values = five_min_values[~np.isnan(five_min_values)]
         if len(valid_values) > 0:
-            result.avg_respiratory_rate = float(np.mean(valid_values))
+            features["avg_respiratory_rate"] = float(np.mean(valid_values))
 
         # Z-score normalization
         rr_mean = 15  # Population average
@@ -362,39 +672,32 @@ class AppleWatchDataProcessor:
         five_min_values = (five_min_values - rr_mean) / rr_std
 
         # Upsample to minute-level for consistency
-        minute_timestamps = np.arange(start_time.timestamp(), end_time.timestamp(), 60)
+        minute_timestamps = _minute_grid(start_time, end_time)
         if len(five_min_values) > 1:
-            f = interp1d(
-                five_min_timestamps,
-                five_min_values,
-                kind="linear",
-                bounds_error=False,
-                fill_value=np.nan,
+            minute_values = _interpolate(
+                SampleSeries(five_min_timestamps, five_min_values), minute_timestamps
             )
-            minute_values = f(minute_timestamps)
         else:
             minute_values = np.full(len(minute_timestamps), np.nan)
 
-        result.respiratory_rate_series = minute_values
+        features["respiratory_rate_series"] = minute_values
+        return features
 
-    async def _process_steps(
+    def _steps_features(
         self,
-        samples: list[HealthDataPoint],
-        result: ProcessedHealthData,
+        samples: Sequence[HealthDataPoint] | SampleSeries,
         start_time: datetime,
         end_time: datetime,
-    ) -> None:
-        """Process steps into PAT-compatible movement proxy vector."""
-        # Create minute-level step array
-        minutes_in_week = 7 * 24 * 60
-        minute_steps = np.zeros(minutes_in_week)
-
-        # Aggregate steps by minute
-        for sample in samples:
-            if start_time <= sample.timestamp <= end_time:
-                minute_idx = int((sample.timestamp - start_time).total_seconds() / 60)
-                if 0 <= minute_idx < minutes_in_week:
-                    minute_steps[minute_idx] += sample.value
+        *,
+        minute_steps: npt.NDArray[np.float64] | None = None,
+    ) -> dict[str, Any]:
+        """Movement proxy vector from steps."""
+        # Aggregate steps into a minute-level array
+        if minute_steps is None:
+            series = self._steps_in_window(_as_series(samples), end_time)
+            minute_steps = bin_by_minute(
+                [series], [start_time.timestamp()], self.MINUTES_PER_WEEK
+            )[0]
 
         # Apply sqrt transformation (variance stabilization)
         movement_vector = np.sqrt(minute_steps)
@@ -404,21 +707,32 @@ class AppleWatchDataProcessor:
             movement_vector - self.NHANES_STEP_MEAN
         ) / self.NHANES_STEP_STD
 
-        result.movement_proxy_vector = movement_vector
-
         # Log weekly step summary
         total_steps = np.sum(minute_steps)
-        # Calculate days from time range
-        days = (
-            (result.end_time - result.start_time).days
-            if result.start_time and result.end_time
-            else 7
-        )
+        days = (end_time - start_time).days
         self.logger.info(
             "Processed steps over period",
             extra={"total_steps": int(total_steps), "days": days},
         )
 
+        return {"movement_proxy_vector": movement_vector}
+
+    @staticmethod
+    def _to_columns(
+        batches: Sequence[HealthDataBatch | ColumnarHealthBatch],
+    ) -> list[ColumnarHealthBatch]:
+        return [
+            batch
+            if isinstance(batch, ColumnarHealthBatch)
+            else ColumnarHealthBatch.from_batch(batch)
+            for batch in batches
+        ]
+
+    @staticmethod
+    def _steps_in_window(series: SampleSeries, end_time: datetime) -> SampleSeries:
+        """Steps up to and including ``end_time``."""
+        return series.select(series.times <= end_time.timestamp())
+
     async def _process_spo2(
         self, samples: list[HealthDataPoint], result: ProcessedHealthData
     ) -> None:
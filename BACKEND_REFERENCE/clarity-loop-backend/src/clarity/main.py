@@ -25,6 +25,7 @@ from clarity.core.config_adapter import clarity_config_to_settings
 from clarity.core.container_aws import get_container, initialize_container
 from clarity.core.openapi import custom_openapi
 from clarity.services.gcp_credentials import initialize_gcp_credentials
+from clarity.services.messaging.publisher import shutdown_publisher
 from clarity.startup.config_schema import ClarityConfig
 from clarity.startup.orchestrator import StartupOrchestrator
 from clarity.startup.progress_reporter import StartupProgressReporter
@@ -150,6 +151,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
 
     # Cleanup
     logger.info("Shutting down CLARITY backend...")
+    # Send upload events still waiting in the publish batchers
+    await shutdown_publisher()
     if _container:
         # Add any cleanup logic here
         pass
@@ -225,6 +228,13 @@ def configure_middleware_from_env(app: FastAPI) -> None:
         cache_control="no-store, private",
     )
 
+    # Request tracing - outermost, so the root span covers every layer
+    from clarity.middleware.request_tracing import (  # noqa: PLC0415
+        RequestTracingMiddleware,
+    )
+
+    app.add_middleware(RequestTracingMiddleware)
+
 
 def include_routers(app: FastAPI) -> None:
     """Include all API routers."""
@@ -13,6 +13,7 @@ from clarity.middleware.rate_limiting import (
     setup_rate_limiting,
 )
 from clarity.middleware.request_logger import RequestLoggingMiddleware
+from clarity.middleware.request_tracing import RequestTracingMiddleware
 from clarity.middleware.security_headers import (
     SecurityHeadersMiddleware,
     setup_security_headers,
@@ -22,6 +23,7 @@ __all__ = [
     "CognitoAuthMiddleware",
     "RateLimitingMiddleware",
     "RequestLoggingMiddleware",
+    "RequestTracingMiddleware",
     "SecurityHeadersMiddleware",
     "get_ip_only",
     "get_user_id_or_ip",
@@ -1,19 +1,18 @@
 """Authentication middleware for JWT token validation.
 
 This middleware validates Cognito JWT tokens and populates request.state.user
-with the authenticated user context.
+with the authenticated user context. It is a pure ASGI middleware, so the
+request and response streams pass through unwrapped.
 """
 
 # removed - breaks FastAPI
 
 import logging
 import os
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from clarity.auth.aws_auth_provider import CognitoAuthProvider
 from clarity.auth.modal_auth_fix import set_user_context
@@ -46,7 +45,7 @@ PUBLIC_PATHS = {
 }
 
 
-class CognitoAuthMiddleware(BaseHTTPMiddleware):
+class CognitoAuthMiddleware:
     """Middleware to validate Cognito JWT tokens and populate user context."""
 
     def __init__(self, app: ASGIApp) -> None:
@@ -55,7 +54,7 @@ class CognitoAuthMiddleware(BaseHTTPMiddleware):
         Args:
             app: The ASGI application
         """
-        super().__init__(app)
+        self.app = app
 
         # Get configuration from environment
         self.enable_auth = os.getenv("ENABLE_AUTH", "true").lower() == "true"
@@ -84,32 +83,43 @@ class CognitoAuthMiddleware(BaseHTTPMiddleware):
         else:
             logger.warning("Authentication disabled or not configured")
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
-        """Process the request and validate JWT token if present.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Validate the JWT token, if present, then call the next app.
 
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] == "http":
+            await self.authenticate(HTTPConnection(scope))
+        await self.app(scope, receive, send)
+
+    async def authenticate(self, request: HTTPConnection) -> None:
+        """Populate ``request.state.user`` from the bearer token, if valid.
+
+        Failures are logged and leave the user unset; the auth dependency
+        returns 401 for endpoints that require a user.
 
-        Returns:
-            The response from the next handler
+        Args:
+            request: The incoming request (or any connection on its scope)
         """
         # Initialize request state
         request.state.user = None
 
         # Skip auth for public paths
         if request.url.path in PUBLIC_PATHS:
-            return cast(Response, await call_next(request))
+            return
 
         # Skip auth if disabled
         if not self.enable_auth or not self.auth_provider:
-            return cast(Response, await call_next(request))
+            return
 
         # Extract token from Authorization header
         auth_header = request.headers.get("Authorization", "")
         if not auth_header.startswith("Bearer "):
             # No auth header, continue without user context
-            return cast(Response, await call_next(request))
+            return
 
         token = auth_header[7:]  # Remove "Bearer " prefix
 
@@ -144,6 +154,3 @@ class CognitoAuthMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             # Log unexpected errors but continue
             logger.exception("Unexpected error during authentication: %s", e)
-
-        # Continue to the next handler
-        return cast(Response, await call_next(request))
@@ -0,0 +1,232 @@
+"""Hybrid local/Redis storage for distributed rate limiting.
+
+Plain Redis storage costs a network round trip on every rate-limited request,
+while in-memory storage is per worker, so limits multiply by worker count.
+``HybridRedisStorage`` keeps a counter per rate-limit key in each worker and
+answers every check locally. A background thread reconciles the counters with
+Redis in one pipelined batch: locally consumed hits are pushed with INCRBY
+and the global totals (including other workers' hits) are read back.
+
+Accuracy is traded against Redis traffic with two knobs: ``sync_interval``
+(seconds between batches) and ``max_pending`` (unsynced hits on one key that
+trigger an early batch). Between batches each worker can overshoot a limit
+by at most the hits it has not yet synced.
+
+Registered with ``limits`` under the ``hybrid+redis://`` and
+``hybrid+rediss://`` schemes, so slowapi can use it through ``storage_uri``.
+"""
+
+# removed - breaks FastAPI
+
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any
+
+from limits.storage import Storage
+import redis
+
+logger = logging.getLogger(__name__)
+
+HYBRID_SCHEME_PREFIX = "hybrid+"
+DEFAULT_SYNC_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_PENDING = 10
+DEFAULT_KEY_PREFIX = "LIMITS"
+
+
+@dataclass
+class _Counter:
+    """Worker-local view of one rate-limit window."""
+
+    synced: int  # Global count as last read from Redis
+    pending: int  # Hits in this worker not yet pushed to Redis
+    expires_at: float  # Epoch seconds when the window resets
+    expiry: int  # Window length in seconds
+
+    @property
+    def value(self) -> int:
+        return self.synced + self.pending
+
+
+class HybridRedisStorage(Storage):
+    """Rate limit storage with local counters and batched Redis sync."""
+
+    STORAGE_SCHEME = ["hybrid+redis", "hybrid+rediss"]
+
+    def __init__(
+        self,
+        uri: str,
+        *,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL_SECONDS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        redis_client: Any = None,
+        wrap_exceptions: bool = False,
+        **options: Any,
+    ) -> None:
+        """Initialize the storage.
+
+        Args:
+            uri: ``hybrid+redis://host:port/db`` style URI
+            sync_interval: Seconds between Redis sync batches
+            max_pending: Unsynced hits on a key that trigger an early sync
+            key_prefix: Prefix for rate limit keys in Redis
+            redis_client: Pre-built client; created from ``uri`` when omitted
+            wrap_exceptions: Wrap Redis errors in ``limits.errors.StorageError``
+            **options: Passed to ``redis.Redis.from_url``
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        self.sync_interval = sync_interval
+        self.max_pending = max_pending
+        self.key_prefix = key_prefix
+        self._redis = redis_client or redis.Redis.from_url(
+            uri.removeprefix(HYBRID_SCHEME_PREFIX), **options
+        )
+        self._counters: dict[str, _Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return redis.RedisError
+
+    def _prefixed(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def _live_counter(self, key: str, now: float) -> _Counter | None:
+        counter = self._counters.get(key)
+        if counter is not None and counter.expires_at <= now:
+            del self._counters[key]
+            return None
+        return counter
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """Count a hit locally and return this worker's view of the total."""
+        now = time.time()
+        with self._lock:
+            counter = self._live_counter(key, now)
+            if counter is None:
+                counter = _Counter(0, 0, now + expiry, expiry)
+                self._counters[key] = counter
+            counter.pending += amount
+            value = counter.value
+            flush_early = counter.pending >= self.max_pending
+        self._ensure_sync_thread()
+        if flush_early:
+            self._wake.set()
+        return value
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            counter = self._live_counter(key, time.time())
+            return counter.value if counter else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            counter = self._live_counter(key, now)
+            return counter.expires_at if counter else now
+
+    def check(self) -> bool:
+        try:
+            return bool(self._redis.ping())
+        except redis.RedisError:
+            return False
+
+    def reset(self) -> int | None:
+        with self._lock:
+            self._counters.clear()
+        keys = list(self._redis.scan_iter(match=self._prefixed("*")))
+        return int(self._redis.delete(*keys)) if keys else 0
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+        self._redis.delete(self._prefixed(key))
+
+    def sync(self) -> bool:
+        """Push pending hits to Redis and pull the global totals.
+
+        Runs on the background thread; callable directly to force a batch.
+
+        Returns:
+            True if the batch reached Redis, False if it failed and the hits
+            were kept for the next attempt
+        """
+        now = time.time()
+        with self._lock:
+            batch = [
+                (key, counter, counter.pending)
+                for key, counter in list(self._counters.items())
+                if self._live_counter(key, now) is not None
+            ]
+            for _, counter, pending in batch:
+                counter.pending -= pending
+        if not batch:
+            return True
+
+        pipe = self._redis.pipeline(transaction=False)
+        for key, counter, pending in batch:
+            redis_key = self._prefixed(key)
+            if pending:
+                # Starts the shared window if this worker is first to sync
+                pipe.set(redis_key, 0, ex=counter.expiry, nx=True)
+                pipe.incrby(redis_key, pending)
+            else:
+                pipe.get(redis_key)
+            pipe.ttl(redis_key)
+        try:
+            results = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Rate limit sync to Redis failed: %s", e)
+            with self._lock:
+                for _, counter, pending in batch:
+                    counter.pending += pending
+            return False
+
+        now = time.time()
+        index = 0
+        with self._lock:
+            for _, counter, pending in batch:
+                index += 1 if pending else 0  # Skip the SET NX result
+                total = int(results[index] or 0)
+                ttl = results[index + 1]
+                index += 2
+                counter.synced = total
+                if ttl is not None and ttl > 0:
+                    # Align the local window with the shared Redis window
+                    counter.expires_at = now + ttl
+        return True
+
+    def close(self) -> None:
+        """Stop the sync thread after a final batch."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sync()
+
+    def _ensure_sync_thread(self) -> None:
+        if self._thread is not None or self._closed:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sync_loop, name="rate-limit-sync", daemon=True
+                )
+                self._thread.start()
+
+    def _sync_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.sync_interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Unexpected error in rate limit sync")
@@ -2,10 +2,16 @@
 
 Provides application-level rate limiting using slowapi to protect against
 abuse and ensure fair resource usage across users.
+
+With a Redis URL, limiters use ``HybridRedisStorage``: checks are answered
+from per-worker counters that are reconciled with Redis in background
+batches, so limits hold across workers without a Redis round trip per
+request. Set ``RATE_LIMIT_SYNC_INTERVAL=0`` to go to Redis on every request.
 """
 
 from collections.abc import Callable
 import logging
+import os
 from typing import Any, ClassVar
 
 from fastapi import Request
@@ -15,9 +21,16 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from clarity.core.exceptions import ProblemDetail
+from clarity.middleware.rate_limit_storage import (
+    DEFAULT_MAX_PENDING,
+    DEFAULT_SYNC_INTERVAL_SECONDS,
+    HYBRID_SCHEME_PREFIX,
+)
 
 logger = logging.getLogger(__name__)
 
+REDIS_SCHEMES = ("redis://", "rediss://")
+
 
 def get_user_id_or_ip(request: Request) -> str:
     """Extract user ID from authenticated requests, fallback to IP address.
@@ -105,13 +118,22 @@ class RateLimitingMiddleware:
         key_func: Callable[[Request], str] = get_user_id_or_ip,
         default_limits: list[str | Callable[..., str]] | None = None,
         storage_uri: str | None = None,
+        storage_options: dict[str, Any] | None = None,
+        *,
+        headers_enabled: bool = True,
     ) -> Limiter:
         """Create a configured rate limiter instance.
 
+        Redis URIs are served through the hybrid local/Redis storage unless
+        ``RATE_LIMIT_SYNC_INTERVAL`` is 0.
+
         Args:
             key_func: Function to extract rate limit key from request
             default_limits: Default rate limits to apply
             storage_uri: Redis URI for distributed rate limiting
+            storage_options: Extra options for the storage backend
+            headers_enabled: Add X-RateLimit-* headers (endpoints must then
+                return a Response or accept a ``response`` parameter)
 
         Returns:
             Configured Limiter instance
@@ -119,37 +141,64 @@ class RateLimitingMiddleware:
         if default_limits is None:
             default_limits = [RateLimitingMiddleware.DEFAULT_LIMITS["global"]]
 
+        storage_options = dict(storage_options or {})
+        sync_interval = float(
+            os.getenv("RATE_LIMIT_SYNC_INTERVAL", str(DEFAULT_SYNC_INTERVAL_SECONDS))
+        )
+        if storage_uri and storage_uri.startswith(REDIS_SCHEMES) and sync_interval:
+            storage_uri = HYBRID_SCHEME_PREFIX + storage_uri
+            storage_options.setdefault("sync_interval", sync_interval)
+            storage_options.setdefault(
+                "max_pending",
+                int(os.getenv("RATE_LIMIT_MAX_PENDING", str(DEFAULT_MAX_PENDING))),
+            )
+
         limiter = Limiter(
             key_func=key_func,
             default_limits=default_limits,
             storage_uri=storage_uri,  # Use Redis if available for distributed limiting
-            headers_enabled=True,  # Add X-RateLimit-* headers
+            storage_options=storage_options,
+            headers_enabled=headers_enabled,  # Add X-RateLimit-* headers
             strategy="fixed-window",  # Simple and predictable
             key_style="endpoint",  # Include endpoint in rate limit key
         )
 
+        if not storage_uri:
+            storage = "In-memory"
+        elif storage_uri.startswith(HYBRID_SCHEME_PREFIX):
+            storage = f"Redis (hybrid, {storage_options['sync_interval']}s sync)"
+        else:
+            storage = "Redis"
         logger.info(
             "🚦 Rate limiter initialized with defaults: %s, storage: %s",
             default_limits,
-            "Redis" if storage_uri else "In-memory",
+            storage,
         )
 
         return limiter
 
     @staticmethod
-    def get_auth_limiter() -> Limiter:
+    def get_auth_limiter(
+        storage_uri: str | None = None, *, headers_enabled: bool = True
+    ) -> Limiter:
         """Create a rate limiter specifically for authentication endpoints."""
         return RateLimitingMiddleware.create_limiter(
             key_func=get_ip_only,  # Always use IP for auth endpoints
             default_limits=[RateLimitingMiddleware.DEFAULT_LIMITS["auth"]],
+            storage_uri=storage_uri,
+            headers_enabled=headers_enabled,
         )
 
     @staticmethod
-    def get_ai_limiter() -> Limiter:
+    def get_ai_limiter(
+        storage_uri: str | None = None, *, headers_enabled: bool = True
+    ) -> Limiter:
         """Create a rate limiter for AI/ML endpoints with stricter limits."""
         return RateLimitingMiddleware.create_limiter(
             key_func=get_user_id_or_ip,
             default_limits=[RateLimitingMiddleware.DEFAULT_LIMITS["ai"]],
+            storage_uri=storage_uri,
+            headers_enabled=headers_enabled,
         )
 
 
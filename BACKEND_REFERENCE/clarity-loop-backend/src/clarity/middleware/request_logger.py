@@ -1,67 +1,100 @@
-"""Request logging middleware for debugging."""
+"""Request logging middleware for debugging.
+
+Logs one line per request with the response status and duration. Request
+bodies are logged for a sample of requests only, and only their first
+``max_body_bytes`` bytes, captured while the body streams through to the
+endpoint instead of buffering it.
+"""
 
 # removed - breaks FastAPI
 
-import json
 import logging
+import random
+import time
 from typing import TYPE_CHECKING
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 if TYPE_CHECKING:
     pass
 
 logger = logging.getLogger(__name__)
 
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+DEFAULT_BODY_SAMPLE_RATE = 0.1  # fraction of requests whose body is logged
+DEFAULT_MAX_BODY_BYTES = 1024  # body bytes kept per logged request
+
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Middleware to log all incoming requests for debugging."""
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        """Log request details before processing."""
-        # Log basic request info
-        logger.warning("🔍 REQUEST: %s %s", request.method, request.url.path)
-        logger.warning("  Headers: %s", dict(request.headers))
-
-        # For POST/PUT/PATCH requests, try to log the body
-        if request.method in {"POST", "PUT", "PATCH"}:
-            try:
-                # Note: After reading body here, we need to make it available to the endpoint
-                body_bytes = await request.body()
-                logger.warning("  Body length: %s bytes", len(body_bytes))
-
-                # Try to decode as UTF-8
-                try:
-                    body_str = body_bytes.decode("utf-8")
-                    logger.warning("  Body preview: %s...", body_str[:200])
-
-                    # Try to parse as JSON
-                    try:
-                        body_json = json.loads(body_str)
-                        logger.warning(
-                            "  Parsed JSON: %s", json.dumps(body_json, indent=2)
-                        )
-                    except json.JSONDecodeError:
-                        logger.warning("  Body is not valid JSON")
-                except UnicodeDecodeError:
-                    logger.warning(
-                        "  Body is not UTF-8, hex preview: %s...",
-                        body_bytes.hex()[:100],
-                    )
-
-                # Store body for the endpoint to use
-                request._body = body_bytes  # noqa: SLF001
-
-            except Exception as e:
-                logger.exception("  Failed to read request body: %s", e)
-
-        # Process the request
-        response = await call_next(request)
-
-        # Log response status
-        logger.warning("  Response: %s", response.status_code)
-
-        return response
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        body_sample_rate: float = DEFAULT_BODY_SAMPLE_RATE,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ) -> None:
+        """Initialize the request logger.
+
+        Args:
+            app: The ASGI application
+            body_sample_rate: Fraction of body requests whose body is logged
+            max_body_bytes: Body bytes logged per sampled request
+        """
+        self.app = app
+        self.body_sample_rate = body_sample_rate
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Log the request line, response status and a sampled body preview."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        body_size = 0
+        preview = bytearray()
+        sample_body = (
+            scope["method"] in BODY_METHODS
+            and logger.isEnabledFor(logging.DEBUG)
+            and random.random() < self.body_sample_rate  # noqa: S311 - sampling
+        )
+
+        async def capturing_receive() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size += len(chunk)
+                room = self.max_body_bytes - len(preview)
+                if room > 0:
+                    preview.extend(chunk[:room])
+            return message
+
+        async def status_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(
+                scope, capturing_receive if sample_body else receive, status_send
+            )
+        finally:
+            logger.info(
+                "🔍 REQUEST: %s %s -> %d (%.1f ms)",
+                scope["method"],
+                scope["path"],
+                status_code,
+                (time.perf_counter() - started) * 1000,
+            )
+            if sample_body:
+                logger.debug(
+                    "  Body (%d bytes, first %d): %s",
+                    body_size,
+                    len(preview),
+                    bytes(preview).decode("utf-8", errors="replace"),
+                )
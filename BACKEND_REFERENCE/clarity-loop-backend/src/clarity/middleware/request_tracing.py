@@ -0,0 +1,68 @@
+"""Request tracing middleware for CLARITY backend.
+
+Opens the root ``http.request`` span for every HTTP request, continuing a
+W3C ``traceparent`` sent by the client, and assigns the request ID: the
+client's ``X-Request-ID`` when it is safe to echo, otherwise a new one. The
+request ID is returned in the ``X-Request-ID`` response header and travels
+with the trace through queue messages to the analysis and insight workers.
+"""
+
+# removed - breaks FastAPI
+
+import logging
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from clarity.core.tracing import (
+    REQUEST_ID_HEADER,
+    REQUEST_ID_KEY,
+    TRACEPARENT_KEY,
+    extract,
+    sanitize_request_id,
+    start_span,
+)
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_ID_HEADER_RAW = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+
+class RequestTracingMiddleware:
+    """Middleware that traces each HTTP request and tags it with a request ID."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = sanitize_request_id(headers.get(REQUEST_ID_HEADER))
+        parent = extract(
+            {
+                TRACEPARENT_KEY: headers.get(TRACEPARENT_KEY, ""),
+                REQUEST_ID_KEY: request_id or "",
+            }
+        )
+
+        with start_span(
+            "http.request",
+            {"http.method": scope["method"], "http.target": scope["path"]},
+            parent=parent,
+            request_id=request_id,
+        ) as span:
+            request_id_raw = (span.context.request_id or "").encode("latin-1")
+
+            async def traced_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (_REQUEST_ID_HEADER_RAW, request_id_raw),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, traced_send)
@@ -2,6 +2,10 @@
 
 This middleware adds security headers to all HTTP responses to enhance security posture.
 Implements OWASP recommended security headers for API protection.
+
+It is a pure ASGI middleware: the header tuples are built once at startup
+and appended to the ``http.response.start`` message, so streaming responses
+pass through untouched and no per-request task or stream wrapping is added.
 """
 
 # removed - breaks FastAPI
@@ -9,10 +13,8 @@ Implements OWASP recommended security headers for API protection.
 import logging
 from typing import TYPE_CHECKING
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 if TYPE_CHECKING:
     pass
@@ -22,8 +24,54 @@ logger = logging.getLogger(__name__)
 # Paths that require relaxed CSP for documentation/UI functionality
 DOCS_AND_STATIC_PATHS = ("/api/v1/docs", "/static/", "/docs", "/redoc")
 
+STRICT_CSP = 'default-src "none"; frame-ancestors "none";'
+RELAXED_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data:; "
+    "font-src 'self' data:; "
+    "connect-src 'self'; "
+    "frame-ancestors 'none';"
+)
+PERMISSIONS_POLICY = (
+    "camera=(), microphone=(), geolocation=(), "
+    "payment=(), usb=(), magnetometer=(), "
+    "accelerometer=(), gyroscope=()"
+)
+
+
+def _security_headers(
+    *, csp: str | None, cache_control: str, hsts: str | None = None
+) -> dict[str, str]:
+    """Security headers in the order they are added to responses."""
+    headers = {
+        "X-Content-Type-Options": "nosniff",  # Prevent MIME type sniffing
+        "X-Frame-Options": "DENY",  # Prevent clickjacking
+    }
+    if csp is not None:
+        headers["Content-Security-Policy"] = csp
+    headers.update(
+        {
+            "X-XSS-Protection": "1; mode=block",  # Legacy but still useful
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+            "Cache-Control": cache_control,  # Prevent caching of sensitive data
+            "Permissions-Policy": PERMISSIONS_POLICY,
+        }
+    )
+    if hsts is not None:
+        headers["Strict-Transport-Security"] = hsts
+    return headers
+
+
+def _raw_headers(headers: dict[str, str]) -> tuple[tuple[bytes, bytes], ...]:
+    return tuple(
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    )
+
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Middleware to add security headers to all responses.
 
     Implements industry-standard security headers to protect against common attacks:
@@ -56,14 +104,37 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             csp_policy: Custom CSP policy (default: API-specific policy)
             cache_control: Cache control header value
         """
-        super().__init__(app)
+        self.app = app
         self.enable_hsts = enable_hsts
         self.hsts_max_age = hsts_max_age
         self.hsts_include_subdomains = hsts_include_subdomains
         self.enable_csp = enable_csp
-        self.csp_policy = csp_policy or 'default-src "none"; frame-ancestors "none";'
+        self.csp_policy = csp_policy or STRICT_CSP
         self.cache_control = cache_control
 
+        hsts = None
+        if enable_hsts:
+            hsts = f"max-age={hsts_max_age}"
+            if hsts_include_subdomains:
+                hsts += "; includeSubDomains"
+
+        # Precomputed raw header tuples for API paths and docs/static paths
+        self._api_headers = _raw_headers(
+            _security_headers(
+                csp=self.csp_policy if enable_csp else None,
+                cache_control=cache_control,
+                hsts=hsts,
+            )
+        )
+        self._docs_headers = _raw_headers(
+            _security_headers(
+                csp=RELAXED_CSP if enable_csp else None,
+                cache_control=cache_control,
+                hsts=hsts,
+            )
+        )
+        self._header_names = frozenset(name for name, _ in self._docs_headers)
+
         # Log configuration
         logger.info(
             "SecurityHeadersMiddleware initialized - HSTS: %s, CSP: %s",
@@ -71,25 +142,37 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             self.enable_csp,
         )
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        """Process the request and add security headers to the response.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Add security headers to the response start message.
 
         Args:
-            request: The incoming request
-            call_next: The next middleware or endpoint handler
-
-        Returns:
-            Response with security headers added
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Process the request
-        response = await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Determine if this request needs relaxed CSP
+        headers = (
+            self._docs_headers
+            if scope["path"].startswith(DOCS_AND_STATIC_PATHS)
+            else self._api_headers
+        )
+        names = self._header_names
 
-        # Add security headers
-        self._add_security_headers(request, response)
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    header
+                    for header in message.get("headers", ())
+                    if header[0].lower() not in names
+                ]
+                message["headers"].extend(headers)
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_headers)
 
     @staticmethod
     def add_security_headers_to_response(
@@ -110,93 +193,13 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             cache_control: Cache control header value
             enable_csp: Whether to add CSP header
         """
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Content Security Policy
+        csp = None
         if enable_csp:
-            if strict:
-                response.headers["Content-Security-Policy"] = (
-                    'default-src "none"; frame-ancestors "none";'
-                )
-            else:
-                response.headers["Content-Security-Policy"] = (
-                    "default-src 'self'; "
-                    "script-src 'self' 'unsafe-inline'; "
-                    "style-src 'self' 'unsafe-inline'; "
-                    "img-src 'self' data:; "
-                    "font-src 'self' data:; "
-                    "connect-src 'self'; "
-                    "frame-ancestors 'none';"
-                )
-
-        # XSS Protection (legacy but still useful)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Control referrer information
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Prevent caching of sensitive data
-        response.headers["Cache-Control"] = cache_control
-
-        # Permissions Policy
-        response.headers["Permissions-Policy"] = (
-            "camera=(), microphone=(), geolocation=(), "
-            "payment=(), usb=(), magnetometer=(), "
-            "accelerometer=(), gyroscope=()"
+            csp = STRICT_CSP if strict else RELAXED_CSP
+        response.headers.update(
+            _security_headers(csp=csp, cache_control=cache_control)
         )
 
-    def _add_security_headers(self, request: Request, response: Response) -> None:
-        """Add security headers to the response.
-
-        Args:
-            request: The request object to check path
-            response: The response object to add headers to
-        """
-        # Determine if this request needs relaxed CSP
-        path = str(request.url.path)
-        needs_relaxed_csp = path.startswith(DOCS_AND_STATIC_PATHS)
-
-        # If CSP is enabled, determine the policy to use
-        if self.enable_csp:
-            if needs_relaxed_csp:
-                # Use relaxed CSP for docs/static paths
-                csp_header = (
-                    "default-src 'self'; "
-                    "script-src 'self' 'unsafe-inline'; "
-                    "style-src 'self' 'unsafe-inline'; "
-                    "img-src 'self' data:; "
-                    "font-src 'self' data:; "
-                    "connect-src 'self'; "
-                    "frame-ancestors 'none';"
-                )
-            else:
-                # Use configured CSP policy for all other paths
-                csp_header = self.csp_policy
-            response.headers["Content-Security-Policy"] = csp_header
-
-        # Add other security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Cache-Control"] = self.cache_control
-        response.headers["Permissions-Policy"] = (
-            "camera=(), microphone=(), geolocation=(), "
-            "payment=(), usb=(), magnetometer=(), "
-            "accelerometer=(), gyroscope=()"
-        )
-
-        # Add HSTS if enabled (this is instance-specific)
-        if self.enable_hsts:
-            hsts_value = f"max-age={self.hsts_max_age}"
-            if self.hsts_include_subdomains:
-                hsts_value += "; includeSubDomains"
-            response.headers["Strict-Transport-Security"] = hsts_value
-
 
 # Convenience function for easy registration
 def setup_security_headers(
@@ -6,7 +6,7 @@ Integrates preprocessing, modality processors, fusion, and PAT model.
 
 # removed - breaks FastAPI
 
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 import logging
 import os
@@ -14,7 +14,17 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from clarity.core.tracing import start_span
+from clarity.ml.feature_store import (
+    FEATURE_WINDOW_DAYS,
+    DayPartial,
+    FeatureStore,
+    FeatureStoreSingleton,
+    group_metrics_by_day,
+    inputs_fingerprint,
+)
 from clarity.ml.fusion_transformer import get_fusion_service
+from clarity.ml.healthkit_stream import MODALITY_CHANNELS, HealthKitColumns
 from clarity.ml.pat_service import ActigraphyAnalysis, ActigraphyInput, get_pat_service
 from clarity.ml.processors.sleep_processor import SleepFeatures
 
@@ -69,8 +79,14 @@ class HealthAnalysisPipeline:
     5. Summary statistics generation
     """
 
-    def __init__(self) -> None:
-        """Initialize the analysis pipeline with all processors."""
+    def __init__(self, feature_store: FeatureStore | None = None) -> None:
+        """Initialize the analysis pipeline with all processors.
+
+        Args:
+            feature_store: Optional store of per-day partial aggregates; when
+                set, only days whose metrics changed since the last run are
+                reprocessed, and stored days complete the week of an upload
+        """
         self.logger = logging.getLogger(__name__)
 
         # Initialize processors
@@ -87,6 +103,10 @@ class HealthAnalysisPipeline:
         # Storage client for saving analysis results
         self.dynamodb_client: DynamoDBHealthDataRepository | None = None
 
+        # Incremental per-day feature partials
+        self.feature_store = feature_store
+        self.feature_store_stats = {"days_built": 0, "days_cached": 0}
+
         self.logger.info("✅ Health Analysis Pipeline initialized")
 
     async def _get_dynamodb_client(self) -> DynamoDBHealthDataRepository:
@@ -104,6 +124,7 @@ class HealthAnalysisPipeline:
         user_id: str,
         health_metrics: list[HealthMetric],
         processing_id: str | None = None,
+        columns: HealthKitColumns | None = None,
     ) -> AnalysisResults:
         """Process health metrics through the analysis pipeline.
 
@@ -111,15 +132,20 @@ class HealthAnalysisPipeline:
             user_id: User identifier
             health_metrics: List of health metrics to analyze
             processing_id: Optional processing ID for tracking
+            columns: Optional columnar quantity samples from streamed ingestion;
+                used for cardio and respiratory processing instead of metrics
 
         Returns:
             AnalysisResults object with all computed features
         """
         try:
+            total_metrics = len(health_metrics) + (
+                columns.sample_count if columns is not None else 0
+            )
             self.logger.info(
                 "🔬 Starting analysis pipeline for user %s with %d metrics",
                 user_id,
-                len(health_metrics),
+                total_metrics,
             )
 
             results = AnalysisResults()
@@ -127,21 +153,33 @@ class HealthAnalysisPipeline:
 
             # Step 1: Organize metrics by modality
             organized_data = self._organize_metrics_by_modality(health_metrics)
+            partial = None
+            if self.feature_store is not None:
+                with start_span("feature_store.load_days"):
+                    partial = await self._load_day_partials(
+                        self.feature_store, user_id, health_metrics, columns
+                    )
 
             # Step 2: Process each modality
-            if organized_data["cardio"]:
+            if organized_data["cardio"] or (
+                columns is not None and columns.has_modality("cardio")
+            ):
                 self.logger.info("Processing cardiovascular data...")
-                cardio_features = await self._process_cardio_data(
-                    organized_data["cardio"]
-                )
+                with start_span("processor.cardio"):
+                    cardio_features = await self._process_cardio_data(
+                        organized_data["cardio"], columns, partial
+                    )
                 results.cardio_features = cardio_features
                 modality_features["cardio"] = cardio_features
 
-            if organized_data["respiratory"]:
+            if organized_data["respiratory"] or (
+                columns is not None and columns.has_modality("respiratory")
+            ):
                 self.logger.info("Processing respiratory data...")
-                respiratory_features = await self._process_respiratory_data(
-                    organized_data["respiratory"]
-                )
+                with start_span("processor.respiratory"):
+                    respiratory_features = await self._process_respiratory_data(
+                        organized_data["respiratory"], columns, partial
+                    )
                 results.respiratory_features = respiratory_features
                 modality_features["respiratory"] = respiratory_features
 
@@ -151,23 +189,38 @@ class HealthAnalysisPipeline:
                 )
 
                 # First, extract basic activity features using ActivityProcessor
-                activity_features = self.activity_processor.process(
-                    organized_data["activity"]
-                )
+                with start_span("processor.activity"):
+                    if partial is not None:
+                        activity_features = self.activity_processor.process_values(
+                            partial.activity_values, partial.activity_records
+                        )
+                    else:
+                        activity_features = self.activity_processor.process(
+                            organized_data["activity"]
+                        )
                 results.activity_features = (
                     activity_features  # 🔥 ADDED: Store basic activity features
                 )
 
                 # Then process with PAT model for advanced analysis
-                activity_embedding = await self._process_activity_data(
-                    user_id, organized_data["activity"]
-                )
+                with start_span("pat.analyze"):
+                    activity_embedding = await self._process_activity_data(
+                        user_id, organized_data["activity"], partial
+                    )
                 results.activity_embedding = activity_embedding
                 modality_features["activity"] = activity_embedding
 
             if organized_data["sleep"]:
                 self.logger.info("🚀 Processing sleep data with SleepProcessor...")
-                sleep_features = self.sleep_processor.process(organized_data["sleep"])
+                with start_span("processor.sleep"):
+                    if partial is not None:
+                        sleep_features = self.sleep_processor.process_record_features(
+                            partial.sleep_features
+                        )
+                    else:
+                        sleep_features = self.sleep_processor.process(
+                            organized_data["sleep"]
+                        )
                 results.sleep_features = sleep_features.__dict__
 
                 # Convert sleep features to vector for fusion
@@ -179,7 +232,10 @@ class HealthAnalysisPipeline:
             # Step 3: Fuse modalities if we have multiple
             if len(modality_features) > 1:
                 self.logger.info("Fusing %d modalities...", len(modality_features))
-                fused_vector = await self._fuse_modalities(modality_features)
+                with start_span(
+                    "analysis.fusion", {"fusion.modalities": len(modality_features)}
+                ):
+                    fused_vector = await self._fuse_modalities(modality_features)
                 results.fused_vector = fused_vector
             elif len(modality_features) == 1:
                 # Single modality - use it as the fused vector
@@ -190,13 +246,14 @@ class HealthAnalysisPipeline:
                 organized_data,
                 modality_features,
                 results.activity_features,  # 🔥 Pass activity features
+                columns,
             )
 
             # Step 5: Add processing metadata
             results.processing_metadata = {
                 "user_id": user_id,
                 "processed_at": datetime.now(UTC).isoformat(),
-                "total_metrics": len(health_metrics),
+                "total_metrics": total_metrics,
                 "modalities_processed": list(modality_features.keys()),
                 "fused_vector_dim": (
                     len(results.fused_vector) if results.fused_vector else 0
@@ -243,7 +300,8 @@ class HealthAnalysisPipeline:
                         "created_at": timestamp.isoformat(),
                     }
 
-                    dynamodb_client.table.put_item(Item=analysis_item)
+                    with start_span("dynamodb.put_analysis"):
+                        dynamodb_client.table.put_item(Item=analysis_item)
                     self.logger.info(
                         "✅ Analysis results saved to DynamoDB: %s", processing_id
                     )
@@ -330,9 +388,29 @@ class HealthAnalysisPipeline:
         ]
 
     async def _process_cardio_data(
-        self, cardio_metrics: list[HealthMetric]
+        self,
+        cardio_metrics: list[HealthMetric],
+        columns: HealthKitColumns | None = None,
+        partial: DayPartial | None = None,
     ) -> list[float]:
         """Process cardiovascular metrics."""
+        if partial is not None:
+            return self.cardio_processor.process_resampled(
+                partial.hr_bins, partial.hrv_bins
+            )
+        if columns is not None and columns.has_modality("cardio"):
+            return self.cardio_processor.process(
+                *columns.channel_arrays("heart_rate"),
+                *columns.channel_arrays("heart_rate_variability"),
+            )
+
+        return self.cardio_processor.process(*self._cardio_series(cardio_metrics))
+
+    @staticmethod
+    def _cardio_series(
+        cardio_metrics: list[HealthMetric],
+    ) -> tuple[list[datetime], list[float], list[datetime], list[float]]:
+        """Split cardio metrics into HR and HRV timestamp/value lists."""
         hr_timestamps = []
         hr_values = []
         hrv_timestamps = []
@@ -357,14 +435,34 @@ class HealthAnalysisPipeline:
                 hrv_timestamps.append(metric.created_at)
                 hrv_values.append(float(metric.biometric_data.heart_rate_variability))
 
-        return self.cardio_processor.process(
-            hr_timestamps, hr_values, hrv_timestamps, hrv_values
-        )
+        return hr_timestamps, hr_values, hrv_timestamps, hrv_values
 
     async def _process_respiratory_data(
-        self, respiratory_metrics: list[HealthMetric]
+        self,
+        respiratory_metrics: list[HealthMetric],
+        columns: HealthKitColumns | None = None,
+        partial: DayPartial | None = None,
     ) -> list[float]:
         """Process respiratory metrics."""
+        if partial is not None:
+            return self.respiratory_processor.process_resampled(
+                partial.rr_bins, partial.spo2_bins
+            )
+        if columns is not None and columns.has_modality("respiratory"):
+            return self.respiratory_processor.process(
+                *columns.channel_arrays("respiratory_rate"),
+                *columns.channel_arrays("oxygen_saturation"),
+            )
+
+        return self.respiratory_processor.process(
+            *self._respiratory_series(respiratory_metrics)
+        )
+
+    @staticmethod
+    def _respiratory_series(
+        respiratory_metrics: list[HealthMetric],
+    ) -> tuple[list[datetime], list[float], list[datetime], list[float]]:
+        """Split respiratory metrics into RR and SpO2 timestamp/value lists."""
         rr_timestamps = []
         rr_values = []
         spo2_timestamps = []
@@ -393,20 +491,185 @@ class HealthAnalysisPipeline:
                 spo2_timestamps.append(metric.created_at)
                 spo2_values.append(float(metric.biometric_data.oxygen_saturation))
 
-        return self.respiratory_processor.process(
-            rr_timestamps, rr_values, spo2_timestamps, spo2_values
+        return rr_timestamps, rr_values, spo2_timestamps, spo2_values
+
+    async def _load_day_partials(
+        self,
+        feature_store: FeatureStore,
+        user_id: str,
+        health_metrics: list[HealthMetric],
+        columns: HealthKitColumns | None = None,
+    ) -> DayPartial | None:
+        """Merge the week's per-day partials, rebuilding only changed days.
+
+        Days in the upload are rebuilt unless their inputs match the stored
+        fingerprint. Stored days within ``FEATURE_WINDOW_DAYS`` of the
+        upload's last day fill in the rest of the week, so a daily sync
+        still produces weekly features.
+
+        Returns:
+            The merged partial, or None for an upload without data
+        """
+        by_day = group_metrics_by_day(health_metrics)
+        column_days = self._column_days(columns) if columns is not None else {}
+        upload_days = sorted(by_day.keys() | column_days.keys())
+        if not upload_days:
+            return None
+
+        window = [
+            upload_days[-1] - timedelta(days=offset)
+            for offset in range(FEATURE_WINDOW_DAYS)
+        ]
+        stored = await feature_store.get_days(
+            user_id, sorted(set(upload_days).union(window))
+        )
+
+        partials = {day: stored[day] for day in window if day in stored}
+        rebuilt: dict[date, DayPartial] = {}
+        for day in upload_days:
+            partial = self._build_day_partial(
+                by_day.get(day, []), stored.get(day), column_days.get(day)
+            )
+            if partial is not stored.get(day):
+                rebuilt[day] = partial
+            partials[day] = partial
+
+        if rebuilt:
+            await feature_store.put_days(user_id, rebuilt)
+
+        self.feature_store_stats["days_built"] += len(rebuilt)
+        self.feature_store_stats["days_cached"] += len(partials) - len(rebuilt)
+        self.logger.info(
+            "Feature partials for user %s: %d days (%d rebuilt, %d cached)",
+            user_id,
+            len(partials),
+            len(rebuilt),
+            len(partials) - len(rebuilt),
+        )
+        return DayPartial.merge([partials[day] for day in sorted(partials)])
+
+    @staticmethod
+    def _column_days(
+        columns: HealthKitColumns,
+    ) -> dict[date, dict[str, tuple[np.ndarray, np.ndarray]]]:
+        """Per-day channel arrays of the modalities the columns carry.
+
+        Every channel of such a modality is present on every day, empty
+        where the day has no samples, so those modalities are taken from
+        the columns rather than from metrics, as without a feature store.
+        """
+        channels = [
+            channel
+            for modality, modality_channels in MODALITY_CHANNELS.items()
+            if columns.has_modality(modality)
+            for channel in modality_channels
+        ]
+        by_channel = {
+            channel: columns.channel_arrays_by_day(channel) for channel in channels
+        }
+        days = {day for channel_days in by_channel.values() for day in channel_days}
+        empty = (np.empty(0, dtype="datetime64[ms]"), np.empty(0, dtype=np.float64))
+        return {
+            day: {
+                channel: channel_days.get(day, empty)
+                for channel, channel_days in by_channel.items()
+            }
+            for day in days
+        }
+
+    def _build_day_partial(
+        self,
+        day_metrics: list[HealthMetric],
+        stored: DayPartial | None = None,
+        day_columns: dict[str, tuple[np.ndarray, np.ndarray]] | None = None,
+    ) -> DayPartial:
+        """Reduce one day's metrics to the partial aggregates of each processor.
+
+        Cardio and respiratory samples come from ``day_columns`` when it
+        holds their channels. Returns ``stored`` unchanged when the day's
+        inputs match its fingerprint, skipping the resampling.
+        """
+        organized = self._organize_metrics_by_modality(day_metrics)
+        day_columns = day_columns or {}
+        cardio_series: tuple[Any, ...]
+        respiratory_series: tuple[Any, ...]
+        if "heart_rate" in day_columns:
+            cardio_series = (
+                *day_columns["heart_rate"],
+                *day_columns["heart_rate_variability"],
+            )
+        else:
+            cardio_series = self._cardio_series(organized["cardio"])
+        if "respiratory_rate" in day_columns:
+            respiratory_series = (
+                *day_columns["respiratory_rate"],
+                *day_columns["oxygen_saturation"],
+            )
+        else:
+            respiratory_series = self._respiratory_series(organized["respiratory"])
+        activity_data = [
+            metric.activity_data
+            for metric in organized["activity"]
+            if metric.activity_data
+        ]
+        activity_values = self.activity_processor.collect_values(activity_data)
+        pat_values, pat_start = (
+            self.preprocessor.convert_health_metrics_to_activity_array(
+                organized["activity"]
+            )
+        )
+        sleep_features = self.sleep_processor.collect_record_features(
+            [
+                metric.sleep_data
+                for metric in organized["sleep"]
+                if metric.sleep_data is not None
+            ]
+        )
+
+        fingerprint = inputs_fingerprint(
+            *cardio_series,
+            *respiratory_series,
+            activity_values,
+            pat_values,
+            pat_start,
+            sleep_features,
+        )
+        if stored is not None and stored.fingerprint == fingerprint:
+            return stored
+
+        hr_bins, hrv_bins = self.cardio_processor.resample(*cardio_series)
+        rr_bins, spo2_bins = self.respiratory_processor.resample(*respiratory_series)
+        return DayPartial(
+            fingerprint=fingerprint,
+            hr_bins=hr_bins,
+            hrv_bins=hrv_bins,
+            rr_bins=rr_bins,
+            spo2_bins=spo2_bins,
+            activity_values=activity_values,
+            activity_records=len(activity_data),
+            pat_values=pat_values,
+            pat_start=pat_start,
+            sleep_features=sleep_features,
         )
 
     async def _process_activity_data(
-        self, user_id: str, activity_metrics: list[HealthMetric]
+        self,
+        user_id: str,
+        activity_metrics: list[HealthMetric],
+        partial: DayPartial | None = None,
     ) -> list[float]:
         """Process activity data using PAT model."""
-        # Convert activity metrics to actigraphy data points
-        actigraphy_points = self.preprocessor.convert_health_metrics_to_actigraphy(
-            activity_metrics
-        )
+        # Extract activity values straight into an array for PAT
+        if partial is not None:
+            activity_values, start_time = partial.pat_values, partial.pat_start
+        else:
+            activity_values, start_time = (
+                self.preprocessor.convert_health_metrics_to_activity_array(
+                    activity_metrics
+                )
+            )
 
-        if not actigraphy_points:
+        if len(activity_values) == 0:
             self.logger.warning("No activity data available for PAT processing")
             return [0.0] * 128  # Return zero embedding
 
@@ -415,9 +678,10 @@ class HealthAnalysisPipeline:
             self.pat_service = await get_pat_service()  # type: ignore[assignment]
 
         # Create actigraphy input
-        actigraphy_input = ActigraphyInput(
-            user_id=user_id,
-            data_points=actigraphy_points,
+        actigraphy_input = ActigraphyInput.from_array(
+            user_id,
+            activity_values,
+            start_time,
             sampling_rate=1.0,  # 1 sample per minute
             duration_hours=168,  # 1 week
         )
@@ -486,16 +750,11 @@ class HealthAnalysisPipeline:
     async def _fuse_modalities(
         self, modality_features: dict[str, list[float]]
     ) -> list[float]:
-        """Fuse multiple modality features using transformer."""
-        # Determine modality dimensions
-        modality_dims = {
-            name: len(features) for name, features in modality_features.items()
-        }
+        """Fuse multiple modality features using transformer.
 
-        # Initialize fusion model
-        self.fusion_service.initialize_model(modality_dims)
-
-        # Perform fusion
+        The fusion service caches one model per modality signature, so this
+        does not construct a model per run.
+        """
         return self.fusion_service.fuse_modalities(modality_features)
 
     def _generate_summary_stats(
@@ -505,10 +764,11 @@ class HealthAnalysisPipeline:
         activity_features: (
             list[dict[str, Any]] | None
         ) = None,  # 🔥 ADDED: Activity features parameter
+        columns: HealthKitColumns | None = None,
     ) -> dict[str, Any]:
         """Generate summary statistics for the analysis."""
         return {
-            "data_coverage": self._generate_data_coverage(organized_data),
+            "data_coverage": self._generate_data_coverage(organized_data, columns),
             "feature_summary": self._generate_feature_summary(modality_features),
             "health_indicators": self._generate_health_indicators(
                 modality_features, activity_features, organized_data
@@ -518,11 +778,12 @@ class HealthAnalysisPipeline:
     @staticmethod
     def _generate_data_coverage(
         organized_data: dict[str, list[HealthMetric]],
+        columns: HealthKitColumns | None = None,
     ) -> dict[str, Any]:
         """Generate data coverage statistics."""
-        data_coverage = {}
+        data_coverage = columns.modality_coverage() if columns is not None else {}
         for modality, metrics in organized_data.items():
-            if metrics:
+            if metrics and modality not in data_coverage:
                 time_span = HealthAnalysisPipeline._calculate_time_span(metrics)
                 data_coverage[modality] = {
                     "metric_count": len(metrics),
@@ -687,7 +948,9 @@ class AnalysisPipelineSingleton:
     def get_instance(cls) -> HealthAnalysisPipeline:
         """Get or create analysis pipeline instance."""
         if cls._instance is None:
-            cls._instance = HealthAnalysisPipeline()
+            cls._instance = HealthAnalysisPipeline(
+                feature_store=FeatureStoreSingleton.get_instance()
+            )
         return cls._instance
 
 
@@ -697,13 +960,14 @@ def get_analysis_pipeline() -> HealthAnalysisPipeline:
 
 
 async def run_analysis_pipeline(
-    user_id: str, health_data: dict[str, Any]
+    user_id: str, health_data: dict[str, Any] | HealthKitColumns
 ) -> dict[str, Any]:
     """Main entry point for running the analysis pipeline.
 
     Args:
         user_id: User identifier
-        health_data: Raw health data dictionary
+        health_data: Raw health data dictionary, or columns from streamed
+            ingestion (see ``clarity.ml.healthkit_stream``)
 
     Returns:
         Analysis results dictionary
@@ -714,11 +978,21 @@ async def run_analysis_pipeline(
         # Get pipeline instance
         pipeline = get_analysis_pipeline()
 
+        columns: HealthKitColumns | None = None
+        if isinstance(health_data, HealthKitColumns):
+            # Quantity samples stay columnar; only the rest becomes metrics
+            columns = health_data
+            health_data = columns.raw_remainder()
+
         # Convert raw data to HealthMetric objects (simplified)
-        health_metrics = _convert_raw_data_to_metrics(health_data)
+        with start_span("analysis.convert_metrics") as span:
+            health_metrics = _convert_raw_data_to_metrics(health_data)
+            span.set_attribute("metrics.count", len(health_metrics))
 
         # Run analysis
-        results = await pipeline.process_health_data(user_id, health_metrics)
+        results = await pipeline.process_health_data(
+            user_id, health_metrics, columns=columns
+        )
 
     except Exception:
         logger.exception("Analysis pipeline failed for user %s", user_id)
@@ -0,0 +1,289 @@
+"""Incremental Feature Store - Per-User, Per-Day Partial Aggregates.
+
+The modality processors reduce raw samples to per-day partial aggregates
+(HR/HRV/RR/SpO2 bin means, activity field values, PAT activity values and
+per-record sleep features) before computing features. Those partials only
+depend on the samples of their own day, so they are stored per user and
+day with a fingerprint of the day's inputs. An upload that changes one day
+of a week resamples that day only and assembles the weekly features by
+merging its partial with the six cached ones.
+
+The embedded store is process-local, so the analysis pipeline only uses it
+when ``FEATURE_STORE_ENABLED`` is set (single-instance deployments). Stored
+partials are bounded in bytes and expire after ``FEATURE_STORE_TTL_SECONDS``.
+"""
+
+# removed - breaks FastAPI
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+import hashlib
+import logging
+import time
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd  # type: ignore[import-untyped]
+
+from clarity.core.config_aws import get_settings
+from clarity.models.health_data import HealthMetric
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DAYS = 10_000  # stored (user, day) partials before LRU eviction
+FEATURE_WINDOW_DAYS = 7  # days merged into the weekly features
+
+
+@dataclass
+class DayPartial:
+    """Partial aggregates of one user's metrics over one or more days.
+
+    Attributes:
+        fingerprint: Digest of the metrics the partial was built from
+        hr_bins: Per-minute heart rate means
+        hrv_bins: Per-5-minute HRV means
+        rr_bins: Per-5-minute respiratory rate means
+        spo2_bins: Per-10-minute SpO2 means
+        activity_values: Non-missing values per ``ActivityData`` field
+        activity_records: Number of activity data points
+        pat_values: Activity values fed to PAT, in metric order
+        pat_start: Timestamp of the first PAT activity value
+        sleep_features: Per-record sleep features
+    """
+
+    fingerprint: str
+    hr_bins: pd.Series | None = None
+    hrv_bins: pd.Series | None = None
+    rr_bins: pd.Series | None = None
+    spo2_bins: pd.Series | None = None
+    activity_values: dict[str, list[Any]] = field(default_factory=dict)
+    activity_records: int = 0
+    pat_values: npt.NDArray[np.float32] = field(
+        default_factory=lambda: np.empty(0, dtype=np.float32)
+    )
+    pat_start: datetime | None = None
+    sleep_features: dict[str, list[float]] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the partial's values."""
+        size = self.pat_values.nbytes
+        for bins in (self.hr_bins, self.hrv_bins, self.rr_bins, self.spo2_bins):
+            if bins is not None:
+                size += int(bins.memory_usage(index=True, deep=False))
+        for values in (*self.activity_values.values(), *self.sleep_features.values()):
+            size += 8 * len(values)
+        return size
+
+    @classmethod
+    def merge(cls, partials: Sequence["DayPartial"]) -> "DayPartial":
+        """Concatenate the partials of consecutive days, oldest first."""
+        if len(partials) == 1:
+            return partials[0]
+
+        def concat_bins(name: str) -> pd.Series | None:
+            series = [
+                bins
+                for partial in partials
+                if (bins := getattr(partial, name)) is not None and len(bins) > 0
+            ]
+            return pd.concat(series) if series else None
+
+        def concat_lists(name: str) -> dict[str, list[Any]]:
+            merged: dict[str, list[Any]] = {}
+            for partial in partials:
+                for key, values in getattr(partial, name).items():
+                    merged.setdefault(key, []).extend(values)
+            return merged
+
+        return cls(
+            fingerprint=hashlib.sha256(
+                "".join(partial.fingerprint for partial in partials).encode()
+            ).hexdigest(),
+            hr_bins=concat_bins("hr_bins"),
+            hrv_bins=concat_bins("hrv_bins"),
+            rr_bins=concat_bins("rr_bins"),
+            spo2_bins=concat_bins("spo2_bins"),
+            activity_values=concat_lists("activity_values"),
+            activity_records=sum(partial.activity_records for partial in partials),
+            pat_values=np.concatenate([partial.pat_values for partial in partials]),
+            pat_start=next(
+                (p.pat_start for p in partials if p.pat_start is not None), None
+            ),
+            sleep_features=concat_lists("sleep_features"),
+        )
+
+
+def metric_day(metric: HealthMetric) -> date:
+    """UTC calendar day a metric belongs to."""
+    created_at = metric.created_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(UTC)
+    return created_at.date()
+
+
+def group_metrics_by_day(
+    metrics: Iterable[HealthMetric],
+) -> dict[date, list[HealthMetric]]:
+    """Group metrics by UTC day, oldest day first, keeping their order."""
+    by_day: dict[date, list[HealthMetric]] = {}
+    for metric in metrics:
+        by_day.setdefault(metric_day(metric), []).append(metric)
+    return dict(sorted(by_day.items()))
+
+
+def inputs_fingerprint(*inputs: Any) -> str:
+    """Digest of the values a day partial is built from.
+
+    Lists of timestamps are hashed as epoch seconds and arrays by their
+    bytes, so fingerprinting a day costs far less than resampling it. Metric
+    IDs are not part of the inputs: they are assigned on every upload, and
+    re-sending unchanged samples must keep the fingerprint.
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        if isinstance(value, np.ndarray):
+            digest.update(value.tobytes())
+        elif isinstance(value, list) and value and isinstance(value[0], datetime):
+            digest.update(
+                np.fromiter((ts.timestamp() for ts in value), dtype=np.float64)
+            )
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FeatureStore(ABC):
+    """Storage for per-user, per-day feature partials."""
+
+    @abstractmethod
+    async def get_days(
+        self, user_id: str, days: Iterable[date]
+    ) -> dict[date, DayPartial]:
+        """Get the stored partials of the given days (missing days omitted)."""
+
+    @abstractmethod
+    async def put_days(self, user_id: str, partials: Mapping[date, DayPartial]) -> None:
+        """Store or replace partials by day."""
+
+    @abstractmethod
+    async def delete_user(self, user_id: str) -> None:
+        """Remove all partials of a user."""
+
+
+class InMemoryFeatureStore(FeatureStore):
+    """Embedded, process-local feature store with LRU eviction.
+
+    Used for tests and single-instance deployments. Partials expire
+    ``ttl_seconds`` after they were stored, whether or not they were read.
+    """
+
+    def __init__(
+        self,
+        max_days: int = DEFAULT_MAX_DAYS,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            max_days: Stored (user, day) partials before the least recently
+                used are evicted
+            max_bytes: Approximate stored bytes before the least recently
+                used partials are evicted (unbounded if None)
+            ttl_seconds: Lifetime of a stored partial (no expiry if None)
+            clock: Monotonic clock, injectable for tests
+        """
+        self.max_days = max_days
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._partials: OrderedDict[tuple[str, date], DayPartial] = OrderedDict()
+        # Write order is expiry order, as every partial gets the same TTL
+        self._expires_at: OrderedDict[tuple[str, date], float] = OrderedDict()
+        self._sizes: dict[tuple[str, date], int] = {}
+        self.nbytes = 0
+
+    async def get_days(
+        self, user_id: str, days: Iterable[date]
+    ) -> dict[date, DayPartial]:
+        """Get the stored partials of the given days (missing days omitted)."""
+        self._expire()
+        found = {}
+        for day in days:
+            partial = self._partials.get((user_id, day))
+            if partial is not None:
+                self._partials.move_to_end((user_id, day))
+                found[day] = partial
+        return found
+
+    async def put_days(self, user_id: str, partials: Mapping[date, DayPartial]) -> None:
+        """Store or replace partials by day."""
+        self._expire()
+        expires_at = (
+            self._clock() + self.ttl_seconds if self.ttl_seconds is not None else 0.0
+        )
+        for day, partial in partials.items():
+            key = (user_id, day)
+            self._remove(key)
+            self._partials[key] = partial
+            self._expires_at[key] = expires_at
+            self._sizes[key] = partial.nbytes
+            self.nbytes += self._sizes[key]
+        while len(self._partials) > self.max_days or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._partials)))
+
+    async def delete_user(self, user_id: str) -> None:
+        """Remove all partials of a user."""
+        for key in [key for key in self._partials if key[0] == user_id]:
+            self._remove(key)
+
+    def __len__(self) -> int:
+        """Number of stored (user, day) partials."""
+        return len(self._partials)
+
+    def _remove(self, key: tuple[str, date]) -> None:
+        if self._partials.pop(key, None) is not None:
+            del self._expires_at[key]
+            self.nbytes -= self._sizes.pop(key)
+
+    def _expire(self) -> None:
+        if self.ttl_seconds is None:
+            return
+        now = self._clock()
+        while self._expires_at:
+            key, expires_at = next(iter(self._expires_at.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+
+
+class FeatureStoreSingleton:
+    """Process-wide feature store used by the analysis pipeline."""
+
+    _instance: InMemoryFeatureStore | None = None
+
+    @classmethod
+    def get_instance(cls) -> InMemoryFeatureStore | None:
+        """Get or create the store; None unless ``FEATURE_STORE_ENABLED`` is set."""
+        settings = get_settings()
+        if cls._instance is None and settings.feature_store_enabled:
+            cls._instance = InMemoryFeatureStore(
+                max_bytes=settings.feature_store_max_bytes,
+                ttl_seconds=settings.feature_store_ttl_seconds,
+            )
+        return cls._instance
+
+    @classmethod
+    async def delete_user(cls, user_id: str) -> None:
+        """Remove a user's partials from this process's store, if one exists."""
+        if cls._instance is not None:
+            await cls._instance.delete_user(user_id)
@@ -7,13 +7,20 @@ using transformer-based attention mechanisms for cross-modal interactions.
 # removed - breaks FastAPI
 
 import logging
+from pathlib import Path
+import threading
+import zlib
 
+import numpy as np
 from pydantic import BaseModel, Field
 import torch
 from torch import nn
 
 logger = logging.getLogger(__name__)
 
+# Modality names and feature dimensions, sorted by name
+ModalitySignature = tuple[tuple[str, int], ...]
+
 
 class FusionConfig(BaseModel):
     """Configuration for FusionTransformer."""
@@ -151,7 +158,8 @@ class FusionTransformer(nn.Module):
         cls_pos_embedding = self.modality_embeddings(
             torch.tensor(0, device=cls_tokens.device)
         )
-        cls_tokens += cls_pos_embedding.unsqueeze(0).unsqueeze(0)
+        # Out-of-place: cls_tokens is an expanded view of the cls_token parameter
+        cls_tokens = cls_tokens + cls_pos_embedding.unsqueeze(0).unsqueeze(0)
 
         # Concatenate CLS token with modality tokens
         sequence = torch.cat(
@@ -189,41 +197,70 @@ class FusionTransformer(nn.Module):
 
 
 class HealthFusionService:
-    """Service for managing health data fusion."""
+    """Service for managing health data fusion.
+
+    Keeps one fusion model per modality signature (the set of modality names
+    and their feature dimensions). Each variant is built, or loaded from
+    ``weights_dir``, the first time it is needed and reused afterwards.
+    Freshly built variants are seeded from their signature, so fused vectors
+    are reproducible across runs and processes.
+    """
 
-    def __init__(self, device: str = "cpu") -> None:
+    def __init__(self, device: str = "cpu", weights_dir: Path | None = None) -> None:
         """Initialize fusion service.
 
         Args:
             device: Device to run model on ('cpu' or 'cuda')
+            weights_dir: Optional directory of trained ``fusion_<signature>.pt``
+                state dicts to load instead of seeded initialization
         """
         self.device = device
+        self.weights_dir = weights_dir
         self.model: FusionTransformer | None = None
         self.config: FusionConfig | None = None
         self.logger = logging.getLogger(__name__)
+        self._models: dict[ModalitySignature, FusionTransformer] = {}
+        self._lock = threading.Lock()
 
-    def initialize_model(self, modality_dims: dict[str, int]) -> None:
-        """Initialize fusion model with given modality dimensions.
+    @property
+    def model_count(self) -> int:
+        """Number of cached fusion model variants."""
+        return len(self._models)
+
+    @staticmethod
+    def modality_signature(modality_dims: dict[str, int]) -> ModalitySignature:
+        """Canonical registry key for a set of modality dimensions."""
+        return tuple(sorted(modality_dims.items()))
+
+    def get_model(self, modality_dims: dict[str, int]) -> FusionTransformer:
+        """Return the cached model for ``modality_dims``, building it once.
 
         Args:
             modality_dims: Dictionary mapping modality names to feature dimensions
         """
-        self.config = FusionConfig(
-            modality_dims=modality_dims,
-            embed_dim=64,
-            num_heads=4,
-            num_layers=2,
-            dropout=0.1,
-            output_dim=64,
-        )
+        signature = self.modality_signature(modality_dims)
+        model = self._models.get(signature)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(signature)
+            if model is None:
+                model = self._build_model(signature)
+                self._models[signature] = model
+        return model
 
-        self.model = FusionTransformer(self.config)
-        self.model.to(self.device)
-        self.model.eval()  # Set to evaluation mode
+    def initialize_model(self, modality_dims: dict[str, int]) -> None:
+        """Select the fusion model for the given modality dimensions.
 
-        self.logger.info(
-            "Initialized fusion model with modalities: %s", list(modality_dims.keys())
-        )
+        Kept for callers that fuse one signature repeatedly; the model comes
+        from the registry, so this no longer rebuilds anything.
+
+        Args:
+            modality_dims: Dictionary mapping modality names to feature dimensions
+        """
+        self.model = self.get_model(modality_dims)
+        self.config = self.model.config
 
     def fuse_modalities(self, modality_features: dict[str, list[float]]) -> list[float]:
         """Fuse multiple modality features into unified health vector.
@@ -234,42 +271,93 @@ class HealthFusionService:
         Returns:
             Unified health state vector as list of floats
         """
-        if self.model is None:
-            msg = "Model not initialized. Call initialize_model() first."
-            raise RuntimeError(msg)
-
-        try:
-            # Convert to tensors
-            tensor_inputs = {}
-            for modality, features in modality_features.items():
-                if modality in self.config.modality_dims:  # type: ignore[union-attr]
-                    tensor_inputs[modality] = torch.tensor(
-                        [features], dtype=torch.float32, device=self.device
-                    )  # Add batch dimension
-
-            if not tensor_inputs:
+        return self.fuse_modalities_batch([modality_features])[0]
+
+    def fuse_modalities_batch(
+        self, batch: list[dict[str, list[float]]]
+    ) -> list[list[float]]:
+        """Fuse many feature dicts, one forward pass per modality signature.
+
+        Args:
+            batch: Modality features per user; signatures may differ
+
+        Returns:
+            Fused vectors in the order of ``batch``
+        """
+        results: list[list[float]] = [[] for _ in batch]
+        groups: dict[ModalitySignature, list[int]] = {}
+        for index, modality_features in enumerate(batch):
+            dims = {name: len(features) for name, features in modality_features.items()}
+            groups.setdefault(self.modality_signature(dims), []).append(index)
+
+        output_dim = FusionConfig.model_fields["output_dim"].default
+        for signature, indices in groups.items():
+            if not signature:
                 self.logger.warning("No valid modalities provided for fusion")
-                return [0.0] * self.config.output_dim  # type: ignore[union-attr]
-
-            # Run fusion
-            with torch.no_grad():
-                fused_vector = self.model(tensor_inputs)
-
-            # Convert back to list
-            result = fused_vector.cpu().numpy().tolist()[0]  # Remove batch dimension
-
-        except Exception:
-            self.logger.exception("Error during fusion")
-            # Return zero vector on error
-            return [0.0] * (self.config.output_dim if self.config else 64)
-        else:
-            self.logger.info(
-                "Fused %d modalities into %d-dim vector",
-                len(tensor_inputs),
-                len(result),
-            )
-
-            return result  # type: ignore[no-any-return]
+                for index in indices:
+                    results[index] = [0.0] * output_dim
+                continue
+
+            try:
+                model = self.get_model(dict(signature))
+                tensor_inputs = {
+                    name: torch.from_numpy(
+                        np.asarray(
+                            [batch[index][name] for index in indices],
+                            dtype=np.float32,
+                        )
+                    ).to(self.device)
+                    for name in model.modality_names
+                }
+                with torch.inference_mode():
+                    fused = model(tensor_inputs).cpu().numpy().tolist()
+            except Exception:
+                self.logger.exception("Error during fusion")
+                # Return zero vectors on error
+                fused = [[0.0] * output_dim for _ in indices]
+
+            for index, vector in zip(indices, fused, strict=True):
+                results[index] = vector
+
+        self.logger.debug(
+            "Fused %d feature sets across %d modality signatures",
+            len(batch),
+            len(groups),
+        )
+        return results
+
+    def _build_model(self, signature: ModalitySignature) -> FusionTransformer:
+        config = FusionConfig(
+            modality_dims=dict(signature),
+            embed_dim=64,
+            num_heads=4,
+            num_layers=2,
+            dropout=0.1,
+            output_dim=64,
+        )
+        key = "_".join(f"{name}-{dim}" for name, dim in signature)
+
+        # Seed from the signature so untrained variants are deterministic
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(zlib.crc32(key.encode()))
+            model = FusionTransformer(config)
+
+        weights_path = (
+            self.weights_dir / f"fusion_{key}.pt" if self.weights_dir else None
+        )
+        if weights_path is not None and weights_path.exists():
+            state_dict = torch.load(weights_path, map_location="cpu", weights_only=True)
+            model.load_state_dict(state_dict)
+            self.logger.info("Loaded fusion weights from %s", weights_path)
+
+        model.to(self.device)
+        model.eval()  # Set to evaluation mode
+
+        self.logger.info(
+            "Initialized fusion model with modalities: %s",
+            [name for name, _ in signature],
+        )
+        return model
 
 
 class FusionServiceSingleton:
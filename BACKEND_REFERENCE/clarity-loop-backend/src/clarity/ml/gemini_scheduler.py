@@ -0,0 +1,468 @@
+"""Concurrency-limited, priority-aware scheduler for Gemini requests.
+
+Every caller that talks to the LLM (the insights REST API, the WebSocket chat
+handler and the background insight subscriber) goes through a single
+per-process scheduler so that a burst of uploads cannot fan out into an
+unbounded number of simultaneous Gemini calls.
+
+The scheduler provides:
+- A global cap on in-flight Gemini calls
+- Token-bucket rate limiting sized to the provider quota
+- Priority lanes: interactive requests always dispatch before background ones
+- Deadline-aware queueing: earliest deadline first within a lane, and requests
+  that cannot start before their deadline fail fast instead of piling up
+- Backpressure via a bounded queue and Prometheus queue-depth metrics
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from clarity.core.config_aws import get_settings
+from clarity.core.constants import (
+    GEMINI_BACKGROUND_DEADLINE_SECONDS,
+    GEMINI_DEFAULT_BURST_SIZE,
+    GEMINI_DEFAULT_MAX_CONCURRENCY,
+    GEMINI_DEFAULT_MAX_QUEUE_SIZE,
+    GEMINI_DEFAULT_REQUESTS_PER_MINUTE,
+    GEMINI_DEFAULT_RESERVED_INTERACTIVE_SLOTS,
+    GEMINI_INTERACTIVE_DEADLINE_SECONDS,
+    SECONDS_PER_MINUTE,
+)
+from clarity.core.exceptions import InferenceTimeoutError, ServiceUnavailableError
+from clarity.ml.gemini_service import (
+    GeminiService,
+    HealthInsightRequest,
+    HealthInsightResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Global scheduler instance (one per worker process)
+_gemini_scheduler: "GeminiRequestScheduler | None" = None
+
+# Prometheus metrics for the scheduler
+GEMINI_QUEUE_DEPTH = Gauge(
+    "clarity_gemini_scheduler_queue_depth",
+    "Gemini requests waiting for dispatch",
+    ["lane"],
+)
+GEMINI_IN_FLIGHT = Gauge(
+    "clarity_gemini_scheduler_in_flight",
+    "Gemini requests currently executing",
+)
+GEMINI_QUEUE_WAIT_SECONDS = Histogram(
+    "clarity_gemini_scheduler_queue_wait_seconds",
+    "Time Gemini requests spend queued before dispatch",
+    ["lane"],
+)
+GEMINI_REJECTED_TOTAL = Counter(
+    "clarity_gemini_scheduler_rejected_total",
+    "Gemini requests rejected by the scheduler",
+    ["lane", "reason"],
+)
+
+
+class InsightPriority(IntEnum):
+    """Priority lanes for Gemini requests (lower value dispatches first)."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    @property
+    def lane(self) -> str:
+        """Metric label for this lane."""
+        return self.name.lower()
+
+
+class TokenBucket:
+    """Token bucket rate limiter measured in requests.
+
+    Tokens refill continuously at ``rate_per_second`` up to ``capacity``.
+    The bucket is only touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            rate_per_second: Token refill rate
+            capacity: Maximum number of tokens (burst size)
+            clock: Monotonic clock, injectable for tests
+        """
+        if rate_per_second <= 0 or capacity <= 0:
+            msg = "Token bucket rate and capacity must be positive"
+            raise ValueError(msg)
+
+        self.rate = rate_per_second
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    @property
+    def tokens(self) -> float:
+        """Currently available tokens."""
+        self._refill()
+        return self._tokens
+
+    def seconds_until_available(self) -> float:
+        """Seconds until one token can be consumed (0 if available now)."""
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def try_consume(self) -> bool:
+        """Consume one token if available.
+
+        Returns:
+            True if a token was consumed, False otherwise
+        """
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+@dataclass(order=True)
+class _QueueEntry:
+    """Heap entry ordered by (priority, deadline, arrival)."""
+
+    priority: int
+    deadline: float
+    sequence: int
+    waiter: "asyncio.Future[None]" = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class GeminiRequestScheduler:
+    """Admission scheduler in front of ``GeminiService``.
+
+    Callers await ``run`` (or ``generate_health_insights``); the scheduler
+    decides when each call may start. The call itself runs in the caller's
+    task, so cancellation and context variables behave as for a direct call.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = GEMINI_DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: int = GEMINI_DEFAULT_REQUESTS_PER_MINUTE,
+        burst_size: int = GEMINI_DEFAULT_BURST_SIZE,
+        max_queue_size: int = GEMINI_DEFAULT_MAX_QUEUE_SIZE,
+        reserved_interactive_slots: int = GEMINI_DEFAULT_RESERVED_INTERACTIVE_SLOTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of concurrent Gemini calls
+            requests_per_minute: Sustained request rate allowed by the provider
+            burst_size: Token bucket capacity
+            max_queue_size: Queued requests beyond which new ones are rejected
+            reserved_interactive_slots: Concurrency slots background work may
+                not use, so interactive requests never wait on a long batch
+            clock: Monotonic clock, injectable for tests
+        """
+        if max_concurrency < 1:
+            msg = "max_concurrency must be at least 1"
+            raise ValueError(msg)
+
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.reserved_interactive_slots = min(
+            max(reserved_interactive_slots, 0), max_concurrency - 1
+        )
+        self._clock = clock
+        self._bucket = TokenBucket(
+            rate_per_second=requests_per_minute / SECONDS_PER_MINUTE,
+            capacity=burst_size,
+            clock=clock,
+        )
+
+        self._queue: list[_QueueEntry] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._queued = dict.fromkeys(InsightPriority, 0)
+        self._wakeup: asyncio.TimerHandle | None = None
+        self._wakeup_loop: asyncio.AbstractEventLoop | None = None
+
+        # Statistics
+        self.completed_count = 0
+        self.rejected_count = 0
+        self.expired_count = 0
+
+        logger.info(
+            "Initialized GeminiRequestScheduler: max_concurrency=%d, "
+            "rate=%d/min, burst=%d, max_queue=%d",
+            max_concurrency,
+            requests_per_minute,
+            burst_size,
+            max_queue_size,
+        )
+
+    @staticmethod
+    def default_deadline(priority: InsightPriority) -> float:
+        """Default queueing deadline in seconds for a priority lane."""
+        if priority is InsightPriority.INTERACTIVE:
+            return GEMINI_INTERACTIVE_DEADLINE_SECONDS
+        return GEMINI_BACKGROUND_DEADLINE_SECONDS
+
+    @property
+    def in_flight(self) -> int:
+        """Number of Gemini calls currently executing."""
+        return self._in_flight
+
+    def queue_depth(self, priority: InsightPriority | None = None) -> int:
+        """Number of requests waiting for dispatch.
+
+        Args:
+            priority: Restrict the count to one lane (all lanes if None)
+        """
+        if priority is None:
+            return sum(self._queued.values())
+        return self._queued[priority]
+
+    async def run(
+        self,
+        func: Callable[[], Awaitable[T]],
+        *,
+        priority: InsightPriority = InsightPriority.BACKGROUND,
+        deadline_seconds: float | None = None,
+        request_id: str = "gemini",
+    ) -> T:
+        """Run ``func`` once the scheduler admits it.
+
+        Args:
+            func: Zero-argument coroutine factory performing the Gemini call
+            priority: Priority lane for the request
+            deadline_seconds: How long the request may wait to start
+                (defaults per lane)
+            request_id: Identifier used in errors and logs
+
+        Returns:
+            Result of ``func``
+
+        Raises:
+            ServiceUnavailableError: If the queue is full
+            InferenceTimeoutError: If the request could not start in time
+        """
+        if deadline_seconds is None:
+            deadline_seconds = self.default_deadline(priority)
+
+        await self._acquire(priority, deadline_seconds, request_id)
+        try:
+            return await func()
+        finally:
+            self._release()
+
+    async def generate_health_insights(
+        self,
+        gemini_service: GeminiService,
+        request: HealthInsightRequest,
+        *,
+        priority: InsightPriority = InsightPriority.BACKGROUND,
+        deadline_seconds: float | None = None,
+    ) -> HealthInsightResponse:
+        """Schedule ``gemini_service.generate_health_insights`` for ``request``."""
+        return await self.run(
+            lambda: gemini_service.generate_health_insights(request),
+            priority=priority,
+            deadline_seconds=deadline_seconds,
+            request_id=f"{request.insight_type}:{request.user_id}",
+        )
+
+    async def _acquire(
+        self, priority: InsightPriority, deadline_seconds: float, request_id: str
+    ) -> None:
+        """Wait until a concurrency slot and a rate token are granted."""
+        if self.queue_depth() >= self.max_queue_size:
+            self.rejected_count += 1
+            GEMINI_REJECTED_TOTAL.labels(lane=priority.lane, reason="queue_full").inc()
+            logger.warning(
+                "Gemini queue full (%d); rejecting %s request %s",
+                self.max_queue_size,
+                priority.lane,
+                request_id,
+            )
+            raise ServiceUnavailableError("Gemini", reason="request queue is full")
+
+        now = self._clock()
+        entry = _QueueEntry(
+            priority=int(priority),
+            deadline=now + deadline_seconds,
+            sequence=next(self._sequence),
+            waiter=asyncio.get_running_loop().create_future(),
+            enqueued_at=now,
+        )
+        heapq.heappush(self._queue, entry)
+        self._queued[priority] += 1
+        self._update_queue_gauges()
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(entry.waiter), timeout=max(deadline_seconds, 0.0)
+            )
+        except TimeoutError as e:
+            if self._granted(entry):
+                return
+            self._abandon(entry, priority)
+            self.expired_count += 1
+            GEMINI_REJECTED_TOTAL.labels(lane=priority.lane, reason="deadline").inc()
+            raise InferenceTimeoutError(request_id, deadline_seconds) from e
+        except BaseException:
+            # Caller was cancelled while queued: give back anything granted
+            if self._granted(entry):
+                self._release()
+            else:
+                self._abandon(entry, priority)
+            raise
+
+    @staticmethod
+    def _granted(entry: _QueueEntry) -> bool:
+        return (
+            entry.waiter.done()
+            and not entry.waiter.cancelled()
+            and entry.waiter.exception() is None
+        )
+
+    def _abandon(self, entry: _QueueEntry, priority: InsightPriority) -> None:
+        """Drop a queued entry; it is removed from the heap lazily."""
+        if not entry.waiter.done():
+            entry.waiter.cancel()
+            self._queued[priority] -= 1
+            self._update_queue_gauges()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self.completed_count += 1
+        GEMINI_IN_FLIGHT.set(self._in_flight)
+        self._dispatch()
+
+    def _slot_available(self, priority: int) -> bool:
+        limit = self.max_concurrency
+        if priority != InsightPriority.INTERACTIVE:
+            limit -= self.reserved_interactive_slots
+        return self._in_flight < limit
+
+    def _dispatch(self) -> None:
+        """Grant queued requests while slots and rate tokens are available."""
+        self._grant_ready()
+        self._update_queue_gauges()
+        GEMINI_IN_FLIGHT.set(self._in_flight)
+
+    def _grant_ready(self) -> None:
+        while self._queue:
+            entry = self._queue[0]
+            if entry.waiter.done():
+                # Abandoned by its caller (timeout or cancellation)
+                heapq.heappop(self._queue)
+                continue
+
+            if not self._slot_available(entry.priority):
+                return
+
+            wait = self._bucket.seconds_until_available()
+            if wait > 0:
+                self._schedule_wakeup(wait)
+                return
+
+            self._bucket.try_consume()
+            heapq.heappop(self._queue)
+            priority = InsightPriority(entry.priority)
+            self._queued[priority] -= 1
+            self._in_flight += 1
+            GEMINI_QUEUE_WAIT_SECONDS.labels(lane=priority.lane).observe(
+                self._clock() - entry.enqueued_at
+            )
+            entry.waiter.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        """Re-run dispatch once the token bucket has refilled."""
+        loop = asyncio.get_running_loop()
+        if self._wakeup is not None:
+            if self._wakeup_loop is loop and self._wakeup.when() <= loop.time() + delay:
+                return
+            self._wakeup.cancel()
+
+        def _wake() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = loop.call_later(delay, _wake)
+        self._wakeup_loop = loop
+
+    def _update_queue_gauges(self) -> None:
+        for priority, depth in self._queued.items():
+            GEMINI_QUEUE_DEPTH.labels(lane=priority.lane).set(depth)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get scheduler statistics.
+
+        Returns:
+            Dictionary containing queue and throughput metrics
+        """
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": {
+                priority.lane: depth for priority, depth in self._queued.items()
+            },
+            "available_tokens": self._bucket.tokens,
+            "completed": self.completed_count,
+            "rejected": self.rejected_count,
+            "expired": self.expired_count,
+        }
+
+
+def get_gemini_scheduler() -> GeminiRequestScheduler:
+    """Get or create the global Gemini request scheduler.
+
+    Returns:
+        Process-wide scheduler configured from application settings
+    """
+    global _gemini_scheduler  # noqa: PLW0603 - Singleton pattern for global limits
+
+    if _gemini_scheduler is None:
+        settings = get_settings()
+        _gemini_scheduler = GeminiRequestScheduler(
+            max_concurrency=settings.gemini_max_concurrency,
+            requests_per_minute=settings.gemini_requests_per_minute,
+            burst_size=settings.gemini_burst_size,
+            max_queue_size=settings.gemini_max_queue_size,
+            reserved_interactive_slots=settings.gemini_reserved_interactive_slots,
+        )
+
+    return _gemini_scheduler
+
+
+def reset_gemini_scheduler() -> None:
+    """Discard the global scheduler (used by tests and on reconfiguration)."""
+    global _gemini_scheduler  # noqa: PLW0603 - Singleton pattern for global limits
+    _gemini_scheduler = None
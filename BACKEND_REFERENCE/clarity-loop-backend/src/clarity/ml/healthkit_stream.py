@@ -0,0 +1,383 @@
+"""Streaming HealthKit ingestion into columnar NumPy buffers.
+
+Raw uploads are JSON objects holding ``quantity_samples``,
+``category_samples`` and ``workouts`` arrays. Instead of loading the whole
+document and building a ``HealthMetric`` per sample, ``parse_healthkit_stream``
+reads the file in chunks, decodes one array item at a time and appends
+high-frequency quantity samples (heart rate, HRV, respiratory rate, SpO2)
+straight into per-channel columns of epoch milliseconds and float values.
+
+Memory stays proportional to the columns (16 bytes per sample) plus one
+read chunk, so multi-month backfills no longer hold the raw document, the
+decoded dicts and the Pydantic models at the same time. Category samples
+and workouts are comparatively rare and are kept as raw dicts so the
+existing converters still handle them.
+"""
+
+# removed - breaks FastAPI
+
+from array import array
+import codecs
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+import json
+import logging
+import math
+from typing import IO, Any, NoReturn
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024  # characters (or bytes) read per chunk
+
+# HealthKit quantity types that go straight into columns, by channel
+QUANTITY_CHANNELS: dict[str, str] = {
+    "heartrate": "heart_rate",
+    "heart_rate": "heart_rate",
+    "heartratevariabilitysdnn": "heart_rate_variability",
+    "respiratoryrate": "respiratory_rate",
+    "respiratory_rate": "respiratory_rate",
+    "oxygensaturation": "oxygen_saturation",
+}
+
+# Quantity types the pipeline understands but that carry no columnar value
+PASSTHROUGH_QUANTITY_TYPES = frozenset(
+    {"bloodpressuresystolic", "bloodpressurediastolic"}
+)
+
+MODALITY_CHANNELS: dict[str, tuple[str, str]] = {
+    "cardio": ("heart_rate", "heart_rate_variability"),
+    "respiratory": ("respiratory_rate", "oxygen_saturation"),
+}
+
+_STREAMED_KEYS = frozenset({"quantity_samples", "category_samples", "workouts"})
+_WHITESPACE = " \t\r\n"
+_MS_PER_HOUR = 3_600_000
+
+
+class SampleColumn:
+    """Append-only (timestamp, value) column backed by typed arrays."""
+
+    __slots__ = ("_times", "_values")
+
+    def __init__(self) -> None:
+        """Initialize an empty column."""
+        self._times = array("q")  # epoch milliseconds, UTC
+        self._values = array("d")
+
+    def __len__(self) -> int:
+        """Number of samples in the column."""
+        return len(self._values)
+
+    def append(self, epoch_ms: int, value: float) -> None:
+        """Append one sample."""
+        self._times.append(epoch_ms)
+        self._values.append(value)
+
+    def timestamps(self) -> np.ndarray:
+        """Timestamps as a ``datetime64[ms]`` array (UTC)."""
+        return np.array(self._times, dtype=np.int64).view("datetime64[ms]")
+
+    def values(self) -> np.ndarray:
+        """Values as a float64 array."""
+        return np.array(self._values, dtype=np.float64)
+
+    def time_bounds(self) -> tuple[int, int] | None:
+        """Earliest and latest timestamp in epoch milliseconds."""
+        if not self._times:
+            return None
+        return min(self._times), max(self._times)
+
+
+@dataclass
+class HealthKitColumns:
+    """Columnar view of one HealthKit upload."""
+
+    user_id: str = "unknown"
+    columns: dict[str, SampleColumn] = field(
+        default_factory=lambda: {
+            channel: SampleColumn() for channel in set(QUANTITY_CHANNELS.values())
+        }
+    )
+    passthrough_samples: list[dict[str, Any]] = field(default_factory=list)
+    category_samples: list[dict[str, Any]] = field(default_factory=list)
+    workouts: list[dict[str, Any]] = field(default_factory=list)
+    other_fields: dict[str, Any] = field(default_factory=dict)
+    skipped: int = 0
+
+    @property
+    def sample_count(self) -> int:
+        """Number of quantity samples held in columns."""
+        return sum(len(column) for column in self.columns.values())
+
+    def add_quantity_sample(self, sample: Any) -> None:
+        """Route one raw quantity sample to its column.
+
+        Samples with unknown types, zero or non-numeric values, or bad
+        timestamps are counted in ``skipped``.
+        """
+        if not isinstance(sample, dict):
+            self.skipped += 1
+            return
+
+        sample_type = str(sample.get("type", "")).lower()
+        channel = QUANTITY_CHANNELS.get(sample_type)
+        if channel is None:
+            if sample_type in PASSTHROUGH_QUANTITY_TYPES:
+                self.passthrough_samples.append(sample)
+            else:
+                self.skipped += 1
+            return
+
+        try:
+            value = float(sample.get("value", 0))
+            epoch_ms = _epoch_ms(sample.get("timestamp"))
+        except (TypeError, ValueError):
+            self.skipped += 1
+            return
+
+        # Zero readings are dropped, as in the per-metric path
+        if not value or not math.isfinite(value):
+            self.skipped += 1
+            return
+
+        self.columns[channel].append(epoch_ms, value)
+
+    def channel_arrays(self, channel: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(timestamps, values)`` arrays for a channel."""
+        column = self.columns[channel]
+        return column.timestamps(), column.values()
+
+    def channel_arrays_by_day(
+        self, channel: str
+    ) -> dict[date, tuple[np.ndarray, np.ndarray]]:
+        """Split a channel's ``(timestamps, values)`` arrays by UTC day."""
+        timestamps, values = self.channel_arrays(channel)
+        days = timestamps.astype("datetime64[D]")
+        by_day = {}
+        for day in np.unique(days):
+            in_day = days == day
+            by_day[day.item()] = (timestamps[in_day], values[in_day])
+        return by_day
+
+    def has_modality(self, modality: str) -> bool:
+        """Whether any column feeding ``modality`` holds samples."""
+        return any(len(self.columns[c]) for c in MODALITY_CHANNELS[modality])
+
+    def modality_coverage(self) -> dict[str, dict[str, Any]]:
+        """Data coverage per modality, shaped like the pipeline's summary."""
+        coverage: dict[str, dict[str, Any]] = {}
+        for modality, channels in MODALITY_CHANNELS.items():
+            bounds = [
+                b
+                for b in (self.columns[c].time_bounds() for c in channels)
+                if b is not None
+            ]
+            if not bounds:
+                continue
+            count = sum(len(self.columns[c]) for c in channels)
+            span_ms = max(b[1] for b in bounds) - min(b[0] for b in bounds)
+            time_span = max(1.0, span_ms / _MS_PER_HOUR)
+            coverage[modality] = {
+                "metric_count": count,
+                "time_span_hours": time_span,
+                "data_density": count / time_span,
+            }
+        return coverage
+
+    def raw_remainder(self) -> dict[str, Any]:
+        """Non-columnar parts of the upload in the raw upload format."""
+        return {
+            **self.other_fields,
+            "user_id": self.user_id,
+            "quantity_samples": self.passthrough_samples,
+            "category_samples": self.category_samples,
+            "workouts": self.workouts,
+        }
+
+    @classmethod
+    def from_dict(cls, health_data: dict[str, Any]) -> "HealthKitColumns":
+        """Build columns from an already decoded upload."""
+        columns = cls()
+        for key, value in health_data.items():
+            if key in _STREAMED_KEYS and isinstance(value, list):
+                for item in value:
+                    columns.add_item(key, item)
+            else:
+                columns.add_field(key, value)
+        return columns
+
+    def add_item(self, key: str, item: Any) -> None:
+        """Add one item of a streamed top-level array."""
+        if key == "quantity_samples":
+            self.add_quantity_sample(item)
+        elif key == "category_samples":
+            self.category_samples.append(item)
+        elif key == "workouts":
+            self.workouts.append(item)
+
+    def add_field(self, key: str, value: Any) -> None:
+        """Add a top-level field that is not streamed."""
+        if key == "user_id":
+            self.user_id = str(value)
+        else:
+            self.other_fields[key] = value
+
+
+def parse_healthkit_stream(
+    fp: IO[str] | IO[bytes], chunk_size: int = STREAM_CHUNK_SIZE
+) -> HealthKitColumns:
+    """Incrementally parse a HealthKit upload into columns.
+
+    Args:
+        fp: Text or binary (UTF-8) file object positioned at the JSON document
+        chunk_size: Amount read from ``fp`` per call
+
+    Returns:
+        Columnar upload
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON object
+    """
+    columns = HealthKitColumns()
+    reader = _JsonStreamReader(fp, chunk_size)
+    for key, item, streamed in reader.iter_object(_STREAMED_KEYS):
+        if streamed:
+            columns.add_item(key, item)
+        else:
+            columns.add_field(key, item)
+
+    logger.info(
+        "Streamed %d quantity samples into columns (%d passthrough, %d skipped)",
+        columns.sample_count,
+        len(columns.passthrough_samples),
+        columns.skipped,
+    )
+    return columns
+
+
+def _epoch_ms(timestamp: Any) -> int:
+    """Convert an ISO-8601 timestamp to epoch milliseconds (naive means UTC)."""
+    if timestamp is None:
+        moment = datetime.now(UTC)
+    else:
+        moment = datetime.fromisoformat(timestamp)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=UTC)
+    return int(moment.timestamp() * 1000)
+
+
+class _JsonStreamReader:
+    """Pulls JSON values out of a file one array item at a time."""
+
+    def __init__(self, fp: IO[str] | IO[bytes], chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def iter_object(
+        self, streamed_keys: frozenset[str]
+    ) -> Iterator[tuple[str, Any, bool]]:
+        """Yield ``(key, value, streamed)`` for the top-level object.
+
+        Arrays under ``streamed_keys`` are yielded item by item with
+        ``streamed=True``; every other member is yielded whole.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                self._malformed("object key")
+            self._expect(":")
+
+            if key in streamed_keys and self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value(), True
+                        if self._separator("]"):
+                            break
+            else:
+                yield key, self._value(), False
+
+            if self._separator("}"):
+                return
+
+    def _fill(self, size: int | None = None) -> bool:
+        if self._eof:
+            return False
+        size = size or self._chunk_size
+        chunk = self._fp.read(size)
+        # A chunk ending mid-character decodes to nothing; keep reading
+        while isinstance(chunk, bytes):
+            text = self._utf8.decode(chunk, final=not chunk)
+            if text or not chunk:
+                chunk = text
+            else:
+                chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            self._malformed(repr(char))
+        self._pos += 1
+
+    def _separator(self, closing: str) -> bool:
+        """Consume ``,`` or ``closing``; return True at the closing bracket."""
+        char = self._peek()
+        if char not in {",", closing}:
+            self._malformed(f"',' or {closing!r}")
+        self._pos += 1
+        return char == closing
+
+    def _value(self) -> Any:
+        self._peek()
+        # Every retry decodes the value from its start, so the read size
+        # doubles per retry: a value of n characters is decoded O(log n)
+        # times instead of once per chunk
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Item split across chunks: read more and retry
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            # A number touching the end of the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill(read_size):
+                read_size *= 2
+                continue
+            self._pos = end
+            return value
+
+    def _malformed(self, expected: str) -> NoReturn:
+        msg = f"Malformed HealthKit upload: expected {expected}"
+        raise ValueError(msg)
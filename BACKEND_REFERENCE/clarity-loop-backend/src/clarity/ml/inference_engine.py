@@ -19,6 +19,7 @@ dependency injection, and comprehensive error handling.
 import asyncio
 from collections.abc import Callable
 from functools import wraps
+import hashlib
 import logging
 import time
 from typing import TYPE_CHECKING, Any, Self
@@ -284,10 +285,14 @@ class AsyncInferenceEngine:
             Secure cache key string
         """
         # Create components for the cache key
-        data_signature = f"{input_data.user_id}_{len(input_data.data_points)}_{input_data.sampling_rate}"
-
-        # Add first and last data point values for uniqueness
-        if input_data.data_points:
+        data_signature = f"{input_data.user_id}_{input_data.point_count}_{input_data.sampling_rate}"
+
+        # Array-backed inputs hash the whole buffer; otherwise add first and
+        # last data point values for uniqueness
+        if input_data.values is not None:
+            digest = hashlib.sha256(input_data.values).hexdigest()
+            data_signature += f"_{input_data.start_time}_{digest}"
+        elif input_data.data_points:
             first_point = input_data.data_points[0]
             last_point = input_data.data_points[-1]
             data_signature += f"_{first_point.timestamp}_{first_point.value}_{last_point.timestamp}_{last_point.value}"
@@ -0,0 +1,259 @@
+"""Longitudinal (multi-week) PAT analysis over sliding windows.
+
+A long activity history is cut into week-long windows with
+``sliding_weeks`` (one per week, or overlapping with a smaller stride). The
+windows run through PAT as batched forward passes and each window's scores
+are cached under a hash of its content and the serving weights' version, so
+refreshing a trend after a new week arrives only computes that week, while a
+model reload or optimized-model swap starts afresh. Every window is
+preprocessed on its own, so its scores match a single-week
+``analyze_actigraphy`` call.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from datetime import datetime, timedelta
+import hashlib
+import logging
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, Field
+import torch
+
+from clarity.core.constants import (
+    LONGITUDINAL_BATCH_SIZE,
+    LONGITUDINAL_CACHE_TTL_SECONDS,
+    LONGITUDINAL_MAX_WEEKS,
+    MINUTES_PER_WEEK,
+)
+from clarity.core.exceptions import DataValidationError
+from clarity.ml.inference_engine import InferenceCache
+from clarity.ml.pat_service import ActigraphyInput, PATModelService, get_pat_service
+from clarity.services.health_data_service import MLPredictionError
+from clarity.utils.time_window import sliding_weeks
+
+logger = logging.getLogger(__name__)
+
+
+class WindowScores(BaseModel):
+    """PAT scores for one window of a longitudinal analysis."""
+
+    start_time: datetime | None = Field(
+        default=None, description="Timestamp of the window's first sample"
+    )
+    end_time: datetime | None = Field(
+        default=None, description="Timestamp just after the window's last sample"
+    )
+    sleep_efficiency: float = Field(description="Sleep efficiency percentage (0-100)")
+    total_sleep_time: float = Field(description="Total sleep time (hours)")
+    circadian_rhythm_score: float = Field(description="Circadian regularity (0-1)")
+    activity_fragmentation: float = Field(description="Activity fragmentation index")
+    depression_risk_score: float = Field(description="Depression risk (0-1)")
+    confidence_score: float = Field(description="Model confidence (0-1)")
+    cached: bool = Field(
+        default=False, description="Whether the window was served from cache"
+    )
+
+
+class LongitudinalAnalysis(BaseModel):
+    """Time series of PAT scores over a multi-week history."""
+
+    user_id: str
+    window_minutes: int = Field(description="Samples per window")
+    stride_minutes: int = Field(description="Samples between window starts")
+    windows: list[WindowScores] = Field(description="Window scores, oldest first")
+    computed_windows: int = Field(description="Windows run through the model")
+    cached_windows: int = Field(description="Windows served from cache")
+
+
+class LongitudinalPATEngine:
+    """Batched, per-window cached PAT inference over sliding weekly windows."""
+
+    def __init__(
+        self,
+        pat_service: PATModelService,
+        *,
+        window_minutes: int = MINUTES_PER_WEEK,
+        batch_size: int = LONGITUDINAL_BATCH_SIZE,
+        max_weeks: int = LONGITUDINAL_MAX_WEEKS,
+        cache: InferenceCache | None = None,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+            pat_service: Loaded PAT service used for preprocessing and inference
+            window_minutes: Window length in samples
+            batch_size: Windows per forward pass
+            max_weeks: Longest accepted history, in windows
+            cache: Per-window score cache
+        """
+        self.pat_service = pat_service
+        self.window_minutes = window_minutes
+        self.batch_size = max(batch_size, 1)
+        self.max_points = max_weeks * window_minutes
+        self.cache = cache or InferenceCache(ttl_seconds=LONGITUDINAL_CACHE_TTL_SECONDS)
+        self.stats = {"analyses": 0, "windows_computed": 0, "windows_cached": 0}
+
+    async def analyze(
+        self, input_data: ActigraphyInput, *, stride_minutes: int | None = None
+    ) -> LongitudinalAnalysis:
+        """Score every window of a long activity history.
+
+        Args:
+            input_data: Minute-level history, oldest first
+            stride_minutes: Samples between window starts; defaults to one
+                window (no overlap)
+
+        Returns:
+            Per-window scores in chronological order
+
+        Raises:
+            DataValidationError: If the history or stride is out of bounds
+            MLPredictionError: If the PAT model is not loaded
+        """
+        stride = self.window_minutes if stride_minutes is None else stride_minutes
+        if not 0 < stride <= self.window_minutes:
+            msg = f"Stride must be between 1 and {self.window_minutes} minutes"
+            raise DataValidationError(msg, field_name="stride_minutes")
+
+        values = input_data.activity_values()
+        if len(values) < self.window_minutes:
+            msg = (
+                f"Longitudinal analysis needs at least {self.window_minutes} "
+                f"data points, got {len(values)}"
+            )
+            raise DataValidationError(msg)
+        if len(values) > self.max_points:
+            msg = (
+                f"Data too large: {len(values)} points exceeds "
+                f"maximum allowed {self.max_points} points"
+            )
+            raise DataValidationError(msg)
+
+        if not self.pat_service._ready_for_inference():  # noqa: SLF001
+            msg = "PAT model not loaded"
+            raise MLPredictionError(msg, model_name="PAT")
+
+        windows = sliding_weeks(values, self.window_minutes, stride)
+        keys = [self._window_key(input_data.user_id, window) for window in windows]
+        cached = [await self.cache.get(key) for key in keys]
+        missing = [index for index, scores in enumerate(cached) if scores is None]
+
+        computed: dict[int, WindowScores] = {}
+        loop = asyncio.get_running_loop()
+        for offset in range(0, len(missing), self.batch_size):
+            chunk = missing[offset : offset + self.batch_size]
+            batch_scores = await loop.run_in_executor(
+                None, self._score_windows, windows[chunk], input_data.user_id
+            )
+            for index, scores in zip(chunk, batch_scores, strict=True):
+                computed[index] = scores
+                await self.cache.set(keys[index], scores)
+
+        first_offset = (len(values) - self.window_minutes) % stride
+        results = []
+        for index, hit in enumerate(cached):
+            scores = hit if isinstance(hit, WindowScores) else computed[index]
+            results.append(
+                scores.model_copy(
+                    update={
+                        **self._window_times(
+                            input_data, first_offset + index * stride
+                        ),
+                        "cached": index not in computed,
+                    }
+                )
+            )
+
+        self.stats["analyses"] += 1
+        self.stats["windows_computed"] += len(computed)
+        self.stats["windows_cached"] += len(windows) - len(computed)
+        logger.info(
+            "Longitudinal analysis for user %s: %d windows (%d computed, %d cached)",
+            input_data.user_id,
+            len(windows),
+            len(computed),
+            len(windows) - len(computed),
+        )
+
+        return LongitudinalAnalysis(
+            user_id=input_data.user_id,
+            window_minutes=self.window_minutes,
+            stride_minutes=stride,
+            windows=results,
+            computed_windows=len(computed),
+            cached_windows=len(windows) - len(computed),
+        )
+
+    def _score_windows(
+        self, windows: npt.NDArray[np.float32], user_id: str
+    ) -> list[WindowScores]:
+        """Run one batch of windows through PAT (blocking)."""
+        service = self.pat_service
+        batch = torch.stack(
+            [
+                service._preprocess_actigraphy_data(  # noqa: SLF001
+                    window, self.window_minutes
+                )
+                for window in windows
+            ]
+        )
+        outputs = service._run_inference(batch)  # noqa: SLF001
+
+        scores = []
+        for row in range(len(windows)):
+            analysis = service._postprocess_predictions(  # noqa: SLF001
+                {name: output[row : row + 1] for name, output in outputs.items()},
+                user_id,
+            )
+            scores.append(
+                WindowScores(
+                    sleep_efficiency=analysis.sleep_efficiency,
+                    total_sleep_time=analysis.total_sleep_time,
+                    circadian_rhythm_score=analysis.circadian_rhythm_score,
+                    activity_fragmentation=analysis.activity_fragmentation,
+                    depression_risk_score=analysis.depression_risk_score,
+                    confidence_score=analysis.confidence_score,
+                )
+            )
+        return scores
+
+    def _window_key(self, user_id: str, window: npt.NDArray[np.float32]) -> str:
+        """Cache key from the window's content and the weights serving it."""
+        digest = hashlib.sha256(np.ascontiguousarray(window)).hexdigest()
+        service = self.pat_service
+        model = (
+            f"{type(service).__name__}:{service.model_size}:{service.weights_version}"
+        )
+        return f"{user_id}:{model}:{self.window_minutes}:{digest}"
+
+    def _window_times(
+        self, input_data: ActigraphyInput, first_sample: int
+    ) -> dict[str, Any]:
+        if input_data.start_time is None:
+            return {"start_time": None, "end_time": None}
+        minutes_per_sample = 1.0 / input_data.sampling_rate
+        start = input_data.start_time + timedelta(
+            minutes=first_sample * minutes_per_sample
+        )
+        return {
+            "start_time": start,
+            "end_time": start
+            + timedelta(minutes=self.window_minutes * minutes_per_sample),
+        }
+
+
+_longitudinal_engine: LongitudinalPATEngine | None = None
+
+
+async def get_longitudinal_engine() -> LongitudinalPATEngine:
+    """Get or create the global longitudinal analysis engine."""
+    global _longitudinal_engine  # noqa: PLW0603 - Singleton pattern for ML engine
+
+    if _longitudinal_engine is None:
+        _longitudinal_engine = LongitudinalPATEngine(await get_pat_service())
+
+    return _longitudinal_engine
@@ -21,6 +21,7 @@ from clarity.ml.models.manager import (
     ModelLoadConfig,
     ModelManager,
     ModelPerformanceMetrics,
+    TierRoutingConfig,
     get_model_manager,
 )
 from clarity.ml.models.progressive_loader import (
@@ -68,6 +69,7 @@ __all__ = [
     "ProgressiveLoadingConfig",
     # Progressive Loader
     "ProgressiveLoadingService",
+    "TierRoutingConfig",
     "get_model_manager",
     "get_progressive_service",
     "initialize_legacy_models",
@@ -519,6 +519,32 @@ async def cleanup(ctx: click.Context, max_size_gb: float) -> None:
         )
 
 
+@cli.command(name="export-onnx")
+@click.option(
+    "--size",
+    "sizes",
+    type=click.Choice(["small", "medium", "large"]),
+    multiple=True,
+    help="PAT size to export (default: all)",
+)
+@click.option("--output-dir", type=click.Path(), help="Directory for .onnx files")
+async def export_onnx(sizes: tuple[str, ...], output_dir: str | None) -> None:
+    """Export PAT models to ONNX for the ONNX Runtime backend."""
+    from clarity.ml.pat_onnx import (  # noqa: PLC0415
+        ONNX_MODEL_DIR,
+        export_pat_models,
+    )
+
+    with console.status("[bold green]Exporting PAT models to ONNX..."):
+        exported = await export_pat_models(
+            Path(output_dir) if output_dir else ONNX_MODEL_DIR,
+            sizes or ("small", "medium", "large"),
+        )
+
+    for size, path in exported.items():
+        console.print(f"[green]✓[/green] Exported PAT {size} to {path}")
+
+
 def main() -> None:
     """Main CLI entry point."""
 
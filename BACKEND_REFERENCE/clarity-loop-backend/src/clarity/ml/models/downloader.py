@@ -0,0 +1,312 @@
+"""Parallel ranged HTTP downloads for model artifacts.
+
+``ParallelRangeDownloader`` splits a file into byte ranges, fetches them over
+concurrent connections and writes each chunk with ``os.pwrite`` into a
+preallocated file, so a cold download is limited by bandwidth rather than by
+the round trips of a single TCP stream. A failed range is retried from the
+last byte written.
+
+The SHA-256 is computed while the download runs: a hasher follows the
+contiguous prefix of the file that is complete and reads it back from the
+page cache, so the digest is ready as soon as the last range lands and
+covers exactly the bytes on disk.
+
+Servers that ignore ``Range`` are downloaded over a single stream.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+from pathlib import Path
+import re
+from typing import Any, cast
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+WRITE_BUFFER_BYTES = 1024 * 1024
+HASH_BLOCK_BYTES = 1024 * 1024
+RETRY_BACKOFF_SECONDS = 0.5
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class DownloadError(Exception):
+    """Raised when the server's responses can't produce the requested file."""
+
+
+@dataclass(slots=True)
+class _Range:
+    start: int
+    end: int  # Exclusive
+    written: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    @property
+    def complete(self) -> bool:
+        return self.written >= self.size
+
+
+def _parse_content_range(value: str | None) -> tuple[int, int, int | None]:
+    match = _CONTENT_RANGE_RE.match(value or "")
+    if match is None:
+        msg = f"Invalid Content-Range: {value!r}"
+        raise DownloadError(msg)
+    total = None if match[3] == "*" else int(match[3])
+    return int(match[1]), int(match[2]), total
+
+
+def _preallocate(fd: int, size: int) -> None:
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # Not every platform/filesystem supports fallocate; a sparse file works
+        os.ftruncate(fd, size)
+
+
+def _pwrite_all(fd: int, data: bytes | bytearray, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in ``HASH_BLOCK_BYTES`` blocks."""
+    sha = hashlib.sha256()
+    with path.open("rb") as f:
+        while block := f.read(HASH_BLOCK_BYTES):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class _PartFile:
+    """Preallocated download target, written by position from several ranges.
+
+    Also hashes the file's completed prefix as the ranges fill in. File I/O
+    runs on a private thread pool that is drained before the descriptor is
+    closed, so no write outlives it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int,
+        ranges: list[_Range],
+        on_progress: Callable[[int], None] | None,
+    ) -> None:
+        self.size = size
+        self.ranges = ranges
+        self._on_progress = on_progress
+        self._sha = hashlib.sha256()
+        self._hashed = 0
+        self._advanced = asyncio.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(ranges) + 1, thread_name_prefix="model-download"
+        )
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def preallocate(self) -> None:
+        await self._run(_preallocate, self._fd, self.size)
+
+    async def write(self, rng: _Range, data: bytes) -> None:
+        await self._run(_pwrite_all, self._fd, data, rng.start + rng.written)
+        rng.written += len(data)
+        self._advanced.set()
+        if self._on_progress is not None:
+            self._on_progress(sum(r.written for r in self.ranges))
+
+    def _contiguous_end(self) -> int:
+        end = 0
+        for rng in self.ranges:
+            end = rng.start + rng.written
+            if not rng.complete:
+                break
+        return end
+
+    def _hash_until(self, target: int) -> None:
+        while self._hashed < target:
+            block = os.pread(
+                self._fd, min(HASH_BLOCK_BYTES, target - self._hashed), self._hashed
+            )
+            if not block:
+                msg = f"Short read at offset {self._hashed} while hashing"
+                raise OSError(msg)
+            self._sha.update(block)
+            self._hashed += len(block)
+
+    async def digest(self) -> str:
+        """Hash the file as it completes and return the hex SHA-256."""
+        while True:
+            self._advanced.clear()
+            target = self._contiguous_end()
+            if target > self._hashed:
+                await self._run(self._hash_until, target)
+            elif self._hashed >= self.size:
+                return self._sha.hexdigest()
+            else:
+                await self._advanced.wait()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        os.close(self._fd)
+
+
+class ParallelRangeDownloader:
+    """Downloads one URL over several concurrent ranged connections.
+
+    Args:
+        session: Session used for all requests; its connector limit should
+            allow ``connections`` concurrent connections to the host
+        connections: Maximum number of ranges fetched at once
+        min_range_bytes: Files are not split into ranges smaller than this
+        retries: Attempts per range after the first, each resuming from the
+            last byte written
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        connections: int = 8,
+        min_range_bytes: int = 8 * 1024 * 1024,
+        retries: int = 3,
+    ) -> None:
+        self.session = session
+        self.connections = max(1, connections)
+        self.min_range_bytes = max(1, min_range_bytes)
+        self.retries = retries
+
+    async def download(
+        self,
+        url: str,
+        path: Path,
+        expected_size: int,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> str:
+        """Download ``url`` to ``path`` and return its SHA-256.
+
+        Args:
+            url: HTTP(S) URL of the file
+            path: Destination; created or overwritten
+            expected_size: Size the server must report for the file
+            on_progress: Called with the total bytes written so far
+
+        Returns:
+            Hex SHA-256 of the downloaded file
+
+        Raises:
+            DownloadError: If the server reports a different size or sends
+                a response that does not match the requested range
+            aiohttp.ClientError: If a range still fails after all retries
+        """
+        async with self.session.get(url, headers={"Range": "bytes=0-0"}) as probe:
+            probe.raise_for_status()
+            if probe.status == 206:
+                _, _, total = _parse_content_range(probe.headers.get("Content-Range"))
+                ranged = True
+            else:
+                total = probe.content_length
+                ranged = False
+            if total is not None and total != expected_size:
+                msg = f"Server reports {total} bytes, expected {expected_size}"
+                raise DownloadError(msg)
+
+        ranges = self._split(expected_size, ranged=ranged)
+        logger.info(
+            "Downloading %s (%d bytes) over %d connection(s)",
+            url,
+            expected_size,
+            len(ranges),
+        )
+
+        part = _PartFile(path, expected_size, ranges, on_progress)
+        try:
+            await part.preallocate()
+            tasks = [
+                asyncio.create_task(self._fetch_range(url, part, rng)) for rng in ranges
+            ]
+            tasks.append(asyncio.create_task(part.digest()))
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            return cast("str", results[-1])
+        finally:
+            part.close()
+
+    def _split(self, size: int, *, ranged: bool) -> list[_Range]:
+        if not ranged or size == 0:
+            return [_Range(0, size)]
+        count = max(1, min(self.connections, size // self.min_range_bytes))
+        step = -(-size // count)
+        return [
+            _Range(start, min(start + step, size)) for start in range(0, size, step)
+        ]
+
+    async def _fetch_range(self, url: str, part: _PartFile, rng: _Range) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                await self._stream_range(url, part, rng)
+            except (aiohttp.ClientError, TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(
+                    "Range %d-%d failed at byte %d (%s), retrying",
+                    rng.start,
+                    rng.end - 1,
+                    rng.start + rng.written,
+                    e,
+                )
+            else:
+                if rng.complete:
+                    return
+                if attempt == self.retries:
+                    msg = f"Range {rng.start}-{rng.end - 1} ended early"
+                    raise aiohttp.ClientPayloadError(msg)
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * (attempt + 1))
+
+    async def _stream_range(self, url: str, part: _PartFile, rng: _Range) -> None:
+        offset = rng.start + rng.written
+        headers = {"Range": f"bytes={offset}-{rng.end - 1}"} if rng.size else {}
+        async with self.session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            if response.status == 206:
+                start, _, _ = _parse_content_range(
+                    response.headers.get("Content-Range")
+                )
+                if start != offset:
+                    msg = f"Asked for byte {offset}, server sent from {start}"
+                    raise DownloadError(msg)
+            elif offset != 0:
+                msg = "Server ignored Range; cannot resume the download"
+                raise DownloadError(msg)
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(WRITE_BUFFER_BYTES):
+                buffer += chunk[: rng.size - rng.written - len(buffer)]
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    await part.write(rng, bytes(buffer))
+                    buffer.clear()
+                if rng.written + len(buffer) >= rng.size:
+                    break
+            if buffer:
+                await part.write(rng, bytes(buffer))
@@ -5,11 +5,16 @@ This replaces the legacy monolithic PAT service approach.
 """
 
 import asyncio
-from collections.abc import AsyncGenerator, Callable
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import StrEnum
+import functools
 import logging
+import math
+import os
 from pathlib import Path
 import time
 from typing import Any
@@ -48,6 +53,21 @@ class ModelLoadConfig:
     warm_up_samples: int = 5
     fallback_to_cpu: bool = True
     enable_monitoring: bool = True
+    # In-flight inferences per model; None means one per CPU core
+    max_concurrent_inferences: int | None = None
+    # Independent model instances, each with its own thread pool
+    replicas: int = 1
+
+
+@dataclass
+class TierRoutingConfig:
+    """SLO thresholds for routing requests across model tiers."""
+
+    # Preferred tier first; later tiers are the degradation path
+    tier_order: tuple[str, ...] = ("large", "medium", "small")
+    max_queue_depth: int = 4  # in-flight requests per model
+    p95_latency_slo_ms: float = 2000.0
+    latency_window_seconds: float = 60.0
 
 
 class ModelPerformanceMetrics(BaseModel):
@@ -65,11 +85,30 @@ class ModelPerformanceMetrics(BaseModel):
     cache_misses: int = 0
 
 
+@dataclass
+class ModelReplica:
+    """One model instance and the thread pool its synchronous calls run on."""
+
+    instance: Any
+    executor: ThreadPoolExecutor | None = None
+    in_flight: int = 0
+
+
 class LoadedModel:
-    """Wrapper for loaded model with metadata and performance tracking."""
+    """Wrapper for loaded model with metadata and performance tracking.
+
+    Inference in eval/no_grad mode is re-entrant, so predictions are not
+    serialized: up to ``max_concurrent_inferences`` run at once, spread over
+    the replicas. Metrics are only touched on the event loop thread, so they
+    need no lock.
+    """
 
     def __init__(
-        self, metadata: ModelMetadata, model_instance: Any, config: ModelLoadConfig
+        self,
+        metadata: ModelMetadata,
+        model_instance: Any,
+        config: ModelLoadConfig,
+        replicas: list[Any] | None = None,
     ) -> None:
         self.metadata = metadata
         self.model_instance = model_instance
@@ -79,26 +118,73 @@ class LoadedModel:
         self.metrics = ModelPerformanceMetrics(
             model_id=metadata.model_id, version=metadata.version
         )
-        self._lock = asyncio.Lock()
+        self.max_concurrency = config.max_concurrent_inferences or os.cpu_count() or 1
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        instances = [model_instance, *(replicas or [])]
+        if len(instances) == 1:
+            # A single replica shares the loop's default executor
+            self.replicas = [ModelReplica(model_instance)]
+        else:
+            workers = math.ceil(self.max_concurrency / len(instances))
+            self.replicas = [
+                ModelReplica(
+                    instance,
+                    ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix=f"{metadata.unique_id}-replica{i}",
+                    ),
+                )
+                for i, instance in enumerate(instances)
+            ]
+
+        # Requests running or waiting on this model, and recent latencies
+        self.in_flight = 0
+        self._recent_latencies: deque[tuple[float, float]] = deque(maxlen=256)
+
+    def p95_latency_ms(self, window_seconds: float = 60.0) -> float:
+        """95th percentile latency of the predictions in the last window."""
+        cutoff = time.time() - window_seconds
+        recent = sorted(
+            latency
+            for finished, latency in self._recent_latencies
+            if finished >= cutoff
+        )
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, int(0.95 * len(recent)))]
 
     async def predict(self, *args: Any, **kwargs: Any) -> Any:
         """Execute prediction with performance tracking."""
         start_time = time.time()
+        self.in_flight += 1
 
-        async with self._lock:
+        try:
+            return await self._predict(start_time, *args, **kwargs)
+        finally:
+            self.in_flight -= 1
+            finished = time.time()
+            self._recent_latencies.append((finished, (finished - start_time) * 1000))
+
+    async def _predict(self, start_time: float, *args: Any, **kwargs: Any) -> Any:
+        async with self._slots:
             self.metrics.last_used = start_time
+            replica = min(self.replicas, key=lambda r: r.in_flight)
+            replica.in_flight += 1
+            instance = replica.instance
 
             try:
                 # Execute the actual prediction
-                if hasattr(self.model_instance, "predict_async"):
-                    result = await self.model_instance.predict_async(*args, **kwargs)
-                elif asyncio.iscoroutinefunction(self.model_instance.predict):
-                    result = await self.model_instance.predict(*args, **kwargs)
+                if hasattr(instance, "predict_async"):
+                    result = await instance.predict_async(*args, **kwargs)
+                elif asyncio.iscoroutinefunction(instance.predict):
+                    result = await instance.predict(*args, **kwargs)
                 else:
-                    # Run synchronous prediction in thread pool
-                    loop = asyncio.get_event_loop()
+                    # Run synchronous prediction in the replica's thread pool
+                    loop = asyncio.get_running_loop()
                     result = await loop.run_in_executor(
-                        None, self.model_instance.predict, *args, **kwargs
+                        replica.executor,
+                        functools.partial(instance.predict, *args, **kwargs),
                     )
 
                 # Update metrics
@@ -124,11 +210,19 @@ class LoadedModel:
                     "Prediction failed for %s: %s", self.metadata.unique_id, e
                 )
                 raise
+            finally:
+                replica.in_flight -= 1
 
     def get_metrics(self) -> ModelPerformanceMetrics:
         """Get current performance metrics."""
         return self.metrics
 
+    def close(self) -> None:
+        """Shut down the replicas' thread pools."""
+        for replica in self.replicas:
+            if replica.executor is not None:
+                replica.executor.shutdown(wait=False)
+
     def update_memory_usage(self) -> None:
         """Update memory usage statistics."""
         if torch.cuda.is_available():
@@ -152,9 +246,11 @@ class ModelManager:
         registry: ModelRegistry | None = None,
         config: ModelRegistryConfig | None = None,
         load_config: ModelLoadConfig | None = None,
+        routing_config: TierRoutingConfig | None = None,
     ) -> None:
         self.registry = registry or ModelRegistry(config or ModelRegistryConfig())
         self.load_config = load_config or ModelLoadConfig()
+        self.routing_config = routing_config or TierRoutingConfig()
         self.loaded_models: dict[str, LoadedModel] = {}
         self.loading_tasks: dict[str, asyncio.Task[LoadedModel | None]] = {}
         self.model_factories: dict[str, Callable[[ModelMetadata], Any]] = {}
@@ -207,6 +303,72 @@ class ModelManager:
 
         return loaded_model_or_none
 
+    async def route_model(
+        self,
+        model_id: str,
+        tier_versions: Mapping[str, str],
+        *,
+        requested_tier: str | None = None,
+    ) -> tuple[LoadedModel, str] | None:
+        """Pick the model tier that should answer the next request.
+
+        An explicitly requested tier is always honoured (and loaded if
+        needed). Otherwise the first loaded tier in ``tier_order`` whose queue
+        depth and recent p95 latency are within the SLO answers; when every
+        loaded tier is over its SLO the last (fastest) one does. Only already
+        loaded tiers are considered so routing never waits on a load, unless
+        no tier is loaded yet.
+
+        Args:
+            model_id: Model identifier
+            tier_versions: Version serving each tier, e.g. ``{"large": "1.2.0"}``
+            requested_tier: Tier the caller opted into
+
+        Returns:
+            The model and its tier, or None if no tier could be loaded
+
+        Raises:
+            ValueError: If ``requested_tier`` has no version
+        """
+        if requested_tier is not None:
+            if requested_tier not in tier_versions:
+                msg = f"Unknown model tier: {requested_tier}"
+                raise ValueError(msg)
+            model = await self.get_model(model_id, tier_versions[requested_tier])
+            return (model, requested_tier) if model else None
+
+        config = self.routing_config
+        tiers = [tier for tier in config.tier_order if tier in tier_versions]
+        loaded = [
+            (tier, model)
+            for tier in tiers
+            if (model := self.loaded_models.get(f"{model_id}:{tier_versions[tier]}"))
+        ]
+
+        if not loaded:
+            for tier in tiers:
+                model = await self.get_model(model_id, tier_versions[tier])
+                if model:
+                    return model, tier
+            return None
+
+        for tier, model in loaded:
+            if (
+                model.in_flight < config.max_queue_depth
+                and model.p95_latency_ms(config.latency_window_seconds)
+                <= config.p95_latency_slo_ms
+            ):
+                return model, tier
+
+        tier, model = loaded[-1]
+        logger.debug(
+            "All %s tiers over SLO, degrading to %s (in flight: %d)",
+            model_id,
+            tier,
+            model.in_flight,
+        )
+        return model, tier
+
     async def preload_model(self, model_id: str, version: str = "latest") -> bool:
         """Preload model in background."""
         try:
@@ -222,7 +384,7 @@ class ModelManager:
 
         async with self._lock:
             if unique_id in self.loaded_models:
-                self.loaded_models.pop(unique_id)
+                self.loaded_models.pop(unique_id).close()
 
                 # Clean up GPU memory if using CUDA
                 if torch.cuda.is_available():
@@ -290,6 +452,9 @@ class ModelManager:
                 "avg_latency_ms": metrics.avg_latency_ms,
                 "error_rate": metrics.error_count / max(metrics.total_inferences, 1),
                 "memory_usage_mb": metrics.memory_usage_mb,
+                "in_flight": loaded_model.in_flight,
+                "max_concurrency": loaded_model.max_concurrency,
+                "replicas": len(loaded_model.replicas),
             }
 
             models = health_status["models"]
@@ -370,8 +535,16 @@ class ModelManager:
                 )
                 return None
 
+            replicas = []
+            for _ in range(self.load_config.replicas - 1):
+                replica = await self._create_model_instance(metadata)
+                if replica:
+                    replicas.append(replica)
+
             # Create loaded model wrapper
-            loaded_model = LoadedModel(metadata, model_instance, self.load_config)
+            loaded_model = LoadedModel(
+                metadata, model_instance, self.load_config, replicas
+            )
 
             # Warm up model if configured
             if self.load_config.warm_up_samples > 0:
@@ -0,0 +1,220 @@
+"""Compact per-model inference metric storage.
+
+Backs ``ModelMonitoringService`` with constant-size state per model version:
+
+- ``SampleRing``: fixed-size ring buffer of struct-packed raw samples
+  (17 bytes each) for trend views
+- ``LatencySketch``: log-bucketed latency histogram with bounded relative
+  error, so percentiles need no sorting and windows merge cheaply
+- ``MetricSlot``: rolling per-minute counters (requests, errors, latency,
+  memory, error types) kept in a ring of ``window_minutes`` slots
+
+Recording an inference is O(1); reading a window touches at most
+``window_minutes`` slots, independent of traffic.
+"""
+
+# removed - breaks FastAPI
+
+from collections import Counter
+from dataclasses import dataclass, field
+import math
+import struct
+
+SKETCH_RELATIVE_ACCURACY = 0.01  # Percentiles within 1% of the true value
+MIN_TRACKED_LATENCY_MS = 0.001  # Smaller latencies share the lowest bucket
+
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# timestamp, latency_ms, memory_mb (0 = not reported), success
+_SAMPLE = struct.Struct("<dff?")
+
+
+class LatencySketch:
+    """Latency histogram with logarithmic buckets (DDSketch/HDR style).
+
+    Bucket ``i`` covers ``(gamma**(i-1), gamma**i]``, so any quantile is
+    reported within ``SKETCH_RELATIVE_ACCURACY`` of the exact value while
+    storage grows only with the spread of latencies, not their number.
+    """
+
+    __slots__ = ("buckets", "count", "max", "min")
+
+    def __init__(self) -> None:
+        self.buckets: Counter[int] = Counter()
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        index = math.ceil(math.log(max(value, MIN_TRACKED_LATENCY_MS)) / _LOG_GAMMA)
+        self.buckets[index] += 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Return the ``q`` quantile (0-1), or 0.0 for an empty sketch."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        cumulative = 0
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative > rank:
+                value = 2 * _GAMMA**index / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class SampleRing:
+    """Fixed-size ring buffer of struct-packed inference samples."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._buffer = bytearray(_SAMPLE.size * capacity)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self, timestamp: float, latency_ms: float, memory_mb: float, *, success: bool
+    ) -> None:
+        _SAMPLE.pack_into(
+            self._buffer,
+            self._next * _SAMPLE.size,
+            timestamp,
+            latency_ms,
+            memory_mb,
+            success,
+        )
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self, n: int) -> list[tuple[float, float, float, bool]]:
+        """Return up to ``n`` most recent samples, oldest first."""
+        n = min(n, self._size)
+        start = (self._next - n) % self.capacity
+        return [
+            _SAMPLE.unpack_from(
+                self._buffer, ((start + i) % self.capacity) * _SAMPLE.size
+            )
+            for i in range(n)
+        ]
+
+
+@dataclass(slots=True)
+class MetricSlot:
+    """Counters for one minute of inferences (or a merged window)."""
+
+    minute: int
+    count: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    memory_sum: float = 0.0
+    memory_count: int = 0
+    health_checks: int = 0
+    latency: LatencySketch = field(default_factory=LatencySketch)
+    error_types: Counter[str] = field(default_factory=Counter)
+
+    def merge(self, other: "MetricSlot") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.latency_sum += other.latency_sum
+        self.memory_sum += other.memory_sum
+        self.memory_count += other.memory_count
+        self.health_checks += other.health_checks
+        self.latency.merge(other.latency)
+        self.error_types.update(other.error_types)
+
+
+@dataclass(slots=True)
+class Peaks:
+    """Largest latency and memory reported since the last alert tick."""
+
+    latency_ms: float = 0.0
+    latency_timestamp: float = 0.0
+    memory_mb: float = 0.0
+    memory_timestamp: float = 0.0
+
+
+class ModelMetricStore:
+    """Rolling metrics for one model version."""
+
+    def __init__(self, window_minutes: int, sample_capacity: int) -> None:
+        self.window_minutes = window_minutes
+        self.samples = SampleRing(sample_capacity)
+        self.total = 0
+        self.errors = 0
+        self._slots: list[MetricSlot | None] = [None] * window_minutes
+        self._peaks = Peaks()
+
+    def _slot(self, timestamp: float) -> MetricSlot:
+        minute = int(timestamp // 60)
+        index = minute % self.window_minutes
+        slot = self._slots[index]
+        if slot is None or slot.minute != minute:
+            slot = self._slots[index] = MetricSlot(minute)
+        return slot
+
+    def record(
+        self,
+        timestamp: float,
+        latency_ms: float,
+        *,
+        success: bool,
+        error_type: str | None = None,
+        memory_usage_mb: float | None = None,
+    ) -> None:
+        slot = self._slot(timestamp)
+        slot.count += 1
+        slot.latency_sum += latency_ms
+        slot.latency.add(latency_ms)
+        if memory_usage_mb:
+            slot.memory_sum += memory_usage_mb
+            slot.memory_count += 1
+        if not success:
+            slot.errors += 1
+            self.errors += 1
+            if error_type:
+                slot.error_types[error_type] += 1
+        self.total += 1
+        self.samples.append(
+            timestamp, latency_ms, memory_usage_mb or 0.0, success=success
+        )
+
+        peaks = self._peaks
+        if latency_ms > peaks.latency_ms:
+            peaks.latency_ms, peaks.latency_timestamp = latency_ms, timestamp
+        if memory_usage_mb and memory_usage_mb > peaks.memory_mb:
+            peaks.memory_mb, peaks.memory_timestamp = memory_usage_mb, timestamp
+
+    def record_health_check(self, timestamp: float) -> None:
+        self._slot(timestamp).health_checks += 1
+
+    def window(self, minutes: int, now: float) -> MetricSlot:
+        """Merge the slots of the last ``minutes`` minutes (at most the window)."""
+        current = int(now // 60)
+        first = current - min(minutes, self.window_minutes) + 1
+        merged = MetricSlot(current)
+        for slot in self._slots:
+            if slot is not None and first <= slot.minute <= current:
+                merged.merge(slot)
+        return merged
+
+    def take_peaks(self) -> Peaks:
+        """Return the peaks since the previous call and start a new period."""
+        peaks, self._peaks = self._peaks, Peaks()
+        return peaks
@@ -2,10 +2,15 @@
 
 Provides comprehensive monitoring, metrics collection, and alerting for ML models.
 Supports Prometheus metrics, custom dashboards, and real-time performance tracking.
+
+Inference metrics live in a ``ModelMetricStore`` per model version (ring
+buffers, rolling per-minute counters and latency sketches), so recording is
+O(1) per inference and dashboard reads are O(models). Alerts are evaluated
+on a periodic tick rather than per inference.
 """
 
 import asyncio
-from collections import defaultdict, deque
+from collections import deque
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import UTC, datetime
@@ -17,6 +22,7 @@ from prometheus_client import Counter, Gauge, Histogram, Info, start_http_server
 from pydantic import BaseModel
 
 from clarity.ml.models.manager import ModelManager
+from clarity.ml.models.metric_store import ModelMetricStore
 
 logger = logging.getLogger(__name__)
 
@@ -24,21 +30,8 @@ logger = logging.getLogger(__name__)
 MODEL_ID_PARTS = 2  # Expected parts in model:version format
 MIN_ERROR_SAMPLE_SIZE = 10  # Minimum errors for rate calculation
 HTTP_OK = 200  # HTTP success status code
-
-
-@dataclass
-class ModelInferenceMetric:
-    """Single inference metric record."""
-
-    model_id: str
-    version: str
-    timestamp: float
-    latency_ms: float
-    success: bool
-    error_type: str | None = None
-    input_size: int | None = None
-    output_size: int | None = None
-    memory_usage_mb: float | None = None
+TREND_POINTS = 100  # Recent samples returned as latency/error trends
+ERROR_RATE_WINDOW_MINUTES = 5  # Window for the error rate alert
 
 
 @dataclass
@@ -78,11 +71,12 @@ class ModelMonitoringConfig(BaseModel):
     health_check_interval_seconds: int = 30
 
     # Retention
-    max_inference_records: int = 10000
+    max_inference_records: int = 10000  # Raw samples kept per model version
     max_health_records: int = 1000
 
     # Alerting
     enable_alerting: bool = True
+    alert_check_interval_seconds: int = 10
     alert_webhook_url: str | None = None
 
 
@@ -102,22 +96,12 @@ class ModelMonitoringService:
         self.config = config or ModelMonitoringConfig()
         self.model_manager: ModelManager | None = None
 
-        # Metrics storage
-        self.inference_metrics: deque[ModelInferenceMetric] = deque(
-            maxlen=self.config.max_inference_records
-        )
+        # Metrics storage, keyed by (model_id, version)
+        self.model_stores: dict[tuple[str, str], ModelMetricStore] = {}
         self.health_metrics: deque[ModelHealthMetric] = deque(
             maxlen=self.config.max_health_records
         )
 
-        # Time-series data for trends
-        self.latency_trends: defaultdict[str, deque[float]] = defaultdict(
-            lambda: deque(maxlen=100)
-        )
-        self.error_trends: defaultdict[str, deque[float]] = defaultdict(
-            lambda: deque(maxlen=100)
-        )
-
         # Prometheus metrics
         self.prometheus_metrics = self._setup_prometheus_metrics()
 
@@ -155,6 +139,9 @@ class ModelMonitoringService:
                 asyncio.create_task(self._system_monitoring_loop())
             )
 
+        if self.config.enable_alerting:
+            self.monitoring_tasks.append(asyncio.create_task(self._alert_loop()))
+
         logger.info("Model monitoring service started")
 
     async def shutdown(self) -> None:
@@ -177,27 +164,23 @@ class ModelMonitoringService:
         output_size: int | None = None,
         memory_usage_mb: float | None = None,
     ) -> None:
-        """Record an inference event."""
+        """Record an inference event.
+
+        ``input_size`` and ``output_size`` are accepted for API compatibility
+        but not stored.
+        """
         if not self.config.collect_inference_metrics:
             return
 
-        metric = ModelInferenceMetric(
-            model_id=model_id,
-            version=version,
-            timestamp=time.time(),
-            latency_ms=latency_ms,
+        self._store(model_id, version).record(
+            time.time(),
+            latency_ms,
             success=success,
             error_type=error_type,
-            input_size=input_size,
-            output_size=output_size,
             memory_usage_mb=memory_usage_mb,
         )
 
-        self.inference_metrics.append(metric)
-
         # Update Prometheus metrics
-        model_key = f"{model_id}:{version}"
-
         if self.prometheus_metrics:
             self.prometheus_metrics["inference_count"].labels(
                 model_id=model_id,
@@ -216,73 +199,38 @@ class ModelMonitoringService:
                     model_id=model_id, version=version
                 ).set(memory_usage_mb)
 
-        # Update trends
-        self.latency_trends[model_key].append(latency_ms)
-        self.error_trends[model_key].append(0.0 if success else 1.0)
-
-        # Check for alerts
-        self._alert_task = asyncio.create_task(
-            self._check_inference_alerts(model_id, version, metric)
-        )
+    def _store(self, model_id: str, version: str) -> ModelMetricStore:
+        """Get or create the metric store for a model version."""
+        store = self.model_stores.get((model_id, version))
+        if store is None:
+            store = self.model_stores[model_id, version] = ModelMetricStore(
+                self.config.metrics_window_minutes,
+                self.config.max_inference_records,
+            )
+        return store
 
     async def get_model_metrics(
         self, model_id: str, version: str = "latest", window_minutes: int | None = None
     ) -> dict[str, Any]:
         """Get comprehensive metrics for a specific model."""
         window_minutes = window_minutes or self.config.metrics_window_minutes
-        window_start = time.time() - (window_minutes * 60)
-
         model_key = f"{model_id}:{version}"
 
-        # Filter metrics within time window
-        inference_metrics = [
-            m
-            for m in self.inference_metrics
-            if m.model_id == model_id
-            and m.version == version
-            and m.timestamp >= window_start
-        ]
-
-        health_metrics = [
-            m
-            for m in self.health_metrics
-            if m.model_id == model_id
-            and m.version == version
-            and m.timestamp >= window_start
-        ]
-
-        if not inference_metrics:
+        store = self.model_stores.get((model_id, version))
+        window = store.window(window_minutes, time.time()) if store else None
+        if store is None or window is None or not window.count:
             return {"error": "No metrics found for model", "model": model_key}
 
-        # Calculate aggregate metrics
-        total_inferences = len(inference_metrics)
-        successful_inferences = sum(1 for m in inference_metrics if m.success)
-        failed_inferences = total_inferences - successful_inferences
-
-        latencies = [m.latency_ms for m in inference_metrics]
-        avg_latency = sum(latencies) / len(latencies) if latencies else 0
-        p95_latency = sorted(latencies)[int(len(latencies) * 0.95)] if latencies else 0
-        p99_latency = sorted(latencies)[int(len(latencies) * 0.99)] if latencies else 0
-
-        success_rate = (
-            successful_inferences / total_inferences if total_inferences > 0 else 0
+        # Aggregate metrics over the window
+        total_inferences = window.count
+        failed_inferences = window.errors
+        successful_inferences = total_inferences - failed_inferences
+        avg_memory = (
+            window.memory_sum / window.memory_count if window.memory_count else 0
         )
 
-        # Memory usage
-        memory_usage = [
-            m.memory_usage_mb for m in inference_metrics if m.memory_usage_mb
-        ]
-        avg_memory = sum(memory_usage) / len(memory_usage) if memory_usage else 0
-
-        # Error breakdown
-        error_types: defaultdict[str, int] = defaultdict(int)
-        for m in inference_metrics:
-            if not m.success and m.error_type:
-                error_types[m.error_type] += 1
-
         # Trend analysis
-        latency_trend = list(self.latency_trends[model_key])
-        error_trend = list(self.error_trends[model_key])
+        samples = store.samples.latest(TREND_POINTS)
 
         return {
             "model_id": model_id,
@@ -292,15 +240,18 @@ class ModelMonitoringService:
                 "total_inferences": total_inferences,
                 "successful_inferences": successful_inferences,
                 "failed_inferences": failed_inferences,
-                "success_rate": success_rate,
-                "avg_latency_ms": avg_latency,
-                "p95_latency_ms": p95_latency,
-                "p99_latency_ms": p99_latency,
+                "success_rate": successful_inferences / total_inferences,
+                "avg_latency_ms": window.latency_sum / total_inferences,
+                "p95_latency_ms": window.latency.quantile(0.95),
+                "p99_latency_ms": window.latency.quantile(0.99),
                 "avg_memory_mb": avg_memory,
             },
-            "errors": dict(error_types),
-            "trends": {"latency": latency_trend, "error_rate": error_trend},
-            "health_checks": len(health_metrics),
+            "errors": dict(window.error_types),
+            "trends": {
+                "latency": [sample[1] for sample in samples],
+                "error_rate": [0.0 if sample[3] else 1.0 for sample in samples],
+            },
+            "health_checks": window.health_checks,
             "alerts": self.alert_state.get(model_key, {}),
         }
 
@@ -310,13 +261,9 @@ class ModelMonitoringService:
         """Get metrics for all monitored models."""
         metrics = {}
 
-        # Get unique model combinations
-        model_combinations: set[tuple[str, str]] = set()
-        model_combinations.update(
-            (metric.model_id, metric.version) for metric in self.inference_metrics
-        )
-
-        for model_id, version in model_combinations:
+        for (model_id, version), store in list(self.model_stores.items()):
+            if not store.total:
+                continue  # Only seen by health checks so far
             model_key = f"{model_id}:{version}"
             metrics[model_key] = await self.get_model_metrics(
                 model_id, version, window_minutes
@@ -333,15 +280,15 @@ class ModelMonitoringService:
         manager_health = await self.model_manager.health_check()
 
         # Calculate system metrics
-        total_inferences = len(self.inference_metrics)
+        now = time.time()
+        stores = list(self.model_stores.values())
+        total_inferences = sum(store.total for store in stores)
         recent_inferences = sum(
-            1
-            for m in self.inference_metrics
-            if m.timestamp >= time.time() - 300  # Last 5 minutes
+            store.window(5, now).count for store in stores  # Last 5 minutes
         )
 
         success_rate = (
-            sum(1 for m in self.inference_metrics if m.success) / total_inferences
+            1 - sum(store.errors for store in stores) / total_inferences
             if total_inferences > 0
             else 0
         )
@@ -433,6 +380,9 @@ class ModelMonitoringService:
                             )
 
                             self.health_metrics.append(metric)
+                            self._store(model_name, version).record_health_check(
+                                metric.timestamp
+                            )
 
                             # Update Prometheus health metric
                             if self.prometheus_metrics:
@@ -473,75 +423,71 @@ class ModelMonitoringService:
                 logger.exception("System monitoring error: %s", e)
                 await asyncio.sleep(60)
 
-    async def _check_inference_alerts(
-        self, model_id: str, version: str, metric: ModelInferenceMetric
-    ) -> None:
-        """Check for inference-related alerts."""
+    async def _alert_loop(self) -> None:
+        """Background alert evaluation loop."""
+        while True:
+            await asyncio.sleep(self.config.alert_check_interval_seconds)
+            try:
+                self.check_alerts()
+            except Exception as e:
+                logger.exception("Alert evaluation error: %s", e)
+
+    def check_alerts(self) -> None:
+        """Evaluate alert thresholds for every model since the last tick."""
         if not self.config.enable_alerting:
             return
 
-        model_key = f"{model_id}:{version}"
-
-        # Initialize alert state if needed
-        if model_key not in self.alert_state:
-            self.alert_state[model_key] = {}
+        now = time.time()
+        for (model_id, version), store in list(self.model_stores.items()):
+            self._check_model_alerts(f"{model_id}:{version}", store, now)
 
+    def _check_model_alerts(
+        self, model_key: str, store: ModelMetricStore, now: float
+    ) -> None:
+        """Check one model's peaks and recent error rate against thresholds."""
         alerts = []
+        peaks = store.take_peaks()
 
         # Check latency threshold
-        if metric.latency_ms > self.config.latency_threshold_ms:
+        if peaks.latency_ms > self.config.latency_threshold_ms:
             alerts.append(
                 {
                     "type": "high_latency",
                     "severity": "warning",
-                    "message": f"High latency detected: {metric.latency_ms:.2f}ms > {self.config.latency_threshold_ms}ms",
-                    "timestamp": metric.timestamp,
+                    "message": f"High latency detected: {peaks.latency_ms:.2f}ms > {self.config.latency_threshold_ms}ms",
+                    "timestamp": peaks.latency_timestamp,
                 }
             )
 
         # Check memory threshold
-        if (
-            metric.memory_usage_mb
-            and metric.memory_usage_mb > self.config.memory_threshold_mb
-        ):
+        if peaks.memory_mb > self.config.memory_threshold_mb:
             alerts.append(
                 {
                     "type": "high_memory",
                     "severity": "warning",
-                    "message": f"High memory usage: {metric.memory_usage_mb:.2f}MB > {self.config.memory_threshold_mb}MB",
-                    "timestamp": metric.timestamp,
+                    "message": f"High memory usage: {peaks.memory_mb:.2f}MB > {self.config.memory_threshold_mb}MB",
+                    "timestamp": peaks.memory_timestamp,
                 }
             )
 
         # Check error rate (over recent window)
-        recent_errors = [
-            m
-            for m in self.inference_metrics
-            if (
-                m.model_id == model_id
-                and m.version == version
-                and m.timestamp >= time.time() - 300
-            )  # Last 5 minutes
-        ]
-
-        if len(recent_errors) >= MIN_ERROR_SAMPLE_SIZE:
-            error_rate = sum(1 for m in recent_errors if not m.success) / len(
-                recent_errors
-            )
+        recent = store.window(ERROR_RATE_WINDOW_MINUTES, now)
+        if recent.count >= MIN_ERROR_SAMPLE_SIZE:
+            error_rate = recent.errors / recent.count
             if error_rate > self.config.error_rate_threshold:
                 alerts.append(
                     {
                         "type": "high_error_rate",
                         "severity": "critical",
                         "message": f"High error rate: {error_rate:.2%} > {self.config.error_rate_threshold:.2%}",
-                        "timestamp": metric.timestamp,
+                        "timestamp": now,
                     }
                 )
 
         # Update alert state
         for alert in alerts:
             alert_key = f"{alert['type']}_{alert['severity']}"
-            self.alert_state[model_key][alert_key] = alert
+            self.alert_state.setdefault(model_key, {})[alert_key] = alert
 
             # Send webhook if configured
             if self.config.alert_webhook_url:
@@ -8,7 +8,6 @@ import asyncio
 from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 from enum import StrEnum
-import hashlib
 import json
 import logging
 import operator
@@ -21,8 +20,17 @@ import aiofiles
 import aiohttp
 from pydantic import BaseModel, Field
 
+from clarity.ml.models.downloader import (
+    DownloadError,
+    ParallelRangeDownloader,
+    file_sha256,
+)
+
 logger = logging.getLogger(__name__)
 
+# Verified digest recorded next to each cached model file
+DIGEST_SUFFIX = ".sha256.json"
+
 
 class ModelStatus(StrEnum):
     """Model availability status."""
@@ -108,6 +116,9 @@ class ModelRegistryConfig(BaseModel):
     registry_file: Path = Field(default=Path("/app/models/registry.json"))
     max_cache_size_gb: float = Field(default=10.0)
     download_timeout_seconds: int = Field(default=300)
+    download_connections: int = Field(default=8)
+    download_min_range_bytes: int = Field(default=8 * 1024 * 1024)
+    download_retries: int = Field(default=3)
     verify_checksums: bool = Field(default=True)
     enable_local_server: bool = Field(default=False)
     local_server_port: int = Field(default=8900)
@@ -119,7 +130,7 @@ class ModelRegistry:
     Features:
     - Version management with semantic aliases
     - Intelligent caching with size limits
-    - Async download with resume capability
+    - Parallel ranged downloads with per-range resume and streaming checksum
     - Local development server support
     - Performance monitoring and metrics
     - Model lineage and metadata tracking
@@ -243,7 +254,7 @@ class ModelRegistry:
         }
 
         try:
-            success = await self._download_with_resume(
+            success = await self._download_ranges(
                 url, local_path, metadata, download_id
             )
             if success:
@@ -307,10 +318,13 @@ class ModelRegistry:
             )
             return False
 
-        # Verify checksum if enabled
+        # Verify checksum if enabled, trusting a digest recorded for this file
         if self.config.verify_checksums:
             try:
-                file_checksum = await self._calculate_checksum(local_path)
+                file_checksum = await self._recorded_digest(local_path)
+                if file_checksum is None:
+                    file_checksum = await self._calculate_checksum(local_path)
+                    await self._record_digest(local_path, file_checksum)
                 if file_checksum != metadata.checksum_sha256:
                     logger.warning("Checksum mismatch for %s", metadata.unique_id)
                     return False
@@ -322,94 +336,91 @@ class ModelRegistry:
 
         return True
 
-    async def _download_with_resume(
+    async def _download_ranges(
         self, url: str, local_path: Path, metadata: ModelMetadata, download_id: str
     ) -> bool:
-        """Download file with resume capability and progress tracking."""
-        # Check if partial file exists
+        """Download file over parallel ranges, checksumming as it streams."""
         partial_path = local_path.with_suffix(local_path.suffix + ".partial")
-        start_byte = 0
-        if partial_path.exists():
-            start_byte = partial_path.stat().st_size
-            logger.info("Resuming download from byte %d", start_byte)
+        download_info = self.download_progress[download_id]
 
-        headers = {}
-        if start_byte > 0:
-            headers["Range"] = f"bytes={start_byte}-"
+        def on_progress(downloaded: int) -> None:
+            download_info["downloaded_bytes"] = downloaded
+            download_info["progress_percent"] = (
+                downloaded / metadata.size_bytes * 100 if metadata.size_bytes else 100.0
+            )
+            elapsed = time.time() - download_info["start_time"]
+            if elapsed > 0:
+                download_info["speed_mbps"] = downloaded / (1024 * 1024) / elapsed
 
         async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.download_timeout_seconds)
+            timeout=aiohttp.ClientTimeout(total=self.config.download_timeout_seconds),
+            connector=aiohttp.TCPConnector(limit=self.config.download_connections),
         ) as session:
+            downloader = ParallelRangeDownloader(
+                session,
+                connections=self.config.download_connections,
+                min_range_bytes=self.config.download_min_range_bytes,
+                retries=self.config.download_retries,
+            )
             try:
-                async with session.get(url, headers=headers) as response:
-                    response.raise_for_status()
-
-                    # Stream download to file
-                    await self._stream_to_file(
-                        response, partial_path, start_byte, metadata, download_id
-                    )
-
-                # Move completed file to final location
-                partial_path.rename(local_path)
-                logger.info("Download completed: %s", local_path)
-                return True
-
-            except (aiohttp.ClientError, OSError) as e:
+                checksum = await downloader.download(
+                    url, partial_path, metadata.size_bytes, on_progress
+                )
+            except (aiohttp.ClientError, DownloadError, OSError) as e:
                 logger.exception("Download error: %s", e)
+                partial_path.unlink(missing_ok=True)
                 return False
 
+        if self.config.verify_checksums and checksum != metadata.checksum_sha256:
+            logger.error("Checksum mismatch for downloaded %s", metadata.unique_id)
+            partial_path.unlink(missing_ok=True)
+            return False
+
+        # Move completed file to final location
+        partial_path.rename(local_path)
+        await self._record_digest(local_path, checksum)
+        logger.info("Download completed: %s", local_path)
+        return True
+
     async def _calculate_checksum(self, file_path: Path) -> str:
         """Calculate SHA-256 checksum of file."""
-        hash_sha256 = hashlib.sha256()
-        async with aiofiles.open(file_path, "rb") as f:
-            while chunk := await f.read(8192):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return await asyncio.to_thread(file_sha256, file_path)
+
+    @staticmethod
+    def _digest_path(local_path: Path) -> Path:
+        return local_path.with_name(local_path.name + DIGEST_SUFFIX)
+
+    async def _record_digest(self, local_path: Path, checksum: str) -> None:
+        """Record a file's SHA-256 next to it, keyed to its size and mtime."""
+        stat = local_path.stat()
+        record = {
+            "sha256": checksum,
+            "size_bytes": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "recorded_at": datetime.now(UTC).isoformat(),
+        }
+        try:
+            async with aiofiles.open(self._digest_path(local_path), "w") as f:
+                await f.write(json.dumps(record))
+        except OSError as e:
+            logger.warning("Failed to record digest for %s: %s", local_path, e)
 
-    async def _stream_to_file(
-        self,
-        response: aiohttp.ClientResponse,
-        file_path: Path,
-        start_byte: int,
-        metadata: ModelMetadata,
-        download_id: str,
-    ) -> None:
-        """Stream response content to file with progress tracking."""
-        mode = "ab" if start_byte > 0 else "wb"
-
-        async with aiofiles.open(str(file_path), mode) as f:  # type: ignore[call-overload]
-            downloaded = start_byte
-            last_update = time.time()
-
-            async for chunk in response.content.iter_chunked(8192):
-                await f.write(chunk)
-                downloaded += len(chunk)
-
-                # Update progress every second
-                now = time.time()
-                if now - last_update >= 1.0:
-                    progress = downloaded / metadata.size_bytes * 100
-
-                    # Update download info
-                    download_info = self.download_progress[download_id]
-                    download_info["downloaded_bytes"] = downloaded
-                    download_info["total_bytes"] = metadata.size_bytes
-                    download_info["progress_percent"] = progress
-
-                    # Calculate speed if not resuming
-                    if start_byte == 0:
-                        elapsed = now - download_info["start_time"]
-                        speed_mbps = (
-                            (downloaded / (1024 * 1024)) / elapsed if elapsed > 0 else 0
-                        )
-                        download_info["speed_mbps"] = speed_mbps
-
-                    last_update = now
-                    logger.debug(
-                        "Download progress for %s: %.1f%%",
-                        metadata.unique_id,
-                        progress,
-                    )
+    async def _recorded_digest(self, local_path: Path) -> str | None:
+        """Return the recorded SHA-256 if the file is unchanged since."""
+        try:
+            async with aiofiles.open(self._digest_path(local_path)) as f:
+                record = json.loads(await f.read())
+            stat = local_path.stat()
+        except (OSError, ValueError):
+            return None
+
+        if (
+            record.get("size_bytes") != stat.st_size
+            or record.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+        checksum = record.get("sha256")
+        return checksum if isinstance(checksum, str) else None
 
     async def _load_registry(self) -> None:
         """Load registry from disk."""
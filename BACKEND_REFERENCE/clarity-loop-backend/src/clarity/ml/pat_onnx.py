@@ -0,0 +1,375 @@
+"""ONNX export and ONNX Runtime serving for the PAT model.
+
+``export_pat_to_onnx`` writes a converted ``PATForMentalHealthClassification``
+to ONNX with dynamic batch and sequence axes; ``export_pat_models`` does it
+for PAT-S/M/L from their converted H5 weights. Next to each graph a
+``.sha256.json`` record holds the graph's SHA-256 and the checksum of the
+verified H5 weights it was exported from; the graph is only served after
+both are checked.
+
+``PATOnnxService`` is a drop-in ``PATModelService`` (and so
+``IMLModelService``) that keeps the same validation, preprocessing and
+clinical postprocessing but runs the graph on ONNX Runtime's CPU execution
+provider. It does not keep a torch model resident, so more workers fit on a
+node. Sequences must be a multiple of the model's patch size and no longer
+than its ``input_size``. A missing or invalid graph is exported by a single
+worker under a file lock and published with an atomic rename.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import Iterable
+import fcntl
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import torch
+from torch import nn
+
+try:
+    import onnxruntime
+
+    _has_onnxruntime = True
+except ImportError:
+    onnxruntime = None
+    _has_onnxruntime = False
+
+from clarity.ml.model_integrity import ModelIntegrityError
+from clarity.ml.pat_optimization import TRACE_BATCH_SIZE
+from clarity.ml.pat_service import EXPECTED_MODEL_CHECKSUMS, PATModelService
+from clarity.ml.preprocessing import HealthDataPreprocessor
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET = 17
+ONNX_MODEL_DIR = Path(__file__).parent.parent.parent.parent / "models" / "pat" / "onnx"
+ONNX_EXECUTION_PROVIDER = "CPUExecutionProvider"
+ONNX_INPUT_NAME = "actigraphy"
+ONNX_OUTPUT_NAMES = (
+    "raw_logits",
+    "sleep_metrics",
+    "circadian_score",
+    "depression_risk",
+    "embeddings",
+)
+ONNX_MODEL_NAMES = {"small": "PAT-S", "medium": "PAT-M", "large": "PAT-L"}
+ONNX_DIGEST_SUFFIX = ".sha256.json"
+ONNX_LOCK_SUFFIX = ".lock"
+
+
+def onnx_model_path(model_size: str, output_dir: Path = ONNX_MODEL_DIR) -> Path:
+    """Path of the exported ONNX graph for a PAT size."""
+    if model_size not in ONNX_MODEL_NAMES:
+        msg = f"Invalid model size: {model_size}. Choose from {list(ONNX_MODEL_NAMES)}"
+        raise ValueError(msg)
+    return output_dir / f"{ONNX_MODEL_NAMES[model_size]}.onnx"
+
+
+def onnx_digest_path(path: Path) -> Path:
+    """Path of the digest record written next to an exported graph."""
+    return path.with_name(path.name + ONNX_DIGEST_SUFFIX)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def export_pat_to_onnx(
+    model: nn.Module,
+    path: Path,
+    *,
+    opset: int = ONNX_OPSET,
+    weights_checksum: str | None = None,
+) -> Path:
+    """Export a PAT classification model to ONNX.
+
+    Batch and sequence axes are dynamic. The model is traced with a batch of
+    ``TRACE_BATCH_SIZE`` full-length sequences so neither axis is
+    specialized. The graph and its digest record are each written to a
+    temporary file and renamed into place.
+
+    Args:
+        model: ``PATForMentalHealthClassification`` (any size)
+        path: Destination ``.onnx`` file
+        opset: ONNX opset version
+        weights_checksum: Checksum of the verified H5 weights loaded into
+            ``model``; None for randomly initialized weights
+
+    Returns:
+        The written path
+    """
+    model.eval()
+    input_size = int(model.encoder.input_size)  # type: ignore[union-attr]
+    example = torch.zeros(TRACE_BATCH_SIZE, input_size)
+    dynamic_axes: dict[str, dict[int, str]] = {
+        ONNX_INPUT_NAME: {0: "batch", 1: "sequence"},
+        **{name: {0: "batch"} for name in ONNX_OUTPUT_NAMES},
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (example,),
+                str(tmp_path),
+                input_names=[ONNX_INPUT_NAME],
+                output_names=list(ONNX_OUTPUT_NAMES),
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                dynamo=False,
+            )
+        digest = hashlib.sha256(tmp_path.read_bytes()).hexdigest()
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    record = {"sha256": digest, "weights_checksum": weights_checksum, "opset": opset}
+    _write_atomic(onnx_digest_path(path), json.dumps(record).encode())
+
+    logger.info("Exported PAT model to ONNX at %s", path)
+    return path
+
+
+def read_verified_onnx(path: Path, model_size: str) -> bytes:
+    """Read an exported graph after checking it against its digest record.
+
+    The graph must hash to the recorded SHA-256, and weights recorded as
+    verified must match the expected checksum of ``model_size``.
+
+    Args:
+        path: Exported ``.onnx`` file
+        model_size: PAT size the graph is served as
+
+    Returns:
+        The graph bytes, ready for ``onnxruntime.InferenceSession``
+
+    Raises:
+        FileNotFoundError: If the graph does not exist
+        ModelIntegrityError: If the record is missing or does not match
+    """
+    model_bytes = path.read_bytes()
+    try:
+        record = json.loads(onnx_digest_path(path).read_text())
+    except (OSError, ValueError) as e:
+        msg = f"No valid digest record for ONNX model {path}"
+        raise ModelIntegrityError(msg) from e
+
+    digest = hashlib.sha256(model_bytes).hexdigest()
+    if digest != record.get("sha256"):
+        msg = f"ONNX model {path} does not match its recorded SHA-256"
+        raise ModelIntegrityError(msg)
+
+    weights_checksum = record.get("weights_checksum")
+    expected = EXPECTED_MODEL_CHECKSUMS.get(model_size)
+    if weights_checksum is not None and expected and weights_checksum != expected:
+        msg = f"ONNX model {path} was exported from unexpected PAT weights"
+        raise ModelIntegrityError(msg)
+    if weights_checksum is None:
+        logger.warning("ONNX model %s was exported from random weights", path)
+    return model_bytes
+
+
+async def export_pat_models(
+    output_dir: Path = ONNX_MODEL_DIR,
+    sizes: Iterable[str] = ("small", "medium", "large"),
+) -> dict[str, Path]:
+    """Load each PAT size from its converted weights and export it to ONNX.
+
+    Returns:
+        Exported path per model size
+    """
+    exported: dict[str, Path] = {}
+    for size in sizes:
+        service = PATModelService(model_size=size, device="cpu")
+        await service.load_model()
+        assert service.model is not None  # noqa: S101
+        exported[size] = export_pat_to_onnx(
+            service.model,
+            onnx_model_path(size, output_dir),
+            weights_checksum=service.verified_weights_checksum,
+        )
+    return exported
+
+
+class PATOnnxService(PATModelService):
+    """PAT model service backed by an ONNX Runtime CPU session."""
+
+    def __init__(
+        self,
+        onnx_path: str | None = None,
+        model_size: str = "medium",
+        *,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        model_path: str | None = None,
+        preprocessor: HealthDataPreprocessor | None = None,
+        export_if_missing: bool = True,
+    ) -> None:
+        """Initialize the ONNX Runtime backend.
+
+        Args:
+            onnx_path: Exported graph; defaults to ``ONNX_MODEL_DIR``
+            model_size: PAT size, as for ``PATModelService``
+            intra_op_threads: Threads used inside one operator (0 = ORT default)
+            inter_op_threads: Threads used across operators (0 = ORT default)
+            model_path: H5 weights used when exporting a missing graph
+            preprocessor: Actigraphy preprocessor
+            export_if_missing: Export from the torch model if ``onnx_path``
+                does not exist yet or fails its integrity check
+        """
+        if not _has_onnxruntime:
+            msg = (
+                "onnxruntime is not installed, cannot serve PAT through ONNX. "
+                "Please install with: pip install 'clarity-loop-backend[onnx]'"
+            )
+            raise RuntimeError(msg)
+
+        super().__init__(
+            model_path=model_path,
+            model_size=model_size,
+            device="cpu",
+            preprocessor=preprocessor,
+        )
+        self.onnx_path = (
+            Path(onnx_path) if onnx_path else onnx_model_path(model_size)
+        )
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.export_if_missing = export_if_missing
+        self.session: Any = None
+
+    async def load_model(self) -> None:
+        """Create the ONNX Runtime session, exporting the graph if needed.
+
+        The session is built from the bytes that passed the integrity check,
+        so the file can't change between the check and the load.
+        """
+        try:
+            try:
+                model_bytes = await asyncio.to_thread(
+                    read_verified_onnx, self.onnx_path, self.model_size
+                )
+            except (FileNotFoundError, ModelIntegrityError) as e:
+                if not self.export_if_missing:
+                    if isinstance(e, FileNotFoundError):
+                        msg = f"ONNX model not found at {self.onnx_path}"
+                        raise FileNotFoundError(msg) from e
+                    raise
+                logger.warning("Exporting PAT ONNX model: %s", e)
+                model_bytes = await self._export_once()
+
+            loop = asyncio.get_running_loop()
+            self.session = await loop.run_in_executor(
+                None, self._create_session, model_bytes
+            )
+
+            # Only the session serves requests; drop the torch copy
+            self.model = None
+            self._weights_checksum = hashlib.sha256(model_bytes).hexdigest()[:16]
+            self.is_loaded = True
+            logger.info(
+                "PAT ONNX model loaded from %s (intra_op=%d, inter_op=%d)",
+                self.onnx_path,
+                self.intra_op_threads,
+                self.inter_op_threads,
+            )
+
+        except Exception as e:
+            logger.critical("Failed to load PAT ONNX model: %s", e, exc_info=True)
+            raise
+
+    async def _export_once(self) -> bytes:
+        """Export the graph unless another worker did while we waited.
+
+        Workers sharing ``onnx_path`` serialize on an exclusive ``flock`` of a
+        lock file next to it; whoever gets it first exports, the others find
+        a valid graph once they get the lock.
+        """
+        self.onnx_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.onnx_path.with_name(self.onnx_path.name + ONNX_LOCK_SUFFIX)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            try:
+                return await asyncio.to_thread(
+                    read_verified_onnx, self.onnx_path, self.model_size
+                )
+            except (FileNotFoundError, ModelIntegrityError):
+                pass
+
+            await super().load_model()
+            assert self.model is not None  # noqa: S101
+            await asyncio.to_thread(
+                export_pat_to_onnx,
+                self.model,
+                self.onnx_path,
+                weights_checksum=self.verified_weights_checksum,
+            )
+            return await asyncio.to_thread(
+                read_verified_onnx, self.onnx_path, self.model_size
+            )
+        finally:
+            os.close(fd)  # Releases the lock
+
+    def _create_session(self, model_bytes: bytes) -> Any:
+        assert onnxruntime is not None  # noqa: S101
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        return onnxruntime.InferenceSession(
+            model_bytes, options, providers=[ONNX_EXECUTION_PROVIDER]
+        )
+
+    def _ready_for_inference(self) -> bool:
+        return self.is_loaded and self.session is not None
+
+    def _run_inference(self, input_tensor: torch.Tensor) -> dict[str, torch.Tensor]:
+        batch = input_tensor.detach().cpu().numpy().astype(np.float32, copy=False)
+        outputs = self.session.run(list(ONNX_OUTPUT_NAMES), {ONNX_INPUT_NAME: batch})
+        return {
+            name: torch.from_numpy(output)
+            for name, output in zip(ONNX_OUTPUT_NAMES, outputs, strict=True)
+        }
+
+    async def verify_weights_loaded(self) -> bool:
+        """Check the session is deterministic on a fixed input."""
+        if not self._ready_for_inference():
+            return False
+
+        try:
+            test_input = torch.zeros(1, int(self.config["input_size"]))
+            first = self._run_inference(test_input)["embeddings"].numpy()
+            second = self._run_inference(test_input)["embeddings"].numpy()
+        except Exception:
+            logger.exception("Error verifying PAT ONNX session")
+            return False
+        return bool(np.allclose(first, second, atol=1e-6))
+
+    async def health_check(self) -> dict[str, str | bool]:
+        """Check the health status of the ONNX backend."""
+        health = await super().health_check()
+        health.update(
+            {
+                "service": "PAT ONNX Runtime Service",
+                "backend": "onnxruntime",
+                "execution_provider": ONNX_EXECUTION_PROVIDER,
+                "onnx_path": str(self.onnx_path),
+                "intra_op_threads": str(self.intra_op_threads),
+                "inter_op_threads": str(self.inter_op_threads),
+            }
+        )
+        return health
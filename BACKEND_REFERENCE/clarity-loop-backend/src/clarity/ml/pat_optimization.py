@@ -2,6 +2,8 @@
 
 This module provides optimization features including:
 - TorchScript compilation for faster inference
+- Dynamic int8 quantization of Linear layers for CPU inference
+- An accuracy guard that checks optimized outputs against the fp32 model
 - Model pruning for reduced memory usage
 - Result caching for repeated analyses
 - Batch processing for multiple requests
@@ -11,13 +13,16 @@ This module provides optimization features including:
 
 import asyncio
 import contextlib
+import copy
 from datetime import UTC, datetime, timedelta
 import hashlib
 import logging
 from pathlib import Path
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
+import numpy as np
+from pydantic import BaseModel, Field
 import torch
 from torch.nn.utils import prune
 
@@ -34,6 +39,47 @@ CACHE_EXPIRY_HOURS = 1
 DEFAULT_WARMUP_ITERATIONS = 5
 MAX_BATCH_SIZE = 8
 HASH_TRUNCATE_LENGTH = 8
+PAT_INPUT_SIZE = 10080  # 1 week at 1-minute resolution
+TRACE_BATCH_SIZE = 2  # >1 so the traced graph keeps the batch dimension dynamic
+
+# Accuracy guard for optimized inference
+ACCURACY_REFERENCE_SIZE = 8  # synthetic weeks compared against fp32
+ACCURACY_MIN_EMBEDDING_COSINE = 0.99
+ACCURACY_MAX_SCORE_DELTA = 0.02  # depression risk / circadian score (0-1 scale)
+
+Compiler = Literal["torchscript", "torch_compile", "none"]
+
+
+class AccuracyReport(BaseModel):
+    """Comparison of an optimized PAT model against the fp32 model."""
+
+    passed: bool
+    reference_size: int
+    min_embedding_cosine: float = Field(description="Worst embedding similarity")
+    max_embedding_abs_error: float
+    max_score_abs_error: float = Field(
+        description="Worst depression risk / circadian score difference"
+    )
+
+
+def build_reference_set(
+    size: int = ACCURACY_REFERENCE_SIZE, input_size: int = PAT_INPUT_SIZE, seed: int = 0
+) -> torch.Tensor:
+    """Deterministic synthetic weeks of normalized actigraphy.
+
+    Each row is a circadian rest/activity cycle with a per-row amplitude,
+    phase and noise level, z-scored like ``preprocess_for_pat_model`` output.
+    """
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(input_size, dtype=np.float64)
+    rows = []
+    for _ in range(size):
+        phase = rng.uniform(0, 2 * np.pi)
+        amplitude = rng.uniform(0.5, 2.0)
+        signal = amplitude * np.sin(2 * np.pi * minutes / 1440 + phase)
+        signal += rng.normal(0.0, rng.uniform(0.1, 1.0), input_size)
+        rows.append((signal - signal.mean()) / (signal.std() + 1e-8))
+    return torch.from_numpy(np.stack(rows).astype(np.float32))
 
 
 class PATPerformanceOptimizer:
@@ -51,6 +97,7 @@ class PATPerformanceOptimizer:
         use_torchscript: bool = True,
         use_pruning: bool = False,
         pruning_amount: float = 0.1,
+        use_quantization: bool = False,
     ) -> bool:
         """Optimize the PAT model for inference performance.
 
@@ -58,6 +105,7 @@ class PATPerformanceOptimizer:
             use_torchscript: Enable TorchScript compilation
             use_pruning: Enable model pruning
             pruning_amount: Amount of weights to prune (0.0-1.0)
+            use_quantization: Compile a dynamic int8 quantized copy
 
         Returns:
             True if optimization succeeded
@@ -77,6 +125,10 @@ class PATPerformanceOptimizer:
                 logger.info("Applying structured pruning (amount: %s)", pruning_amount)
                 self._apply_model_pruning(model, pruning_amount)
 
+            if use_quantization:
+                logger.info("Applying dynamic int8 quantization to Linear layers")
+                model = self.quantize_model(model)
+
             # Compile with TorchScript if requested
             if use_torchscript:
                 logger.info("Compiling model with TorchScript")
@@ -118,6 +170,19 @@ class PATPerformanceOptimizer:
                 with contextlib.suppress(ValueError):
                     prune.remove(module, "weight")  # type: ignore[no-untyped-call]
 
+    @staticmethod
+    def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+        """Return a copy with Linear layers dynamically quantized to int8.
+
+        Weights are stored as int8 and activations quantized on the fly, which
+        is the cheapest throughput win on CPU. The fp32 model is untouched so
+        it can serve as the accuracy reference and fallback.
+        """
+        quantized = copy.deepcopy(model).cpu().eval()
+        return torch.ao.quantization.quantize_dynamic(  # type: ignore[no-any-return]
+            quantized, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
     def _compile_torchscript(
         self, model: torch.nn.Module
     ) -> torch.jit.ScriptModule | None:
@@ -125,11 +190,13 @@ class PATPerformanceOptimizer:
         try:
             model.eval()
 
-            # Create sample input for tracing
-            sample_input = torch.randn(1, 10080, device=self.pat_service.device)
+            # Trace with a batch > 1 so batched requests reuse the graph
+            sample_input = torch.randn(
+                TRACE_BATCH_SIZE, PAT_INPUT_SIZE, device=self.pat_service.device
+            )
 
-            # Trace the model
-            traced_model = torch.jit.trace(model, sample_input)  # type: ignore[no-untyped-call]
+            # Trace the model (strict=False: the model returns a dict)
+            traced_model = torch.jit.trace(model, sample_input, strict=False)  # type: ignore[no-untyped-call]
 
             # Optimize for inference
             if hasattr(torch.jit, "optimize_for_inference"):
@@ -140,6 +207,151 @@ class PATPerformanceOptimizer:
             logger.exception("TorchScript compilation failed")
             return None
 
+    @staticmethod
+    def _compile_torch(model: torch.nn.Module) -> torch.nn.Module | None:
+        """Compile model with ``torch.compile`` and dynamic batch shapes."""
+        try:
+            return torch.compile(model, dynamic=True)  # type: ignore[return-value]
+        except Exception:
+            logger.exception("torch.compile failed")
+            return None
+
+    def verify_accuracy(
+        self,
+        candidate: torch.nn.Module,
+        reference_inputs: torch.Tensor | None = None,
+        *,
+        min_embedding_cosine: float = ACCURACY_MIN_EMBEDDING_COSINE,
+        max_score_delta: float = ACCURACY_MAX_SCORE_DELTA,
+    ) -> AccuracyReport:
+        """Compare an optimized model against the fp32 model.
+
+        Args:
+            candidate: Optimized model returning the same output dict
+            reference_inputs: Normalized weeks to compare on (defaults to
+                ``build_reference_set()``)
+            min_embedding_cosine: Lowest acceptable embedding cosine similarity
+            max_score_delta: Largest acceptable depression risk or circadian
+                score difference
+
+        Returns:
+            Accuracy report; ``passed`` is False if any tolerance is exceeded
+        """
+        reference_model = self.pat_service.model
+        if reference_model is None:
+            msg = "Cannot verify accuracy: PAT model not loaded"
+            raise RuntimeError(msg)
+
+        inputs = (
+            reference_inputs if reference_inputs is not None else build_reference_set()
+        )
+        with torch.no_grad():
+            expected = reference_model(inputs.to(self.pat_service.device))
+            actual = candidate(inputs.cpu())
+
+        expected_emb = expected["embeddings"].float().cpu()
+        actual_emb = actual["embeddings"].float().cpu()
+        cosine = torch.nn.functional.cosine_similarity(expected_emb, actual_emb, dim=1)
+        score_error = max(
+            float((expected[key].cpu() - actual[key].cpu()).abs().max())
+            for key in ("depression_risk", "circadian_score")
+        )
+
+        report = AccuracyReport(
+            passed=False,
+            reference_size=int(inputs.shape[0]),
+            min_embedding_cosine=float(cosine.min()),
+            max_embedding_abs_error=float((expected_emb - actual_emb).abs().max()),
+            max_score_abs_error=score_error,
+        )
+        report.passed = (
+            report.min_embedding_cosine >= min_embedding_cosine
+            and report.max_score_abs_error <= max_score_delta
+        )
+        return report
+
+    async def enable_optimized_inference(
+        self,
+        *,
+        quantize: bool = True,
+        compiler: Compiler = "torchscript",
+        reference_inputs: torch.Tensor | None = None,
+    ) -> AccuracyReport | None:
+        """Build an optimized model and serve through it if it is accurate.
+
+        The quantized/compiled model replaces the fp32 model in
+        ``PATModelService.analyze_actigraphy`` only when it passes the
+        accuracy guard; otherwise the service keeps serving fp32.
+
+        Args:
+            quantize: Apply dynamic int8 quantization to Linear layers
+            compiler: Graph compilation to apply after quantization
+            reference_inputs: Optional reference set for the accuracy guard
+
+        Returns:
+            Accuracy report, or None if no optimized model could be built
+        """
+        if not self.pat_service.is_loaded or self.pat_service.model is None:
+            logger.error("Cannot optimize: PAT model not loaded")
+            return None
+        if quantize and str(self.pat_service.device) != "cpu":
+            logger.warning(
+                "Dynamic quantization is CPU-only; serving fp32 on %s",
+                self.pat_service.device,
+            )
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            candidate = await loop.run_in_executor(
+                None, lambda: self._build_optimized_model(quantize, compiler)
+            )
+            if candidate is None:
+                return None
+            report = await loop.run_in_executor(
+                None, lambda: self.verify_accuracy(candidate, reference_inputs)
+            )
+        except Exception:
+            logger.exception("Optimized PAT inference setup failed")
+            self.pat_service.set_inference_model(None)
+            return None
+
+        if not report.passed:
+            logger.warning(
+                "Optimized PAT model failed accuracy guard "
+                "(cosine=%.4f, score_delta=%.4f); serving fp32",
+                report.min_embedding_cosine,
+                report.max_score_abs_error,
+            )
+            self.pat_service.set_inference_model(None)
+            return report
+
+        self.compiled_model = candidate  # type: ignore[assignment]
+        self.optimization_enabled = True
+        self.pat_service.set_inference_model(candidate)
+        logger.info(
+            "Optimized PAT inference enabled (quantize=%s, compiler=%s, cosine=%.4f)",
+            quantize,
+            compiler,
+            report.min_embedding_cosine,
+        )
+        return report
+
+    def _build_optimized_model(
+        self, quantize: bool, compiler: Compiler  # noqa: FBT001
+    ) -> torch.nn.Module | None:
+        model: torch.nn.Module = self.pat_service.model  # type: ignore[assignment]
+        if quantize:
+            model = self.quantize_model(model)
+        else:
+            model = copy.deepcopy(model).eval()
+
+        if compiler == "torchscript":
+            return self._compile_torchscript(model)
+        if compiler == "torch_compile":
+            return self._compile_torch(model)
+        return model
+
     def save_compiled_model(self, model_path: str | Path) -> None:
         """Save the compiled TorchScript model to disk."""
         if self.compiled_model is None:
@@ -157,10 +369,12 @@ class PATPerformanceOptimizer:
     def _generate_cache_key(input_data: ActigraphyInput) -> str:
         """Generate a cache key for actigraphy input."""
         # Create hash from user_id, data points, and parameters
-        data_str = f"{input_data.user_id}_{len(input_data.data_points)}"
+        data_str = f"{input_data.user_id}_{input_data.point_count}"
 
         # Add sample of data values for uniqueness
-        if input_data.data_points:
+        if input_data.values is not None:
+            data_str += f"_{hashlib.sha256(input_data.values).hexdigest()}"
+        elif input_data.data_points:
             first_vals = [dp.value for dp in input_data.data_points[:5]]
             last_vals = [dp.value for dp in input_data.data_points[-5:]]
             data_str += f"_{hash(tuple(first_vals + last_vals))}"
@@ -233,7 +447,7 @@ class PATPerformanceOptimizer:
 
         # Preprocess input data
         input_tensor = self.pat_service._preprocess_actigraphy_data(  # noqa: SLF001
-            input_data.data_points
+            input_data.samples
         )
         input_tensor = input_tensor.unsqueeze(0)  # Add batch dimension
 
@@ -241,6 +455,12 @@ class PATPerformanceOptimizer:
         with torch.no_grad():
             outputs = self.compiled_model(input_tensor)
 
+        if isinstance(outputs, dict):
+            # Traced with strict=False: same output dict as the eager model
+            return self.pat_service._postprocess_predictions(  # noqa: SLF001
+                outputs, input_data.user_id
+            )
+
         # Convert outputs to dictionary format expected by postprocessing
         outputs_dict = {
             "sleep_stage_predictions": (
@@ -21,11 +21,14 @@ import hashlib
 import hmac
 import logging
 import math
+import os
 from pathlib import Path
+import tempfile
 from typing import Any, NoReturn, cast
 
 import numpy as np
-from pydantic import BaseModel, Field
+import numpy.typing as npt
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 import torch
 from torch import nn
 from torch.nn import functional
@@ -39,6 +42,7 @@ except ImportError:
     _has_h5py = False
 
 from clarity.core.exceptions import DataValidationError
+from clarity.core.tracing import start_span
 from clarity.ml.preprocessing import ActigraphyDataPoint, HealthDataPreprocessor
 from clarity.ports.ml_ports import IMLModelService
 from clarity.services.health_data_service import MLPredictionError
@@ -101,13 +105,97 @@ MODERATE_DEPRESSION_RISK = 0.4
 
 
 class ActigraphyInput(BaseModel):
-    """Input model for actigraphy data."""
+    """Input model for actigraphy data.
+
+    Holds either ``data_points`` or, for callers that already have arrays,
+    a float32 ``values`` buffer starting at ``start_time``; use
+    ``from_array`` for the latter. The buffer is never copied or modified on
+    its way to the model.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     user_id: str
-    data_points: list[ActigraphyDataPoint]
+    data_points: list[ActigraphyDataPoint] = Field(default_factory=list)
+    values: np.ndarray | None = Field(
+        default=None,
+        description="Activity values at sampling_rate (float32)",
+        exclude=True,
+        repr=False,
+    )
+    start_time: datetime | None = Field(
+        default=None, description="Timestamp of the first value"
+    )
     sampling_rate: float = Field(default=1.0, description="Samples per minute")
     duration_hours: int = Field(default=168, description="Duration in hours (1 week)")
 
+    @field_validator("values", mode="before")
+    @classmethod
+    def _as_float32_buffer(cls, v: Any) -> npt.NDArray[np.float32] | None:
+        if v is None:
+            return None
+        # No copy when already a contiguous float32 array
+        values = np.ascontiguousarray(v, dtype=np.float32)
+        if values.ndim != 1:
+            msg = f"Expected 1-D activity values, got {values.ndim}-D"
+            raise ValueError(msg)
+        return values
+
+    @model_validator(mode="after")
+    def _single_representation(self) -> "ActigraphyInput":
+        if self.values is not None and self.data_points:
+            msg = "Provide either data_points or values, not both"
+            raise ValueError(msg)
+        return self
+
+    @classmethod
+    def from_array(
+        cls,
+        user_id: str,
+        values: npt.ArrayLike,
+        start_time: datetime | None = None,
+        *,
+        sampling_rate: float = 1.0,
+        duration_hours: int | None = None,
+    ) -> "ActigraphyInput":
+        """Build an input from activity values without per-point objects.
+
+        ``duration_hours`` defaults to the span the values cover.
+        """
+        if duration_hours is None:
+            duration_hours = int(np.size(values) / sampling_rate) // 60
+        return cls(
+            user_id=user_id,
+            values=values,
+            start_time=start_time,
+            sampling_rate=sampling_rate,
+            duration_hours=duration_hours,
+        )
+
+    @property
+    def samples(self) -> list[ActigraphyDataPoint] | npt.NDArray[np.float32]:
+        """The values buffer if array-backed, else the data points."""
+        if self.values is not None:
+            return self.values
+        return self.data_points
+
+    @property
+    def point_count(self) -> int:
+        """Number of samples, in either representation."""
+        if self.values is not None:
+            return len(self.values)
+        return len(self.data_points)
+
+    def activity_values(self) -> npt.NDArray[np.float32]:
+        """Activity values as a float32 array (the buffer itself if array-backed)."""
+        if self.values is not None:
+            return self.values
+        return np.fromiter(
+            (point.value for point in self.data_points),
+            dtype=np.float32,
+            count=len(self.data_points),
+        )
+
 
 class ActigraphyAnalysis(BaseModel):
     """Output model for PAT analysis results."""
@@ -321,8 +409,9 @@ class PATEncoder(nn.Module):
         """Forward pass through the PAT encoder."""
         batch_size, _seq_len = x.shape
 
-        # Reshape input to patches [batch, num_patches, patch_size]
-        x = x.view(batch_size, self.num_patches, self.patch_size)
+        # Reshape input to patches [batch, num_patches, patch_size]; the patch
+        # count follows the sequence so exported graphs keep a dynamic length
+        x = x.view(batch_size, -1, self.patch_size)
 
         # Patch embedding
         x = self.patch_embedding(x)  # [batch, num_patches, embed_dim]
@@ -403,7 +492,13 @@ class PATModelService(IMLModelService):
         self.model_size = model_size
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.model: PATForMentalHealthClassification | None = None
+        # Optimized (quantized/compiled) copy that serves requests when set
+        self.inference_model: nn.Module | None = None
         self.is_loaded = False
+        self._weights_checksum = "unloaded"
+        self._inference_generation = 0
+        # Checksum of the H5 file the weights came from, once verified and loaded
+        self.verified_weights_checksum: str | None = None
         self.preprocessor = preprocessor or HealthDataPreprocessor()
 
         # Get model configuration
@@ -455,12 +550,14 @@ class PATModelService(IMLModelService):
             )
 
             # Load pre-trained encoder weights if available
+            self.verified_weights_checksum = None
             self._load_pretrained_weights()
 
             # Move model to device and set to eval mode
             self.model.to(self.device)
             self.model.eval()
 
+            self._weights_checksum = self._state_checksum(self.model)
             self.is_loaded = True
             logger.info("PAT model loaded successfully")
 
@@ -472,6 +569,42 @@ class PATModelService(IMLModelService):
             )
             raise
 
+    def set_inference_model(self, model: nn.Module | None) -> None:
+        """Serve requests through an optimized model, or back through fp32.
+
+        The fp32 ``model`` stays loaded for weight verification and as the
+        accuracy reference.
+
+        Args:
+            model: Optimized model with the same outputs, or None to reset
+        """
+        self.inference_model = model
+        self._inference_generation += 1
+        logger.info(
+            "PAT inference model set to %s",
+            "optimized" if model is not None else "fp32",
+        )
+
+    @property
+    def weights_version(self) -> str:
+        """Identifies the weights serving requests, for keying derived caches.
+
+        Changes whenever the model is (re)loaded with different weights or an
+        optimized inference model is swapped in.
+        """
+        if self.inference_model is None:
+            return self._weights_checksum
+        return f"{self._weights_checksum}+opt{self._inference_generation}"
+
+    @staticmethod
+    def _state_checksum(model: nn.Module) -> str:
+        """Short SHA-256 over a model's parameters and buffers."""
+        sha = hashlib.sha256()
+        for name, tensor in model.state_dict().items():
+            sha.update(name.encode())
+            sha.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+        return sha.hexdigest()[:16]
+
     def _load_pretrained_weights(self) -> None:
         """Load pre-trained weights if available."""
         if not (self.model_path and Path(self.model_path).exists()):
@@ -514,6 +647,9 @@ class PATModelService(IMLModelService):
                 if unexpected_keys:
                     logger.warning("Unexpected keys: %s", unexpected_keys)
 
+                self.verified_weights_checksum = (
+                    PATModelService._calculate_file_checksum(Path(self.model_path))
+                )
                 logger.info(
                     "Successfully loaded %d weight tensors from %s",
                     len(state_dict),
@@ -893,11 +1029,18 @@ class PATModelService(IMLModelService):
 
     def _preprocess_actigraphy_data(
         self,
-        data_points: list[ActigraphyDataPoint],
+        data_points: list[ActigraphyDataPoint] | npt.NDArray[np.floating[Any]],
         target_length: int = 10080,  # 1 week at 1-minute resolution
     ) -> torch.Tensor:
         """Preprocess actigraphy data for PAT model input using injected preprocessor."""
-        tensor = self.preprocessor.preprocess_for_pat_model(data_points, target_length)
+        if isinstance(data_points, np.ndarray):
+            tensor = self.preprocessor.preprocess_array_for_pat_model(
+                data_points, target_length
+            )
+        else:
+            tensor = self.preprocessor.preprocess_for_pat_model(
+                data_points, target_length
+            )
         return tensor.to(self.device)
 
     def _postprocess_predictions(
@@ -1025,6 +1168,74 @@ class PATModelService(IMLModelService):
         empty_data_msg = "No actigraphy data provided"
         raise DataValidationError(empty_data_msg)
 
+    def _ready_for_inference(self) -> bool:
+        """Whether a model is loaded and can serve ``analyze_actigraphy``."""
+        return self.is_loaded and bool(self.model)
+
+    def _run_inference(self, input_tensor: torch.Tensor) -> dict[str, torch.Tensor]:
+        """Run a preprocessed ``[batch, sequence]`` tensor through the model.
+
+        Args:
+            input_tensor: Batched, preprocessed actigraphy
+
+        Returns:
+            Model outputs keyed like ``PATForMentalHealthClassification``
+        """
+        assert (  # noqa: S101
+            self.model is not None
+        ), "Model must be loaded at this point"
+
+        model = self.inference_model if self.inference_model is not None else self.model
+        with torch.no_grad():
+            return cast("dict[str, torch.Tensor]", model(input_tensor))
+
+    def profile_inference(self, runs: int = 1, *, chrome_trace: bool = False) -> str:
+        """Profile the model forward pass with the torch profiler.
+
+        Runs a week of zeros through ``_run_inference`` ``runs`` times, after
+        one unprofiled warm-up pass, and reports where the time went per
+        operator.
+
+        Args:
+            runs: Number of profiled forward passes
+            chrome_trace: Return a Chrome trace (``chrome://tracing`` or
+                Perfetto) instead of the operator table
+
+        Returns:
+            Operator table sorted by self CPU time, or Chrome trace JSON
+
+        Raises:
+            MLPredictionError: If no model is loaded
+        """
+        from torch.profiler import (  # noqa: PLC0415
+            ProfilerActivity,
+            profile,
+            record_function,
+        )
+
+        if not self._ready_for_inference():
+            self._raise_model_not_loaded_error()
+
+        input_tensor = torch.zeros(1, 10080, device=self.device)
+        self._run_inference(input_tensor)  # Warm-up: lazy init, allocator
+
+        activities = [ProfilerActivity.CPU]
+        if str(self.device).startswith("cuda"):
+            activities.append(ProfilerActivity.CUDA)
+        with profile(activities=activities, record_shapes=True) as prof:
+            for _ in range(runs):
+                with record_function("pat.forward"):
+                    self._run_inference(input_tensor)
+
+        if chrome_trace:
+            with tempfile.TemporaryDirectory() as tmp:
+                trace_path = Path(tmp) / "pat_forward.json"
+                prof.export_chrome_trace(str(trace_path))
+                return trace_path.read_text(encoding="utf-8")
+        return str(
+            prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=30)
+        )
+
     @resilient_prediction(model_name="PAT")
     async def analyze_actigraphy(
         self, input_data: ActigraphyInput
@@ -1044,13 +1255,13 @@ class PATModelService(IMLModelService):
         logger.info(
             "Analyzing actigraphy data for user %s (%d data points)",
             input_data.user_id,
-            len(input_data.data_points),
+            input_data.point_count,
         )
 
         try:
             # SECURITY: Validate input data bounds FIRST to prevent memory exhaustion
             max_data_points = 20160  # 2 weeks max for safety
-            data_point_count = len(input_data.data_points)
+            data_point_count = input_data.point_count
 
             if data_point_count == 0:
                 self._raise_empty_data_error()
@@ -1059,27 +1270,23 @@ class PATModelService(IMLModelService):
                 self._raise_data_too_large_error(data_point_count, max_data_points)
 
             # Check model loading status AFTER data validation
-            if not self.is_loaded or not self.model:
+            if not self._ready_for_inference():
                 self._raise_model_not_loaded_error()
 
-            assert (  # noqa: S101
-                self.model is not None
-            ), "Model must be loaded at this point"
-
             # Preprocess input data
-            input_tensor = self._preprocess_actigraphy_data(input_data.data_points)
-
-            # Add batch dimension
-            input_tensor = input_tensor.unsqueeze(0)
+            with start_span("pat.preprocess", {"pat.points": data_point_count}):
+                input_tensor = self._preprocess_actigraphy_data(input_data.samples)
 
-            model = self.model
+                # Add batch dimension
+                input_tensor = input_tensor.unsqueeze(0)
 
             # Run inference - resilience is handled by the decorator
-            with torch.no_grad():
-                outputs = cast("dict[str, torch.Tensor]", model(input_tensor))
+            with start_span("pat.forward"):
+                outputs = self._run_inference(input_tensor)
 
             # Post-process outputs
-            analysis = self._postprocess_predictions(outputs, input_data.user_id)
+            with start_span("pat.postprocess"):
+                analysis = self._postprocess_predictions(outputs, input_data.user_id)
 
             logger.info(
                 "Actigraphy analysis complete for user %s",
@@ -1161,6 +1368,7 @@ class PATModelService(IMLModelService):
             "model_loaded": self.is_loaded,
             "weights_verified": weights_verified,
             "model_integrity_verified": model_integrity_verified,
+            "optimized_inference": self.inference_model is not None,
             "weights_path": self.model_path,
         }
 
@@ -1181,11 +1389,33 @@ async def get_pat_service() -> PATModelService:
     logger.info("Initializing global PATModelService for the first time...")
     service_instance: PATModelService | None = None
     try:
-        service_instance = PATModelService()  # Default model_size="medium"
+        if os.getenv("PAT_INFERENCE_BACKEND", "torch").lower() == "onnx":
+            # Import here to avoid circular dependency
+            from clarity.ml.pat_onnx import PATOnnxService  # noqa: PLC0415
+
+            service_instance = PATOnnxService(
+                intra_op_threads=int(os.getenv("PAT_ONNX_INTRA_OP_THREADS", "0")),
+                inter_op_threads=int(os.getenv("PAT_ONNX_INTER_OP_THREADS", "0")),
+            )
+        else:
+            service_instance = PATModelService()  # Default model_size="medium"
         # Removed: if not isinstance(service_instance, PATModelService): block
 
         await service_instance.load_model()
 
+        if (
+            os.getenv("PAT_OPTIMIZED_INFERENCE", "false").lower() == "true"
+            and service_instance.model is not None
+        ):
+            # Import here to avoid circular dependency
+            from clarity.ml.pat_optimization import (  # noqa: PLC0415
+                PATPerformanceOptimizer,
+            )
+
+            await PATPerformanceOptimizer(
+                service_instance
+            ).enable_optimized_inference()
+
     except Exception as e:
         logger.critical(
             "Failed to initialize global PATModelService: %s", e, exc_info=True
@@ -37,11 +37,14 @@ class PATServiceV2:
         model_size: str = "medium",
         *,
         enable_monitoring: bool = True,
+        adaptive_routing: bool = False,
         progressive_config: ProgressiveLoadingConfig | None = None,
         monitoring_config: ModelMonitoringConfig | None = None,
     ) -> None:
         self.model_size = model_size
         self.enable_monitoring = enable_monitoring
+        # Route each request across PAT-L/M/S by load instead of model_size
+        self.adaptive_routing = adaptive_routing
 
         # Initialize services
         self.progressive_service: ProgressiveLoadingService | None = None
@@ -55,6 +58,7 @@ class PATServiceV2:
         self.is_initialized = False
         self.current_model: LoadedModel | None = None
         self.fallback_service: PATModelService | None = None
+        self._preload_tasks: set[asyncio.Task[bool]] = set()
 
         # Model mapping
         self.size_to_version = {
@@ -117,6 +121,16 @@ class PATServiceV2:
             else:
                 logger.warning("Failed to load PAT model: pat:%s", version)
 
+            # Load the other tiers in the background so there is a tier to
+            # degrade to
+            if self.adaptive_routing and self.progressive_service:
+                for other_version in set(self.size_to_version.values()) - {version}:
+                    task = asyncio.create_task(
+                        self.progressive_service.preload_model("pat", other_version)
+                    )
+                    self._preload_tasks.add(task)
+                    task.add_done_callback(self._preload_tasks.discard)
+
         except (RuntimeError, AttributeError) as e:
             logger.exception("Error loading PAT model: %s", e)
 
@@ -138,22 +152,27 @@ class PATServiceV2:
 
         Args:
             actigraphy_data: Input actigraphy data
-            options: Additional prediction options
+            options: Additional prediction options. ``tier`` ("small",
+                "medium" or "large") pins the request to that PAT model.
 
         Returns:
-            Prediction results
+            Prediction results; ``model_info["tier"]`` is the tier that answered
         """
         if not self.is_initialized:
             msg = "PAT Service V2 not initialized"
             raise RuntimeError(msg)
 
         start_time = time.time()
+        options = dict(options or {})
+        requested_tier = options.pop("tier", None)
+
+        model, tier = await self._select_model(requested_tier)
 
         # Try using the progressive model first
-        if self.current_model:
+        if model:
             try:
                 result = await self._predict_with_progressive_model(
-                    actigraphy_data, options
+                    actigraphy_data, options, model=model, tier=tier
                 )
 
                 # Record monitoring metrics
@@ -161,7 +180,7 @@ class PATServiceV2:
                     latency_ms = (time.time() - start_time) * 1000
                     self.monitoring_service.record_inference(
                         model_id="pat",
-                        version=self.current_model.metadata.version,
+                        version=model.metadata.version,
                         latency_ms=latency_ms,
                         success=True,
                     )
@@ -176,7 +195,7 @@ class PATServiceV2:
                     latency_ms = (time.time() - start_time) * 1000
                     self.monitoring_service.record_inference(
                         model_id="pat",
-                        version=self.current_model.metadata.version,
+                        version=model.metadata.version,
                         latency_ms=latency_ms,
                         success=False,
                         error_type=type(e).__name__,
@@ -195,27 +214,51 @@ class PATServiceV2:
         msg = "No available models for prediction"
         raise RuntimeError(msg)
 
+    async def _select_model(
+        self, requested_tier: str | None
+    ) -> tuple[LoadedModel | None, str]:
+        """Choose the model (and its tier) that answers one request."""
+        manager = (
+            self.progressive_service.model_manager
+            if self.progressive_service
+            else None
+        )
+        if manager is None or not (self.adaptive_routing or requested_tier):
+            return self.current_model, self.model_size
+
+        routed = await manager.route_model(
+            "pat", self.size_to_version, requested_tier=requested_tier
+        )
+        if routed is None:
+            return self.current_model, self.model_size
+        return routed
+
     async def _predict_with_progressive_model(
         self,
         actigraphy_data: list[float] | dict[str, Any],
         options: dict[str, Any] | None = None,
+        *,
+        model: LoadedModel | None = None,
+        tier: str | None = None,
     ) -> dict[str, Any]:
         """Make prediction using the progressive model."""
+        model = model or self.current_model
+
         # Prepare input data
         if isinstance(actigraphy_data, list):
             input_data = {"actigraphy_data": actigraphy_data}
         else:
-            input_data = actigraphy_data
+            input_data = dict(actigraphy_data)
 
         # Add options if provided
         if options:
             input_data.update(options)
 
         # Use the model's predict method
-        if not self.current_model:
+        if not model:
             msg = "No model loaded"
             raise RuntimeError(msg)
-        raw_result = await self.current_model.predict(**input_data)
+        raw_result = await model.predict(**input_data)
 
         # Ensure consistent output format
         if isinstance(raw_result, dict):
@@ -224,13 +267,13 @@ class PATServiceV2:
             result = {"predictions": raw_result}
 
         # Add metadata
-        if self.current_model:
-            result["model_info"] = {
-                "model_id": self.current_model.metadata.model_id,
-                "version": self.current_model.metadata.version,
-                "model_size": self.model_size,
-                "service_version": "v2",
-            }
+        result["model_info"] = {
+            "model_id": model.metadata.model_id,
+            "version": model.metadata.version,
+            "model_size": self.model_size,
+            "tier": tier or self.model_size,
+            "service_version": "v2",
+        }
 
         return result
 
@@ -260,6 +303,7 @@ class PATServiceV2:
                 "model_id": "pat",
                 "version": "fallback",
                 "model_size": self.model_size,
+                "tier": self.model_size,
                 "service_version": "v2_fallback",
             },
         }
@@ -424,6 +468,7 @@ async def create_pat_service(
     model_size: str = "medium",
     *,
     enable_monitoring: bool = True,
+    adaptive_routing: bool = False,
     progressive_config: ProgressiveLoadingConfig | None = None,
     monitoring_config: ModelMonitoringConfig | None = None,
 ) -> PATServiceV2:
@@ -432,6 +477,7 @@ async def create_pat_service(
     Args:
         model_size: Model size (small, medium, large)
         enable_monitoring: Enable performance monitoring
+        adaptive_routing: Route requests across tiers by queue depth and p95
         progressive_config: Progressive loading configuration
         monitoring_config: Monitoring configuration
 
@@ -441,6 +487,7 @@ async def create_pat_service(
     service = PATServiceV2(
         model_size=model_size,
         enable_monitoring=enable_monitoring,
+        adaptive_routing=adaptive_routing,
         progressive_config=progressive_config,
         monitoring_config=monitoring_config,
     )
@@ -2,20 +2,25 @@
 
 This service handles the preprocessing of health data for ML model input,
 following the Strategy pattern for different preprocessing approaches.
+
+Activity can be preprocessed from a float32 array as well as from
+``ActigraphyDataPoint`` objects. The array path makes one copy, into the
+model-length window, normalizes it in place and hands the buffer to torch
+with ``torch.from_numpy``.
 """
 
 # removed - breaks FastAPI
 
 from datetime import datetime
 import logging
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 import numpy as np
+import numpy.typing as npt
 from pydantic import BaseModel, Field
 import torch
 
 from clarity.models.health_data import HealthMetric
-from clarity.utils.time_window import prepare_for_pat_inference
 
 if TYPE_CHECKING:
     pass  # Only for type stubs now
@@ -39,6 +44,12 @@ class PreprocessingStrategy(Protocol):
         """Preprocess data points into model-ready tensor."""
         ...
 
+    def preprocess_array(
+        self, values: npt.NDArray[np.floating[Any]], target_length: int
+    ) -> torch.Tensor:
+        """Preprocess an array of activity values into model-ready tensor."""
+        ...
+
 
 class StandardActigraphyPreprocessor:
     """Standard actigraphy preprocessing implementation."""
@@ -56,24 +67,49 @@ class StandardActigraphyPreprocessor:
         Returns:
             Preprocessed tensor ready for model input
         """
-        # Extract activity values
-        values = [point.value for point in data_points]
+        values = np.fromiter(
+            (point.value for point in data_points),
+            dtype=np.float32,
+            count=len(data_points),
+        )
+        return StandardActigraphyPreprocessor.preprocess_array(values, target_length)
+
+    @staticmethod
+    def preprocess_array(
+        values: npt.NDArray[np.floating[Any]], target_length: int = 1440
+    ) -> torch.Tensor:
+        """Preprocess an array of activity values for PAT model input.
 
-        # Convert to numpy array
-        activity_data = np.array(values, dtype=np.float32)
+        Same result as ``preprocess``: z-scored over the whole input, the most
+        recent ``target_length`` values kept and shorter inputs left-padded
+        with zeros. ``values`` is not modified.
+
+        Args:
+            values: Activity values in time order (float32 avoids a cast)
+            target_length: Target sequence length
+
+        Returns:
+            Preprocessed tensor ready for model input
+        """
+        activity_data = np.asarray(values, dtype=np.float32)
+        original_length = len(activity_data)
 
-        # Normalize data (z-score normalization)
-        if len(activity_data) > 1:
+        # Z-score statistics cover the whole input, not just the kept window
+        mean_val = std_val = None
+        if original_length > 1:
             mean_val = np.mean(activity_data)
             std_val = np.std(activity_data)
-            if std_val > 0:
-                activity_data = (activity_data - mean_val) / std_val
 
-        # Resize to target length using canonical approach
-        # This now uses truncation for long sequences (keeping most recent data)
-        # and padding for short sequences
-        original_length = len(activity_data)
-        activity_data = prepare_for_pat_inference(activity_data, target_length)
+        # The only copy: most recent samples go to the end of the window and
+        # shorter inputs keep zero padding on the left
+        window = np.zeros(target_length, dtype=np.float32)
+        kept = min(original_length, target_length)
+        if kept > 0:
+            recent = window[target_length - kept :]
+            recent[:] = activity_data[original_length - kept :]
+            if std_val is not None and std_val > 0:
+                recent -= mean_val
+                recent /= std_val
 
         if original_length != target_length:
             logger.debug(
@@ -82,8 +118,8 @@ class StandardActigraphyPreprocessor:
                 target_length,
             )
 
-        # Convert to tensor (PAT expects 1D sequence, service adds batch dim)
-        return torch.FloatTensor(activity_data)
+        # Shares the window buffer (PAT expects 1D sequence, service adds batch dim)
+        return torch.from_numpy(window)
 
 
 class HealthDataPreprocessor:
@@ -104,27 +140,52 @@ class HealthDataPreprocessor:
         actigraphy_points: list[ActigraphyDataPoint] = []
 
         for metric in metrics:
-            # Extract activity data from different metric types
-            if metric.activity_data and metric.activity_data.steps:
-                actigraphy_points.append(
-                    ActigraphyDataPoint(
-                        timestamp=metric.created_at,
-                        value=float(metric.activity_data.steps),
-                    )
-                )
-            elif metric.biometric_data and metric.biometric_data.heart_rate:
-                # Use heart rate as activity proxy
+            value = _activity_value(metric)
+            if value is not None:
                 actigraphy_points.append(
-                    ActigraphyDataPoint(
-                        timestamp=metric.created_at,
-                        value=float(metric.biometric_data.heart_rate),
-                    )
+                    ActigraphyDataPoint(timestamp=metric.created_at, value=value)
                 )
 
         return actigraphy_points
 
+    @staticmethod
+    def convert_health_metrics_to_activity_array(
+        metrics: list[HealthMetric],
+    ) -> tuple[npt.NDArray[np.float32], datetime | None]:
+        """Extract activity values from HealthMetric objects into an array.
+
+        Selects the same values as ``convert_health_metrics_to_actigraphy``
+        without building a data point per metric.
+
+        Returns:
+            Activity values and the timestamp of the first one (None if empty)
+        """
+        values = np.fromiter(
+            (v for v in map(_activity_value, metrics) if v is not None),
+            dtype=np.float32,
+        )
+        start_time = next(
+            (m.created_at for m in metrics if _activity_value(m) is not None), None
+        )
+        return values, start_time
+
     def preprocess_for_pat_model(
         self, data_points: list[ActigraphyDataPoint], target_length: int = 1440
     ) -> torch.Tensor:
         """Preprocess data using the current strategy."""
         return self.strategy.preprocess(data_points, target_length)
+
+    def preprocess_array_for_pat_model(
+        self, values: npt.NDArray[np.floating[Any]], target_length: int = 1440
+    ) -> torch.Tensor:
+        """Preprocess an activity array using the current strategy."""
+        return self.strategy.preprocess_array(values, target_length)
+
+
+def _activity_value(metric: HealthMetric) -> float | None:
+    """Activity value of a metric: steps, else heart rate as a proxy."""
+    if metric.activity_data and metric.activity_data.steps:
+        return float(metric.activity_data.steps)
+    if metric.biometric_data and metric.biometric_data.heart_rate:
+        return float(metric.biometric_data.heart_rate)
+    return None
@@ -35,6 +35,18 @@ logger = logging.getLogger(__name__)
 # Constants
 MIN_VALUES_FOR_CONSISTENCY = 2
 
+# ActivityData fields aggregated into features
+ACTIVITY_VALUE_FIELDS = (
+    "steps",
+    "distance",
+    "active_energy",
+    "exercise_minutes",
+    "flights_climbed",
+    "active_minutes",
+    "vo2_max",
+    "resting_heart_rate",
+)
+
 
 class ActivityProcessor:
     """Process activity and fitness metrics for clear, actionable insights.
@@ -125,39 +137,66 @@ class ActivityProcessor:
         if not activity_data:
             return []
 
-        # Aggregate metrics
-        steps = [data.steps for data in activity_data if data.steps is not None]
-        distances = [
-            data.distance for data in activity_data if data.distance is not None
-        ]
-        active_energy = [
-            data.active_energy
-            for data in activity_data
-            if data.active_energy is not None
-        ]
-        exercise_minutes = [
-            data.exercise_minutes
-            for data in activity_data
-            if data.exercise_minutes is not None
-        ]
-        flights_climbed = [
-            data.flights_climbed
-            for data in activity_data
-            if data.flights_climbed is not None
-        ]
-        active_minutes = [
-            data.active_minutes
-            for data in activity_data
-            if data.active_minutes is not None
-        ]
-        vo2_max_values = [
-            data.vo2_max for data in activity_data if data.vo2_max is not None
-        ]
-        resting_hr_values = [
-            data.resting_heart_rate
-            for data in activity_data
-            if data.resting_heart_rate is not None
-        ]
+        return self._features_from_values(self.collect_values(activity_data))
+
+    @staticmethod
+    def collect_values(activity_data: list[ActivityData]) -> dict[str, list[Any]]:
+        """Collect the non-missing value of each activity field.
+
+        The lists of separate days can be concatenated (in day order) and
+        passed to ``process_values``.
+
+        Args:
+            activity_data: List of activity data points
+
+        Returns:
+            Values per ``ActivityData`` field, in input order
+        """
+        return {
+            field: [
+                value
+                for data in activity_data
+                if (value := getattr(data, field)) is not None
+            ]
+            for field in ACTIVITY_VALUE_FIELDS
+        }
+
+    def process_values(
+        self, values: dict[str, list[Any]], record_count: int
+    ) -> list[dict[str, Any]]:
+        """Calculate activity features from values gathered by ``collect_values``.
+
+        Args:
+            values: Values per activity field
+            record_count: Number of activity data points the values came from
+
+        Returns:
+            List of activity feature dictionaries
+        """
+        if record_count == 0:
+            logger.warning("No activity data found in metrics")
+            return [{"warning": "No activity data available"}]
+
+        try:
+            features = self._features_from_values(values)
+        except Exception as e:
+            logger.exception("Failed to process activity data")
+            return [{"error": f"ActivityProcessor failed: {e!s}"}]
+        logger.info("✅ Extracted %d activity features", len(features))
+        return features
+
+    def _features_from_values(
+        self, values: dict[str, list[Any]]
+    ) -> list[dict[str, Any]]:
+        """Calculate activity features from per-field value lists."""
+        steps = values["steps"]
+        distances = values["distance"]
+        active_energy = values["active_energy"]
+        exercise_minutes = values["exercise_minutes"]
+        flights_climbed = values["flights_climbed"]
+        active_minutes = values["active_minutes"]
+        vo2_max_values = values["vo2_max"]
+        resting_hr_values = values["resting_heart_rate"]
 
         # Calculate features
         features = []
@@ -73,10 +73,10 @@ class CardioProcessor:
 
     def process(
         self,
-        hr_timestamps: list[datetime],
-        hr_values: list[float],
-        hrv_timestamps: list[datetime] | None = None,
-        hrv_values: list[float] | None = None,
+        hr_timestamps: list[datetime] | np.ndarray,
+        hr_values: list[float] | np.ndarray,
+        hrv_timestamps: list[datetime] | np.ndarray | None = None,
+        hrv_values: list[float] | np.ndarray | None = None,
     ) -> list[float]:
         """Process heart rate and HRV data to extract cardiovascular features.
 
@@ -93,14 +93,64 @@ class CardioProcessor:
             self.logger.info(
                 "Processing cardiovascular data: %d HR samples", len(hr_values)
             )
+            hr_bins, hrv_bins = self.resample(
+                hr_timestamps, hr_values, hrv_timestamps, hrv_values
+            )
+        except Exception:
+            self.logger.exception("Error processing cardiovascular data")
+            return [0.0] * 8
+
+        return self.process_resampled(hr_bins, hrv_bins)
 
+    @staticmethod
+    def resample(
+        hr_timestamps: list[datetime] | np.ndarray,
+        hr_values: list[float] | np.ndarray,
+        hrv_timestamps: list[datetime] | np.ndarray | None = None,
+        hrv_values: list[float] | np.ndarray | None = None,
+    ) -> tuple[pd.Series, pd.Series | None]:
+        """Average raw HR and HRV samples into their fixed-width bins.
+
+        Bins never straddle midnight, so the bins of separate days can be
+        concatenated and passed to ``process_resampled`` to get the same
+        features as processing all samples at once.
+
+        Returns:
+            Per-minute HR means and per-5-minute HRV means (None without HRV)
+        """
+        hr_bins = CardioProcessor._resample_heart_rate(hr_timestamps, hr_values)
+        hrv_bins = None
+        if (
+            hrv_timestamps is not None
+            and hrv_values is not None
+            and len(hrv_values) > 0
+        ):
+            hrv_bins = CardioProcessor._resample_hrv(hrv_timestamps, hrv_values)
+        return hr_bins, hrv_bins
+
+    def process_resampled(
+        self, hr_bins: pd.Series | None, hrv_bins: pd.Series | None = None
+    ) -> list[float]:
+        """Extract cardiovascular features from binned HR and HRV means.
+
+        Args:
+            hr_bins: Per-minute HR means, e.g. from ``resample``; missing
+                minutes are filled in as gaps
+            hrv_bins: Optional per-5-minute HRV means
+
+        Returns:
+            List of 8 cardiovascular features
+        """
+        try:
             # Preprocess heart rate data
-            hr_clean = self._preprocess_heart_rate(hr_timestamps, hr_values)
+            hr_clean = self._clean_heart_rate(
+                hr_bins if hr_bins is not None else pd.Series(dtype=float)
+            )
 
             # Preprocess HRV data if available
             hrv_clean = None
-            if hrv_timestamps and hrv_values:
-                hrv_clean = self._preprocess_hrv(hrv_timestamps, hrv_values)
+            if hrv_bins is not None and len(hrv_bins) > 0:
+                hrv_clean = self._clean_hrv(hrv_bins)
 
             # Extract features
             features = self._extract_features(hr_clean, hrv_clean)
@@ -130,17 +180,35 @@ class CardioProcessor:
 
     @staticmethod
     def _preprocess_heart_rate(
-        timestamps: list[datetime], values: list[float]
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
     ) -> pd.Series:
         """Clean and normalize heart rate time series."""
-        if not timestamps or not values:
+        return CardioProcessor._clean_heart_rate(
+            CardioProcessor._resample_heart_rate(timestamps, values)
+        )
+
+    @staticmethod
+    def _resample_heart_rate(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
+        """Average heart rate samples per minute."""
+        if len(timestamps) == 0 or len(values) == 0:
             return pd.Series(dtype=float)
 
         # Create pandas Series for resampling
         ts = pd.Series(values, index=pd.to_datetime(timestamps))
 
         # Resample to 1-minute frequency
-        hr_per_min = ts.resample(HR_RESAMPLE_INTERVAL).mean()
+        return ts.resample(HR_RESAMPLE_INTERVAL).mean()
+
+    @staticmethod
+    def _clean_heart_rate(hr_per_min: pd.Series) -> pd.Series:
+        """Remove outliers, fill gaps and smooth per-minute heart rate."""
+        if len(hr_per_min) == 0:
+            return hr_per_min
+
+        # Restore minutes missing between concatenated bins
+        hr_per_min = hr_per_min.asfreq(HR_RESAMPLE_INTERVAL)
 
         # Remove outliers (HR outside physiological range)
         hr_per_min = hr_per_min.mask(
@@ -161,16 +229,36 @@ class CardioProcessor:
         return hr_smoothed.ffill().bfill()
 
     @staticmethod
-    def _preprocess_hrv(timestamps: list[datetime], values: list[float]) -> pd.Series:
+    def _preprocess_hrv(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
         """Clean and normalize HRV time series."""
-        if not timestamps or not values:
+        return CardioProcessor._clean_hrv(
+            CardioProcessor._resample_hrv(timestamps, values)
+        )
+
+    @staticmethod
+    def _resample_hrv(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
+        """Average HRV samples per 5 minutes."""
+        if len(timestamps) == 0 or len(values) == 0:
             return pd.Series(dtype=float)
 
         # Create pandas Series
         ts = pd.Series(values, index=pd.to_datetime(timestamps))
 
         # Resample to 5-minute frequency (HRV is typically less frequent)
-        hrv_resampled = ts.resample(HRV_RESAMPLE_INTERVAL).mean()
+        return ts.resample(HRV_RESAMPLE_INTERVAL).mean()
+
+    @staticmethod
+    def _clean_hrv(hrv_resampled: pd.Series) -> pd.Series:
+        """Remove outliers and fill gaps in 5-minute HRV."""
+        if len(hrv_resampled) == 0:
+            return hrv_resampled
+
+        # Restore bins missing between concatenated days
+        hrv_resampled = hrv_resampled.asfreq(HRV_RESAMPLE_INTERVAL)
 
         # Remove outliers (HRV outside physiological range)
         hrv_resampled = hrv_resampled.mask(
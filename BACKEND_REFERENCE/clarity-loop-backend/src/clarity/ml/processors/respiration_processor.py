@@ -81,10 +81,10 @@ class RespirationProcessor:
 
     def process(
         self,
-        rr_timestamps: list[datetime] | None = None,
-        rr_values: list[float] | None = None,
-        spo2_timestamps: list[datetime] | None = None,
-        spo2_values: list[float] | None = None,
+        rr_timestamps: list[datetime] | np.ndarray | None = None,
+        rr_values: list[float] | np.ndarray | None = None,
+        spo2_timestamps: list[datetime] | np.ndarray | None = None,
+        spo2_values: list[float] | np.ndarray | None = None,
     ) -> list[float]:
         """Process respiratory rate and SpO2 data to extract respiratory features.
 
@@ -100,19 +100,76 @@ class RespirationProcessor:
         try:
             self.logger.info(
                 "Processing respiratory data: %d RR samples, %d SpO2 samples",
-                len(rr_values) if rr_values else 0,
-                len(spo2_values) if spo2_values else 0,
+                len(rr_values) if rr_values is not None else 0,
+                len(spo2_values) if spo2_values is not None else 0,
+            )
+            rr_bins, spo2_bins = self.resample(
+                rr_timestamps, rr_values, spo2_timestamps, spo2_values
+            )
+        except Exception:
+            self.logger.exception("Error processing respiratory data")
+            return self._default_features()
+
+        return self.process_resampled(rr_bins, spo2_bins)
+
+    @staticmethod
+    def resample(
+        rr_timestamps: list[datetime] | np.ndarray | None = None,
+        rr_values: list[float] | np.ndarray | None = None,
+        spo2_timestamps: list[datetime] | np.ndarray | None = None,
+        spo2_values: list[float] | np.ndarray | None = None,
+    ) -> tuple[pd.Series | None, pd.Series | None]:
+        """Average raw RR and SpO2 samples into their fixed-width bins.
+
+        Bins never straddle midnight, so the bins of separate days can be
+        concatenated and passed to ``process_resampled``.
+
+        Returns:
+            Per-5-minute RR means and per-10-minute SpO2 means (None when
+            a channel has no samples)
+        """
+        rr_bins = None
+        if rr_timestamps is not None and rr_values is not None and len(rr_values) > 0:
+            rr_bins = RespirationProcessor._resample_respiratory_rate(
+                rr_timestamps, rr_values
             )
 
+        spo2_bins = None
+        if (
+            spo2_timestamps is not None
+            and spo2_values is not None
+            and len(spo2_values) > 0
+        ):
+            spo2_bins = RespirationProcessor._resample_spo2(
+                spo2_timestamps, spo2_values
+            )
+        return rr_bins, spo2_bins
+
+    def process_resampled(
+        self,
+        rr_bins: pd.Series | None = None,
+        spo2_bins: pd.Series | None = None,
+    ) -> list[float]:
+        """Extract respiratory features from binned RR and SpO2 means.
+
+        Args:
+            rr_bins: Optional per-5-minute RR means, e.g. from ``resample``;
+                missing bins are filled in as gaps
+            spo2_bins: Optional per-10-minute SpO2 means
+
+        Returns:
+            List of 8 respiratory features
+        """
+        try:
             # Preprocess respiratory rate data
             rr_clean = None
-            if rr_timestamps and rr_values:
-                rr_clean = self._preprocess_respiratory_rate(rr_timestamps, rr_values)
+            if rr_bins is not None and len(rr_bins) > 0:
+                rr_clean = self._clean_respiratory_rate(rr_bins)
 
             # Preprocess SpO2 data
             spo2_clean = None
-            if spo2_timestamps and spo2_values:
-                spo2_clean = self._preprocess_spo2(spo2_timestamps, spo2_values)
+            if spo2_bins is not None and len(spo2_bins) > 0:
+                spo2_clean = self._clean_spo2(spo2_bins)
 
             # Extract features
             features = self._extract_features(rr_clean, spo2_clean)
@@ -126,16 +183,7 @@ class RespirationProcessor:
         except Exception:
             self.logger.exception("Error processing respiratory data")
             # Return default values on error
-            return [
-                DEFAULT_RR,
-                DEFAULT_RESTING_RR,
-                DEFAULT_RR_VARIABILITY,
-                DEFAULT_SPO2,
-                DEFAULT_MIN_SPO2,
-                DEFAULT_SPO2_VARIABILITY,
-                DEFAULT_STABILITY_SCORE,
-                DEFAULT_EFFICIENCY_SCORE,
-            ]
+            return self._default_features()
         else:
             # Return as list for fusion layer
             return [
@@ -149,19 +197,51 @@ class RespirationProcessor:
                 features.oxygenation_efficiency_score,
             ]
 
+    @staticmethod
+    def _default_features() -> list[float]:
+        """Healthy default feature vector used when processing fails."""
+        return [
+            DEFAULT_RR,
+            DEFAULT_RESTING_RR,
+            DEFAULT_RR_VARIABILITY,
+            DEFAULT_SPO2,
+            DEFAULT_MIN_SPO2,
+            DEFAULT_SPO2_VARIABILITY,
+            DEFAULT_STABILITY_SCORE,
+            DEFAULT_EFFICIENCY_SCORE,
+        ]
+
     @staticmethod
     def _preprocess_respiratory_rate(
-        timestamps: list[datetime], values: list[float]
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
     ) -> pd.Series:
         """Clean and normalize respiratory rate time series."""
-        if not timestamps or not values:
+        return RespirationProcessor._clean_respiratory_rate(
+            RespirationProcessor._resample_respiratory_rate(timestamps, values)
+        )
+
+    @staticmethod
+    def _resample_respiratory_rate(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
+        """Average respiratory rate samples per 5 minutes."""
+        if len(timestamps) == 0 or len(values) == 0:
             return pd.Series(dtype=float)
 
         # Create pandas Series for resampling
         ts = pd.Series(values, index=pd.to_datetime(timestamps))
 
         # Resample to 5-minute frequency (RR is typically less frequent than HR)
-        rr_resampled = ts.resample(RR_RESAMPLE_INTERVAL).mean()
+        return ts.resample(RR_RESAMPLE_INTERVAL).mean()
+
+    @staticmethod
+    def _clean_respiratory_rate(rr_resampled: pd.Series) -> pd.Series:
+        """Remove outliers, fill gaps and smooth 5-minute respiratory rate."""
+        if len(rr_resampled) == 0:
+            return rr_resampled
+
+        # Restore bins missing between concatenated days
+        rr_resampled = rr_resampled.asfreq(RR_RESAMPLE_INTERVAL)
 
         # Remove outliers (RR outside physiological range)
         rr_resampled = rr_resampled.mask(
@@ -184,16 +264,36 @@ class RespirationProcessor:
         return rr_smoothed.ffill().bfill()
 
     @staticmethod
-    def _preprocess_spo2(timestamps: list[datetime], values: list[float]) -> pd.Series:
+    def _preprocess_spo2(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
         """Clean and normalize SpO2 time series."""
-        if not timestamps or not values:
+        return RespirationProcessor._clean_spo2(
+            RespirationProcessor._resample_spo2(timestamps, values)
+        )
+
+    @staticmethod
+    def _resample_spo2(
+        timestamps: list[datetime] | np.ndarray, values: list[float] | np.ndarray
+    ) -> pd.Series:
+        """Average SpO2 samples per 10 minutes."""
+        if len(timestamps) == 0 or len(values) == 0:
             return pd.Series(dtype=float)
 
         # Create pandas Series
         ts = pd.Series(values, index=pd.to_datetime(timestamps))
 
         # Resample to 10-minute frequency (SpO2 is often periodic)
-        spo2_resampled = ts.resample(SPO2_RESAMPLE_INTERVAL).mean()
+        return ts.resample(SPO2_RESAMPLE_INTERVAL).mean()
+
+    @staticmethod
+    def _clean_spo2(spo2_resampled: pd.Series) -> pd.Series:
+        """Remove outliers and fill gaps in 10-minute SpO2."""
+        if len(spo2_resampled) == 0:
+            return spo2_resampled
+
+        # Restore bins missing between concatenated days
+        spo2_resampled = spo2_resampled.asfreq(SPO2_RESAMPLE_INTERVAL)
 
         # Remove outliers (SpO2 outside physiological range)
         spo2_resampled = spo2_resampled.mask(
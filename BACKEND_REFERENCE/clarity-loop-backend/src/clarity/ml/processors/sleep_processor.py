@@ -138,6 +138,24 @@ class SleepProcessor:
 
         self.logger.info("Processing %d sleep records", len(sleep_data_list))
 
+        return self.process_record_features(
+            self.collect_record_features(sleep_data_list)
+        )
+
+    def collect_record_features(
+        self, sleep_data_list: list[SleepData]
+    ) -> dict[str, list[float]]:
+        """Extract the per-record features that ``process`` averages.
+
+        The lists of separate days can be concatenated (in day order) and
+        passed to ``process_record_features``.
+
+        Args:
+            sleep_data_list: Sleep records
+
+        Returns:
+            Feature values per name, one entry per record
+        """
         # Initialize feature collections
         feature_sets: dict[str, list[float]] = {
             "total_sleep": [],
@@ -157,6 +175,23 @@ class SleepProcessor:
             self._extract_sleep_stages(sleep_data, feature_sets)
             self._extract_timing_features(sleep_data, feature_sets)
 
+        return feature_sets
+
+    def process_record_features(
+        self, feature_sets: dict[str, list[float]]
+    ) -> SleepFeatures:
+        """Aggregate per-record features from ``collect_record_features``.
+
+        Args:
+            feature_sets: Feature values per name, one entry per record
+
+        Returns:
+            SleepFeatures object with aggregated features
+        """
+        if not feature_sets["total_sleep"]:
+            self.logger.warning("No sleep data found in metrics")
+            return self._create_empty_features()
+
         # Calculate aggregated features
         features = SleepFeatures(
             total_sleep_minutes=float(np.mean(feature_sets["total_sleep"])),
@@ -8,18 +8,54 @@ Replaces Google Pub/Sub with AWS-native solution using SQS and SNS.
 
 import asyncio
 from datetime import UTC, datetime
+from functools import partial
 import json
 import logging
+import time
 from typing import Any, cast
+import uuid
 
 import boto3
 from botocore.exceptions import ClientError
+from prometheus_client import Counter, Histogram
 from pydantic import BaseModel
 
+from clarity.core.constants import (
+    MESSAGE_COMPRESS_THRESHOLD_BYTES,
+    MESSAGE_MAX_INLINE_BYTES,
+    SQS_MAX_BATCH_SIZE,
+    SQS_MAX_MESSAGE_BYTES,
+)
 from clarity.core.decorators import log_execution
+from clarity.core.tracing import inject, start_span
+from clarity.services.message_batching import (
+    BatchSender,
+    MessageBatcher,
+    OutboundMessage,
+    compress_payload,
+    s3_pointer_payload,
+)
+from clarity.services.sqs_messaging_service import MessagingError
 
 logger = logging.getLogger(__name__)
 
+# Prometheus metrics for outbound messaging
+MESSAGING_PUBLISH_LATENCY_SECONDS = Histogram(
+    "clarity_messaging_publish_latency_seconds",
+    "Latency of SQS/SNS publish API calls",
+    ["destination", "mode"],
+)
+MESSAGING_PUBLISHED_TOTAL = Counter(
+    "clarity_messaging_published_total",
+    "Messages published to SQS/SNS",
+    ["destination", "outcome"],
+)
+MESSAGING_PAYLOAD_ENCODING_TOTAL = Counter(
+    "clarity_messaging_payload_encoding_total",
+    "Outbound payloads by encoding (inline, gzip, s3)",
+    ["encoding"],
+)
+
 
 class HealthDataEvent(BaseModel):
     """Health data processing event."""
@@ -47,6 +83,12 @@ class AWSMessagingService:
     """AWS SQS/SNS messaging service for health data processing events.
 
     Replaces Google Pub/Sub with enterprise-grade AWS messaging.
+
+    With ``batch_linger_seconds`` set, concurrent publishes are coalesced
+    into ``SendMessageBatch``/``PublishBatch`` calls of up to 10 messages.
+    Payloads above the compression threshold are gzipped, and payloads that
+    still exceed the SQS size limit are offloaded to ``payload_bucket`` with
+    a pointer message.
     """
 
     def __init__(
@@ -56,6 +98,9 @@ class AWSMessagingService:
         health_data_queue: str = "clarity-health-data-processing",
         insight_queue: str = "clarity-insight-generation",
         sns_topic_arn: str | None = None,
+        batch_linger_seconds: float | None = None,
+        payload_bucket: str | None = None,
+        compress_threshold_bytes: int = MESSAGE_COMPRESS_THRESHOLD_BYTES,
     ) -> None:
         """Initialize AWS messaging service.
 
@@ -65,6 +110,9 @@ class AWSMessagingService:
             health_data_queue: SQS queue name for health data processing
             insight_queue: SQS queue name for insight generation
             sns_topic_arn: Optional SNS topic ARN for fan-out messaging
+            batch_linger_seconds: Enables batched publishing with this linger
+            payload_bucket: Optional S3 bucket for oversized payloads
+            compress_threshold_bytes: Payload size above which bodies are gzipped
         """
         self.region = region
         self.endpoint_url = endpoint_url
@@ -88,10 +136,21 @@ class AWSMessagingService:
         else:
             self.sns_client = None
 
+        self.payload_bucket = payload_bucket
+        self.s3_client = (
+            boto3.client("s3", region_name=region, endpoint_url=endpoint_url)
+            if payload_bucket
+            else None
+        )
+        self.compress_threshold_bytes = compress_threshold_bytes
+        self.batch_linger_seconds = batch_linger_seconds
+        self._batchers: dict[str, MessageBatcher] = {}
+
         self.logger = logging.getLogger(__name__)
 
         # Get queue URLs (create if they don't exist)
         self._queue_urls: dict[str, str] = {}
+        self._queue_url_lock = asyncio.Lock()
 
         logger.info("AWS messaging service initialized for region: %s", region)
 
@@ -100,6 +159,14 @@ class AWSMessagingService:
         if queue_name in self._queue_urls:
             return self._queue_urls[queue_name]
 
+        # Concurrent first publishes resolve the URL once
+        async with self._queue_url_lock:
+            if queue_name in self._queue_urls:
+                return self._queue_urls[queue_name]
+            return await self._resolve_queue_url(queue_name)
+
+    async def _resolve_queue_url(self, queue_name: str) -> str:
+        """Look up (or create) a queue and cache its URL."""
         loop = asyncio.get_event_loop()
         try:
             # Try to get existing queue
@@ -160,46 +227,21 @@ class AWSMessagingService:
                 "metadata": metadata or {},
             }
 
-            # Get queue URL
-            queue_url = await self._get_queue_url(self.health_data_queue)
-
-            # Send message to SQS
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.sqs_client.send_message(
-                    QueueUrl=queue_url,
-                    MessageBody=json.dumps(message_data),
-                    MessageAttributes={
-                        "user_id": {
-                            "StringValue": user_id,
-                            "DataType": "String",
-                        },
-                        "upload_id": {
-                            "StringValue": upload_id,
-                            "DataType": "String",
-                        },
-                        "event_type": {
-                            "StringValue": "health_data_upload",
-                            "DataType": "String",
-                        },
-                    },
-                ),
+            message_id = await self._publish_event(
+                self.health_data_queue,
+                message_data,
+                queue_attributes={
+                    "user_id": user_id,
+                    "upload_id": upload_id,
+                    "event_type": "health_data_upload",
+                },
+                subject="Health Data Upload",
+                topic_attributes={
+                    "event_type": "health_data_upload",
+                    "user_id": user_id,
+                },
             )
 
-            message_id: str = response["MessageId"]
-
-            # Also publish to SNS for fan-out if configured
-            if self.sns_client and self.sns_topic_arn:
-                await self._publish_to_sns(
-                    subject="Health Data Upload",
-                    message=message_data,
-                    attributes={
-                        "event_type": "health_data_upload",
-                        "user_id": user_id,
-                    },
-                )
-
         except Exception:
             self.logger.exception("Failed to publish health data event")
             raise
@@ -241,57 +283,385 @@ class AWSMessagingService:
                 "metadata": metadata or {},
             }
 
-            # Get queue URL
-            queue_url = await self._get_queue_url(self.insight_queue)
+            message_id = await self._publish_event(
+                self.insight_queue,
+                message_data,
+                queue_attributes={
+                    "user_id": user_id,
+                    "upload_id": upload_id,
+                    "event_type": "insight_request",
+                },
+                subject="Insight Generation Request",
+                topic_attributes={
+                    "event_type": "insight_request",
+                    "user_id": user_id,
+                },
+            )
 
-            # Send message to SQS
-            loop = asyncio.get_event_loop()
+        except Exception:
+            self.logger.exception("Failed to publish insight request event")
+            raise
+        else:
+            self.logger.info(
+                "Published insight request event for user %s, upload %s, message ID: %s",
+                user_id,
+                upload_id,
+                message_id,
+            )
+            return message_id
+
+    async def _send_to_queue(
+        self,
+        queue_name: str,
+        message_data: dict[str, Any],
+        attributes: dict[str, str],
+    ) -> str:
+        """Send one event to a queue, batched when batching is enabled.
+
+        The current trace context and request ID are added to the message
+        attributes so the consuming worker continues the trace.
+
+        Args:
+            queue_name: Destination queue name
+            message_data: Event payload
+            attributes: String message attributes
+
+        Returns:
+            Message ID from SQS
+        """
+        destination = f"sqs:{queue_name}"
+        with start_span(
+            "messaging.publish", {"messaging.destination": destination}
+        ) as span:
+            queue_url = await self._get_queue_url(queue_name)
+            message = OutboundMessage(
+                body=await self._encode_body(message_data),
+                attributes=inject(dict(attributes)),
+            )
+            span.set_attribute("messaging.message_bytes", message.size)
+
+            if self.batch_linger_seconds is not None:
+                return await self._get_batcher(destination, queue_url).submit(message)
+
+            return await self._send_single(destination, queue_url, message)
+
+    async def _send_single(
+        self, destination: str, queue_url: str, message: OutboundMessage
+    ) -> str:
+        """Send one message with a ``SendMessage`` call."""
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        try:
             response = await loop.run_in_executor(
                 None,
                 lambda: self.sqs_client.send_message(
                     QueueUrl=queue_url,
-                    MessageBody=json.dumps(message_data),
-                    MessageAttributes={
-                        "user_id": {
-                            "StringValue": user_id,
-                            "DataType": "String",
-                        },
-                        "upload_id": {
-                            "StringValue": upload_id,
-                            "DataType": "String",
-                        },
-                        "event_type": {
-                            "StringValue": "insight_request",
-                            "DataType": "String",
-                        },
-                    },
+                    MessageBody=message.body,
+                    MessageAttributes=self._sqs_attributes(  # type: ignore[arg-type]
+                        message.attributes
+                    ),
                 ),
             )
+        except Exception:
+            MESSAGING_PUBLISHED_TOTAL.labels(
+                destination=destination, outcome="failure"
+            ).inc()
+            raise
+        finally:
+            MESSAGING_PUBLISH_LATENCY_SECONDS.labels(
+                destination=destination, mode="single"
+            ).observe(time.perf_counter() - started)
 
-            message_id: str = response["MessageId"]
+        MESSAGING_PUBLISHED_TOTAL.labels(
+            destination=destination, outcome="success"
+        ).inc()
+        return cast("str", response["MessageId"])
 
-            # Also publish to SNS for fan-out if configured
-            if self.sns_client and self.sns_topic_arn:
-                await self._publish_to_sns(
-                    subject="Insight Generation Request",
-                    message=message_data,
-                    attributes={
-                        "event_type": "insight_request",
-                        "user_id": user_id,
-                    },
+    async def _publish_event(
+        self,
+        queue_name: str,
+        message: dict[str, Any],
+        *,
+        queue_attributes: dict[str, str],
+        subject: str,
+        topic_attributes: dict[str, str],
+    ) -> str:
+        """Send an event to its queue and, if configured, fan it out to SNS.
+
+        The two legs run concurrently, so a batched publish waits for one
+        linger instead of two. Both legs always run to completion; a failure
+        of either is raised, the queue's first.
+
+        Returns:
+            Message ID from SQS
+        """
+        legs = [self._send_to_queue(queue_name, message, queue_attributes)]
+        if self.sns_client and self.sns_topic_arn:
+            legs.append(
+                self._fan_out(
+                    subject=subject, message=message, attributes=topic_attributes
+                )
+            )
+
+        results = await asyncio.gather(*legs, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            if len(errors) > 1:
+                logger.error(
+                    "SNS fan-out also failed for %s event: %r", subject, errors[1]
+                )
+            raise errors[0]
+        return cast("str", results[0])
+
+    async def _fan_out(
+        self,
+        subject: str,
+        message: dict[str, Any],
+        attributes: dict[str, str],
+    ) -> str:
+        """Publish an event to the SNS topic, batched when enabled."""
+        attributes = inject(dict(attributes))
+        if self.batch_linger_seconds is None:
+            return await self._publish_to_sns(
+                subject=subject, message=message, attributes=attributes
+            )
+
+        outbound = OutboundMessage(
+            body=await self._encode_body(message),
+            attributes=attributes,
+            subject=subject,
+        )
+        return await self._get_batcher("sns", self.sns_topic_arn or "").submit(
+            outbound
+        )
+
+    async def send_message_batch(
+        self,
+        queue_name: str,
+        messages: list[dict[str, Any]],
+        attributes: list[dict[str, str]] | None = None,
+    ) -> list[str]:
+        """Send many events to a queue with ``SendMessageBatch`` calls.
+
+        Intended for bulk backfills: messages are packed into batches of up
+        to 10 entries within the SQS batch size limit.
+
+        Args:
+            queue_name: Destination queue name
+            messages: Event payloads
+            attributes: Optional per-message string attributes
+
+        Returns:
+            Message IDs in the order of ``messages``
+
+        Raises:
+            MessagingError: If any message could not be sent
+        """
+        queue_url = await self._get_queue_url(queue_name)
+        attributes = attributes or [{} for _ in messages]
+        outbound = [
+            OutboundMessage(body=await self._encode_body(data), attributes=attrs)
+            for data, attrs in zip(messages, attributes, strict=True)
+        ]
+
+        results: list[str | BaseException] = []
+        batch: list[OutboundMessage] = []
+        batch_bytes = 0
+        for message in outbound:
+            if batch and (
+                len(batch) >= SQS_MAX_BATCH_SIZE
+                or batch_bytes + message.size > SQS_MAX_MESSAGE_BYTES
+            ):
+                results.extend(
+                    await self._send_sqs_batch(f"sqs:{queue_name}", queue_url, batch)
                 )
+                batch, batch_bytes = [], 0
+            batch.append(message)
+            batch_bytes += message.size
+        if batch:
+            results.extend(
+                await self._send_sqs_batch(f"sqs:{queue_name}", queue_url, batch)
+            )
 
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            msg = f"Failed to send {len(failures)} of {len(results)} messages"
+            raise MessagingError(msg, queue=queue_name)
+        return cast("list[str]", results)
+
+    async def flush(self) -> None:
+        """Send any buffered messages and wait for in-progress batch calls."""
+        for batcher in list(self._batchers.values()):
+            await batcher.flush()
+
+    def _get_batcher(self, destination: str, target: str) -> MessageBatcher:
+        """Get or create the batcher for a queue URL or the SNS topic."""
+        batcher = self._batchers.get(destination)
+        if batcher is None:
+            send: BatchSender = (
+                self._publish_sns_batch
+                if destination == "sns"
+                else partial(self._send_sqs_batch, destination, target)
+            )
+            batcher = MessageBatcher(
+                send, linger_seconds=self.batch_linger_seconds or 0.0
+            )
+            self._batchers[destination] = batcher
+        return batcher
+
+    async def _send_sqs_batch(
+        self, destination: str, queue_url: str, batch: list[OutboundMessage]
+    ) -> list[str | BaseException]:
+        """Send up to 10 messages with one ``SendMessageBatch`` call."""
+        entries = [
+            {
+                "Id": str(i),
+                "MessageBody": message.body,
+                "MessageAttributes": self._sqs_attributes(message.attributes),
+            }
+            for i, message in enumerate(batch)
+        ]
+
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        try:
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.sqs_client.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=entries,  # type: ignore[arg-type]
+                ),
+            )
         except Exception:
-            self.logger.exception("Failed to publish insight request event")
+            MESSAGING_PUBLISHED_TOTAL.labels(
+                destination=destination, outcome="failure"
+            ).inc(len(batch))
+            self.logger.exception("SQS batch send to %s failed", destination)
             raise
-        else:
-            self.logger.info(
-                "Published insight request event for user %s, upload %s, message ID: %s",
-                user_id,
-                upload_id,
-                message_id,
+        finally:
+            MESSAGING_PUBLISH_LATENCY_SECONDS.labels(
+                destination=destination, mode="batch"
+            ).observe(time.perf_counter() - started)
+
+        return self._batch_results(destination, len(batch), response)
+
+    async def _publish_sns_batch(
+        self, batch: list[OutboundMessage]
+    ) -> list[str | BaseException]:
+        """Publish up to 10 messages with one SNS ``PublishBatch`` call."""
+        if not self.sns_client or not self.sns_topic_arn:
+            msg = "SNS not configured"
+            raise RuntimeError(msg)
+
+        entries: list[dict[str, Any]] = []
+        for i, message in enumerate(batch):
+            entry: dict[str, Any] = {
+                "Id": str(i),
+                "Message": message.body,
+                "MessageAttributes": self._sqs_attributes(message.attributes),
+            }
+            if message.subject:
+                entry["Subject"] = message.subject
+            entries.append(entry)
+
+        sns_client = self.sns_client
+        topic_arn = self.sns_topic_arn
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        try:
+            response = await loop.run_in_executor(
+                None,
+                lambda: sns_client.publish_batch(
+                    TopicArn=topic_arn,
+                    PublishBatchRequestEntries=entries,
+                ),
             )
-            return message_id
+        except Exception:
+            MESSAGING_PUBLISHED_TOTAL.labels(destination="sns", outcome="failure").inc(
+                len(batch)
+            )
+            self.logger.exception("SNS batch publish failed")
+            raise
+        finally:
+            MESSAGING_PUBLISH_LATENCY_SECONDS.labels(
+                destination="sns", mode="batch"
+            ).observe(time.perf_counter() - started)
+
+        return self._batch_results("sns", len(batch), response)
+
+    @staticmethod
+    def _batch_results(
+        destination: str, size: int, response: Any
+    ) -> list[str | BaseException]:
+        """Map a batch API response back to per-entry IDs or errors."""
+        results: list[str | BaseException] = [
+            MessagingError("No result returned for batch entry") for _ in range(size)
+        ]
+        for success in response.get("Successful", []):
+            results[int(success["Id"])] = success["MessageId"]
+        for failure in response.get("Failed", []):
+            logger.warning(
+                "Batch entry rejected by %s: %s", destination, failure.get("Code")
+            )
+            results[int(failure["Id"])] = MessagingError(
+                f"Batch entry rejected: {failure.get('Code')}",
+                code=failure.get("Code"),
+                sender_fault=failure.get("SenderFault"),
+            )
+
+        succeeded = sum(isinstance(result, str) for result in results)
+        MESSAGING_PUBLISHED_TOTAL.labels(
+            destination=destination, outcome="success"
+        ).inc(succeeded)
+        if size - succeeded:
+            MESSAGING_PUBLISHED_TOTAL.labels(
+                destination=destination, outcome="failure"
+            ).inc(size - succeeded)
+        return results
+
+    async def _encode_body(self, message_data: dict[str, Any]) -> str:
+        """Serialize a payload, compressing or offloading it when large."""
+        body = json.dumps(message_data)
+        if len(body.encode()) <= self.compress_threshold_bytes:
+            MESSAGING_PAYLOAD_ENCODING_TOTAL.labels(encoding="inline").inc()
+            return body
+
+        compressed = compress_payload(body)
+        if len(compressed) <= MESSAGE_MAX_INLINE_BYTES:
+            MESSAGING_PAYLOAD_ENCODING_TOTAL.labels(encoding="gzip").inc()
+            return compressed
+
+        if not self.s3_client or not self.payload_bucket:
+            msg = (
+                "Message payload exceeds the SQS size limit and no payload "
+                "bucket is configured"
+            )
+            raise MessagingError(msg, size_bytes=len(compressed))
+
+        s3_client = self.s3_client
+        bucket = self.payload_bucket
+        key = f"message-payloads/{datetime.now(UTC):%Y/%m/%d}/{uuid.uuid4()}.json"
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: s3_client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=body.encode(),
+                ContentType="application/json",
+                ServerSideEncryption="AES256",
+            ),
+        )
+        MESSAGING_PAYLOAD_ENCODING_TOTAL.labels(encoding="s3").inc()
+        return s3_pointer_payload(f"s3://{bucket}/{key}")
+
+    @staticmethod
+    def _sqs_attributes(attributes: dict[str, str]) -> dict[str, dict[str, str]]:
+        """Convert plain string attributes to the SQS/SNS attribute shape."""
+        return {
+            key: {"StringValue": value, "DataType": "String"}
+            for key, value in attributes.items()
+        }
 
     async def _publish_to_sns(
         self,
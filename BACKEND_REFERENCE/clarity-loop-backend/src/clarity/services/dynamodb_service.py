@@ -989,6 +989,13 @@ class DynamoDBHealthDataRepository(IHealthDataRepository):
                 )
                 deleted_count += 1
 
+            # Derived per-day partials are health data too
+            from clarity.ml.feature_store import (  # noqa: PLC0415
+                FeatureStoreSingleton,
+            )
+
+            await FeatureStoreSingleton.delete_user(user_id)
+
             logger.info("Deleted %s health records for user %s", deleted_count, user_id)
             return deleted_count
 
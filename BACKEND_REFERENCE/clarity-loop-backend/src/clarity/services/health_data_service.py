@@ -24,6 +24,7 @@ except ImportError:
     S3StorageService = None  # type: ignore[misc, assignment]
 
 from clarity.core.secure_logging import log_health_data_received
+from clarity.core.tracing import start_span
 from clarity.models.health_data import (
     HealthDataResponse,
     HealthDataUpload,
@@ -234,13 +235,17 @@ class HealthDataService:
                 _raise_validation_error(error_summary)
 
             # Store health data using repository
-            await self.repository.save_health_data(
-                user_id=str(health_data.user_id),
-                processing_id=processing_id,
-                metrics=health_data.metrics,
-                upload_source=health_data.upload_source,
-                client_timestamp=health_data.client_timestamp,
-            )
+            with start_span(
+                "dynamodb.save_health_data",
+                {"metrics.count": len(health_data.metrics)},
+            ):
+                await self.repository.save_health_data(
+                    user_id=str(health_data.user_id),
+                    processing_id=processing_id,
+                    metrics=health_data.metrics,
+                    upload_source=health_data.upload_source,
+                    client_timestamp=health_data.client_timestamp,
+                )
 
             # Add audit log for compliance
             audit_logger.info(
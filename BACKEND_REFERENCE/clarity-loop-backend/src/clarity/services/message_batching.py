@@ -0,0 +1,199 @@
+"""Batching and payload encoding helpers for SQS/SNS publishing.
+
+``MessageBatcher`` buffers outbound messages for one destination and sends
+them with a single batch API call once 10 messages (or the 256 KiB batch
+size limit) accumulate, or after a short linger, whichever comes first.
+Each caller still awaits its own message ID.
+
+Large payloads are wrapped in a JSON envelope so receivers can tell how to
+read them: gzip+base64 compressed inline, or offloaded to S3 with only a
+pointer in the message.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+import base64
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import gzip
+import json
+import logging
+from typing import Any
+
+from clarity.core.constants import (
+    PUBLISH_BATCH_LINGER_SECONDS,
+    SQS_MAX_BATCH_SIZE,
+    SQS_MAX_MESSAGE_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_ENVELOPE_KEY = "clarity_payload"
+PAYLOAD_ENCODING_GZIP = "gzip+base64"
+
+
+@dataclass
+class OutboundMessage:
+    """Encoded message waiting to be sent in a batch."""
+
+    body: str
+    attributes: dict[str, str] = field(default_factory=dict)
+    subject: str | None = None
+
+    @property
+    def size(self) -> int:
+        """Size in bytes as counted against the SQS/SNS limits."""
+        attributes_size = sum(
+            len(key.encode()) + len(value.encode())
+            for key, value in self.attributes.items()
+        )
+        return len(self.body.encode()) + attributes_size
+
+
+# Sends one batch; returns a message ID or an exception per entry, in order
+BatchSender = Callable[[list[OutboundMessage]], Awaitable[list[str | BaseException]]]
+
+
+class MessageBatcher:
+    """Coalesces concurrent publishes to one destination into batch calls."""
+
+    def __init__(
+        self,
+        send_batch: BatchSender,
+        *,
+        max_batch_size: int = SQS_MAX_BATCH_SIZE,
+        max_batch_bytes: int = SQS_MAX_MESSAGE_BYTES,
+        linger_seconds: float = PUBLISH_BATCH_LINGER_SECONDS,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            send_batch: Coroutine that sends one batch of messages
+            max_batch_size: Entries per batch call (SQS and SNS allow 10)
+            max_batch_bytes: Total payload allowed per batch call
+            linger_seconds: Longest time a message waits for more to batch with
+        """
+        self._send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.linger_seconds = linger_seconds
+        self._buffer: list[tuple[OutboundMessage, asyncio.Future[str]]] = []
+        self._buffer_bytes = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered messages not yet handed to a batch call."""
+        return len(self._buffer)
+
+    async def submit(self, message: OutboundMessage) -> str:
+        """Buffer a message and wait for the batch that carries it.
+
+        Returns:
+            Message ID assigned by the destination
+
+        Raises:
+            Exception: Whatever the batch call reported for this entry
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[str] = loop.create_future()
+
+        if self._buffer and self._buffer_bytes + message.size > self.max_batch_bytes:
+            self._flush_now()
+
+        self._buffer.append((message, future))
+        self._buffer_bytes += message.size
+
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger_seconds, self._flush_now)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Send everything buffered and wait for outstanding batch calls."""
+        self._flush_now()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+
+        task = asyncio.create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(
+        self, batch: list[tuple[OutboundMessage, "asyncio.Future[str]"]]
+    ) -> None:
+        try:
+            results = await self._send_batch([message for message, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def compress_payload(raw: str) -> str:
+    """Wrap a JSON string in a gzip+base64 payload envelope."""
+    encoded = base64.b64encode(gzip.compress(raw.encode())).decode("ascii")
+    return json.dumps(
+        {PAYLOAD_ENVELOPE_KEY: {"encoding": PAYLOAD_ENCODING_GZIP, "data": encoded}}
+    )
+
+
+def s3_pointer_payload(s3_path: str) -> str:
+    """Build a pointer envelope for a payload offloaded to S3."""
+    return json.dumps({PAYLOAD_ENVELOPE_KEY: {"s3_path": s3_path}})
+
+
+def payload_s3_path(body: Any) -> str | None:
+    """Return the S3 path if ``body`` is a pointer envelope."""
+    if not isinstance(body, dict):
+        return None
+    envelope = body.get(PAYLOAD_ENVELOPE_KEY)
+    if isinstance(envelope, dict) and isinstance(envelope.get("s3_path"), str):
+        return envelope["s3_path"]
+    return None
+
+
+def decode_payload_envelope(body: Any) -> Any:
+    """Inflate a compressed payload envelope; other bodies pass through.
+
+    Raises:
+        ValueError: If the envelope uses an unknown encoding or points to S3
+    """
+    if not isinstance(body, dict) or PAYLOAD_ENVELOPE_KEY not in body:
+        return body
+
+    envelope = body[PAYLOAD_ENVELOPE_KEY]
+    if payload_s3_path(body) is not None:
+        msg = "Payload is offloaded to S3 and must be fetched first"
+        raise ValueError(msg)
+    encoding = envelope.get("encoding") if isinstance(envelope, dict) else None
+    if encoding != PAYLOAD_ENCODING_GZIP:
+        msg = "Unsupported message payload encoding"
+        raise ValueError(msg)
+
+    raw = gzip.decompress(base64.b64decode(envelope["data"]))
+    return json.loads(raw)
@@ -5,6 +5,7 @@ Handles Pub/Sub messages for health data analysis processing.
 
 # removed - breaks FastAPI
 
+import asyncio
 import base64
 import json
 import logging
@@ -14,8 +15,11 @@ from typing import Any
 from fastapi import FastAPI, HTTPException, Request
 from google.cloud import storage
 
+from clarity.core.tracing import start_span
 from clarity.ml.analysis_pipeline import run_analysis_pipeline
+from clarity.ml.healthkit_stream import HealthKitColumns, parse_healthkit_stream
 from clarity.services.messaging.publisher import HealthDataPublisher, get_publisher
+from clarity.services.messaging.sqs_consumer import load_event_data
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,10 @@ class AnalysisSubscriber:
         # Environment settings
         self.environment = os.getenv("ENVIRONMENT", "development")
         self.pubsub_push_audience = os.getenv("PUBSUB_PUSH_AUDIENCE")
+        # Parse uploads incrementally into columns instead of json.loads
+        self.streaming_ingest = (
+            os.getenv("ANALYSIS_STREAMING_INGEST", "true").lower() == "true"
+        )
 
         self.logger.info("Initialized analysis subscriber (env: %s)", self.environment)
 
@@ -61,38 +69,7 @@ class AnalysisSubscriber:
             body = await request.json()
             message_data = self._extract_message_data(body)
 
-            self.logger.info(
-                "Processing health data analysis for user: %s, upload: %s",
-                message_data.get("user_id"),
-                message_data.get("upload_id"),
-            )
-
-            # Download raw data from GCS
-            raw_health_data = await self._download_health_data(message_data["gcs_path"])
-
-            # Run analysis pipeline
-            analysis_results = await run_analysis_pipeline(
-                user_id=message_data["user_id"], health_data=raw_health_data
-            )
-
-            # Publish insight request event
-            publisher = await self._get_publisher()
-            await publisher.publish_insight_request(
-                user_id=message_data["user_id"],
-                upload_id=message_data["upload_id"],
-                analysis_results=analysis_results,
-            )
-
-            self.logger.info(
-                "Completed health data analysis for user: %s", message_data["user_id"]
-            )
-
-            return {
-                "status": "success",
-                "user_id": message_data["user_id"],
-                "upload_id": message_data["upload_id"],
-                "analysis_completed": True,
-            }
+            return await self.process_health_data_event(message_data)
 
         except Exception as e:
             self.logger.exception("Error processing health data message")
@@ -100,6 +77,88 @@ class AnalysisSubscriber:
                 status_code=500, detail=f"Analysis processing failed: {e!s}"
             ) from e
 
+    async def process_health_data_event(
+        self, message_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Run analysis for a decoded health data event.
+
+        Shared by the Pub/Sub push endpoint and the SQS pull consumer.
+
+        Args:
+            message_data: Event payload with user_id, upload_id and the raw
+                data path (``s3_path``, or ``gcs_path`` on older messages)
+
+        Returns:
+            Processing result
+        """
+        self.logger.info(
+            "Processing health data analysis for user: %s, upload: %s",
+            message_data.get("user_id"),
+            message_data.get("upload_id"),
+        )
+
+        # Download raw data from GCS
+        data_path = self._raw_data_path(message_data)
+        raw_health_data: dict[str, Any] | HealthKitColumns
+        with start_span(
+            "analysis.download", {"analysis.streaming": self.streaming_ingest}
+        ):
+            if self.streaming_ingest:
+                raw_health_data = await self._stream_health_data(data_path)
+            else:
+                raw_health_data = await self._download_health_data(data_path)
+
+        # Run analysis pipeline
+        analysis_results = await run_analysis_pipeline(
+            user_id=message_data["user_id"], health_data=raw_health_data
+        )
+
+        # Publish insight request event
+        publisher = await self._get_publisher()
+        await publisher.publish_insight_request(
+            user_id=message_data["user_id"],
+            upload_id=message_data["upload_id"],
+            analysis_results=analysis_results,
+        )
+
+        self.logger.info(
+            "Completed health data analysis for user: %s", message_data["user_id"]
+        )
+
+        return {
+            "status": "success",
+            "user_id": message_data["user_id"],
+            "upload_id": message_data["upload_id"],
+            "analysis_completed": True,
+        }
+
+    async def process_queue_message(self, message: dict[str, Any]) -> None:
+        """Handle a message delivered by the SQS batch consumer.
+
+        Raises on failure so the consumer leaves the message for redelivery.
+
+        Args:
+            message: Message as returned by ``SQSMessagingService.receive_messages``
+        """
+        message_data = await load_event_data(message)
+        for field in ("user_id", "upload_id"):
+            if field not in message_data:
+                self._raise_missing_field_error(field)
+        self._raw_data_path(message_data)
+
+        await self.process_health_data_event(message_data)
+
+    def _raw_data_path(self, message_data: dict[str, Any]) -> str:
+        """Return the raw upload path of an event.
+
+        Publishers send ``s3_path``; messages queued before the AWS migration
+        carry ``gcs_path`` instead.
+        """
+        path = message_data.get("s3_path") or message_data.get("gcs_path")
+        if not path:
+            self._raise_missing_field_error("s3_path")
+        return str(path)
+
     async def _verify_pubsub_token(self, request: Request) -> None:
         """Verify Pub/Sub OIDC token in production."""
         authorization = request.headers.get("authorization")
@@ -162,20 +221,7 @@ class AnalysisSubscriber:
             Raw health data as dictionary
         """
         try:
-            # Parse GCS path
-            if not gcs_path.startswith("gs://"):
-                self._raise_invalid_gcs_path_error(gcs_path)
-
-            path_parts = gcs_path[5:].split("/", 1)  # Remove "gs://" prefix
-            bucket_name = path_parts[0]
-            blob_path = path_parts[1] if len(path_parts) > 1 else ""
-
-            # Download data
-            bucket = self.storage_client.bucket(bucket_name)
-            blob = bucket.blob(blob_path)
-
-            if not blob.exists():
-                self._raise_health_data_not_found_error(gcs_path)
+            blob = self._get_health_data_blob(gcs_path)
 
             # Download and parse JSON
             raw_json = blob.download_as_text()
@@ -193,6 +239,53 @@ class AnalysisSubscriber:
         else:
             return health_data  # type: ignore[no-any-return]
 
+    async def _stream_health_data(self, gcs_path: str) -> HealthKitColumns:
+        """Stream raw health data from GCS straight into columns.
+
+        The blob is read in chunks and parsed incrementally in a worker
+        thread, so memory stays bounded for multi-month uploads.
+
+        Args:
+            gcs_path: GCS path in format gs://bucket/path
+
+        Returns:
+            Columnar health data
+        """
+
+        def _read() -> HealthKitColumns:
+            blob = self._get_health_data_blob(gcs_path)
+            with blob.open("rb") as fp:
+                return parse_healthkit_stream(fp)
+
+        try:
+            columns = await asyncio.get_running_loop().run_in_executor(None, _read)
+            self.logger.info(
+                "Streamed health data from GCS: %s (%d samples)",
+                gcs_path,
+                columns.sample_count,
+            )
+        except Exception:
+            self.logger.exception("Failed to stream health data from %s", gcs_path)
+            raise
+        else:
+            return columns
+
+    def _get_health_data_blob(self, gcs_path: str) -> Any:
+        """Resolve a gs:// path to an existing blob."""
+        if not gcs_path.startswith("gs://"):
+            self._raise_invalid_gcs_path_error(gcs_path)
+
+        path_parts = gcs_path[5:].split("/", 1)  # Remove "gs://" prefix
+        bucket_name = path_parts[0]
+        blob_path = path_parts[1] if len(path_parts) > 1 else ""
+
+        bucket = self.storage_client.bucket(bucket_name)
+        blob = bucket.blob(blob_path)
+
+        if not blob.exists():
+            self._raise_health_data_not_found_error(gcs_path)
+        return blob
+
     @staticmethod
     def _raise_invalid_token_error() -> None:
         """Raise HTTPException for invalid token format."""
@@ -14,7 +14,10 @@ from typing import TYPE_CHECKING, Any
 from fastapi import FastAPI, HTTPException, Request
 from google.cloud import storage
 
+from clarity.core.tracing import start_span
+from clarity.ml.gemini_scheduler import InsightPriority, get_gemini_scheduler
 from clarity.ml.gemini_service import GeminiService, HealthInsightRequest
+from clarity.services.messaging.sqs_consumer import load_event_data
 
 if TYPE_CHECKING:
     pass
@@ -55,39 +58,7 @@ class InsightSubscriber:
             body = await request.json()
             message_data = self._extract_message_data(body)
 
-            self.logger.info(
-                "Processing insight generation for user: %s, upload: %s",
-                message_data.get("user_id"),
-                message_data.get("upload_id"),
-            )
-
-            # Generate insights using Gemini
-            insight_request = HealthInsightRequest(
-                user_id=message_data["user_id"],
-                analysis_results=message_data["analysis_results"],
-                context=message_data.get("context"),
-            )
-            insights = await self.gemini_service.generate_health_insights(
-                insight_request
-            )
-
-            # Store insights (implementation depends on your storage solution)
-            await self._store_insights(
-                user_id=message_data["user_id"],
-                upload_id=message_data["upload_id"],
-                insights=insights.model_dump(),
-            )
-
-            self.logger.info(
-                "Completed insight generation for user: %s", message_data["user_id"]
-            )
-
-            return {
-                "status": "success",
-                "user_id": message_data["user_id"],
-                "upload_id": message_data["upload_id"],
-                "insights_generated": True,
-            }
+            return await self.process_insight_event(message_data)
 
         except Exception as e:
             self.logger.exception("Error processing insight request")
@@ -95,6 +66,71 @@ class InsightSubscriber:
                 status_code=500, detail=f"Insight generation failed: {e!s}"
             ) from e
 
+    async def process_insight_event(
+        self, message_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Generate and store insights for a decoded insight request event.
+
+        Shared by the Pub/Sub push endpoint and the SQS pull consumer.
+
+        Args:
+            message_data: Event payload with user_id, upload_id and analysis_results
+
+        Returns:
+            Processing result
+        """
+        self.logger.info(
+            "Processing insight generation for user: %s, upload: %s",
+            message_data.get("user_id"),
+            message_data.get("upload_id"),
+        )
+
+        # Generate insights using Gemini (background lane yields to chat)
+        insight_request = HealthInsightRequest(
+            user_id=message_data["user_id"],
+            analysis_results=message_data["analysis_results"],
+            context=message_data.get("context"),
+        )
+        with start_span("gemini.generate_insights"):
+            insights = await get_gemini_scheduler().generate_health_insights(
+                self.gemini_service,
+                insight_request,
+                priority=InsightPriority.BACKGROUND,
+            )
+
+        # Store insights (implementation depends on your storage solution)
+        await self._store_insights(
+            user_id=message_data["user_id"],
+            upload_id=message_data["upload_id"],
+            insights=insights.model_dump(),
+        )
+
+        self.logger.info(
+            "Completed insight generation for user: %s", message_data["user_id"]
+        )
+
+        return {
+            "status": "success",
+            "user_id": message_data["user_id"],
+            "upload_id": message_data["upload_id"],
+            "insights_generated": True,
+        }
+
+    async def process_queue_message(self, message: dict[str, Any]) -> None:
+        """Handle a message delivered by the SQS batch consumer.
+
+        Raises on failure so the consumer leaves the message for redelivery.
+
+        Args:
+            message: Message as returned by ``SQSMessagingService.receive_messages``
+        """
+        message_data = await load_event_data(message)
+        for field in ("user_id", "upload_id", "analysis_results"):
+            if field not in message_data:
+                self._raise_missing_field_error(field)
+
+        await self.process_insight_event(message_data)
+
     async def _verify_pubsub_token(self, request: Request) -> None:
         """Verify Pub/Sub OIDC token in production."""
         authorization = request.headers.get("authorization")
@@ -12,6 +12,7 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from clarity.core.constants import PUBLISH_BATCH_LINGER_SECONDS
 from clarity.core.decorators import log_execution
 from clarity.services.aws_messaging_service import AWSMessagingService
 
@@ -48,6 +49,14 @@ class HealthDataPublisher:
         self.aws_region = os.getenv("AWS_REGION", "us-east-1")
         self.sns_topic_arn = os.getenv("CLARITY_SNS_TOPIC_ARN")
 
+        # Concurrent publishes (e.g. bulk backfills) share batch API calls
+        batching_enabled = (
+            os.getenv("CLARITY_PUBLISH_BATCHING", "true").lower() != "false"
+        )
+        self.batch_linger_seconds = (
+            PUBLISH_BATCH_LINGER_SECONDS if batching_enabled else None
+        )
+
         # Initialize AWS messaging service
         self.messaging_service = AWSMessagingService(
             region=self.aws_region,
@@ -58,6 +67,8 @@ class HealthDataPublisher:
                 "CLARITY_INSIGHT_QUEUE", "clarity-insight-generation"
             ),
             sns_topic_arn=self.sns_topic_arn,
+            batch_linger_seconds=self.batch_linger_seconds,
+            payload_bucket=os.getenv("CLARITY_MESSAGE_PAYLOAD_BUCKET"),
         )
 
         self.logger = logging.getLogger(__name__)
@@ -144,6 +155,10 @@ class HealthDataPublisher:
             )
             return message_id
 
+    async def flush(self) -> None:
+        """Send any buffered events (call before shutdown)."""
+        await self.messaging_service.flush()
+
     async def health_check(self) -> dict[str, Any]:
         """Perform health check on AWS messaging services."""
         return await self.messaging_service.health_check()
@@ -165,3 +180,25 @@ async def get_publisher() -> HealthDataPublisher:  # noqa: RUF029
         _publisher = HealthDataPublisher()
 
     return _publisher
+
+
+async def shutdown_publisher() -> None:
+    """Flush and close the global publisher, if one was created.
+
+    Called from the application lifespans so batched events are sent before
+    the process exits.
+    """
+    global _publisher  # noqa: PLW0603 - Singleton pattern for messaging publisher
+
+    if _publisher is None:
+        return
+
+    publisher = _publisher
+    _publisher = None
+    try:
+        await publisher.flush()
+    except Exception:
+        # Shutdown must go on; callers waiting on the batch get the error
+        logger.exception("Failed to flush batched events on shutdown")
+    finally:
+        publisher.close()
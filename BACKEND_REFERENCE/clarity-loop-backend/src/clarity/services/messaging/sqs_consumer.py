@@ -0,0 +1,581 @@
+"""Long-polling SQS consumer runtime for the analysis and insight workers.
+
+The push subscribers handle one message per HTTP request, which caps queue
+drain rate after large sync events. In pull mode a worker instead runs
+``SQSBatchConsumer``, which:
+
+- Long-polls for up to 10 messages per ``ReceiveMessage`` call
+- Processes messages concurrently under a configurable in-flight limit
+- Acknowledges successes with ``DeleteMessageBatch`` (coalesced up to 10)
+- Extends the visibility timeout of messages that are still processing, so
+  long PAT jobs are not redelivered mid-flight
+- Drains gracefully on shutdown: in-flight work finishes (or is released
+  for redelivery after the drain timeout) and pending acks are flushed
+
+Failed messages are never deleted; they become visible again when their
+lease expires so the queue's redrive policy decides between retry and DLQ.
+Handlers must therefore be idempotent.
+"""
+
+# removed - breaks FastAPI
+
+import asyncio
+from collections.abc import AsyncGenerator, Awaitable, Callable
+import contextlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import json
+import logging
+import time
+from typing import Any
+
+import boto3
+from fastapi import FastAPI
+from prometheus_client import Counter, Gauge
+
+from clarity.core.config_aws import get_settings
+from clarity.core.constants import (
+    MAX_BACKOFF_SECONDS,
+    SQS_CONSUMER_ACK_LINGER_SECONDS,
+    SQS_CONSUMER_DEFAULT_CONCURRENCY,
+    SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS,
+    SQS_CONSUMER_VISIBILITY_TIMEOUT_SECONDS,
+    SQS_MAX_BATCH_SIZE,
+    SQS_MAX_WAIT_TIME_SECONDS,
+)
+from clarity.core.tracing import SpanContext, extract, start_span
+from clarity.services.message_batching import (
+    decode_payload_envelope,
+    payload_s3_path,
+)
+from clarity.services.messaging.publisher import shutdown_publisher
+from clarity.services.sqs_messaging_service import MessagingError, SQSMessagingService
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Prometheus metrics for the consumer
+SQS_CONSUMER_MESSAGES_TOTAL = Counter(
+    "clarity_sqs_consumer_messages_total",
+    "SQS messages handled by the consumer runtime",
+    ["queue", "outcome"],
+)
+SQS_CONSUMER_IN_FLIGHT = Gauge(
+    "clarity_sqs_consumer_in_flight",
+    "SQS messages currently being processed",
+    ["queue"],
+)
+
+
+@dataclass
+class _InFlightMessage:
+    """Lease bookkeeping for a message being processed."""
+
+    receipt_handle: str
+    message_id: str
+    lease_expires_at: float
+    task: "asyncio.Task[None] | None" = None
+
+
+def _unwrap_sns(body: Any) -> Any:
+    """Return the inner message of an SNS notification delivered to SQS."""
+    if (
+        isinstance(body, dict)
+        and body.get("Type") == "Notification"
+        and isinstance(body.get("Message"), str)
+    ):
+        return json.loads(body["Message"])
+    return body
+
+
+def extract_event_data(message: dict[str, Any]) -> dict[str, Any]:
+    """Unwrap the event payload from a received SQS message.
+
+    Accepts raw event bodies, the ``{"type", "data"}`` envelope written by
+    ``SQSMessagingService.publish_message``, gzip-compressed payload
+    envelopes and SNS notifications delivered to a subscribed queue.
+
+    Args:
+        message: Message as returned by ``SQSMessagingService.receive_messages``
+
+    Returns:
+        Event payload dictionary
+
+    Raises:
+        ValueError: If the body does not contain a JSON object payload
+    """
+    body = decode_payload_envelope(_unwrap_sns(message.get("body")))
+
+    if isinstance(body, dict) and "type" in body and isinstance(body.get("data"), dict):
+        body = body["data"]
+
+    if not isinstance(body, dict):
+        msg = "SQS message body is not a JSON object"
+        raise ValueError(msg)  # noqa: TRY004 - payload validation, not a type check
+
+    return body
+
+
+def message_trace_context(message: dict[str, Any]) -> SpanContext | None:
+    """Return the trace context the publisher put in the message attributes.
+
+    Reads the SQS message attributes, or those of an SNS notification
+    delivered to the queue.
+
+    Args:
+        message: Message as returned by ``SQSMessagingService.receive_messages``
+
+    Returns:
+        The publisher's span context, or None if the message carries none
+    """
+    carrier = {
+        name: value["StringValue"]
+        for name, value in (message.get("attributes") or {}).items()
+        if isinstance(value, dict) and "StringValue" in value
+    }
+    body = message.get("body")
+    if isinstance(body, dict) and body.get("Type") == "Notification":
+        for name, value in (body.get("MessageAttributes") or {}).items():
+            if isinstance(value, dict) and "Value" in value:
+                carrier.setdefault(name, value["Value"])
+    return extract(carrier)
+
+
+async def load_event_data(
+    message: dict[str, Any], s3_client: Any | None = None
+) -> dict[str, Any]:
+    """Like ``extract_event_data`` but also fetches payloads offloaded to S3.
+
+    Args:
+        message: Message as returned by ``SQSMessagingService.receive_messages``
+        s3_client: Optional boto3 S3 client (created on demand)
+
+    Returns:
+        Event payload dictionary
+    """
+    body = _unwrap_sns(message.get("body"))
+    s3_path = payload_s3_path(body)
+    if s3_path is None:
+        return extract_event_data({"body": body})
+
+    bucket, _, key = s3_path.removeprefix("s3://").partition("/")
+    client = s3_client or boto3.client("s3")
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(
+        None, lambda: client.get_object(Bucket=bucket, Key=key)
+    )
+    raw = await loop.run_in_executor(None, response["Body"].read)
+    return extract_event_data({"body": json.loads(raw)})
+
+
+class SQSBatchConsumer:
+    """Concurrent long-polling consumer for a single SQS queue."""
+
+    def __init__(
+        self,
+        messaging: SQSMessagingService,
+        handler: MessageHandler,
+        *,
+        max_messages: int = SQS_MAX_BATCH_SIZE,
+        concurrency: int = SQS_CONSUMER_DEFAULT_CONCURRENCY,
+        wait_time_seconds: int = SQS_MAX_WAIT_TIME_SECONDS,
+        visibility_timeout: int = SQS_CONSUMER_VISIBILITY_TIMEOUT_SECONDS,
+        drain_timeout_seconds: float = SQS_CONSUMER_DRAIN_TIMEOUT_SECONDS,
+        ack_linger_seconds: float = SQS_CONSUMER_ACK_LINGER_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the consumer.
+
+        Args:
+            messaging: SQS service bound to the queue to consume
+            handler: Coroutine called with each received message
+            max_messages: Messages requested per receive call (1-10)
+            concurrency: Maximum messages processed at once
+            wait_time_seconds: Long-poll wait per receive call (0-20)
+            visibility_timeout: Lease length requested on receive and renewal
+            drain_timeout_seconds: Time in-flight work gets to finish on stop
+            ack_linger_seconds: Delay used to coalesce deletes into batches
+            clock: Monotonic clock, injectable for tests
+        """
+        if not 1 <= max_messages <= SQS_MAX_BATCH_SIZE:
+            msg = f"max_messages must be between 1 and {SQS_MAX_BATCH_SIZE}"
+            raise ValueError(msg)
+        if concurrency < 1:
+            msg = "concurrency must be positive"
+            raise ValueError(msg)
+        if visibility_timeout < 1:
+            msg = "visibility_timeout must be positive"
+            raise ValueError(msg)
+
+        self._messaging = messaging
+        self._handler = handler
+        self.max_messages = max_messages
+        self.concurrency = concurrency
+        self.wait_time_seconds = min(
+            max(wait_time_seconds, 0), SQS_MAX_WAIT_TIME_SECONDS
+        )
+        self.visibility_timeout = visibility_timeout
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.ack_linger_seconds = ack_linger_seconds
+        self._clock = clock
+        self.queue_name = messaging.queue_url.rsplit("/", 1)[-1]
+
+        self._in_flight: dict[str, _InFlightMessage] = {}
+        self._pending_acks: list[str] = []
+        self._acks_ready = asyncio.Event()
+        # Serializes flushes so drain waits for a batch the ack loop has taken
+        self._ack_lock = asyncio.Lock()
+        self._slot_freed = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._running = False
+
+        # Statistics
+        self.received_count = 0
+        self.succeeded_count = 0
+        self.failed_count = 0
+        self.deleted_count = 0
+        self.released_count = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of messages currently being processed."""
+        return len(self._in_flight)
+
+    @property
+    def pending_acks(self) -> int:
+        """Number of processed messages waiting to be deleted."""
+        return len(self._pending_acks)
+
+    def stop(self) -> None:
+        """Ask ``run`` to stop polling and drain."""
+        self._stop.set()
+        self._slot_freed.set()
+
+    async def run(self) -> None:
+        """Poll, process and acknowledge messages until ``stop`` is called.
+
+        A receive that is already long-polling when ``stop`` is called is
+        allowed to return; anything it delivers is released immediately.
+        """
+        if self._running:
+            msg = "Consumer is already running"
+            raise RuntimeError(msg)
+
+        self._running = True
+        self._stop.clear()
+        background = [
+            asyncio.create_task(self._ack_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        logger.info(
+            "SQS consumer started for %s (concurrency=%d, batch=%d)",
+            self.queue_name,
+            self.concurrency,
+            self.max_messages,
+        )
+
+        try:
+            while not self._stop.is_set():
+                await self._wait_for_capacity()
+                if self._stop.is_set():
+                    break
+                try:
+                    await self.poll_once()
+                except MessagingError:
+                    logger.exception("SQS receive failed for %s", self.queue_name)
+                    await self._sleep_unless_stopped(MAX_BACKOFF_SECONDS)
+                except Exception:
+                    # Keep polling; an escaped error would end the worker silently
+                    logger.exception("Unexpected error polling %s", self.queue_name)
+                    await self._sleep_unless_stopped(MAX_BACKOFF_SECONDS)
+        finally:
+            await self.drain()
+            for task in background:
+                task.cancel()
+            for task in background:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+            self._running = False
+            logger.info("SQS consumer stopped for %s", self.queue_name)
+
+    async def poll_once(self) -> int:
+        """Receive one batch and start processing it.
+
+        Returns:
+            Number of messages dispatched to the handler
+        """
+        free_slots = self.concurrency - len(self._in_flight)
+        if free_slots <= 0:
+            return 0
+
+        messages = await self._messaging.receive_messages(
+            max_messages=min(self.max_messages, free_slots),
+            wait_time_seconds=self.wait_time_seconds,
+            visibility_timeout=self.visibility_timeout,
+        )
+        if not messages:
+            return 0
+
+        self.received_count += len(messages)
+        if self._stop.is_set():
+            await self._release([message["receipt_handle"] for message in messages])
+            return 0
+
+        for message in messages:
+            self._start(message)
+        return len(messages)
+
+    async def flush_acks(self) -> int:
+        """Delete processed messages in batches of up to 10.
+
+        Returns:
+            Number of messages SQS confirmed as deleted
+        """
+        async with self._ack_lock:
+            deleted = 0
+            while self._pending_acks:
+                batch = self._pending_acks[:SQS_MAX_BATCH_SIZE]
+                del self._pending_acks[:SQS_MAX_BATCH_SIZE]
+                try:
+                    result = await self._messaging.batch_delete_messages(batch)
+                except MessagingError:
+                    # The messages reappear after their lease; handlers are idempotent
+                    logger.exception(
+                        "Failed to delete %d processed messages from %s",
+                        len(batch),
+                        self.queue_name,
+                    )
+                    continue
+
+                deleted += len(result["successful"])
+                for failure in result["failed"]:
+                    logger.warning(
+                        "SQS rejected delete for entry %s: %s",
+                        failure.get("Id"),
+                        failure.get("Code"),
+                    )
+
+            self._acks_ready.clear()
+            self.deleted_count += deleted
+            return deleted
+
+    async def extend_visibility(self) -> int:
+        """Renew the lease of in-flight messages that are close to expiring.
+
+        Returns:
+            Number of messages whose visibility timeout was extended
+        """
+        now = self._clock()
+        renew_before = now + self.visibility_timeout / 2
+        expiring = [
+            entry
+            for entry in self._in_flight.values()
+            if entry.lease_expires_at <= renew_before
+        ]
+
+        extended = 0
+        for start in range(0, len(expiring), SQS_MAX_BATCH_SIZE):
+            batch = expiring[start : start + SQS_MAX_BATCH_SIZE]
+            try:
+                result = await self._messaging.change_message_visibility_batch(
+                    [entry.receipt_handle for entry in batch],
+                    self.visibility_timeout,
+                )
+            except MessagingError:
+                logger.exception("Failed to extend visibility on %s", self.queue_name)
+                continue
+
+            failed_ids = {failure.get("Id") for failure in result["failed"]}
+            for index, entry in enumerate(batch):
+                if str(index) in failed_ids:
+                    continue
+                entry.lease_expires_at = now + self.visibility_timeout
+                extended += 1
+
+        if extended:
+            logger.debug(
+                "Extended visibility of %d messages on %s", extended, self.queue_name
+            )
+        return extended
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Wait for in-flight messages, then flush pending acks.
+
+        Messages still running after the timeout are cancelled and released
+        for immediate redelivery.
+
+        Args:
+            timeout: Seconds to wait (defaults to ``drain_timeout_seconds``)
+        """
+        timeout = self.drain_timeout_seconds if timeout is None else timeout
+        tasks = {
+            entry.task: entry.receipt_handle
+            for entry in self._in_flight.values()
+            if entry.task is not None
+        }
+
+        if tasks:
+            logger.info(
+                "Draining %d in-flight messages from %s", len(tasks), self.queue_name
+            )
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                logger.warning(
+                    "Drain timed out; releasing %d messages on %s",
+                    len(pending),
+                    self.queue_name,
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                await self._release([tasks[task] for task in pending])
+
+        await self.flush_acks()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get consumer statistics.
+
+        Returns:
+            Dictionary containing throughput and in-flight counts
+        """
+        return {
+            "queue": self.queue_name,
+            "running": self._running,
+            "in_flight": len(self._in_flight),
+            "concurrency": self.concurrency,
+            "pending_acks": len(self._pending_acks),
+            "received": self.received_count,
+            "succeeded": self.succeeded_count,
+            "failed": self.failed_count,
+            "deleted": self.deleted_count,
+            "released": self.released_count,
+        }
+
+    def _start(self, message: dict[str, Any]) -> None:
+        entry = _InFlightMessage(
+            receipt_handle=message["receipt_handle"],
+            message_id=message.get("message_id", ""),
+            lease_expires_at=self._clock() + self.visibility_timeout,
+        )
+        self._in_flight[entry.receipt_handle] = entry
+        SQS_CONSUMER_IN_FLIGHT.labels(queue=self.queue_name).inc()
+        entry.task = asyncio.create_task(self._process(entry, message))
+
+    async def _process(self, entry: _InFlightMessage, message: dict[str, Any]) -> None:
+        try:
+            with start_span(
+                "sqs.process",
+                {
+                    "messaging.destination": self.queue_name,
+                    "messaging.message_id": entry.message_id,
+                },
+                parent=message_trace_context(message),
+            ):
+                await self._handler(message)
+        except Exception:
+            self.failed_count += 1
+            SQS_CONSUMER_MESSAGES_TOTAL.labels(
+                queue=self.queue_name, outcome="failed"
+            ).inc()
+            logger.exception(
+                "Failed to process SQS message %s; leaving it for redelivery",
+                entry.message_id,
+            )
+        else:
+            self.succeeded_count += 1
+            SQS_CONSUMER_MESSAGES_TOTAL.labels(
+                queue=self.queue_name, outcome="succeeded"
+            ).inc()
+            self._pending_acks.append(entry.receipt_handle)
+            self._acks_ready.set()
+        finally:
+            self._in_flight.pop(entry.receipt_handle, None)
+            SQS_CONSUMER_IN_FLIGHT.labels(queue=self.queue_name).dec()
+            self._slot_freed.set()
+
+    async def _release(self, receipt_handles: list[str]) -> None:
+        """Make messages visible again immediately (visibility timeout 0)."""
+        for start in range(0, len(receipt_handles), SQS_MAX_BATCH_SIZE):
+            batch = receipt_handles[start : start + SQS_MAX_BATCH_SIZE]
+            try:
+                await self._messaging.change_message_visibility_batch(batch, 0)
+            except MessagingError:
+                logger.exception("Failed to release messages on %s", self.queue_name)
+                continue
+            self.released_count += len(batch)
+            SQS_CONSUMER_MESSAGES_TOTAL.labels(
+                queue=self.queue_name, outcome="released"
+            ).inc(len(batch))
+
+    async def _wait_for_capacity(self) -> None:
+        while len(self._in_flight) >= self.concurrency and not self._stop.is_set():
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+
+    async def _sleep_unless_stopped(self, seconds: float) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+
+    async def _ack_loop(self) -> None:
+        while True:
+            await self._acks_ready.wait()
+            if len(self._pending_acks) < SQS_MAX_BATCH_SIZE:
+                await asyncio.sleep(self.ack_linger_seconds)
+            await self.flush_acks()
+
+    async def _heartbeat_loop(self) -> None:
+        interval = max(self.visibility_timeout / 4, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            await self.extend_visibility()
+
+
+def sqs_consumer_lifespan(
+    handler_factory: Callable[[], MessageHandler],
+) -> Callable[[FastAPI], contextlib.AbstractAsyncContextManager[None]]:
+    """Build a FastAPI lifespan that runs an SQS consumer in pull mode.
+
+    The consumer only starts when ``SQS_CONSUMER_ENABLED`` is set and
+    ``SQS_QUEUE_URL`` points at the worker's queue; otherwise the service
+    keeps serving push deliveries only. Either way, batched events of the
+    global publisher are flushed on shutdown.
+
+    Args:
+        handler_factory: Returns the message handler; called at startup so
+            subscriber clients are not created at import time
+
+    Returns:
+        Lifespan callable for ``FastAPI(lifespan=...)``
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+        settings = get_settings()
+        consumer: SQSBatchConsumer | None = None
+        task: asyncio.Task[None] | None = None
+        if settings.sqs_consumer_enabled and settings.sqs_queue_url:
+            consumer = SQSBatchConsumer(
+                SQSMessagingService(
+                    queue_url=settings.sqs_queue_url,
+                    region=settings.aws_region,
+                    endpoint_url=settings.sqs_endpoint_url,
+                ),
+                handler_factory(),
+                concurrency=settings.sqs_consumer_concurrency,
+                wait_time_seconds=settings.sqs_consumer_wait_time_seconds,
+                visibility_timeout=settings.sqs_consumer_visibility_timeout,
+                drain_timeout_seconds=settings.sqs_consumer_drain_timeout_seconds,
+            )
+            app.state.sqs_consumer = consumer
+            task = asyncio.create_task(consumer.run())
+        try:
+            yield
+        finally:
+            if consumer is not None and task is not None:
+                consumer.stop()
+                await task
+            # Handlers publish follow-up events; send any still batched
+            await shutdown_publisher()
+
+    return lifespan
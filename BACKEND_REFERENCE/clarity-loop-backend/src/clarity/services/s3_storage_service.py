@@ -17,6 +17,7 @@ import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 from mypy_boto3_s3 import S3Client
 
+from clarity.core.tracing import start_span
 from clarity.models.health_data import HealthDataUpload
 from clarity.ports.storage import CloudStoragePort
 
@@ -236,9 +237,13 @@ class S3StorageService(CloudStoragePort):
                 upload_params["ServerSideEncryption"] = "AES256"
 
             # Upload to S3
-            await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.s3_client.put_object(**upload_params)
-            )
+            with start_span(
+                "storage.write_raw",
+                {"storage.backend": "s3", "storage.bytes": len(upload_params["Body"])},
+            ):
+                await asyncio.get_event_loop().run_in_executor(
+                    None, lambda: self.s3_client.put_object(**upload_params)
+                )
 
             # Create audit log
             await self._audit_log(
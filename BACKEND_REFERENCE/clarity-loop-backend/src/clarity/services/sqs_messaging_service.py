@@ -2,6 +2,7 @@
 
 # removed - breaks FastAPI
 
+import asyncio
 from datetime import UTC, datetime
 import json
 import logging
@@ -9,7 +10,7 @@ from typing import Any, cast
 import uuid
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
 from clarity.core.exceptions import ServiceError
 
@@ -107,15 +108,23 @@ class SQSMessagingService:
         wait_time_seconds: int = 20,
         visibility_timeout: int = 30,
     ) -> list[dict[str, Any]]:
-        """Receive messages from SQS queue."""
+        """Receive messages from SQS queue.
+
+        The call runs in the default executor so a long poll does not block
+        the event loop while other messages are being processed.
+        """
         try:
-            response = self.sqs_client.receive_message(
-                QueueUrl=self.queue_url,
-                MaxNumberOfMessages=max_messages,
-                WaitTimeSeconds=wait_time_seconds,
-                VisibilityTimeout=visibility_timeout,
-                MessageAttributeNames=["All"],
-                AttributeNames=["All"],
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.sqs_client.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=max_messages,
+                    WaitTimeSeconds=wait_time_seconds,
+                    VisibilityTimeout=visibility_timeout,
+                    MessageAttributeNames=["All"],
+                    AttributeNames=["All"],
+                ),
             )
 
             messages = []
@@ -137,7 +146,7 @@ class SQSMessagingService:
 
             return messages
 
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.exception("SQS receive error")
             error_msg = f"Failed to receive messages: {e!s}"
             raise MessagingError(error_msg) from e
@@ -151,7 +160,7 @@ class SQSMessagingService:
 
             logger.info("Successfully deleted message from SQS")
 
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.exception("SQS delete error")
             msg = f"Failed to delete message: {e!s}"
             raise MessagingError(msg) from e
@@ -164,9 +173,13 @@ class SQSMessagingService:
                 for i, handle in enumerate(receipt_handles)
             ]
 
-            response = self.sqs_client.delete_message_batch(
-                QueueUrl=self.queue_url,
-                Entries=entries,  # type: ignore[arg-type]
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.sqs_client.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=entries,  # type: ignore[arg-type]
+                ),
             )
 
             return {
@@ -174,11 +187,49 @@ class SQSMessagingService:
                 "failed": response.get("Failed", []),
             }
 
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.exception("SQS batch delete error")
             msg = f"Failed to batch delete messages: {e!s}"
             raise MessagingError(msg) from e
 
+    async def change_message_visibility_batch(
+        self, receipt_handles: list[str], visibility_timeout: int
+    ) -> dict[str, Any]:
+        """Batch change the visibility timeout of in-flight messages.
+
+        Used to extend the lease on messages whose processing outlives the
+        receive visibility timeout, or to release them (timeout 0) for
+        immediate redelivery.
+        """
+        try:
+            entries = [
+                {
+                    "Id": str(i),
+                    "ReceiptHandle": handle,
+                    "VisibilityTimeout": visibility_timeout,
+                }
+                for i, handle in enumerate(receipt_handles)
+            ]
+
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.sqs_client.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=entries,  # type: ignore[arg-type]
+                ),
+            )
+
+            return {
+                "successful": response.get("Successful", []),
+                "failed": response.get("Failed", []),
+            }
+
+        except (ClientError, BotoCoreError) as e:
+            logger.exception("SQS change visibility error")
+            msg = f"Failed to change message visibility: {e!s}"
+            raise MessagingError(msg) from e
+
     async def publish_to_sns(
         self,
         subject: str,
@@ -126,6 +126,60 @@ def slice_to_weeks(
     return chunks
 
 
+def sliding_weeks(
+    arr: npt.NDArray[np.floating[Any]] | npt.NDArray[np.integer[Any]],
+    minutes_per_week: int = WEEK_MINUTES,
+    stride: int | None = None,
+) -> npt.NDArray[np.floating[Any]] | npt.NDArray[np.integer[Any]]:
+    """Week-long windows starting every ``stride`` samples, as a view.
+
+    Windows are anchored at the end of the data like ``slice_to_weeks``: the
+    last window is always the most recent week, and leading samples that do
+    not fill a stride are dropped. With the default stride of one week the
+    rows are exactly ``slice_to_weeks(arr, keep="all")``; a smaller stride
+    gives overlapping windows. No data is copied.
+
+    Parameters
+    ----------
+    arr : numpy array
+        1-D input time series
+    minutes_per_week : int, optional
+        Window length (default: 10,080)
+    stride : int, optional
+        Samples between window starts (default: ``minutes_per_week``)
+
+    Returns:
+    -------
+    numpy array
+        Read-only view of shape (n_windows, minutes_per_week), oldest first.
+        Zero rows if the input is shorter than one window.
+
+    Examples:
+    --------
+    >>> data = np.arange(3 * 10080)
+    >>> sliding_weeks(data).shape
+    (3, 10080)
+    >>> sliding_weeks(data, stride=1440).shape
+    (15, 10080)
+    """
+    if arr.ndim != 1:
+        msg = f"Expected 1-D array, got {arr.ndim}-D"
+        raise ValueError(msg)
+
+    stride = minutes_per_week if stride is None else stride
+    if stride <= 0:
+        msg = f"Stride must be positive, got {stride}"
+        raise ValueError(msg)
+
+    n_samples = arr.shape[0]
+    if n_samples < minutes_per_week:
+        return arr[:0].reshape(0, minutes_per_week)
+
+    windows = np.lib.stride_tricks.sliding_window_view(arr, minutes_per_week)
+    first = (n_samples - minutes_per_week) % stride
+    return windows[first::stride]
+
+
 def pad_to_week(
     arr: npt.NDArray[np.floating[Any]] | npt.NDArray[np.integer[Any]],
     minutes_per_week: int = WEEK_MINUTES,
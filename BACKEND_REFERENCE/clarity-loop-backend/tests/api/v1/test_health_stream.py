@@ -0,0 +1,218 @@
+"""Tests for windowed coalescing of streamed health_data frames."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from clarity.api.v1.websocket.health_stream import HealthDataStreamCoalescer
+from clarity.api.v1.websocket.models import (
+    ActigraphyDataPointSchema,
+    AnalysisUpdateMessage,
+    WebSocketHealthDataPayload,
+)
+
+START = datetime(2025, 1, 6, 8, 0, tzinfo=UTC)
+
+
+def make_frame(first_minute: int, minutes: int) -> WebSocketHealthDataPayload:
+    return WebSocketHealthDataPayload(
+        data_points=[
+            ActigraphyDataPointSchema(
+                timestamp=START + timedelta(minutes=first_minute + i), value=1.0
+            )
+            for i in range(minutes)
+        ]
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Recorder:
+    """Collects analyses and progress frames emitted by the coalescer."""
+
+    def __init__(self) -> None:
+        self.analyses: list[WebSocketHealthDataPayload] = []
+        self.updates: list[AnalysisUpdateMessage] = []
+
+    async def analyze(self, user_id: str, payload: WebSocketHealthDataPayload) -> None:
+        self.analyses.append(payload)
+
+    async def notify(self, update: AnalysisUpdateMessage) -> None:
+        self.updates.append(update)
+
+
+@pytest.fixture
+def recorder() -> Recorder:
+    return Recorder()
+
+
+@pytest.mark.asyncio
+async def test_frames_below_threshold_only_send_progress(recorder: Recorder) -> None:
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=3600,
+        min_new_minutes=10,
+        clock=FakeClock(),
+    )
+
+    for frame in range(3):
+        assert not await coalescer.ingest("user-1", make_frame(frame * 3, 3))
+
+    assert recorder.analyses == []
+    assert [u.status for u in recorder.updates] == ["buffering"] * 3
+    assert recorder.updates[-1].progress == 90
+    assert coalescer.pending_minutes("user-1") == 9
+    await coalescer.close("user-1")
+
+
+@pytest.mark.asyncio
+async def test_volume_threshold_triggers_one_analysis_per_window(
+    recorder: Recorder,
+) -> None:
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=3600,
+        min_new_minutes=5,
+        clock=FakeClock(),
+    )
+
+    results = [await coalescer.ingest("user-1", make_frame(i, 1)) for i in range(10)]
+
+    assert results.count(True) == 2
+    assert len(recorder.analyses) == 2
+    # Each analysis covers the whole rolling buffer, not just the last frame
+    assert len(recorder.analyses[-1].data_points) == 10
+    assert coalescer.pending_minutes("user-1") == 0
+    await coalescer.close("user-1")
+
+
+@pytest.mark.asyncio
+async def test_cadence_elapsed_triggers_analysis(recorder: Recorder) -> None:
+    clock = FakeClock()
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=60,
+        min_new_minutes=1000,
+        clock=clock,
+    )
+
+    assert not await coalescer.ingest("user-1", make_frame(0, 1))
+    clock.now = 61.0
+    assert await coalescer.ingest("user-1", make_frame(1, 1))
+    assert len(recorder.analyses) == 1
+    await coalescer.close("user-1")
+
+
+@pytest.mark.asyncio
+async def test_debounce_timer_flushes_trailing_data(recorder: Recorder) -> None:
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=0.01,
+        min_new_minutes=1000,
+    )
+
+    await coalescer.ingest("user-1", make_frame(0, 2))
+    await asyncio.sleep(0.05)
+
+    assert len(recorder.analyses) == 1
+    assert coalescer.pending_minutes("user-1") == 0
+    await coalescer.close("user-1")
+
+
+@pytest.mark.asyncio
+async def test_samples_in_same_minute_accumulate_and_buffer_rolls(
+    recorder: Recorder,
+) -> None:
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=3600,
+        min_new_minutes=1000,
+        max_buffer_minutes=5,
+        clock=FakeClock(),
+    )
+    same_minute = WebSocketHealthDataPayload(
+        data_points=[
+            ActigraphyDataPointSchema(timestamp=START, value=2.0),
+            ActigraphyDataPointSchema(timestamp=START + timedelta(seconds=30), value=3.0),
+        ]
+    )
+
+    await coalescer.ingest("user-1", same_minute)
+    await coalescer.ingest("user-1", make_frame(1, 8))
+    assert coalescer.buffered_minutes("user-1") == 5
+
+    assert await coalescer.flush("user-1")
+    window = recorder.analyses[0].data_points
+    assert window[0].timestamp == START + timedelta(minutes=4)
+    assert len(window) == 5
+    await coalescer.close("user-1")
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_pending_timer(recorder: Recorder) -> None:
+    coalescer = HealthDataStreamCoalescer(
+        recorder.analyze,
+        recorder.notify,
+        analysis_interval_seconds=0.05,
+        min_new_minutes=1000,
+    )
+
+    await coalescer.ingest("user-1", make_frame(0, 1))
+    await coalescer.close("user-1")
+    await asyncio.sleep(0.1)
+
+    assert recorder.analyses == []
+    assert coalescer.buffered_minutes("user-1") == 0
+
+
+@pytest.mark.asyncio
+async def test_frames_buffer_while_analysis_runs(recorder: Recorder) -> None:
+    release = asyncio.Event()
+    analyze_started = asyncio.Event()
+
+    async def slow_analyze(user_id: str, payload: WebSocketHealthDataPayload) -> None:
+        analyze_started.set()
+        await release.wait()
+        await recorder.analyze(user_id, payload)
+
+    coalescer = HealthDataStreamCoalescer(
+        slow_analyze,
+        recorder.notify,
+        analysis_interval_seconds=3600,
+        min_new_minutes=5,
+        clock=FakeClock(),
+    )
+
+    analysis = asyncio.create_task(coalescer.ingest("user-1", make_frame(0, 5)))
+    await analyze_started.wait()
+    assert [(u.status, u.progress) for u in recorder.updates] == [("processing", 0)]
+
+    # The stream lock is free: the next frame is buffered, not queued
+    assert not await asyncio.wait_for(
+        coalescer.ingest("user-1", make_frame(5, 2)), timeout=1
+    )
+    assert coalescer.pending_minutes("user-1") == 2
+
+    release.set()
+    assert await analysis
+    assert len(recorder.analyses[0].data_points) == 5  # The snapshot, not the buffer
+    assert [(u.status, u.progress) for u in recorder.updates] == [
+        ("processing", 0),
+        ("buffering", 40),
+        ("completed", 100),
+    ]
+    await coalescer.close("user-1")
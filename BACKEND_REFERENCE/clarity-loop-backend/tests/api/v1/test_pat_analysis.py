@@ -0,0 +1,95 @@
+"""Tests for the direct actigraphy PAT analysis endpoint."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from clarity.api.v1.pat_analysis import DirectActigraphyRequest, analyze_actigraphy_data
+from clarity.ml.inference_engine import InferenceResponse
+from clarity.ml.pat_service import ActigraphyAnalysis, ActigraphyInput
+
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def analysis(user_id: str) -> ActigraphyAnalysis:
+    return ActigraphyAnalysis(
+        user_id=user_id,
+        analysis_timestamp=START.isoformat(),
+        sleep_efficiency=85.0,
+        sleep_onset_latency=12.0,
+        wake_after_sleep_onset=20.0,
+        total_sleep_time=7.5,
+        circadian_rhythm_score=0.8,
+        activity_fragmentation=0.3,
+        depression_risk_score=0.1,
+        sleep_stages=["wake"],
+        confidence_score=0.9,
+        clinical_insights=[],
+        embedding=[0.0] * 128,
+    )
+
+
+async def test_direct_analysis_builds_array_backed_input() -> None:
+    captured: list[ActigraphyInput] = []
+
+    async def predict(  # noqa: RUF029
+        input_data: ActigraphyInput, **kwargs: Any
+    ) -> InferenceResponse:
+        captured.append(input_data)
+        return InferenceResponse(
+            request_id=kwargs["request_id"],
+            analysis=analysis(input_data.user_id),
+            processing_time_ms=1.0,
+            timestamp=0.0,
+        )
+
+    request = DirectActigraphyRequest(
+        data_points=[
+            {"timestamp": (START + timedelta(minutes=i)).isoformat(), "value": i}
+            for i in range(120)
+        ],
+        duration_hours=2,
+    )
+
+    response = await analyze_actigraphy_data(
+        request,
+        SimpleNamespace(user_id="user-1"),
+        inference_engine=AsyncMock(predict=predict),
+    )
+
+    assert response.status == "completed"
+    [pat_input] = captured
+    assert pat_input.data_points == []
+    assert pat_input.values is not None
+    np.testing.assert_array_equal(pat_input.values, np.arange(120, dtype=np.float32))
+    assert pat_input.start_time == START
+    assert pat_input.duration_hours == 2
+
+
+@pytest.mark.parametrize("timestamp", [START, START.isoformat()])
+async def test_direct_analysis_accepts_datetime_or_iso_start(
+    timestamp: datetime | str,
+) -> None:
+    engine = AsyncMock()
+    engine.predict.return_value = InferenceResponse(
+        request_id="request-1",
+        analysis=analysis("user-1"),
+        processing_time_ms=1.0,
+        timestamp=0.0,
+    )
+    request = DirectActigraphyRequest(
+        data_points=[{"timestamp": timestamp, "value": 3}]
+    )
+
+    await analyze_actigraphy_data(
+        request, SimpleNamespace(user_id="user-1"), inference_engine=engine
+    )
+
+    pat_input = engine.predict.call_args.kwargs["input_data"]
+    assert pat_input.start_time == START
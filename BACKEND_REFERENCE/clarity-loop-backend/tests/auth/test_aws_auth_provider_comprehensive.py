@@ -7,19 +7,30 @@ user context creation, error handling, and role-based permissions.
 from __future__ import annotations
 
 import asyncio
-import json
 import time
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
-from urllib.error import URLError
 
 from botocore.exceptions import ClientError
+import httpx
 from jose import JWTError
 import pytest
 
-from clarity.auth.aws_auth_provider import CognitoAuthProvider
+from clarity.auth.aws_auth_provider import (
+    AUTH_TOKEN_CACHE_REQUESTS_TOTAL,
+    CognitoAuthProvider,
+    VerifiedTokenCache,
+)
+from clarity.auth.jwks import JWKSManager
 from clarity.models.auth import AuthError, Permission, UserRole
 
 
+def jwks_response(document: dict[str, Any]) -> httpx.Response:
+    return httpx.Response(
+        200, json=document, request=httpx.Request("GET", "https://example.com")
+    )
+
+
 class TestCognitoAuthProviderInitialization:
     """Test Cognito auth provider initialization."""
 
@@ -127,11 +138,10 @@ class TestJWKSHandling:
         expected_url = "https://cognito-idp.us-west-2.amazonaws.com/us-east-1_ABC123/.well-known/jwks.json"
         assert provider.jwks_url == expected_url
 
-    @patch("urllib.request.urlopen")
-    async def test_get_jwks_success(self, mock_urlopen: MagicMock) -> None:
+    @patch("clarity.auth.jwks.httpx.AsyncClient.get", new_callable=AsyncMock)
+    async def test_get_jwks_success(self, mock_get: AsyncMock) -> None:
         """Test successful JWKS retrieval."""
-        mock_response = Mock()
-        mock_response.read.return_value = json.dumps(
+        mock_get.return_value = jwks_response(
             {
                 "keys": [
                     {
@@ -143,10 +153,7 @@ class TestJWKSHandling:
                     }
                 ]
             }
-        ).encode()
-        mock_response.__enter__ = Mock(return_value=mock_response)
-        mock_response.__exit__ = Mock(return_value=None)
-        mock_urlopen.return_value = mock_response
+        )
 
         provider = CognitoAuthProvider(
             user_pool_id="us-east-1_ABC123", client_id="client123"
@@ -158,14 +165,10 @@ class TestJWKSHandling:
         assert len(jwks["keys"]) == 1
         assert jwks["keys"][0]["kid"] == "key1"
 
-    @patch("urllib.request.urlopen")
-    async def test_get_jwks_caching(self, mock_urlopen: MagicMock) -> None:
+    @patch("clarity.auth.jwks.httpx.AsyncClient.get", new_callable=AsyncMock)
+    async def test_get_jwks_caching(self, mock_get: AsyncMock) -> None:
         """Test JWKS caching functionality."""
-        mock_response = Mock()
-        mock_response.read.return_value = json.dumps({"keys": []}).encode()
-        mock_response.__enter__ = Mock(return_value=mock_response)
-        mock_response.__exit__ = Mock(return_value=None)
-        mock_urlopen.return_value = mock_response
+        mock_get.return_value = jwks_response({"keys": []})
 
         provider = CognitoAuthProvider(
             user_pool_id="us-east-1_ABC123", client_id="client123"
@@ -177,39 +180,38 @@ class TestJWKSHandling:
         jwks2 = await provider._get_jwks()
 
         assert jwks1 == jwks2
-        # Should only call urlopen once due to caching
-        mock_urlopen.assert_called_once()
+        # Should only fetch once due to caching
+        mock_get.assert_awaited_once()
 
-    @patch("urllib.request.urlopen")
-    async def test_get_jwks_invalid_url_scheme(self, mock_urlopen: MagicMock) -> None:
+    def test_jwks_manager_rejects_insecure_url_scheme(self) -> None:
         """Test JWKS retrieval with invalid URL scheme."""
-        provider = CognitoAuthProvider(
-            user_pool_id="us-east-1_ABC123", client_id="client123"
-        )
-        provider.jwks_url = "http://insecure-url.com/jwks.json"  # HTTP instead of HTTPS
-
         with pytest.raises(ValueError, match="Invalid URL scheme"):
-            await provider._get_jwks()
+            JWKSManager("http://insecure-url.com/jwks.json")  # HTTP instead of HTTPS
 
-    @patch("urllib.request.urlopen")
+    @patch("clarity.auth.jwks.httpx.AsyncClient.get", new_callable=AsyncMock)
     async def test_get_jwks_network_error_with_cache_fallback(
-        self, mock_urlopen: MagicMock
+        self, mock_get: AsyncMock
     ) -> None:
         """Test JWKS network error with cache fallback."""
         provider = CognitoAuthProvider(
             user_pool_id="us-east-1_ABC123", client_id="client123"
         )
+        provider._jwks = JWKSManager(
+            provider.jwks_url, ttl_seconds=0, min_refresh_interval_seconds=0
+        )
 
         # Set up existing cache
-        provider._jwks_cache = {"keys": [{"kid": "cached_key"}]}
-        provider._jwks_cache_time = time.time()
+        mock_get.return_value = jwks_response({"keys": [{"kid": "cached_key"}]})
+        await provider._get_jwks()
 
         # Mock network failure
-        mock_urlopen.side_effect = URLError("Network error")
+        mock_get.side_effect = httpx.ConnectError("Network error")
+        await provider._jwks.refresh()
 
         # Should return cached JWKS
         jwks = await provider._get_jwks()
         assert jwks["keys"][0]["kid"] == "cached_key"
+        assert provider._jwks.stats["failures"] >= 1
 
 
 class TestTokenVerification:
@@ -223,19 +225,6 @@ class TestTokenVerification:
         )
         provider._initialized = True
 
-        # Mock JWKS
-        mock_jwks = {
-            "keys": [
-                {
-                    "kid": "test_key_id",
-                    "kty": "RSA",
-                    "use": "sig",
-                    "n": "sample_n",
-                    "e": "AQAB",
-                }
-            ]
-        }
-
         # Mock JWT payload
         mock_payload = {
             "sub": "user123",
@@ -247,7 +236,7 @@ class TestTokenVerification:
         }
 
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch(
                 "jose.jwt.get_unverified_header", return_value={"kid": "test_key_id"}
             ),
@@ -266,12 +255,11 @@ class TestTokenVerification:
             user_pool_id="us-east-1_ABC123", client_id="client123"
         )
 
-        mock_jwks = {"keys": [{"kid": "test_key_id"}]}
         mock_payload = {"sub": "user123", "email": "test@example.com"}
 
         with (
             patch.object(provider, "initialize") as mock_init,
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch(
                 "jose.jwt.get_unverified_header", return_value={"kid": "test_key_id"}
             ),
@@ -293,10 +281,7 @@ class TestTokenVerification:
 
         # Pre-populate cache
         cached_user_data = {"user_id": "cached_user", "email": "cached@example.com"}
-        provider._token_cache["cached_token"] = {
-            "user_data": cached_user_data,
-            "timestamp": time.time(),
-        }
+        provider._token_cache.set("cached_token", cached_user_data)
 
         result = await provider.verify_token("cached_token")
 
@@ -311,11 +296,10 @@ class TestTokenVerification:
         )
         provider._initialized = True
 
-        mock_jwks = {"keys": [{"kid": "test_key_id"}]}
         mock_payload = {"sub": "user123", "email": "test@example.com"}
 
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch(
                 "jose.jwt.get_unverified_header", return_value={"kid": "test_key_id"}
             ),
@@ -333,10 +317,8 @@ class TestTokenVerification:
         )
         provider._initialized = True
 
-        mock_jwks = {"keys": [{"kid": "different_key_id"}]}
-
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=None),
             patch(
                 "jose.jwt.get_unverified_header", return_value={"kid": "missing_key_id"}
             ),
@@ -351,10 +333,8 @@ class TestTokenVerification:
         )
         provider._initialized = True
 
-        mock_jwks = {"keys": [{"kid": "test_key_id"}]}
-
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch(
                 "jose.jwt.get_unverified_header", return_value={"kid": "test_key_id"}
             ),
@@ -372,8 +352,9 @@ class TestTokenVerification:
 
         with (
             patch.object(
-                provider, "_get_jwks", side_effect=Exception("Unexpected error")
+                provider._jwks, "get_key", side_effect=Exception("Unexpected error")
             ),
+            patch("jose.jwt.get_unverified_header", return_value={"kid": "test_key"}),
             pytest.raises(AuthError, match="An unexpected error occurred"),
         ):
             await provider.verify_token("test_token")
@@ -382,45 +363,75 @@ class TestTokenVerification:
 class TestTokenCacheManagement:
     """Test token cache management functionality."""
 
-    def test_remove_expired_tokens_with_cache_disabled(self):
-        """Test cache cleanup when caching is disabled."""
+    def test_token_cache_does_not_keep_raw_tokens(self):
+        """Test that cache keys are token digests, not bearer tokens."""
+        cache = VerifiedTokenCache()
+
+        cache.set("secret.bearer.token", {"user_id": "user123"})
+
+        assert "secret.bearer.token" in cache
+        assert all(isinstance(key, bytes) for key in cache._entries)
+        assert b"secret.bearer.token" not in cache._entries
+
+    def test_token_cache_expiry_bound_to_exp_claim(self):
+        """Test that cached claims never outlive the token."""
+        cache = VerifiedTokenCache(ttl_seconds=300)
+
+        cache.set("expired_token", {"exp": time.time() - 1})
+        cache.set("short_token", {"exp": time.time() + 0.01})
+        cache.set("valid_token", {"exp": time.time() + 3600})
+        time.sleep(0.02)
+
+        assert "expired_token" not in cache
+        assert cache.get("short_token") is None
+        assert cache.get("valid_token") is not None
+        assert len(cache) == 1
+
+    def test_token_cache_bounded_with_lru_eviction(self):
+        """Test that the configured max size is enforced, oldest first."""
         provider = CognitoAuthProvider(
             user_pool_id="us-east-1_ABC123",
             client_id="client123",
-            middleware_config={"auth_provider_config": {"cache_enabled": False}},
+            middleware_config={"auth_provider_config": {"cache_max_size": 2}},
         )
+        cache = provider._token_cache
 
-        # Add some tokens to cache anyway
-        provider._token_cache["token1"] = {"timestamp": time.time() - 1000}
+        cache.set("token1", {"user_id": "1"})
+        cache.set("token2", {"user_id": "2"})
+        cache.get("token1")
+        cache.set("token3", {"user_id": "3"})
 
-        provider._remove_expired_tokens()
+        assert len(cache) == 2
+        assert "token1" in cache
+        assert "token2" not in cache
 
-        # Should not remove anything when cache is disabled
-        assert "token1" in provider._token_cache
+    def test_token_cache_sweeps_expired_entries_on_insert(self):
+        """Test that inserts drop expired least recently used entries."""
+        cache = VerifiedTokenCache(ttl_seconds=0.01)
+        for n in range(3):
+            cache.set(f"token{n}", {})
+        time.sleep(0.02)
 
-    def test_remove_expired_tokens_removes_old_tokens(self):
-        """Test that expired tokens are removed from cache."""
-        provider = CognitoAuthProvider(
-            user_pool_id="us-east-1_ABC123", client_id="client123"
-        )
-        provider._token_cache_ttl_seconds = 300  # 5 minutes
+        cache.ttl_seconds = 300
+        cache.set("fresh", {})
+        cache.set("fresher", {})
 
-        current_time = time.time()
-        # Add expired token
-        provider._token_cache["expired_token"] = {
-            "user_data": {"user_id": "expired"},
-            "timestamp": current_time - 600,  # 10 minutes ago
-        }
-        # Add valid token
-        provider._token_cache["valid_token"] = {
-            "user_data": {"user_id": "valid"},
-            "timestamp": current_time - 100,  # 1.6 minutes ago
-        }
+        assert len(cache) == 2
 
-        provider._remove_expired_tokens()
+    def test_token_cache_counts_hits_and_misses(self):
+        """Test that lookups are exported as Prometheus counters."""
+        cache = VerifiedTokenCache()
+        hits = AUTH_TOKEN_CACHE_REQUESTS_TOTAL.labels(outcome="hit")
+        misses = AUTH_TOKEN_CACHE_REQUESTS_TOTAL.labels(outcome="miss")
+        before = (hits._value.get(), misses._value.get())
 
-        assert "expired_token" not in provider._token_cache
-        assert "valid_token" in provider._token_cache
+        cache.get("token")
+        cache.set("token", {"user_id": "user123"})
+        cache.get("token")
+        cache.get("token")
+
+        assert hits._value.get() - before[0] == 2
+        assert misses._value.get() - before[1] == 1
 
 
 class TestUserInfoRetrieval:
@@ -660,6 +671,7 @@ class TestUserContextCreation:
         }
 
         context = await provider.get_or_create_user_context(cognito_user_info)
+        await provider.flush_login_writes()
 
         assert context.user_id == "user123"
         mock_dynamodb.update_item.assert_called_once()  # Should update last login
@@ -832,7 +844,6 @@ class TestProductionIntegrationScenarios:
         provider._initialized = True
 
         # Mock successful token verification
-        mock_jwks = {"keys": [{"kid": "test_key"}]}
         mock_payload = {
             "sub": "user123",
             "email": "user@example.com",
@@ -843,7 +854,7 @@ class TestProductionIntegrationScenarios:
         }
 
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch("jose.jwt.get_unverified_header", return_value={"kid": "test_key"}),
             patch("jose.jwt.decode", return_value=mock_payload),
             patch.object(
@@ -874,7 +885,10 @@ class TestProductionIntegrationScenarios:
 
         # Test JWKS failure
         with (
-            patch.object(provider, "_get_jwks", side_effect=Exception("JWKS failed")),
+            patch.object(
+                provider._jwks, "get_key", side_effect=Exception("JWKS failed")
+            ),
+            patch("jose.jwt.get_unverified_header", return_value={"kid": "test_key"}),
             pytest.raises(AuthError, match="An unexpected error occurred"),
         ):
             await provider.verify_token("any_token")
@@ -886,11 +900,10 @@ class TestProductionIntegrationScenarios:
         )
         provider._initialized = True
 
-        mock_jwks = {"keys": [{"kid": "test_key"}]}
         mock_payload = {"sub": "user123", "email": "test@example.com"}
 
         with (
-            patch.object(provider, "_get_jwks", return_value=mock_jwks),
+            patch.object(provider._jwks, "get_key", return_value=Mock()),
             patch("jose.jwt.get_unverified_header", return_value={"kid": "test_key"}),
             patch("jose.jwt.decode", return_value=mock_payload),
         ):
@@ -9,17 +9,26 @@ from __future__ import annotations
 import asyncio
 from datetime import UTC, datetime
 from typing import Any
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 from botocore.exceptions import ClientError
+import httpx
 from jose import JWTError
 import pytest
-import requests
 
 from clarity.auth.aws_cognito_provider import CognitoAuthProvider, get_cognito_provider
+from clarity.auth.jwks import JWKSManager
 from clarity.core.exceptions import AuthenticationError
 from clarity.models.user import User
 
+HTTPX_GET = "clarity.auth.jwks.httpx.AsyncClient.get"
+
+
+def jwks_response(document: dict[str, Any], status_code: int = 200) -> httpx.Response:
+    return httpx.Response(
+        status_code, json=document, request=httpx.Request("GET", "https://example.com")
+    )
+
 
 class TestCognitoAuthProviderInitialization:
     """Test Cognito auth provider initialization."""
@@ -41,9 +50,9 @@ class TestCognitoAuthProviderInitialization:
             provider.jwks_url
             == "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_ABC123/.well-known/jwks.json"
         )
-        assert provider._jwks_cache is None
-        assert provider._jwks_cache_time == 0.0
-        assert provider._jwks_cache_ttl == 3600
+        assert provider._jwks.url == provider.jwks_url
+        assert provider._jwks.ttl_seconds == 3600
+        assert not provider._jwks.loaded
 
     @patch("clarity.auth.aws_cognito_provider.boto3.client")
     def test_cognito_auth_provider_client_creation(
@@ -74,95 +83,81 @@ class TestCognitoAuthProviderInitialization:
 class TestCognitoJWKSCaching:
     """Test JWKS key caching functionality."""
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_initial_fetch(self, mock_get: MagicMock) -> None:
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_initial_fetch(self, mock_get: AsyncMock) -> None:
         """Test initial JWKS fetch and caching."""
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "keys": [{"kid": "key1", "kty": "RSA", "use": "sig"}]
-        }
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_get.return_value = jwks_response(
+            {"keys": [{"kid": "key1", "kty": "RSA", "use": "sig"}]}
+        )
 
         provider = CognitoAuthProvider("pool", "client")
-
-        with patch("clarity.auth.aws_cognito_provider.time.time", return_value=1000.0):
-            jwks = provider.jwks
+        jwks = await provider._jwks.get_jwks()
 
         assert jwks == {"keys": [{"kid": "key1", "kty": "RSA", "use": "sig"}]}
-        assert provider._jwks_cache == jwks
-        assert provider._jwks_cache_time == 1000.0
-        mock_get.assert_called_once_with(provider.jwks_url, timeout=30)
+        assert provider._jwks.loaded
+        mock_get.assert_awaited_once_with(provider.jwks_url)
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_cache_hit(self, mock_get: MagicMock) -> None:
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_cache_hit(self, mock_get: AsyncMock) -> None:
         """Test JWKS cache hit (no new request)."""
+        mock_get.return_value = jwks_response({"keys": [{"kid": "cached_key"}]})
         provider = CognitoAuthProvider("pool", "client")
-        provider._jwks_cache = {"keys": [{"kid": "cached_key"}]}
-        provider._jwks_cache_time = 1000.0
 
-        with patch("clarity.auth.aws_cognito_provider.time.time", return_value=1500.0):
-            jwks = provider.jwks
+        await provider._jwks.get_jwks()
+        jwks = await provider._jwks.get_jwks()
 
         assert jwks == {"keys": [{"kid": "cached_key"}]}
-        mock_get.assert_not_called()
-
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_cache_expired(self, mock_get: MagicMock) -> None:
-        """Test JWKS cache expiration and refresh."""
-        mock_response = Mock()
-        mock_response.json.return_value = {"keys": [{"kid": "new_key"}]}
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_get.assert_awaited_once()
 
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_cache_expired(self, mock_get: AsyncMock) -> None:
+        """Test JWKS cache expiration and background refresh."""
+        mock_get.return_value = jwks_response({"keys": [{"kid": "old_key"}]})
         provider = CognitoAuthProvider("pool", "client")
-        provider._jwks_cache = {"keys": [{"kid": "old_key"}]}
-        provider._jwks_cache_time = 1000.0
+        provider._jwks = JWKSManager(
+            provider.jwks_url, ttl_seconds=0, min_refresh_interval_seconds=0
+        )
+        await provider._jwks.get_jwks()
 
-        # Cache TTL is 3600 seconds, so 1000 + 3601 = 4601 should expire cache
-        with patch("clarity.auth.aws_cognito_provider.time.time", return_value=4601.0):
-            jwks = provider.jwks
+        mock_get.return_value = jwks_response({"keys": [{"kid": "new_key"}]})
+        # Expired keys are served while the refresh runs in the background
+        assert await provider._jwks.get_jwks() == {"keys": [{"kid": "old_key"}]}
+        await provider._jwks.refresh()
 
-        assert jwks == {"keys": [{"kid": "new_key"}]}
-        assert provider._jwks_cache_time == 4601.0
-        mock_get.assert_called_once()
+        assert await provider._jwks.get_jwks() == {"keys": [{"kid": "new_key"}]}
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_fetch_failure_no_cache(self, mock_get: MagicMock) -> None:
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_fetch_failure_no_cache(self, mock_get: AsyncMock) -> None:
         """Test JWKS fetch failure with no existing cache."""
-        mock_get.side_effect = requests.RequestException("Network error")
+        mock_get.side_effect = httpx.ConnectError("Network error")
 
         provider = CognitoAuthProvider("pool", "client")
 
-        with pytest.raises(AuthenticationError, match="Failed to fetch JWKS keys"):
-            _ = provider.jwks
+        with pytest.raises(RuntimeError, match="Failed to fetch JWKS keys"):
+            await provider._jwks.get_jwks()
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_fetch_failure_with_cache(self, mock_get: MagicMock) -> None:
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_fetch_failure_with_cache(self, mock_get: AsyncMock) -> None:
         """Test JWKS fetch failure with existing cache."""
-        mock_get.side_effect = requests.RequestException("Network error")
-
+        mock_get.return_value = jwks_response({"keys": [{"kid": "cached_key"}]})
         provider = CognitoAuthProvider("pool", "client")
-        provider._jwks_cache = {"keys": [{"kid": "cached_key"}]}
-        provider._jwks_cache_time = 1000.0
+        await provider._jwks.get_jwks()
 
-        with patch("clarity.auth.aws_cognito_provider.time.time", return_value=5000.0):
-            jwks = provider.jwks
+        mock_get.side_effect = httpx.ConnectError("Network error")
+        await provider._jwks.refresh()
 
         # Should return cached version despite fetch failure
-        assert jwks == {"keys": [{"kid": "cached_key"}]}
+        assert await provider._jwks.get_jwks() == {"keys": [{"kid": "cached_key"}]}
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
-    def test_jwks_property_http_error(self, mock_get: MagicMock) -> None:
+    @patch(HTTPX_GET, new_callable=AsyncMock)
+    async def test_jwks_http_error(self, mock_get: AsyncMock) -> None:
         """Test JWKS HTTP error handling."""
-        mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.HTTPError("404 Not Found")
-        mock_get.return_value = mock_response
+        mock_get.return_value = jwks_response({}, status_code=404)
 
         provider = CognitoAuthProvider("pool", "client")
 
-        with pytest.raises(AuthenticationError, match="Failed to fetch JWKS keys"):
-            _ = provider.jwks
+        with pytest.raises(RuntimeError, match="Failed to fetch JWKS keys"):
+            await provider._jwks.get_jwks()
 
 
 class TestTokenVerification:
@@ -183,10 +178,10 @@ class TestTokenVerification:
             ]
         }
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_claims")
-    @patch("clarity.auth.aws_cognito_provider.jwk.construct")
+    @patch("clarity.auth.jwks.jwk.construct")
     @patch("clarity.auth.aws_cognito_provider.base64url_decode")
     @patch("clarity.auth.aws_cognito_provider.time.time")
     @pytest.mark.asyncio
@@ -197,14 +192,14 @@ class TestTokenVerification:
         mock_jwk_construct: MagicMock,
         mock_get_claims: MagicMock,
         mock_get_headers: MagicMock,
-        mock_requests_get: MagicMock,
+        mock_http_get: AsyncMock,
     ) -> None:
         """Test successful token verification."""
         # Mock JWKS fetch
         mock_response = Mock()
         mock_response.json.return_value = self.mock_jwks
         mock_response.raise_for_status.return_value = None
-        mock_requests_get.return_value = mock_response
+        mock_http_get.return_value = mock_response
 
         # Mock setup
         mock_get_headers.return_value = {"kid": "test_key_id"}
@@ -229,18 +224,18 @@ class TestTokenVerification:
         assert result["email"] == "test@example.com"
         mock_public_key.verify.assert_called_once()
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @pytest.mark.asyncio
     async def test_verify_token_kid_not_found(
-        self, mock_get_headers: MagicMock, mock_requests_get: MagicMock
+        self, mock_get_headers: MagicMock, mock_http_get: AsyncMock
     ) -> None:
         """Test token verification with unknown key ID."""
         # Mock JWKS fetch
         mock_response = Mock()
         mock_response.json.return_value = self.mock_jwks
         mock_response.raise_for_status.return_value = None
-        mock_requests_get.return_value = mock_response
+        mock_http_get.return_value = mock_response
 
         mock_get_headers.return_value = {"kid": "unknown_key_id"}
 
@@ -248,10 +243,10 @@ class TestTokenVerification:
 
         assert result is None
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_claims")
-    @patch("clarity.auth.aws_cognito_provider.jwk.construct")
+    @patch("clarity.auth.jwks.jwk.construct")
     @patch("clarity.auth.aws_cognito_provider.time.time")
     @pytest.mark.asyncio
     async def test_verify_token_signature_verification_failed(
@@ -260,14 +255,14 @@ class TestTokenVerification:
         mock_jwk_construct: MagicMock,
         mock_get_claims: MagicMock,
         mock_get_headers: MagicMock,
-        mock_requests_get: MagicMock,
+        mock_http_get: AsyncMock,
     ) -> None:
         """Test token verification with invalid signature."""
         # Mock JWKS fetch
         mock_response = Mock()
         mock_response.json.return_value = self.mock_jwks
         mock_response.raise_for_status.return_value = None
-        mock_requests_get.return_value = mock_response
+        mock_http_get.return_value = mock_response
 
         mock_get_headers.return_value = {"kid": "test_key_id"}
         mock_get_claims.return_value = {
@@ -285,10 +280,10 @@ class TestTokenVerification:
 
         assert result is None
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_claims")
-    @patch("clarity.auth.aws_cognito_provider.jwk.construct")
+    @patch("clarity.auth.jwks.jwk.construct")
     @patch("clarity.auth.aws_cognito_provider.base64url_decode")
     @patch("clarity.auth.aws_cognito_provider.time.time")
     @pytest.mark.asyncio
@@ -299,14 +294,14 @@ class TestTokenVerification:
         mock_jwk_construct: MagicMock,
         mock_get_claims: MagicMock,
         mock_get_headers: MagicMock,
-        mock_requests_get: MagicMock,
+        mock_http_get: AsyncMock,
     ) -> None:
         """Test token verification with expired token."""
         # Mock JWKS fetch
         mock_response = Mock()
         mock_response.json.return_value = self.mock_jwks
         mock_response.raise_for_status.return_value = None
-        mock_requests_get.return_value = mock_response
+        mock_http_get.return_value = mock_response
 
         mock_get_headers.return_value = {"kid": "test_key_id"}
         mock_get_claims.return_value = {
@@ -324,10 +319,10 @@ class TestTokenVerification:
 
         assert result is None
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_claims")
-    @patch("clarity.auth.aws_cognito_provider.jwk.construct")
+    @patch("clarity.auth.jwks.jwk.construct")
     @patch("clarity.auth.aws_cognito_provider.base64url_decode")
     @patch("clarity.auth.aws_cognito_provider.time.time")
     @pytest.mark.asyncio
@@ -338,14 +333,14 @@ class TestTokenVerification:
         mock_jwk_construct: MagicMock,
         mock_get_claims: MagicMock,
         mock_get_headers: MagicMock,
-        mock_requests_get: MagicMock,
+        mock_http_get: AsyncMock,
     ) -> None:
         """Test token verification with wrong audience."""
         # Mock JWKS fetch
         mock_response = Mock()
         mock_response.json.return_value = self.mock_jwks
         mock_response.raise_for_status.return_value = None
-        mock_requests_get.return_value = mock_response
+        mock_http_get.return_value = mock_response
 
         mock_get_headers.return_value = {"kid": "test_key_id"}
         mock_get_claims.return_value = {
@@ -363,16 +358,16 @@ class TestTokenVerification:
 
         assert result is None
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @pytest.mark.asyncio
     async def test_verify_token_jwt_error(
-        self, mock_get_headers: MagicMock, mock_requests_get: MagicMock
+        self, mock_get_headers: MagicMock, mock_http_get: AsyncMock
     ) -> None:
         """Test token verification with JWT error."""
         # Mock the JWKS HTTP request
-        mock_requests_get.return_value.json.return_value = self.mock_jwks
-        mock_requests_get.return_value.raise_for_status.return_value = None
+        mock_http_get.return_value.json.return_value = self.mock_jwks
+        mock_http_get.return_value.raise_for_status.return_value = None
 
         # Mock JWT error during header extraction
         mock_get_headers.side_effect = JWTError("Invalid token format")
@@ -381,16 +376,16 @@ class TestTokenVerification:
 
         assert result is None
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @patch("clarity.auth.aws_cognito_provider.jwt.get_unverified_headers")
     @pytest.mark.asyncio
     async def test_verify_token_unexpected_error(
-        self, mock_get_headers: MagicMock, mock_requests_get: MagicMock
+        self, mock_get_headers: MagicMock, mock_http_get: AsyncMock
     ) -> None:
         """Test token verification with unexpected error."""
         # Mock the JWKS HTTP request
-        mock_requests_get.return_value.json.return_value = self.mock_jwks
-        mock_requests_get.return_value.raise_for_status.return_value = None
+        mock_http_get.return_value.json.return_value = self.mock_jwks
+        mock_http_get.return_value.raise_for_status.return_value = None
 
         # Mock unexpected error during header extraction
         mock_get_headers.side_effect = Exception("Unexpected error")
@@ -769,21 +764,21 @@ class TestProviderLifecycle:
         """Set up test fixtures."""
         self.provider = CognitoAuthProvider("us-east-1_ABC123", "client123")
 
-    @patch.object(CognitoAuthProvider, "jwks")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_initialize_success(self, mock_jwks: MagicMock) -> None:
+    async def test_initialize_success(self, mock_get: AsyncMock) -> None:
         """Test successful provider initialization."""
-        mock_jwks.return_value = {"keys": []}
+        mock_get.return_value = jwks_response({"keys": []})
 
         await self.provider.initialize()
 
         # Should not raise any errors
 
-    @patch("clarity.auth.aws_cognito_provider.requests.get")
+    @patch(HTTPX_GET, new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_initialize_failure(self, mock_requests_get: MagicMock) -> None:
+    async def test_initialize_failure(self, mock_http_get: AsyncMock) -> None:
         """Test provider initialization failure."""
-        mock_requests_get.side_effect = Exception("JWKS fetch failed")
+        mock_http_get.side_effect = Exception("JWKS fetch failed")
 
         with pytest.raises(Exception, match="Failed to fetch JWKS keys"):
             await self.provider.initialize()
@@ -791,20 +786,20 @@ class TestProviderLifecycle:
     @pytest.mark.asyncio
     async def test_shutdown(self) -> None:
         """Test provider shutdown."""
-        self.provider._jwks_cache = {"keys": []}
+        self.provider._jwks._jwks = {"keys": []}
 
         await self.provider.shutdown()
 
-        assert self.provider._jwks_cache is None
+        assert not self.provider._jwks.loaded
 
     @pytest.mark.asyncio
     async def test_cleanup(self) -> None:
         """Test provider cleanup."""
-        self.provider._jwks_cache = {"keys": []}
+        self.provider._jwks._jwks = {"keys": []}
 
         await self.provider.cleanup()
 
-        assert self.provider._jwks_cache is None
+        assert not self.provider._jwks.loaded
 
     @pytest.mark.asyncio
     async def test_get_user_info_success(self) -> None:
@@ -1025,16 +1020,13 @@ class TestProductionScenarios:
     async def test_concurrent_jwks_access(self) -> None:
         """Test concurrent access to JWKS cache."""
         # Mock JWKS fetch
-        with patch("clarity.auth.aws_cognito_provider.requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.json.return_value = {"keys": [{"kid": "key1"}]}
-            mock_response.raise_for_status.return_value = None
-            mock_get.return_value = mock_response
+        with patch(HTTPX_GET, new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = jwks_response({"keys": [{"kid": "key1"}]})
 
             # Simulate concurrent access
             async def access_jwks() -> dict[str, Any]:
                 await asyncio.sleep(0)  # Make it properly async
-                return self.provider.jwks
+                return await self.provider._jwks.get_jwks()
 
             # Run multiple concurrent accesses
             results = await asyncio.gather(*[access_jwks() for _ in range(5)])
@@ -1043,27 +1035,25 @@ class TestProductionScenarios:
             for result in results:
                 assert result == {"keys": [{"kid": "key1"}]}
 
-            # Should only fetch once due to caching
-            assert mock_get.call_count <= 2  # Allow for some race conditions
+            # Concurrent first loads share a single fetch
+            mock_get.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_provider_resilience_to_network_issues(self) -> None:
         """Test provider resilience to network issues."""
         # Test JWKS fetch with network issues
-        with patch("clarity.auth.aws_cognito_provider.requests.get") as mock_get:
+        with patch(HTTPX_GET, new_callable=AsyncMock) as mock_get:
             # Both calls fail - simulates persistent network issues
-            mock_get.side_effect = requests.RequestException("Network timeout")
+            mock_get.side_effect = httpx.ConnectError("Network timeout")
 
             # Should raise on first call with no cache
-            with pytest.raises(AuthenticationError):
-                _ = self.provider.jwks
+            with pytest.raises(RuntimeError):
+                await self.provider._jwks.get_jwks()
 
             # Set up cache first
-            self.provider._jwks_cache = {"keys": [{"kid": "cached"}]}
+            self.provider._jwks._jwks = {"keys": [{"kid": "cached"}]}
 
             # Should return cached version on network error
-            with patch(
-                "clarity.auth.aws_cognito_provider.time.time", return_value=10000.0
-            ):
-                jwks = self.provider.jwks
+            await self.provider._jwks.refresh()
+            jwks = await self.provider._jwks.get_jwks()
             assert jwks == {"keys": [{"kid": "cached"}]}
@@ -0,0 +1,143 @@
+"""Tests for the asynchronously refreshed JWKS manager."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+import time
+from unittest.mock import patch
+
+from jose import jwk
+import pytest
+
+from clarity.auth import aws_cognito_provider
+from clarity.auth.aws_auth_provider import CognitoAuthProvider
+from clarity.auth.jwks import JWKSManager
+from clarity.models.auth import AuthError
+from tests.fakes.jwks_server import FakeJWKSServer, SigningKey
+
+CLIENT_ID = "client123"
+
+
+@pytest.fixture
+def server() -> Iterator[FakeJWKSServer]:
+    with FakeJWKSServer() as fake:
+        yield fake
+
+
+def make_manager(server: FakeJWKSServer, **options: float) -> JWKSManager:
+    return JWKSManager(server.url, allow_insecure=True, **options)
+
+
+def claims(issuer: str, **extra: object) -> dict[str, object]:
+    return {
+        "sub": "user123",
+        "email": "test@example.com",
+        "aud": CLIENT_ID,
+        "iss": issuer,
+        "exp": int(time.time()) + 3600,
+        **extra,
+    }
+
+
+async def test_verification_uses_indexed_keys(server: FakeJWKSServer) -> None:
+    with patch("boto3.client"):
+        provider = CognitoAuthProvider("us-east-1_ABC123", CLIENT_ID)
+    provider._jwks = make_manager(server)
+    provider._initialized = True
+    provider.cache_is_enabled = False
+    issuer = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_ABC123"
+    tokens = [server.keys[0].sign(claims(issuer, n=n)) for n in range(5)]
+
+    with patch("jose.jwk.construct", wraps=jwk.construct) as construct:
+        results = [await provider.verify_token(token) for token in tokens]
+
+    assert all(result and result["user_id"] == "user123" for result in results)
+    assert server.requests == 1
+    construct.assert_called_once()
+
+    with pytest.raises(AuthError, match="Unable to find appropriate key"):
+        await provider.verify_token(SigningKey().sign(claims(issuer)))
+    await provider.cleanup()
+
+
+async def test_unknown_kid_refreshes_once_for_concurrent_requests(
+    server: FakeJWKSServer,
+) -> None:
+    manager = make_manager(server, min_refresh_interval_seconds=0.2)
+    await manager.get_key(server.keys[0].kid)
+    await asyncio.sleep(0.2)
+
+    rotated = server.rotate()
+    server.delay_seconds = 0.1
+    keys = await asyncio.gather(*(manager.get_key(rotated.kid) for _ in range(20)))
+
+    assert all(key is keys[0] and key is not None for key in keys)
+    assert server.requests == 2
+
+    # Unknown kids are rate limited, so forged headers cannot force fetches
+    assert await manager.get_key("forged") is None
+    assert server.requests == 2
+    await manager.close()
+
+
+async def test_refresh_ahead_does_not_block_requests(server: FakeJWKSServer) -> None:
+    manager = make_manager(
+        server,
+        ttl_seconds=0.2,
+        refresh_ahead_seconds=0.1,
+        min_refresh_interval_seconds=0,
+    )
+    kid = server.keys[0].kid
+    await manager.get_key(kid)
+    await asyncio.sleep(0.12)
+    server.delay_seconds = 0.3
+
+    started = time.perf_counter()
+    key = await manager.get_key(kid)
+
+    assert key is not None
+    assert time.perf_counter() - started < 0.1
+    assert manager._refresh_task is not None
+    await manager._refresh_task
+    assert server.requests == 2
+    assert manager.age_seconds < 0.1
+    await manager.close()
+
+
+async def test_stale_keys_served_when_refresh_fails(server: FakeJWKSServer) -> None:
+    manager = make_manager(server, ttl_seconds=0.05, min_refresh_interval_seconds=0)
+    kid = server.keys[0].kid
+    key = await manager.get_key(kid)
+
+    server.fail = True
+    await asyncio.sleep(0.06)
+    assert await manager.get_key(kid) is key
+    await manager.refresh()
+
+    assert await manager.get_key(kid) is key
+    assert manager.stats["failures"] >= 1
+    await manager.close()
+
+
+async def test_cognito_provider_verifies_signature(server: FakeJWKSServer) -> None:
+    with patch("boto3.client"):
+        provider = aws_cognito_provider.CognitoAuthProvider(
+            "us-east-1_ABC123", CLIENT_ID
+        )
+    provider._jwks = make_manager(server)
+    token = server.keys[0].sign(claims(provider.issuer))
+
+    assert (await provider.verify_token(token) or {}).get("sub") == "user123"
+    assert await provider.verify_token(token[:-4] + "AAAA") is None
+    await provider.shutdown()
+
+
+async def test_unavailable_endpoint_and_insecure_url(server: FakeJWKSServer) -> None:
+    server.fail = True
+    manager = make_manager(server)
+
+    with pytest.raises(RuntimeError, match="Failed to fetch JWKS keys"):
+        await manager.get_key("any")
+    with pytest.raises(ValueError, match="Only HTTPS is allowed"):
+        JWKSManager(server.url)
@@ -1,11 +1,14 @@
 """Tests for Account Lockout Service."""
 
 import asyncio
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
 import logging
+from typing import Any
+from unittest.mock import AsyncMock
 
 import pytest
 
+from clarity.auth import lockout_service as lockout_module
 from clarity.auth.lockout_service import AccountLockoutError, AccountLockoutService
 
 logger = logging.getLogger(__name__)
@@ -242,3 +245,105 @@ class TestAccountLockoutService:
         long_email = "a" * 1000 + "@example.com"
         await lockout_service.record_failed_attempt(long_email, "192.168.1.1")
         await lockout_service.check_lockout(long_email)
+
+    @pytest.mark.asyncio
+    async def test_expired_records_are_swept(
+        self, lockout_service: AccountLockoutService
+    ) -> None:
+        """Test that stale failure windows are dropped from memory."""
+        for i in range(100):
+            await lockout_service.record_failed_attempt(f"user{i}@example.com")
+        for record in lockout_service._mem.values():
+            record.expires_at = 0
+
+        lockout_service._next_sweep = 0
+        await lockout_service.record_failed_attempt("fresh@example.com")
+
+        assert list(lockout_service._mem) == ["lockout:v1:fresh@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_redis_uses_one_script_call_per_operation(self) -> None:
+        """Test that the Redis path makes a single round trip per operation."""
+        service = AccountLockoutService(redis_url="redis://localhost:6379/0")
+        service._register_failure_script = AsyncMock(side_effect=[0, 1])
+        service._lock_remaining_script = AsyncMock(return_value=899_000)
+
+        assert await service.record_failed_attempt("User@Example.com") is False
+        assert await service.record_failed_attempt("User@Example.com") is True
+        service._register_failure_script.assert_awaited_with(
+            keys=["lockout:v1:user@example.com"], args=[3, 900]
+        )
+
+        with pytest.raises(AccountLockoutError) as exc_info:
+            await service.check_lockout("User@Example.com")
+        unlock_in = exc_info.value.unlock_time - datetime.now(UTC)
+        assert timedelta(seconds=897) < unlock_in <= timedelta(seconds=899)
+        service._lock_remaining_script.assert_awaited_once_with(
+            keys=["lockout:v1:user@example.com"]
+        )
+
+
+class TestRedisLockoutScripts:
+    """Run the lockout Lua scripts on a Redis fake with Lua scripting."""
+
+    @pytest.fixture
+    def redis_client(self, monkeypatch: pytest.MonkeyPatch) -> Any:
+        """Point the service at an in-process Redis server; return a client."""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(
+            lockout_module.redis,
+            "from_url",
+            lambda *_, **__: fakeredis.FakeAsyncRedis(server=server),
+        )
+        return fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    @pytest.mark.asyncio
+    async def test_failures_lock_at_threshold(self, redis_client: Any) -> None:
+        """Test the count, the lock and the remaining lockout time."""
+        service = AccountLockoutService(redis_url="redis://fake")
+        key = "lockout:v1:user@example.com"
+
+        assert await service.register_failure("User@Example.com") is False
+        assert await service.register_failure("user@example.com") is False
+        assert await redis_client.hgetall(key) == {"attempts": "2"}
+        # The failure window runs, but the account is not locked yet
+        assert 0 < await redis_client.ttl(key) <= 900
+        assert await service.lock_remaining("user@example.com") == 0
+
+        assert await service.register_failure("user@example.com") is True
+        assert await redis_client.hgetall(key) == {"attempts": "3", "locked": "1"}
+        assert 899 < await service.lock_remaining("user@example.com") <= 900
+        with pytest.raises(AccountLockoutError):
+            await service.check_lockout("user@example.com")
+
+        # Further failures keep the account locked without extending the lock
+        await redis_client.pexpire(key, 10_000)
+        assert await service.register_failure("user@example.com") is True
+        assert 9 < await service.lock_remaining("user@example.com") <= 10
+
+        await service.reset("user@example.com")
+        assert await redis_client.exists(key) == 0
+        assert not await service.is_locked("user@example.com")
+
+    @pytest.mark.asyncio
+    async def test_lock_and_failure_window_expire(self, redis_client: Any) -> None:
+        """Test the key TTL ends both the failure window and the lockout."""
+        service = AccountLockoutService(
+            max_attempts=2,
+            lockout_duration=timedelta(seconds=1),
+            redis_url="redis://fake",
+        )
+
+        assert await service.register_failure("user@example.com") is False
+        await asyncio.sleep(1.1)
+        # The window expired, so this is a first failure again
+        assert await service.register_failure("user@example.com") is False
+        assert await service.register_failure("user@example.com") is True
+        assert 0 < await service.lock_remaining("user@example.com") <= 1
+
+        await asyncio.sleep(1.1)
+        assert await service.lock_remaining("user@example.com") == 0
+        assert await redis_client.exists("lockout:v1:user@example.com") == 0
+        await service.check_lockout("user@example.com")
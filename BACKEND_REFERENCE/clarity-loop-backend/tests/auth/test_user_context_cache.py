@@ -0,0 +1,140 @@
+"""Tests for user-context caching and write-behind last-login tracking."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from clarity.auth.aws_auth_provider import (
+    CognitoAuthProvider,
+    UserContextCache,
+    invalidate_user_context,
+)
+from clarity.models.auth import UserRole
+
+USER_RECORD = {
+    "user_id": "user123",
+    "email": "test@example.com",
+    "role": "clinician",
+    "status": "active",
+}
+
+
+def make_provider(**config: Any) -> tuple[CognitoAuthProvider, AsyncMock]:
+    dynamodb = AsyncMock()
+    dynamodb.get_item.return_value = dict(USER_RECORD)
+    provider = CognitoAuthProvider(
+        user_pool_id="us-east-1_ABC123",
+        client_id="client123",
+        dynamodb_service=dynamodb,
+        middleware_config={"auth_provider_config": config},
+    )
+    return provider, dynamodb
+
+
+def user_info(expires_in: float = 3600.0) -> dict[str, Any]:
+    return {
+        "user_id": "user123",
+        "email": "test@example.com",
+        "verified": True,
+        "custom_claims": {},
+        "exp": time.time() + expires_in,
+    }
+
+
+async def test_repeat_requests_skip_dynamodb() -> None:
+    provider, dynamodb = make_provider()
+
+    contexts = [
+        await provider.get_or_create_user_context(user_info()) for _ in range(3)
+    ]
+    await provider.flush_login_writes()
+
+    assert all(context is contexts[0] for context in contexts)
+    assert contexts[0].role == UserRole.CLINICIAN
+    dynamodb.get_item.assert_awaited_once()
+    # Debounced: one last-login write for three requests
+    dynamodb.update_item.assert_awaited_once()
+
+
+async def test_last_login_written_again_after_interval() -> None:
+    provider, dynamodb = make_provider(last_login_interval_seconds=0)
+
+    for _ in range(3):
+        await provider.get_or_create_user_context(user_info())
+    await provider.flush_login_writes()
+
+    dynamodb.get_item.assert_awaited_once()
+    assert dynamodb.update_item.await_count == 3
+
+
+async def test_context_ttl_is_capped_by_token_expiry() -> None:
+    provider, dynamodb = make_provider(user_context_ttl_seconds=3600)
+
+    await provider.get_or_create_user_context(user_info(expires_in=0.05))
+    time.sleep(0.06)
+    await provider.get_or_create_user_context(user_info(expires_in=-1))
+    await provider.get_or_create_user_context(user_info())
+
+    assert dynamodb.get_item.await_count == 3
+
+
+async def test_profile_update_invalidates_cached_context() -> None:
+    provider, dynamodb = make_provider()
+    await provider.get_or_create_user_context(user_info())
+
+    dynamodb.get_item.return_value = {**USER_RECORD, "role": "admin"}
+    invalidate_user_context("user123")
+    context = await provider.get_or_create_user_context(user_info())
+
+    assert context.role == UserRole.ADMIN
+    assert dynamodb.get_item.await_count == 2
+
+
+async def test_fallback_contexts_are_not_cached() -> None:
+    provider, dynamodb = make_provider()
+    dynamodb.get_item.side_effect = [Exception("DynamoDB error"), dict(USER_RECORD)]
+
+    fallback = await provider.get_or_create_user_context(user_info())
+    recovered = await provider.get_or_create_user_context(user_info())
+
+    assert fallback.role == UserRole.PATIENT
+    assert recovered.role == UserRole.CLINICIAN
+
+
+async def test_failed_login_write_does_not_fail_request(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    provider, dynamodb = make_provider()
+    dynamodb.update_item.side_effect = Exception("throttled")
+
+    context = await provider.get_or_create_user_context(user_info())
+    await provider.cleanup()
+
+    assert context.user_id == "user123"
+    assert "Failed to record last login for user123" in caplog.text
+
+
+def test_cache_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider, _ = make_provider()
+    context = provider._create_basic_user_context(user_info())
+    cache = UserContextCache(max_size=2)
+
+    cache.set("a", context, 60)
+    cache.set("b", context, 60)
+    cache.get("a")
+    cache.set("c", context, 60)
+    cache.set("d", context, 0)
+
+    assert [cache.get(user) is not None for user in "abcd"] == [
+        True,
+        False,
+        True,
+        False,
+    ]
+    monkeypatch.setattr(time, "monotonic", lambda: float("inf"))
+    assert cache.get("a") is None
+    assert len(cache) == 1
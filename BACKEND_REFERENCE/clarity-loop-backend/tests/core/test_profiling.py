@@ -0,0 +1,151 @@
+"""Tests for the on-demand profilers and the admin profiling endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from clarity.api.v1.profiling import WORKER_PID_HEADER
+from clarity.api.v1.profiling import router as profiling_router
+from clarity.auth.dependencies import get_authenticated_user, require_admin
+from clarity.core.profiling import (
+    ProfilerBusyError,
+    profiling_session,
+    run_cprofile,
+    sample_stacks,
+    snapshot_allocations,
+)
+from clarity.ml.pat_service import PATModelService, get_pat_service
+from clarity.models.auth import Permission, UserContext, UserRole
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_busy_thread_stacks() -> None:
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=busy_loop, args=(stop,), name="busy-worker"),
+        threading.Thread(target=stop.wait, name="idle-worker"),
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        profile = sample_stacks(0.3, interval_ms=5)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    assert profile.samples > 10
+    assert profile.idle_samples > 0  # idle-worker parked in Event.wait
+    stacks = profile.collapsed().splitlines()
+    busy = [line for line in stacks if line.startswith("busy-worker;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.endswith("test_profiling.py:busy_loop")
+    assert "threading.py:Thread.run" in stack
+    assert int(count) > 0
+    assert not any(line.startswith("idle-worker;") for line in stacks)
+    assert not any("sample_stacks" in line for line in stacks)
+
+
+def test_sampler_backs_off_when_over_budget() -> None:
+    profile = sample_stacks(0.1, interval_ms=5, max_overhead_ratio=0.0)
+    assert profile.interval_ms > 5
+    assert 0 < profile.overhead_ratio < 1
+
+
+async def test_cprofile_and_allocation_snapshot() -> None:
+    retained: list[bytes] = []
+
+    async def allocate() -> None:
+        for _ in range(20):
+            retained.append(bytes(10_000))
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(allocate())
+    report = await run_cprofile(0.2, limit=20)
+    await task
+    assert "allocate" in report
+
+    task = asyncio.create_task(allocate())
+    snapshot = await snapshot_allocations(0.2, limit=5)
+    await task
+    assert snapshot["started_tracing"] is True
+    top = snapshot["top_allocations"][0]
+    assert top["size_diff_bytes"] >= 100_000
+    assert any("test_profiling.py" in line for line in top["traceback"])
+
+
+def test_one_profile_at_a_time() -> None:
+    with profiling_session("cpu"), pytest.raises(ProfilerBusyError):
+        with profiling_session("memory"):
+            pass
+    with profiling_session("memory"):
+        pass
+
+
+@pytest.fixture
+def user() -> UserContext:
+    return UserContext(user_id="admin-1", role=UserRole.ADMIN)
+
+
+@pytest.fixture
+async def pat_service() -> PATModelService:
+    service = PATModelService(model_size="small", device="cpu")
+    await service.load_model()
+    return service
+
+
+@pytest.fixture
+def client(user: UserContext, pat_service: PATModelService) -> TestClient:
+    app = FastAPI()
+    app.include_router(
+        profiling_router, prefix="/profiling", dependencies=[Depends(require_admin)]
+    )
+    app.dependency_overrides[get_authenticated_user] = lambda: user
+    app.dependency_overrides[get_pat_service] = lambda: pat_service
+    return TestClient(app)
+
+
+def test_profiling_requires_admin(client: TestClient, user: UserContext) -> None:
+    user.role = UserRole.CLINICIAN
+    assert client.post("/profiling/cpu", params={"seconds": 0.05}).status_code == 403
+
+    user.permissions = [Permission.SYSTEM_ADMIN]
+    assert client.post("/profiling/cpu", params={"seconds": 0.05}).status_code == 200
+
+
+def test_profiling_limits_and_busy(client: TestClient) -> None:
+    assert client.post("/profiling/cpu", params={"seconds": 600}).status_code == 422
+    assert client.post("/profiling/cpu", params={"interval_ms": 0.1}).status_code == 422
+    assert client.post("/profiling/memory", params={"seconds": 31}).status_code == 422
+    assert client.post("/profiling/pat", params={"runs": 1000}).status_code == 422
+
+    with profiling_session("cpu"):
+        response = client.post("/profiling/memory", params={"seconds": 0})
+    assert response.status_code == 409
+
+    response = client.post("/profiling/memory", params={"seconds": 0})
+    assert response.status_code == 200
+    assert response.json()["pid"] == int(response.headers[WORKER_PID_HEADER])
+
+
+def test_pat_forward_profile(client: TestClient) -> None:
+    table = client.post("/profiling/pat", params={"runs": 1})
+    assert table.status_code == 200
+    assert "pat.forward" in table.text
+    assert "aten::" in table.text
+
+    trace = client.post("/profiling/pat", params={"runs": 1, "output": "chrome"})
+    assert trace.headers["content-type"] == "application/json"
+    events = json.loads(trace.text)["traceEvents"]
+    assert any(event.get("name") == "pat.forward" for event in events)
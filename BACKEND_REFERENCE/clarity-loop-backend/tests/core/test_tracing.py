@@ -0,0 +1,160 @@
+"""Tests for request tracing and trace propagation through SQS."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+import boto3
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+import pytest
+
+from clarity.core.tracing import (
+    REQUEST_ID_HEADER,
+    InMemorySpanExporter,
+    Span,
+    SpanContext,
+    StatusCode,
+    add_span_exporter,
+    extract,
+    get_request_id,
+    inject,
+    remove_span_exporter,
+    start_span,
+)
+from clarity.middleware.request_tracing import RequestTracingMiddleware
+from clarity.ml.analysis_pipeline import run_analysis_pipeline
+from clarity.services.aws_messaging_service import AWSMessagingService
+from clarity.services.messaging.sqs_consumer import SQSBatchConsumer
+from clarity.services.sqs_messaging_service import SQSMessagingService
+
+
+@pytest.fixture
+def exporter() -> Iterator[InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    add_span_exporter(exporter)
+    yield exporter
+    remove_span_exporter(exporter)
+
+
+def spans_by_name(exporter: InMemorySpanExporter) -> dict[str, Span]:
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_spans_nest_and_record_errors(exporter: InMemorySpanExporter) -> None:
+    with start_span("outer", request_id="req-1") as outer:
+        assert get_request_id() == "req-1"
+        with pytest.raises(ValueError, match="boom"), start_span("inner"):
+            msg = "boom"
+            raise ValueError(msg)
+
+    spans = spans_by_name(exporter)
+    assert spans["inner"].parent_span_id == outer.context.span_id
+    assert spans["inner"].context.trace_id == outer.context.trace_id
+    assert spans["inner"].context.request_id == "req-1"
+    assert spans["inner"].status is StatusCode.ERROR
+    assert spans["inner"].attributes["exception.type"] == "ValueError"
+    assert spans["outer"].parent_span_id is None
+    assert spans["outer"].duration_ms >= spans["inner"].duration_ms
+    assert get_request_id() is None
+
+
+def test_inject_extract_round_trip() -> None:
+    assert inject({}) == {}
+    with start_span("publish", request_id="req-2") as span:
+        carrier = inject({"event_type": "health_data_upload"})
+
+    assert carrier["traceparent"] == span.context.traceparent
+    assert extract(carrier) == span.context
+
+    # Malformed trace context keeps the request ID on a fresh trace
+    context = extract({"traceparent": "00-zz-00-01", "request_id": "req-2"})
+    assert context is not None
+    assert context.request_id == "req-2"
+    with start_span("consume", parent=context) as child:
+        assert child.parent_span_id is None
+    assert extract({"traceparent": f"00-{'0' * 32}-{'1' * 16}-01"}) is None
+    assert extract({"request_id": "bad\nid"}) is None
+
+
+def test_middleware_sets_request_id(exporter: InMemorySpanExporter) -> None:
+    app = FastAPI()
+    seen: list[str | None] = []
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        seen.append(get_request_id())
+        return {"status": "ok"}
+
+    app.add_middleware(RequestTracingMiddleware)
+    client = TestClient(app)
+
+    parent = SpanContext("a" * 32, "b" * 16)
+    response = client.get(
+        "/ping",
+        headers={REQUEST_ID_HEADER: "client-req", "traceparent": parent.traceparent},
+    )
+    assert response.headers[REQUEST_ID_HEADER] == "client-req"
+    span = spans_by_name(exporter)["http.request"]
+    assert span.context.trace_id == parent.trace_id
+    assert span.parent_span_id == parent.span_id
+    assert span.attributes["http.status_code"] == 200
+
+    generated = client.get("/ping", headers={REQUEST_ID_HEADER: "x" * 500})
+    assert generated.headers[REQUEST_ID_HEADER] not in {"client-req", "x" * 500}
+    assert seen == ["client-req", generated.headers[REQUEST_ID_HEADER]]
+
+
+@pytest.fixture
+def queue_url(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        yield boto3.client("sqs", region_name="us-east-1").create_queue(
+            QueueName="clarity-health-data-processing"
+        )["QueueUrl"]
+
+
+async def test_trace_continues_through_sqs_into_analysis(
+    queue_url: str, exporter: InMemorySpanExporter
+) -> None:
+    publisher = AWSMessagingService(region="us-east-1")
+    now = datetime.now(UTC).isoformat()
+    health_data = {
+        "quantity_samples": [
+            {"type": "heart_rate", "value": 70.0 + i, "start_date": now}
+            for i in range(5)
+        ]
+    }
+    with start_span("http.request", request_id="upload-req") as root:
+        await publisher.publish_health_data_upload("user-1", "upload-1", "s3://b/k")
+
+    async def handler(message: dict[str, Any]) -> None:
+        assert get_request_id() == "upload-req"
+        await run_analysis_pipeline(message["body"]["user_id"], health_data)
+
+    consumer = SQSBatchConsumer(
+        SQSMessagingService(queue_url=queue_url), handler, wait_time_seconds=0
+    )
+    assert await consumer.poll_once() == 1
+    await consumer.drain()
+    assert consumer.succeeded_count == 1
+
+    spans = spans_by_name(exporter)
+    assert {
+        "messaging.publish",
+        "sqs.process",
+        "analysis.convert_metrics",
+        "processor.cardio",
+    } <= set(spans)
+    for span in spans.values():
+        assert span.context.trace_id == root.context.trace_id
+        assert span.context.request_id == "upload-req"
+    assert (
+        spans["sqs.process"].parent_span_id
+        == spans["messaging.publish"].context.span_id
+    )
@@ -0,0 +1,119 @@
+"""Local HTTP stand-in for a Cognito JWKS endpoint.
+
+Serves a JSON Web Key Set from a background thread on 127.0.0.1, so the
+JWKS client runs its real HTTP path. Keys are generated RSA key pairs that
+can sign test tokens; the server can be told to fail or to respond slowly.
+"""
+
+from __future__ import annotations
+
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from typing import Any
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+
+def _b64_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class SigningKey:
+    """RSA key pair published in the fake JWKS."""
+
+    def __init__(self, kid: str | None = None) -> None:
+        self.kid = kid or uuid.uuid4().hex
+        self._private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+
+    @property
+    def jwk(self) -> dict[str, str]:
+        numbers = self._private_key.public_key().public_numbers()
+        return {
+            "kid": self.kid,
+            "kty": "RSA",
+            "alg": "RS256",
+            "use": "sig",
+            "n": _b64_uint(numbers.n),
+            "e": _b64_uint(numbers.e),
+        }
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        pem = self._private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+class FakeJWKSServer:
+    """Threaded HTTP server publishing a mutable JWKS.
+
+    Attributes:
+        keys: Signing keys currently published
+        requests: Number of JWKS requests served (including failures)
+        fail: Respond with HTTP 503 while set
+        delay_seconds: Sleep before responding
+    """
+
+    def __init__(self, keys: list[SigningKey] | None = None) -> None:
+        self.keys = keys if keys is not None else [SigningKey()]
+        self.requests = 0
+        self.fail = False
+        self.delay_seconds = 0.0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/.well-known/jwks.json"
+
+    def rotate(self) -> SigningKey:
+        """Publish a new key alongside the current ones."""
+        key = SigningKey()
+        self.keys.append(key)
+        return key
+
+    def __enter__(self) -> FakeJWKSServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                server.requests += 1
+                if server.delay_seconds:
+                    time.sleep(server.delay_seconds)
+                if server.fail:
+                    self.send_error(503)
+                    return
+                body = json.dumps({"keys": [key.jwk for key in server.keys]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,111 @@
+"""Local HTTP stand-in for a model artifact host (S3/CDN).
+
+Serves one file from a background thread on 127.0.0.1 with single-range
+``Range`` support, so the model downloader runs its real HTTP path. The
+server can ignore ranges, like a plain origin, and can cut responses short
+to exercise resume.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import threading
+from typing import Any
+
+_RANGE_RE = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, *_: Any) -> None:
+        pass  # Clients drop connections mid-body (size probes, cancellations)
+
+
+class FakeModelServer:
+    """Threaded HTTP server publishing a single file.
+
+    Attributes:
+        data: File contents served for every path
+        support_ranges: Honour ``Range`` headers (otherwise always 200)
+        truncate_responses: Number of upcoming file responses to cut off
+            halfway, closing the connection
+        ranges: ``Range`` header of each request (None when absent)
+    """
+
+    def __init__(self, data: bytes, *, support_ranges: bool = True) -> None:
+        self.data = data
+        self.support_ranges = support_ranges
+        self.truncate_responses = 0
+        self.ranges: list[str | None] = []
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/models/model.bin"
+
+    def __enter__(self) -> FakeModelServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _take_truncation(self) -> bool:
+        with self._lock:
+            if self.truncate_responses > 0:
+                self.truncate_responses -= 1
+                return True
+            return False
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                range_header = self.headers.get("Range")
+                with server._lock:
+                    server.ranges.append(range_header)
+
+                size = len(server.data)
+                start, end = 0, size - 1
+                match = _RANGE_RE.match(range_header or "")
+                if server.support_ranges and match:
+                    start = int(match[1])
+                    end = min(int(match[2]) if match[2] else size - 1, size - 1)
+                    if start >= size or start > end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                else:
+                    self.send_response(200)
+                    self.send_header("Accept-Ranges", "none")
+
+                body = server.data[start : end + 1]
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if len(body) > 1 and server._take_truncation():
+                    self.wfile.write(body[: len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,139 @@
+"""In-process stand-in for a Redis server shared by several clients.
+
+Implements the subset of the ``redis.Redis`` client API used by the rate
+limit storage: string counters with expiry, non-transactional pipelines,
+key scans and ping. Every command or pipeline ``execute`` counts as one
+round trip, so tests can assert how often the network would be used.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import threading
+import time
+from typing import Any
+
+import redis
+
+
+class FakeRedis:
+    """Thread-safe fake Redis client.
+
+    Attributes:
+        round_trips: Commands or pipelines sent
+        fail: Raise ``redis.ConnectionError`` while set
+    """
+
+    def __init__(self) -> None:
+        self.round_trips = 0
+        self.fail = False
+        self._values: dict[str, int] = {}
+        self._expires: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.fail:
+            msg = "Fake Redis is unavailable"
+            raise redis.ConnectionError(msg)
+
+    def _purge(self, key: str) -> None:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+
+    def _set(self, key: str, value: Any, ex: int | None, nx: bool) -> bool | None:
+        self._purge(key)
+        if nx and key in self._values:
+            return None
+        self._values[key] = int(value)
+        if ex is not None:
+            self._expires[key] = time.time() + ex
+        return True
+
+    def _incrby(self, key: str, amount: int) -> int:
+        self._purge(key)
+        self._values[key] = self._values.get(key, 0) + amount
+        return self._values[key]
+
+    def _get(self, key: str) -> bytes | None:
+        self._purge(key)
+        value = self._values.get(key)
+        return None if value is None else str(value).encode()
+
+    def _ttl(self, key: str) -> int:
+        self._purge(key)
+        if key not in self._values:
+            return -2
+        expires = self._expires.get(key)
+        return -1 if expires is None else max(0, round(expires - time.time()))
+
+    def _delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            self._purge(key)
+            deleted += self._values.pop(key, None) is not None
+            self._expires.pop(key, None)
+        return deleted
+
+    def _call(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return getattr(self, f"_{command}")(*args, **kwargs)
+
+    def set(
+        self, key: str, value: Any, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        self._round_trip()
+        return self._call("set", key, value, ex, nx)  # type: ignore[no-any-return]
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        self._round_trip()
+        return int(self._call("incrby", key, amount))
+
+    def get(self, key: str) -> bytes | None:
+        self._round_trip()
+        return self._call("get", key)  # type: ignore[no-any-return]
+
+    def ttl(self, key: str) -> int:
+        self._round_trip()
+        return int(self._call("ttl", key))
+
+    def delete(self, *keys: str) -> int:
+        self._round_trip()
+        return int(self._call("delete", *keys))
+
+    def ping(self) -> bool:
+        self._round_trip()
+        return True
+
+    def scan_iter(self, match: str = "*") -> list[str]:
+        self._round_trip()
+        with self._lock:
+            return [key for key in self._values if fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self, *, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Buffers commands and sends them in a single round trip."""
+
+    def __init__(self, client: FakeRedis) -> None:
+        self._client = client
+        self._commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, command: str) -> Any:
+        def queue(*args: Any, **kwargs: Any) -> FakePipeline:
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list[Any]:
+        self._client._round_trip()
+        with self._client._lock:
+            return [
+                self._client._call(command, *args, **kwargs)
+                for command, args, kwargs in self._commands
+            ]
@@ -2,17 +2,29 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+import threading
+from typing import Any
 from unittest.mock import MagicMock
 
 import numpy as np
+import pandas as pd
 import pytest
+from scipy.interpolate import interp1d
+import scipy.signal
 
 from clarity.integrations.apple_watch import (
+    HR_LOWPASS_FILTER,
     AppleWatchDataProcessor,
+    ColumnarHealthBatch,
     ProcessedHealthData,
+    SampleSeries,
+    _forward_fill,
+    _interpolate,
+    bin_by_minute,
 )
-from clarity.integrations.healthkit import HealthDataPoint
+from clarity.integrations.healthkit import HealthDataBatch, HealthDataPoint
 
 
 @pytest.mark.asyncio
@@ -217,3 +229,167 @@ def test_calculate_completeness():
     completeness = processor._calculate_completeness(result)
     # Expected: (0.75 + 1.0 + 0.5 + 0.0) / 4 = 0.5625 * 100 = 56.25
     assert completeness == pytest.approx(56.25)
+
+
+def test_sample_series_sorts_and_converts() -> None:
+    series = SampleSeries.from_arrays(
+        np.array([120, 60, 0], dtype=np.int64), np.array([3, 2, 1], dtype=np.float32)
+    )
+
+    assert series.times.tolist() == [0.0, 60.0, 120.0]
+    assert series.values.tolist() == [1.0, 2.0, 3.0]
+    with pytest.raises(ValueError, match="equal length"):
+        SampleSeries.from_arrays([0, 1], [1.0])
+
+
+def test_vectorized_helpers_match_reference() -> None:
+    rng = np.random.default_rng(1)
+    times = np.sort(rng.uniform(0, 6000, 40))
+    values = rng.uniform(50, 120, 40)
+    grid = np.arange(-300.0, 6600.0, 60.0)
+
+    interpolated = _interpolate(SampleSeries(times, values), grid)
+    reference = interp1d(
+        times, values, kind="linear", bounds_error=False, fill_value=np.nan
+    )(grid)
+    np.testing.assert_allclose(interpolated, reference)
+
+    gappy = np.where(rng.random(200) < 0.6, np.nan, rng.random(200))
+    np.testing.assert_array_equal(
+        _forward_fill(gappy.copy(), 5), pd.Series(gappy).ffill(limit=5).to_numpy()
+    )
+
+
+def test_bin_by_minute_handles_many_users() -> None:
+    starts = [0.0, 10_000.0, 0.0]
+    series = [
+        SampleSeries.from_arrays([0, 30, 61, 600], [1, 2, 4, 100]),
+        SampleSeries.from_arrays([10_000, 9_999, 10_179], [5, 7, 9]),
+        None,
+    ]
+
+    binned = bin_by_minute(series, starts, minutes=3)
+
+    assert binned.tolist() == [[3, 4, 0], [5, 0, 9], [0, 0, 0]]
+
+
+@pytest.mark.asyncio
+async def test_columnar_and_multi_user_batches_match_single_batch() -> None:
+    end_time = datetime(2025, 1, 13, tzinfo=UTC)
+    start_time = end_time - timedelta(days=7)
+    rng = np.random.default_rng(2)
+
+    def batch(offset: int) -> HealthDataBatch:
+        def points(count: int, low: float, high: float) -> list[HealthDataPoint]:
+            seconds = rng.uniform(0, 7 * 86400, count)
+            return [
+                HealthDataPoint(
+                    timestamp=start_time + timedelta(seconds=float(second)),
+                    value=float(value) + offset,
+                    unit="",
+                )
+                for second, value in zip(
+                    seconds, rng.uniform(low, high, count), strict=True
+                )
+            ]
+
+        return HealthDataBatch(
+            user_id=f"user-{offset}",
+            end_date=end_time,
+            heart_rate_samples=points(3000, 50, 150),
+            hrv_samples=points(200, 20, 90),
+            respiratory_rate_samples=points(300, 10, 22),
+            step_count_samples=points(2000, 0, 100),
+            blood_oxygen_samples=points(5, 95, 99),
+        )
+
+    batches = [batch(offset) for offset in range(3)]
+    processor = AppleWatchDataProcessor()
+
+    singles = [await processor.process_health_batch(b) for b in batches]
+    many = await processor.process_health_batches(batches)
+    columnar = await processor.process_health_batch(
+        ColumnarHealthBatch.from_batch(batches[0])
+    )
+
+    for single, batched in zip(singles, many, strict=True):
+        for name in ("heart_rate_series", "movement_proxy_vector", "hrv_series"):
+            np.testing.assert_array_equal(getattr(single, name), getattr(batched, name))
+        assert batched.avg_spo2 == single.avg_spo2
+    np.testing.assert_array_equal(
+        columnar.respiratory_rate_series, singles[0].respiratory_rate_series
+    )
+    assert columnar.avg_hr == singles[0].avg_hr
+    assert columnar.avg_spo2 is None  # sparse modalities need the raw batch
+
+
+def dense_batch(end_time: datetime) -> HealthDataBatch:
+    start_time = end_time - timedelta(days=1)
+
+    def points(value: float) -> list[HealthDataPoint]:
+        return [
+            HealthDataPoint(
+                timestamp=start_time + timedelta(minutes=i),
+                value=value + i % 7,
+                unit="",
+            )
+            for i in range(0, 1440, 5)
+        ]
+
+    return HealthDataBatch(
+        user_id="user-1",
+        end_date=end_time,
+        heart_rate_samples=points(70),
+        hrv_samples=points(40),
+        respiratory_rate_samples=points(14),
+        step_count_samples=points(20),
+    )
+
+
+def test_lowpass_coefficients_are_precomputed() -> None:
+    b, a = scipy.signal.butter(4, 0.5 / (0.5 * 60), btype="low")
+
+    np.testing.assert_array_equal(HR_LOWPASS_FILTER[0], b)
+    np.testing.assert_array_equal(HR_LOWPASS_FILTER[1], a)
+
+
+@pytest.mark.asyncio
+async def test_modality_stages_run_on_the_executor() -> None:
+    stage_threads: set[str] = set()
+
+    class RecordingProcessor(AppleWatchDataProcessor):
+        def _heart_rate_features(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+            stage_threads.add(threading.current_thread().name)
+            return super()._heart_rate_features(*args, **kwargs)
+
+        def _hrv_features(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+            stage_threads.add(threading.current_thread().name)
+            return super()._hrv_features(*args, **kwargs)
+
+    end_time = datetime(2025, 1, 13, tzinfo=UTC)
+    with ThreadPoolExecutor(thread_name_prefix="modality") as executor:
+        result = await RecordingProcessor(executor).process_health_batch(
+            dense_batch(end_time)
+        )
+
+    assert stage_threads
+    assert all(name.startswith("modality") for name in stage_threads)
+    assert result.heart_rate_series is not None
+    assert result.hrv_series is not None
+    assert result.respiratory_rate_series is not None
+    assert result.movement_proxy_vector is not None
+
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_default_executor() -> None:
+    end_time = datetime(2025, 1, 13, tzinfo=UTC)
+    batch = dense_batch(end_time)
+
+    expected = await AppleWatchDataProcessor().process_health_batch(batch)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        actual = await AppleWatchDataProcessor(executor).process_health_batch(batch)
+
+    for name in ("heart_rate_series", "hrv_series", "movement_proxy_vector"):
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+    assert actual.resting_hr == expected.resting_hr
+    assert actual.data_completeness == expected.data_completeness
@@ -4,28 +4,46 @@ from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
 
 from clarity.middleware.auth_middleware import CognitoAuthMiddleware
 from clarity.models.auth import Permission, UserContext, UserRole
 
 
+class RecordingApp:
+    """Inner ASGI app that records the scopes it is called with."""
+
+    def __init__(self) -> None:
+        self.scopes: list[Scope] = []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.scopes.append(scope)
+
+
 @pytest.fixture
-def mock_app():
-    """Create a mock ASGI application."""
-    return MagicMock()
+def mock_app() -> RecordingApp:
+    """Create a recording ASGI application."""
+    return RecordingApp()
 
 
 @pytest.fixture
-def mock_request():
-    """Create a mock request."""
-    request = MagicMock(spec=Request)
-    request.state = MagicMock()
-    request.headers = {}
-    request.url = MagicMock()
-    request.url.path = "/api/v1/health-data"
-    return request
+def mock_request() -> dict[str, Any]:
+    """Create an HTTP request scope."""
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/health-data",
+        "query_string": b"",
+        "headers": [],
+    }
+
+
+def set_header(scope: dict[str, Any], name: str, value: str) -> None:
+    scope["headers"].append((name.lower().encode(), value.encode()))
+
+
+async def run(middleware: CognitoAuthMiddleware, scope: dict[str, Any]) -> None:
+    await middleware(scope, AsyncMock(), AsyncMock())
 
 
 @pytest.fixture
@@ -46,86 +64,81 @@ class TestCognitoAuthMiddleware:
     """Test cases for Cognito authentication middleware."""
 
     @pytest.mark.asyncio
-    async def test_public_path_bypass(self, mock_app: Any, mock_request: Any) -> None:
+    async def test_public_path_bypass(
+        self, mock_app: RecordingApp, mock_request: dict[str, Any]
+    ) -> None:
         """Test that public paths bypass authentication."""
         # Arrange
-        mock_request.url.path = "/health"
-        call_next = AsyncMock(return_value=Response("OK"))
-
+        mock_request["path"] = "/health"
         middleware = CognitoAuthMiddleware(mock_app)
 
         # Act
-        response = await middleware.dispatch(mock_request, call_next)
+        await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user is None
-        call_next.assert_called_once_with(mock_request)
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] is None
 
     @pytest.mark.asyncio
-    async def test_no_auth_header(self, mock_app: Any, mock_request: Any) -> None:
+    async def test_no_auth_header(
+        self, mock_app: RecordingApp, mock_request: dict[str, Any]
+    ) -> None:
         """Test request without Authorization header."""
         # Arrange
-        call_next = AsyncMock(return_value=Response("OK"))
-
         with patch.dict("os.environ", {"ENABLE_AUTH": "true"}):
             middleware = CognitoAuthMiddleware(mock_app)
 
         # Act
-        response = await middleware.dispatch(mock_request, call_next)
+        await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user is None
-        call_next.assert_called_once_with(mock_request)
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] is None
 
     @pytest.mark.asyncio
     async def test_invalid_auth_header_format(
-        self, mock_app: Any, mock_request: Any
+        self, mock_app: RecordingApp, mock_request: dict[str, Any]
     ) -> None:
         """Test request with invalid Authorization header format."""
         # Arrange
-        mock_request.headers = {"Authorization": "Invalid token"}
-        call_next = AsyncMock(return_value=Response("OK"))
-
+        set_header(mock_request, "Authorization", "Invalid token")
         with patch.dict("os.environ", {"ENABLE_AUTH": "true"}):
             middleware = CognitoAuthMiddleware(mock_app)
 
         # Act
-        response = await middleware.dispatch(mock_request, call_next)
+        await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user is None
-        call_next.assert_called_once_with(mock_request)
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] is None
 
     @pytest.mark.asyncio
-    async def test_auth_disabled(self, mock_app: Any, mock_request: Any) -> None:
+    async def test_auth_disabled(
+        self, mock_app: RecordingApp, mock_request: dict[str, Any]
+    ) -> None:
         """Test when authentication is disabled."""
         # Arrange
-        mock_request.headers = {"Authorization": "Bearer test-token"}
-        call_next = AsyncMock(return_value=Response("OK"))
-
+        set_header(mock_request, "Authorization", "Bearer test-token")
         with patch.dict("os.environ", {"ENABLE_AUTH": "false"}):
             middleware = CognitoAuthMiddleware(mock_app)
 
         # Act
-        response = await middleware.dispatch(mock_request, call_next)
+        await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user is None
-        call_next.assert_called_once_with(mock_request)
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] is None
 
     @pytest.mark.asyncio
     async def test_valid_token_authentication(
-        self, mock_app: Any, mock_request: Any, mock_user_context: UserContext
+        self,
+        mock_app: RecordingApp,
+        mock_request: dict[str, Any],
+        mock_user_context: UserContext,
     ) -> None:
         """Test successful authentication with valid token."""
         # Arrange
-        mock_request.headers = {"Authorization": "Bearer valid-token"}
-        call_next = AsyncMock(return_value=Response("OK"))
-
+        set_header(mock_request, "Authorization", "Bearer valid-token")
         with patch.dict(
             "os.environ",
             {
@@ -156,24 +169,21 @@ class TestCognitoAuthMiddleware:
         with patch(
             "clarity.middleware.auth_middleware.set_user_context"
         ) as mock_set_context:
-            response = await middleware.dispatch(mock_request, call_next)
+            await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user == mock_user_context
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] == mock_user_context
         mock_auth_provider.verify_token.assert_called_once_with("valid-token")
         mock_set_context.assert_called_once_with(mock_user_context)
-        call_next.assert_called_once_with(mock_request)
 
     @pytest.mark.asyncio
     async def test_invalid_token_authentication(
-        self, mock_app: Any, mock_request: Any
+        self, mock_app: RecordingApp, mock_request: dict[str, Any]
     ) -> None:
         """Test authentication with invalid token."""
         # Arrange
-        mock_request.headers = {"Authorization": "Bearer invalid-token"}
-        call_next = AsyncMock(return_value=Response("OK"))
-
+        set_header(mock_request, "Authorization", "Bearer invalid-token")
         with patch.dict(
             "os.environ",
             {
@@ -194,10 +204,20 @@ class TestCognitoAuthMiddleware:
             middleware.auth_provider = mock_auth_provider
 
         # Act
-        response = await middleware.dispatch(mock_request, call_next)
+        await run(middleware, mock_request)
 
         # Assert
-        assert response.body == b"OK"
-        assert mock_request.state.user is None
+        assert mock_app.scopes == [mock_request]
+        assert mock_request["state"]["user"] is None
         mock_auth_provider.verify_token.assert_called_once_with("invalid-token")
-        call_next.assert_called_once_with(mock_request)
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope_passes_through(self, mock_app: RecordingApp) -> None:
+        """Test that lifespan scopes reach the app without auth state."""
+        middleware = CognitoAuthMiddleware(mock_app)
+        scope: dict[str, Any] = {"type": "lifespan"}
+
+        await run(middleware, scope)
+
+        assert mock_app.scopes == [scope]
+        assert "state" not in scope
@@ -0,0 +1,145 @@
+"""Tests for the hybrid local/Redis rate limit storage."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.storage import MemoryStorage, RedisStorage
+from limits.strategies import FixedWindowRateLimiter
+import pytest
+from slowapi.errors import RateLimitExceeded
+
+from clarity.middleware.rate_limit_storage import HybridRedisStorage
+from clarity.middleware.rate_limiting import (
+    RateLimitingMiddleware,
+    custom_rate_limit_exceeded_handler,
+)
+from tests.fakes.redis_client import FakeRedis
+
+URI = "hybrid+redis://localhost:6379"
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def workers(fake_redis: FakeRedis) -> Iterator[list[HybridRedisStorage]]:
+    storages = [
+        HybridRedisStorage(
+            URI, sync_interval=60, max_pending=100, redis_client=fake_redis
+        )
+        for _ in range(2)
+    ]
+    yield storages
+    for storage in storages:
+        storage.close()
+
+
+def test_hits_are_local_until_sync(
+    workers: list[HybridRedisStorage], fake_redis: FakeRedis
+) -> None:
+    limit = parse("10/minute")
+    limiters = [FixedWindowRateLimiter(storage) for storage in workers]
+
+    for _ in range(4):
+        assert all(limiter.hit(limit, "user:1") for limiter in limiters)
+    assert fake_redis.round_trips == 0
+
+    # One sync round each; the first worker sees the second's hits next round
+    assert all(storage.sync() for storage in [*workers, workers[0]])
+    assert fake_redis.round_trips == 3
+    remaining = [limiter.get_window_stats(limit, "user:1") for limiter in limiters]
+    assert [stats.remaining for stats in remaining] == [2, 2]
+    assert limiters[0].hit(limit, "user:1")
+    assert limiters[0].hit(limit, "user:1")
+    assert not limiters[0].hit(limit, "user:1")
+
+
+def test_redis_failure_keeps_hits_for_next_sync(
+    workers: list[HybridRedisStorage], fake_redis: FakeRedis
+) -> None:
+    worker = workers[0]
+    worker.incr("key", 60, amount=3)
+    fake_redis.fail = True
+
+    assert not worker.sync()
+    assert worker.get("key") == 3
+
+    fake_redis.fail = False
+    assert worker.sync()
+    assert fake_redis.get("LIMITS:key") == b"3"
+    assert 0 < fake_redis.ttl("LIMITS:key") <= 60
+
+
+def test_max_pending_triggers_background_sync(fake_redis: FakeRedis) -> None:
+    storage = HybridRedisStorage(
+        URI, sync_interval=60, max_pending=3, redis_client=fake_redis
+    )
+    for _ in range(3):
+        storage.incr("key", 60)
+
+    deadline = time.monotonic() + 2
+    while fake_redis.get("LIMITS:key") != b"3" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fake_redis.get("LIMITS:key") == b"3"
+    storage.close()
+
+
+def test_expired_window_resets_locally(workers: list[HybridRedisStorage]) -> None:
+    worker = workers[0]
+    worker.incr("key", 1)
+    worker._counters["key"].expires_at = time.time() - 1
+
+    assert worker.get("key") == 0
+    assert worker.incr("key", 1) == 1
+
+
+def test_create_limiter_selects_storage(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert isinstance(
+        RateLimitingMiddleware.get_auth_limiter()._storage, MemoryStorage
+    )
+    limiter = RateLimitingMiddleware.get_ai_limiter(storage_uri="redis://localhost")
+    assert isinstance(limiter._storage, HybridRedisStorage)
+    assert limiter._storage.sync_interval == 1.0
+
+    monkeypatch.setenv("RATE_LIMIT_SYNC_INTERVAL", "0")
+    limiter = RateLimitingMiddleware.create_limiter(storage_uri="redis://localhost")
+    assert isinstance(limiter._storage, RedisStorage)
+
+
+def test_limit_enforced_across_workers(fake_redis: FakeRedis) -> None:
+    def create_worker() -> tuple[TestClient, HybridRedisStorage]:
+        app = FastAPI()
+        limiter = RateLimitingMiddleware.create_limiter(
+            storage_uri="redis://localhost",
+            storage_options={"redis_client": fake_redis, "sync_interval": 60},
+        )
+        app.state.limiter = limiter
+        app.add_exception_handler(RateLimitExceeded, custom_rate_limit_exceeded_handler)
+
+        @app.get("/limited")
+        @limiter.limit("3/minute")
+        async def limited(request: Request) -> JSONResponse:
+            _ = request  # Used by rate limiter
+            return JSONResponse({"message": "success"})
+
+        return TestClient(app), limiter._storage
+
+    (first, first_storage), (second, second_storage) = create_worker(), create_worker()
+    assert first.get("/limited").status_code == 200
+    assert second.get("/limited").status_code == 200
+    for storage in (first_storage, second_storage, first_storage):
+        storage.sync()
+
+    assert first.get("/limited").status_code == 200
+    assert first.get("/limited").status_code == 429
+    assert fake_redis.round_trips == 3
+    first_storage.close()
+    second_storage.close()
@@ -0,0 +1,92 @@
+"""Tests for the streaming request size limiter and request logger."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+import logging
+
+from fastapi import FastAPI, Request
+import httpx
+import pytest
+
+from clarity.middleware.request_logger import RequestLoggingMiddleware
+from clarity.middleware.request_size_limiter import RequestSizeLimiterMiddleware
+
+LIMIT = 1024
+
+
+def create_test_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimiterMiddleware, max_json_size=LIMIT)
+
+    @app.post("/echo")
+    async def echo(payload: dict[str, str]) -> dict[str, int]:
+        return {"size": len(payload["data"])}
+
+    @app.post("/raw")
+    async def raw(request: Request) -> dict[str, int]:
+        return {"size": len(await request.body())}
+
+    return app
+
+
+def client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    )
+
+
+async def chunks(count: int, size: int = 256) -> AsyncIterator[bytes]:
+    for _ in range(count):
+        yield b"x" * size
+
+
+async def test_content_length_over_limit_rejected() -> None:
+    async with client(create_test_app()) as http:
+        response = await http.post("/echo", json={"data": "x" * (LIMIT + 1)})
+
+    assert response.status_code == 413
+    assert response.json()["error"] == "Request payload too large"
+    assert response.headers["Retry-After"] == "3600"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+async def test_streamed_body_counted_without_content_length() -> None:
+    headers = {"Content-Type": "application/json"}
+    async with client(create_test_app()) as http:
+        small = await http.post("/raw", content=chunks(2), headers=headers)
+        large = await http.post("/raw", content=chunks(8), headers=headers)
+
+    assert "content-length" not in small.request.headers
+    assert small.json() == {"size": 512}
+    assert large.status_code == 413
+    assert large.json()["received_size_mb"] == pytest.approx(1280 / 2**20, abs=0.01)
+
+
+async def test_get_requests_are_not_limited() -> None:
+    app = create_test_app()
+
+    @app.get("/ok")
+    async def ok() -> dict[str, str]:
+        return {"status": "ok"}
+
+    async with client(app) as http:
+        response = await http.get("/ok")
+
+    assert response.status_code == 200
+
+
+async def test_request_logger_samples_and_caps_body(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    app = create_test_app()
+    app.add_middleware(RequestLoggingMiddleware, body_sample_rate=1, max_body_bytes=8)
+    caplog.set_level(logging.DEBUG, logger="clarity.middleware.request_logger")
+
+    async with client(app) as http:
+        response = await http.post("/raw", content=b"0123456789abcdef")
+
+    assert response.json() == {"size": 16}
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("POST /raw -> 200" in message for message in messages)
+    assert "  Body (16 bytes, first 8): 01234567" in messages
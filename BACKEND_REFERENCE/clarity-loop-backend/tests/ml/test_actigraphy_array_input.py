@@ -0,0 +1,132 @@
+"""Tests for the array-backed ActigraphyInput path to the PAT tensor."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+from pydantic import ValidationError
+import pytest
+import torch
+
+from clarity.ml.pat_service import ActigraphyInput, PATModelService
+from clarity.ml.preprocessing import (
+    ActigraphyDataPoint,
+    HealthDataPreprocessor,
+    StandardActigraphyPreprocessor,
+)
+from clarity.models.health_data import (
+    ActivityData,
+    BiometricData,
+    HealthMetric,
+    HealthMetricType,
+)
+from clarity.utils.time_window import prepare_for_pat_inference
+
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def data_points(values: np.ndarray) -> list[ActigraphyDataPoint]:
+    return [
+        ActigraphyDataPoint(timestamp=START + timedelta(minutes=i), value=float(v))
+        for i, v in enumerate(values)
+    ]
+
+
+def reference_preprocess(values: np.ndarray, target_length: int) -> np.ndarray:
+    """The list-based preprocessing this path replaces."""
+    activity_data = np.array(values, dtype=np.float32)
+    if len(activity_data) > 1:
+        std_val = np.std(activity_data)
+        if std_val > 0:
+            activity_data = (activity_data - np.mean(activity_data)) / std_val
+    return prepare_for_pat_inference(activity_data, target_length)
+
+
+@pytest.mark.parametrize("length", [0, 1, 500, 1440, 20160])
+def test_array_preprocessing_matches_list_path(length: int) -> None:
+    values = np.random.default_rng(length).gamma(2.0, 50.0, length).astype(np.float32)
+    original = values.copy()
+
+    from_array = StandardActigraphyPreprocessor.preprocess_array(values, 1440)
+    from_points = StandardActigraphyPreprocessor.preprocess(data_points(values), 1440)
+
+    assert from_array.dtype == torch.float32
+    np.testing.assert_array_equal(
+        from_array.numpy(), reference_preprocess(values, 1440)
+    )
+    np.testing.assert_array_equal(from_points.numpy(), from_array.numpy())
+    np.testing.assert_array_equal(values, original)
+
+
+def test_constant_input_is_not_normalized() -> None:
+    tensor = StandardActigraphyPreprocessor.preprocess_array(
+        np.full(10, 3.0, dtype=np.float32), 12
+    )
+
+    assert tensor.tolist() == [0.0, 0.0] + [3.0] * 10
+
+
+def test_float32_buffer_is_not_copied() -> None:
+    values = np.arange(2880, dtype=np.float32)
+
+    input_data = ActigraphyInput.from_array("user-1", values, START)
+
+    assert input_data.values is values
+    assert input_data.activity_values() is values
+    assert input_data.point_count == 2880
+    assert input_data.duration_hours == 48
+    assert "values" not in input_data.model_dump()
+
+
+def test_invalid_array_inputs_are_rejected() -> None:
+    with pytest.raises(ValidationError, match="1-D"):
+        ActigraphyInput.from_array("user-1", np.zeros((2, 3)))
+    with pytest.raises(ValidationError, match="not both"):
+        ActigraphyInput(
+            user_id="user-1",
+            data_points=data_points(np.ones(2)),
+            values=np.ones(2),
+        )
+
+
+def test_metric_array_matches_data_points() -> None:
+    metrics = [
+        HealthMetric(
+            metric_type=HealthMetricType.ACTIVITY_LEVEL,
+            created_at=START + timedelta(minutes=1),
+            activity_data=ActivityData(steps=120),
+        ),
+        HealthMetric(
+            metric_type=HealthMetricType.HEART_RATE,
+            created_at=START + timedelta(minutes=2),
+            biometric_data=BiometricData(heart_rate=64),
+        ),
+    ]
+
+    preprocessor = HealthDataPreprocessor()
+
+    values, start_time = preprocessor.convert_health_metrics_to_activity_array(metrics)
+    points = preprocessor.convert_health_metrics_to_actigraphy(metrics)
+
+    assert values.dtype == np.float32
+    assert values.tolist() == [point.value for point in points]
+    assert start_time == points[0].timestamp
+    assert preprocessor.convert_health_metrics_to_activity_array([])[1] is None
+
+
+async def test_array_input_analysis_matches_data_points() -> None:
+    service = PATModelService(model_size="small", device="cpu")
+    await service.load_model()
+    values = np.random.default_rng(3).gamma(2.0, 50.0, 1440).astype(np.float32)
+
+    from_points = await service.analyze_actigraphy(
+        ActigraphyInput(user_id="user-1", data_points=data_points(values))
+    )
+    from_array = await service.analyze_actigraphy(
+        ActigraphyInput.from_array("user-1", values, START)
+    )
+
+    assert from_array.embedding == from_points.embedding
+    assert from_array.sleep_efficiency == from_points.sleep_efficiency
+    assert from_array.clinical_insights == from_points.clinical_insights
@@ -346,7 +346,8 @@ class TestHealthAnalysisPipelineFusion:
         result = await pipeline._fuse_modalities(modality_features)
 
         assert result == expected_fused
-        pipeline.fusion_service.initialize_model.assert_called_once()
+        # Models come from the service's registry, not a per-run rebuild
+        pipeline.fusion_service.initialize_model.assert_not_called()
         pipeline.fusion_service.fuse_modalities.assert_called_once_with(
             modality_features
         )
@@ -0,0 +1,353 @@
+"""Tests for the incremental per-day feature store in the analysis pipeline."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from clarity.ml import feature_store
+from clarity.ml.analysis_pipeline import (
+    AnalysisPipelineSingleton,
+    HealthAnalysisPipeline,
+)
+from clarity.ml.feature_store import (
+    DayPartial,
+    FeatureStoreSingleton,
+    InMemoryFeatureStore,
+    group_metrics_by_day,
+)
+from clarity.ml.healthkit_stream import HealthKitColumns
+from clarity.models.health_data import (
+    ActivityData,
+    BiometricData,
+    HealthMetric,
+    HealthMetricType,
+    SleepData,
+    SleepStage,
+)
+
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def biometric(
+    metric_type: HealthMetricType, at: datetime, **values: float
+) -> HealthMetric:
+    return HealthMetric(
+        metric_type=metric_type, created_at=at, biometric_data=BiometricData(**values)
+    )
+
+
+def day_metrics(day: int, seed: int = 0) -> list[HealthMetric]:
+    """One day of HR, HRV, RR, SpO2, activity and sleep metrics."""
+    rng = np.random.default_rng(day * 100 + seed)
+    midnight = START + timedelta(days=day)
+    metrics = []
+    # Every 3 minutes with an afternoon gap, so bins are missing mid-day
+    for minute in range(0, 1440, 3):
+        if 840 <= minute < 900:
+            continue
+        at = midnight + timedelta(minutes=minute)
+        metrics.append(
+            biometric(
+                HealthMetricType.HEART_RATE,
+                at,
+                heart_rate=float(rng.normal(70 + 10 * (minute > 480), 8)),
+            )
+        )
+        if minute % 15 == 0:
+            metrics.extend(
+                (
+                    biometric(
+                        HealthMetricType.HEART_RATE_VARIABILITY,
+                        at,
+                        heart_rate_variability=float(rng.uniform(20, 80)),
+                    ),
+                    biometric(
+                        HealthMetricType.RESPIRATORY_RATE,
+                        at,
+                        respiratory_rate=float(rng.uniform(12, 20)),
+                    ),
+                    biometric(
+                        HealthMetricType.BLOOD_OXYGEN,
+                        at,
+                        oxygen_saturation=float(rng.uniform(94, 99)),
+                    ),
+                )
+            )
+        if minute % 60 == 0:
+            metrics.append(
+                HealthMetric(
+                    metric_type=HealthMetricType.ACTIVITY_LEVEL,
+                    created_at=at,
+                    activity_data=ActivityData(
+                        steps=int(rng.integers(0, 1500)),
+                        distance=float(rng.uniform(0, 1)),
+                        active_energy=float(rng.uniform(0, 80)),
+                        vo2_max=float(rng.uniform(35, 45)),
+                    ),
+                )
+            )
+    asleep = int(rng.integers(360, 480))
+    sleep_start = midnight - timedelta(minutes=int(rng.integers(30, 90)))
+    metrics.append(
+        HealthMetric(
+            metric_type=HealthMetricType.SLEEP_ANALYSIS,
+            created_at=midnight + timedelta(hours=8),
+            sleep_data=SleepData(
+                total_sleep_minutes=asleep,
+                sleep_efficiency=float(rng.uniform(0.8, 0.95)),
+                time_to_sleep_minutes=int(rng.integers(5, 30)),
+                wake_count=int(rng.integers(0, 4)),
+                sleep_stages={SleepStage.REM: 90, SleepStage.DEEP: 60},
+                sleep_start=sleep_start,
+                sleep_end=sleep_start + timedelta(minutes=asleep + 20),
+            ),
+        )
+    )
+    return metrics
+
+
+def week_metrics(days: int = 7) -> list[HealthMetric]:
+    return [metric for day in range(days) for metric in day_metrics(day)]
+
+
+def make_pipeline(store: InMemoryFeatureStore | None = None) -> HealthAnalysisPipeline:
+    pipeline = HealthAnalysisPipeline(feature_store=store)
+    pipeline.pat_service = SimpleNamespace(  # type: ignore[assignment]
+        analyze_actigraphy=AsyncMock(
+            return_value=SimpleNamespace(embedding=[0.5] * 128)
+        )
+    )
+    return pipeline
+
+
+def pat_input(pipeline: HealthAnalysisPipeline) -> Any:
+    service: Any = pipeline.pat_service
+    return service.analyze_actigraphy.await_args.args[0]
+
+
+async def assert_matches_full_recompute(
+    pipeline: HealthAnalysisPipeline, metrics: list[HealthMetric]
+) -> None:
+    reference = make_pipeline()
+    expected = await reference.process_health_data("user-1", metrics)
+    actual = await pipeline.process_health_data("user-1", metrics)
+
+    assert actual.cardio_features == pytest.approx(expected.cardio_features, rel=1e-9)
+    assert actual.respiratory_features == pytest.approx(
+        expected.respiratory_features, rel=1e-9
+    )
+    assert actual.activity_features == expected.activity_features
+    assert actual.sleep_features == expected.sleep_features
+    np.testing.assert_array_equal(
+        pat_input(pipeline).values, pat_input(reference).values
+    )
+    assert pat_input(pipeline).start_time == pat_input(reference).start_time
+
+
+async def test_merged_partials_match_full_recompute() -> None:
+    store = InMemoryFeatureStore()
+    pipeline = make_pipeline(store)
+
+    await assert_matches_full_recompute(pipeline, week_metrics())
+
+    assert len(store) == 7
+    assert pipeline.feature_store_stats == {"days_built": 7, "days_cached": 0}
+
+
+async def test_daily_sync_rebuilds_only_changed_days() -> None:
+    store = InMemoryFeatureStore()
+    pipeline = make_pipeline(store)
+    await pipeline.process_health_data("user-1", week_metrics())
+
+    # Late-arriving samples for day 6, then a new day 7
+    updated = week_metrics() + [
+        biometric(
+            HealthMetricType.HEART_RATE,
+            START + timedelta(days=6, hours=23, minutes=59),
+            heart_rate=61.0,
+        )
+    ]
+    await assert_matches_full_recompute(pipeline, updated)
+    assert pipeline.feature_store_stats == {"days_built": 8, "days_cached": 6}
+
+    rolled = [m for m in updated if m.created_at >= START + timedelta(days=1)]
+    await assert_matches_full_recompute(pipeline, rolled + day_metrics(7))
+    assert pipeline.feature_store_stats == {"days_built": 9, "days_cached": 12}
+
+
+async def test_one_day_upload_completes_week_from_cached_days() -> None:
+    store = InMemoryFeatureStore()
+    pipeline = make_pipeline(store)
+    await pipeline.process_health_data("user-1", week_metrics(6))
+
+    reference = make_pipeline()
+    expected = await reference.process_health_data("user-1", week_metrics())
+    actual = await pipeline.process_health_data("user-1", day_metrics(6))
+
+    assert pipeline.feature_store_stats == {"days_built": 7, "days_cached": 6}
+    assert actual.cardio_features == pytest.approx(expected.cardio_features, rel=1e-9)
+    assert actual.respiratory_features == pytest.approx(
+        expected.respiratory_features, rel=1e-9
+    )
+    assert actual.activity_features == expected.activity_features
+    assert actual.sleep_features == expected.sleep_features
+    np.testing.assert_array_equal(
+        pat_input(pipeline).values, pat_input(reference).values
+    )
+
+    # Days older than the week ending at the upload are left out
+    await pipeline.process_health_data("user-1", day_metrics(13))
+    assert pat_input(pipeline).start_time == START + timedelta(days=13)
+    assert len(pat_input(pipeline).values) == 23  # Hourly, minus the 14:00 gap
+
+
+def quantity_upload(days: range) -> dict[str, Any]:
+    """Raw upload with HR, HRV, RR and SpO2 samples for the given days."""
+    samples = []
+    for metric in (m for day in days for m in day_metrics(day)):
+        data = metric.biometric_data
+        if data is None:
+            continue
+        for sample_type, value in (
+            ("HeartRate", data.heart_rate),
+            ("HeartRateVariabilitySDNN", data.heart_rate_variability),
+            ("RespiratoryRate", data.respiratory_rate),
+            ("OxygenSaturation", data.oxygen_saturation),
+        ):
+            if value:
+                samples.append(
+                    {
+                        "type": sample_type,
+                        "value": value,
+                        "timestamp": metric.created_at.isoformat(),
+                    }
+                )
+    return {"quantity_samples": samples, "category_samples": [], "workouts": []}
+
+
+async def test_columns_partials_complete_week_from_cached_days() -> None:
+    pipeline = make_pipeline(InMemoryFeatureStore())
+    await pipeline.process_health_data(
+        "user-1", [], columns=HealthKitColumns.from_dict(quantity_upload(range(6)))
+    )
+
+    expected = await make_pipeline().process_health_data(
+        "user-1", [], columns=HealthKitColumns.from_dict(quantity_upload(range(7)))
+    )
+    actual = await pipeline.process_health_data(
+        "user-1", [], columns=HealthKitColumns.from_dict(quantity_upload(range(6, 7)))
+    )
+
+    assert pipeline.feature_store_stats == {"days_built": 7, "days_cached": 6}
+    assert actual.cardio_features == pytest.approx(expected.cardio_features, rel=1e-9)
+    assert actual.respiratory_features == pytest.approx(
+        expected.respiratory_features, rel=1e-9
+    )
+
+
+def feature_store_settings(*, enabled: bool) -> SimpleNamespace:
+    return SimpleNamespace(
+        feature_store_enabled=enabled,
+        feature_store_max_bytes=1024,
+        feature_store_ttl_seconds=60,
+    )
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_singleton_pipeline_feature_store_is_opt_in(
+    monkeypatch: pytest.MonkeyPatch, *, enabled: bool
+) -> None:
+    monkeypatch.setattr(
+        feature_store,
+        "get_settings",
+        lambda: feature_store_settings(enabled=enabled),
+    )
+    monkeypatch.setattr(FeatureStoreSingleton, "_instance", None)
+    monkeypatch.setattr(AnalysisPipelineSingleton, "_instance", None)
+    pipeline = AnalysisPipelineSingleton.get_instance()
+
+    if not enabled:
+        assert pipeline.feature_store is None
+        return
+    assert isinstance(pipeline.feature_store, InMemoryFeatureStore)
+    assert pipeline.feature_store.max_bytes == 1024
+    assert pipeline.feature_store.ttl_seconds == 60
+
+
+async def test_store_expires_partials_after_ttl() -> None:
+    clock = SimpleNamespace(now=0.0)
+    store = InMemoryFeatureStore(ttl_seconds=60, clock=lambda: clock.now)
+    days = [date(2025, 1, 6), date(2025, 1, 7)]
+
+    await store.put_days("user-1", {days[0]: DayPartial("a")})
+    clock.now = 30.0
+    await store.put_days("user-1", {days[1]: DayPartial("b")})
+    # Reads do not extend the lifetime of stored health data
+    assert sorted(await store.get_days("user-1", days)) == days
+
+    clock.now = 60.0
+    assert list(await store.get_days("user-1", days)) == [days[1]]
+    clock.now = 90.0
+    assert await store.get_days("user-1", days) == {}
+    assert len(store) == 0
+    assert store.nbytes == 0
+
+
+async def test_store_evicts_least_recently_used_bytes() -> None:
+    def partial(name: str) -> DayPartial:
+        return DayPartial(name, pat_values=np.zeros(100, dtype=np.float32))
+
+    store = InMemoryFeatureStore(max_bytes=1000)
+    days = [date(2025, 1, day) for day in (6, 7, 8)]
+
+    await store.put_days("user-1", {days[0]: partial("a"), days[1]: partial("b")})
+    await store.get_days("user-1", [days[0]])
+    await store.put_days("user-1", {days[2]: partial("c")})
+
+    assert sorted(await store.get_days("user-1", days)) == [days[0], days[2]]
+    assert store.nbytes == 800
+
+
+async def test_users_do_not_share_partials() -> None:
+    store = InMemoryFeatureStore()
+    pipeline = make_pipeline(store)
+    metrics = day_metrics(0)
+
+    await pipeline.process_health_data("user-1", metrics)
+    await pipeline.process_health_data("user-2", metrics)
+    await store.delete_user("user-1")
+
+    assert pipeline.feature_store_stats["days_built"] == 2
+    assert await store.get_days("user-1", [START.date()]) == {}
+    assert list(await store.get_days("user-2", [START.date()])) == [START.date()]
+
+
+async def test_store_evicts_least_recently_used_days() -> None:
+    store = InMemoryFeatureStore(max_days=2)
+    days = [date(2025, 1, day) for day in (6, 7, 8)]
+
+    await store.put_days("user-1", {days[0]: DayPartial("a"), days[1]: DayPartial("b")})
+    await store.get_days("user-1", [days[0]])
+    await store.put_days("user-1", {days[2]: DayPartial("c")})
+
+    assert sorted(await store.get_days("user-1", days)) == [days[0], days[2]]
+
+
+def test_metrics_are_grouped_by_utc_day() -> None:
+    late = biometric(
+        HealthMetricType.HEART_RATE,
+        datetime.fromisoformat("2025-01-06T20:00:00-05:00"),
+        heart_rate=70.0,
+    )
+    early = biometric(HealthMetricType.HEART_RATE, START, heart_rate=70.0)
+
+    grouped = group_metrics_by_day([late, early])
+
+    assert list(grouped) == [date(2025, 1, 6), date(2025, 1, 7)]
+    assert grouped[date(2025, 1, 7)] == [late]
@@ -0,0 +1,71 @@
+"""Tests for the fusion model registry in HealthFusionService."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import torch
+
+from clarity.ml.fusion_transformer import HealthFusionService
+
+CARDIO = [float(i) for i in range(8)]
+RESPIRATORY = [0.5 * i for i in range(8)]
+SLEEP = [1.0, 0.9, 0.1, 0.2]
+
+
+@pytest.fixture
+def service() -> HealthFusionService:
+    return HealthFusionService()
+
+
+def test_models_are_cached_per_signature(service: HealthFusionService) -> None:
+    first = service.get_model({"cardio": 8, "respiratory": 8})
+    # Key order does not matter, dimensions do
+    assert service.get_model({"respiratory": 8, "cardio": 8}) is first
+    assert service.get_model({"cardio": 8, "respiratory": 4}) is not first
+
+    service.initialize_model({"cardio": 8, "respiratory": 8})
+    assert service.model is first
+    assert service.model_count == 2
+
+
+def test_fusion_is_deterministic(service: HealthFusionService) -> None:
+    features = {"cardio": CARDIO, "respiratory": RESPIRATORY}
+
+    first = service.fuse_modalities(features)
+    again = service.fuse_modalities(features)
+    other_process = HealthFusionService().fuse_modalities(features)
+
+    assert len(first) == 64
+    assert first == again
+    assert first == pytest.approx(other_process)
+
+
+def test_batch_matches_single_fusion(service: HealthFusionService) -> None:
+    batch = [
+        {"cardio": CARDIO, "respiratory": RESPIRATORY},
+        {"cardio": CARDIO, "sleep": SLEEP},
+        {"respiratory": RESPIRATORY, "cardio": [v + 1 for v in CARDIO]},
+        {},
+    ]
+
+    fused = service.fuse_modalities_batch(batch)
+
+    assert len(fused) == len(batch)
+    for features, vector in zip(batch[:3], fused, strict=False):
+        assert vector == pytest.approx(service.fuse_modalities(features), abs=1e-5)
+    assert fused[3] == [0.0] * 64
+    assert service.model_count == 2
+
+
+def test_trained_weights_are_loaded(tmp_path: Path) -> None:
+    trained = HealthFusionService().get_model({"cardio": 8, "sleep": 4})
+    state = {k: torch.full_like(v, 0.01) for k, v in trained.state_dict().items()}
+    torch.save(state, tmp_path / "fusion_cardio-8_sleep-4.pt")
+
+    loaded = HealthFusionService(weights_dir=tmp_path).get_model(
+        {"sleep": 4, "cardio": 8}
+    )
+
+    assert torch.equal(loaded.cls_token, torch.full_like(loaded.cls_token, 0.01))
@@ -0,0 +1,304 @@
+"""Tests for the Gemini request scheduler.
+
+Covers:
+- Token bucket refill and consumption
+- Global concurrency cap
+- Priority lanes and reserved interactive capacity
+- Deadline expiry and queue-full backpressure
+- Integration with GeminiService
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from clarity.core.exceptions import InferenceTimeoutError, ServiceUnavailableError
+from clarity.ml.gemini_scheduler import (
+    GeminiRequestScheduler,
+    InsightPriority,
+    TokenBucket,
+    get_gemini_scheduler,
+    reset_gemini_scheduler,
+)
+from clarity.ml.gemini_service import GeminiService, HealthInsightRequest
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    """Test token bucket rate limiting."""
+
+    @staticmethod
+    def test_bucket_starts_full_and_drains() -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=1.0, capacity=2, clock=clock)
+
+        assert bucket.try_consume()
+        assert bucket.try_consume()
+        assert not bucket.try_consume()
+        assert bucket.seconds_until_available() == pytest.approx(1.0)
+
+    @staticmethod
+    def test_bucket_refills_up_to_capacity() -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=2.0, capacity=3, clock=clock)
+        for _ in range(3):
+            bucket.try_consume()
+
+        clock.now = 0.5
+        assert bucket.tokens == pytest.approx(1.0)
+
+        clock.now = 100.0
+        assert bucket.tokens == pytest.approx(3.0)
+
+    @staticmethod
+    def test_invalid_configuration_rejected() -> None:
+        with pytest.raises(ValueError, match="positive"):
+            TokenBucket(rate_per_second=0, capacity=1)
+
+
+class TestGeminiRequestScheduler:
+    """Test scheduling behaviour."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_enforced() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=2,
+            requests_per_minute=60_000,
+            burst_size=100,
+            reserved_interactive_slots=0,
+        )
+        active = 0
+        peak = 0
+
+        async def call() -> int:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return 1
+
+        results = await asyncio.gather(*(scheduler.run(call) for _ in range(10)))
+
+        assert sum(results) == 10
+        assert peak == 2
+        assert scheduler.in_flight == 0
+        assert scheduler.queue_depth() == 0
+        assert scheduler.get_stats()["completed"] == 10
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_interactive_dispatches_before_background() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=1,
+            requests_per_minute=60_000,
+            burst_size=100,
+        )
+        gate = asyncio.Event()
+        order: list[str] = []
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        def make_call(name: str):
+            async def call() -> None:
+                order.append(name)
+
+            return call
+
+        first = asyncio.create_task(
+            scheduler.run(blocker, priority=InsightPriority.INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+        background = asyncio.create_task(
+            scheduler.run(make_call("background"), priority=InsightPriority.BACKGROUND)
+        )
+        interactive = asyncio.create_task(
+            scheduler.run(
+                make_call("interactive"), priority=InsightPriority.INTERACTIVE
+            )
+        )
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth(InsightPriority.BACKGROUND) == 1
+        assert scheduler.queue_depth(InsightPriority.INTERACTIVE) == 1
+
+        gate.set()
+        await asyncio.gather(first, background, interactive)
+
+        assert order == ["interactive", "background"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_background_cannot_use_reserved_slots() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=2,
+            requests_per_minute=60_000,
+            burst_size=100,
+            reserved_interactive_slots=1,
+        )
+        gate = asyncio.Event()
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        tasks = [
+            asyncio.create_task(scheduler.run(blocker)),
+            asyncio.create_task(scheduler.run(blocker)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.in_flight == 1
+        assert scheduler.queue_depth(InsightPriority.BACKGROUND) == 1
+
+        interactive = asyncio.create_task(
+            scheduler.run(blocker, priority=InsightPriority.INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+        assert scheduler.in_flight == 2
+
+        gate.set()
+        await asyncio.gather(*tasks, interactive)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_expires_when_it_cannot_start_in_time() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=1, requests_per_minute=60_000, burst_size=100
+        )
+        gate = asyncio.Event()
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        async def never_runs() -> None:
+            pytest.fail("expired request must not run")
+
+        running = asyncio.create_task(
+            scheduler.run(blocker, priority=InsightPriority.INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+
+        with pytest.raises(InferenceTimeoutError):
+            await scheduler.run(
+                never_runs,
+                priority=InsightPriority.INTERACTIVE,
+                deadline_seconds=0.01,
+            )
+
+        assert scheduler.queue_depth() == 0
+        assert scheduler.get_stats()["expired"] == 1
+
+        gate.set()
+        await running
+        assert scheduler.in_flight == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_queue_full_rejects_with_backpressure() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=1,
+            requests_per_minute=60_000,
+            burst_size=100,
+            max_queue_size=1,
+        )
+        gate = asyncio.Event()
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        tasks = [
+            asyncio.create_task(
+                scheduler.run(blocker, priority=InsightPriority.INTERACTIVE)
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServiceUnavailableError):
+            await scheduler.run(blocker)
+
+        assert scheduler.get_stats()["rejected"] == 1
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_rate_limit_delays_dispatch() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=4, requests_per_minute=1200, burst_size=1
+        )
+        loop = asyncio.get_running_loop()
+        started: list[float] = []
+
+        async def call() -> None:
+            started.append(loop.time())
+
+        await asyncio.gather(scheduler.run(call), scheduler.run(call))
+
+        # 1200/min = one token every 50ms after the single-token burst
+        assert started[1] - started[0] >= 0.04
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_queue_position() -> None:
+        scheduler = GeminiRequestScheduler(
+            max_concurrency=1, requests_per_minute=60_000, burst_size=100
+        )
+        gate = asyncio.Event()
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        running = asyncio.create_task(scheduler.run(blocker))
+        queued = asyncio.create_task(scheduler.run(blocker))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth() == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert scheduler.queue_depth() == 0
+
+        gate.set()
+        await running
+        assert scheduler.in_flight == 0
+
+
+class TestGeminiSchedulerIntegration:
+    """Test the scheduler in front of GeminiService."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_generate_health_insights_through_scheduler() -> None:
+        scheduler = GeminiRequestScheduler()
+        service = GeminiService(testing=True)
+        request = HealthInsightRequest(
+            user_id="user-1",
+            analysis_results={"sleep_efficiency": 90.0},
+        )
+
+        response = await scheduler.generate_health_insights(
+            service, request, priority=InsightPriority.INTERACTIVE
+        )
+
+        assert response.user_id == "user-1"
+        assert scheduler.get_stats()["completed"] == 1
+
+    @staticmethod
+    def test_global_scheduler_is_singleton() -> None:
+        reset_gemini_scheduler()
+        try:
+            assert get_gemini_scheduler() is get_gemini_scheduler()
+        finally:
+            reset_gemini_scheduler()
@@ -0,0 +1,127 @@
+"""Tests for streaming HealthKit ingestion into columnar buffers."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import io
+import json
+from typing import Any
+
+import numpy as np
+import pytest
+
+from clarity.ml.analysis_pipeline import run_analysis_pipeline
+from clarity.ml.healthkit_stream import HealthKitColumns, parse_healthkit_stream
+
+START = datetime(2025, 1, 6, 8, 0, tzinfo=UTC)
+
+
+def heart_rate_upload(minutes: int) -> dict[str, Any]:
+    return {
+        "user_id": "user-1",
+        "source_note": "Apple Watch – Série 9",  # multi-byte characters
+        "quantity_samples": [
+            {
+                "type": "HeartRate",
+                "value": 60 + (i % 30),
+                "timestamp": (START + timedelta(minutes=i)).isoformat(),
+            }
+            for i in range(minutes)
+        ],
+        "category_samples": [],
+        "workouts": [],
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_stream_matches_decoded_document(chunk_size: int) -> None:
+    upload = heart_rate_upload(50)
+    raw = json.dumps(upload, ensure_ascii=False, indent=2).encode()
+
+    streamed = parse_healthkit_stream(io.BytesIO(raw), chunk_size=chunk_size)
+    decoded = HealthKitColumns.from_dict(upload)
+
+    assert streamed.user_id == "user-1"
+    assert streamed.other_fields == {"source_note": "Apple Watch – Série 9"}
+    assert streamed.sample_count == decoded.sample_count == 50
+    for a, b in zip(
+        streamed.channel_arrays("heart_rate"),
+        decoded.channel_arrays("heart_rate"),
+        strict=True,
+    ):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_samples_are_routed_by_type() -> None:
+    upload = {
+        "quantity_samples": [
+            {"type": "heartratevariabilitysdnn", "value": 45.5},
+            {"type": "respiratoryrate", "value": "15", "timestamp": "2025-01-06T08:00"},
+            {"type": "bloodpressuresystolic", "systolic": 120, "diastolic": 80},
+            {"type": "stepcount", "value": 100},
+            {"type": "heartrate", "value": 0},
+            {"type": "heartrate", "value": 70, "timestamp": "yesterday"},
+        ],
+        "category_samples": [{"type": "sleepanalysis", "duration": 420}],
+        "workouts": [{"steps": 5000}],
+    }
+
+    columns = parse_healthkit_stream(io.StringIO(json.dumps(upload)), chunk_size=16)
+
+    assert len(columns.columns["heart_rate_variability"]) == 1
+    timestamps, values = columns.channel_arrays("respiratory_rate")
+    assert values.tolist() == [15.0]
+    assert timestamps[0] == np.datetime64("2025-01-06T08:00", "ms")
+    assert len(columns.passthrough_samples) == 1
+    assert columns.skipped == 3
+    assert len(columns.category_samples) == 1
+    assert len(columns.workouts) == 1
+
+
+def test_malformed_document_raises() -> None:
+    with pytest.raises(ValueError, match="Malformed"):
+        parse_healthkit_stream(io.StringIO('["not", "an", "object"]'))
+    with pytest.raises(ValueError):  # noqa: PT011 - truncated JSON
+        parse_healthkit_stream(io.StringIO('{"quantity_samples": [{"type": "hea'))
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+
+
+def test_large_members_are_read_geometrically() -> None:
+    upload = heart_rate_upload(3)
+    upload["firmware_blob"] = "x" * (4 * 1024 * 1024)
+    upload["device_log"] = {f"event-{i}": [i, "ok"] for i in range(100_000)}
+    raw = CountingReader(json.dumps(upload).encode())
+
+    columns = parse_healthkit_stream(raw, chunk_size=1024)
+
+    assert columns.sample_count == 3
+    assert columns.other_fields["firmware_blob"] == upload["firmware_blob"]
+    assert columns.other_fields["device_log"] == upload["device_log"]
+    # A fixed 1 KiB read per retry would take over 6000 reads
+    assert raw.reads < 50
+
+
+@pytest.mark.asyncio
+async def test_pipeline_features_match_per_metric_path() -> None:
+    upload = heart_rate_upload(180)
+    columns = parse_healthkit_stream(io.StringIO(json.dumps(upload)), chunk_size=512)
+
+    from_metrics = await run_analysis_pipeline("user-1", upload)
+    from_columns = await run_analysis_pipeline("user-1", columns)
+
+    assert from_columns["cardio_features"] == pytest.approx(
+        from_metrics["cardio_features"]
+    )
+    coverage = from_columns["summary_stats"]["data_coverage"]["cardio"]
+    assert coverage["metric_count"] == 180
+    assert coverage["time_span_hours"] == pytest.approx(179 / 60)
+    assert from_columns["processing_metadata"]["total_metrics"] == 180
@@ -0,0 +1,137 @@
+"""Tests for multi-week sliding-window PAT analysis."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from clarity.core.constants import MINUTES_PER_WEEK
+from clarity.core.exceptions import DataValidationError
+from clarity.ml.longitudinal_analysis import LongitudinalPATEngine
+from clarity.ml.pat_service import ActigraphyInput, PATModelService
+from clarity.services.health_data_service import MLPredictionError
+
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def history(weeks: int, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.gamma(2.0, 50.0, weeks * MINUTES_PER_WEEK).astype(np.float32)
+
+
+@pytest.fixture
+async def pat_service() -> PATModelService:
+    service = PATModelService(model_size="small", device="cpu")
+    await service.load_model()
+    return service
+
+
+async def test_windows_match_single_week_analysis(
+    pat_service: PATModelService,
+) -> None:
+    values = history(3)
+    engine = LongitudinalPATEngine(pat_service, batch_size=2)
+
+    result = await engine.analyze(ActigraphyInput.from_array("user-1", values, START))
+
+    assert [w.start_time for w in result.windows] == [
+        START + timedelta(weeks=week) for week in range(3)
+    ]
+    assert result.windows[-1].end_time == START + timedelta(weeks=3)
+    weeks = values.reshape(3, MINUTES_PER_WEEK)
+    for week, window in zip(weeks, result.windows, strict=True):
+        single = await pat_service.analyze_actigraphy(
+            ActigraphyInput.from_array("user-1", week)
+        )
+        assert window.circadian_rhythm_score == pytest.approx(
+            single.circadian_rhythm_score, abs=1e-5
+        )
+        assert window.depression_risk_score == pytest.approx(
+            single.depression_risk_score, abs=1e-5
+        )
+        assert window.sleep_efficiency == pytest.approx(
+            single.sleep_efficiency, abs=1e-3
+        )
+
+
+async def test_refresh_only_computes_new_weeks(pat_service: PATModelService) -> None:
+    values = history(4)
+    engine = LongitudinalPATEngine(pat_service)
+
+    first = await engine.analyze(
+        ActigraphyInput.from_array("user-1", values[:-MINUTES_PER_WEEK], START)
+    )
+    refreshed = await engine.analyze(
+        ActigraphyInput.from_array("user-1", values, START)
+    )
+    other_user = await engine.analyze(
+        ActigraphyInput.from_array("user-2", values, START)
+    )
+
+    assert (first.computed_windows, first.cached_windows) == (3, 0)
+    assert (refreshed.computed_windows, refreshed.cached_windows) == (1, 3)
+    assert [w.cached for w in refreshed.windows] == [True, True, True, False]
+    assert refreshed.windows[:3] == [
+        w.model_copy(update={"cached": True}) for w in first.windows
+    ]
+    assert other_user.computed_windows == 4
+    assert engine.stats["windows_cached"] == 3
+
+
+async def test_weights_change_invalidates_cached_windows(
+    pat_service: PATModelService,
+) -> None:
+    history_input = ActigraphyInput.from_array("user-1", history(2), START)
+    engine = LongitudinalPATEngine(pat_service)
+    first = await engine.analyze(history_input)
+
+    pat_service.set_inference_model(pat_service.model)
+    swapped = await engine.analyze(history_input)
+    assert swapped.computed_windows == 2
+    assert (await engine.analyze(history_input)).cached_windows == 2
+
+    pat_service.set_inference_model(None)
+    assert (await engine.analyze(history_input)).cached_windows == 2
+
+    await pat_service.load_model()  # Fresh random initialization
+    reloaded = await engine.analyze(history_input)
+    assert reloaded.computed_windows == 2
+    assert reloaded.windows[0].depression_risk_score != pytest.approx(
+        first.windows[0].depression_risk_score, abs=1e-6
+    )
+
+
+async def test_overlapping_stride(pat_service: PATModelService) -> None:
+    values = history(2)[: MINUTES_PER_WEEK + 3000]
+    engine = LongitudinalPATEngine(pat_service)
+
+    result = await engine.analyze(
+        ActigraphyInput.from_array("user-1", values, START), stride_minutes=1440
+    )
+
+    # 3000 extra minutes fit two daily strides; 120 leading minutes are dropped
+    assert result.stride_minutes == 1440
+    assert len(result.windows) == 3
+    assert result.windows[0].start_time == START + timedelta(minutes=120)
+    assert result.windows[-1].end_time == START + timedelta(
+        minutes=MINUTES_PER_WEEK + 3000
+    )
+
+
+async def test_invalid_requests(pat_service: PATModelService) -> None:
+    engine = LongitudinalPATEngine(pat_service, max_weeks=2)
+
+    with pytest.raises(DataValidationError, match="at least"):
+        await engine.analyze(ActigraphyInput.from_array("user-1", history(1)[:100]))
+    with pytest.raises(DataValidationError, match="too large"):
+        await engine.analyze(ActigraphyInput.from_array("user-1", history(3)))
+    with pytest.raises(DataValidationError, match="Stride"):
+        await engine.analyze(
+            ActigraphyInput.from_array("user-1", history(1)), stride_minutes=0
+        )
+
+    unloaded = LongitudinalPATEngine(PATModelService(model_size="small"))
+    with pytest.raises(MLPredictionError, match="not loaded"):
+        await unloaded.analyze(ActigraphyInput.from_array("user-1", history(1)))
@@ -0,0 +1,217 @@
+"""Tests for ModelManager concurrency and PAT tier routing."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from clarity.ml.models import (
+    LEGACY_PAT_MODELS,
+    LoadedModel,
+    ModelLoadConfig,
+    ModelManager,
+    ModelRegistryConfig,
+    TierRoutingConfig,
+)
+from clarity.ml.pat_service_v2 import PATServiceV2
+
+TIER_VERSIONS = {"small": "1.0.0", "medium": "1.1.0", "large": "1.2.0"}
+TIER_MODELS = {"small": "PAT-S", "medium": "PAT-M", "large": "PAT-L"}
+
+
+class FakePAT:
+    """Async model that records its calls and takes ``delay`` seconds."""
+
+    def __init__(self, tier: str, delay: float = 0.0) -> None:
+        self.tier = tier
+        self.delay = delay
+        self.calls: list[dict[str, Any]] = []
+
+    async def predict(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return {"predictions": {"tier": self.tier}}
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> ModelManager:
+    manager = ModelManager(
+        config=ModelRegistryConfig(base_path=tmp_path, cache_dir=tmp_path / "cache"),
+        routing_config=TierRoutingConfig(max_queue_depth=2, p95_latency_slo_ms=100.0),
+    )
+    for tier, version in TIER_VERSIONS.items():
+        manager.loaded_models[f"pat:{version}"] = LoadedModel(
+            LEGACY_PAT_MODELS[TIER_MODELS[tier]], FakePAT(tier), ModelLoadConfig()
+        )
+    return manager
+
+
+def record_latency(model: LoadedModel, latency_ms: float, age: float = 0.0) -> None:
+    for _ in range(20):
+        model._recent_latencies.append((time.time() - age, latency_ms))
+
+
+def routed_service(manager: ModelManager) -> PATServiceV2:
+    service = PATServiceV2(model_size="large", adaptive_routing=True)
+    service.progressive_service = SimpleNamespace(  # type: ignore[assignment]
+        model_manager=manager
+    )
+    service.current_model = manager.loaded_models["pat:1.2.0"]
+    service.is_initialized = True
+    return service
+
+
+async def routed_tier(manager: ModelManager) -> str:
+    routed = await manager.route_model("pat", TIER_VERSIONS)
+    assert routed is not None
+    return routed[1]
+
+
+async def test_routes_to_large_within_slo(manager: ModelManager) -> None:
+    routed = await manager.route_model("pat", TIER_VERSIONS)
+
+    assert routed is not None
+    model, tier = routed
+    assert tier == "large"
+    assert model.metadata.version == "1.2.0"
+
+
+async def test_degrades_by_queue_depth_and_p95(manager: ModelManager) -> None:
+    large = manager.loaded_models["pat:1.2.0"]
+    medium = manager.loaded_models["pat:1.1.0"]
+    small = manager.loaded_models["pat:1.0.0"]
+
+    large.in_flight = 2
+    assert await routed_tier(manager) == "medium"
+
+    record_latency(medium, 250.0)
+    assert await routed_tier(manager) == "small"
+
+    # Every tier over SLO: the fastest tier still answers
+    small.in_flight = 5
+    assert await routed_tier(manager) == "small"
+
+
+async def test_large_recovers_once_slow_samples_age_out(manager: ModelManager) -> None:
+    large = manager.loaded_models["pat:1.2.0"]
+    record_latency(large, 500.0, age=120.0)
+
+    assert large.p95_latency_ms() == 0.0
+    assert await routed_tier(manager) == "large"
+
+
+async def test_explicit_tier_is_honoured(manager: ModelManager) -> None:
+    manager.loaded_models["pat:1.0.0"].in_flight = 10
+
+    routed = await manager.route_model("pat", TIER_VERSIONS, requested_tier="small")
+
+    assert routed is not None
+    assert routed[1] == "small"
+    with pytest.raises(ValueError, match="Unknown model tier"):
+        await manager.route_model("pat", TIER_VERSIONS, requested_tier="huge")
+
+
+async def test_service_records_answering_tier(manager: ModelManager) -> None:
+    service = routed_service(manager)
+    options = {"tier": "medium", "threshold": 0.5}
+
+    routed = await service.predict([0.1] * 10)
+    pinned = await service.predict([0.1] * 10, options)
+
+    assert routed["model_info"]["tier"] == "large"
+    assert pinned["model_info"]["tier"] == "medium"
+    assert pinned["model_info"]["version"] == "1.1.0"
+    medium_model = manager.loaded_models["pat:1.1.0"].model_instance
+    assert medium_model.calls == [{"actigraphy_data": [0.1] * 10, "threshold": 0.5}]
+    assert options == {"tier": "medium", "threshold": 0.5}
+
+
+async def test_spike_spills_over_to_smaller_tiers(manager: ModelManager) -> None:
+    for model in manager.loaded_models.values():
+        model.model_instance.delay = 0.02
+    service = routed_service(manager)
+
+    results = await asyncio.gather(*(service.predict([0.0]) for _ in range(6)))
+
+    tiers = [result["model_info"]["tier"] for result in results]
+    assert tiers.count("large") == 2
+    assert tiers.count("medium") == 2
+    assert tiers.count("small") == 2
+
+
+class BlockingPAT:
+    """Synchronous model; calls wait on a barrier so overlap is observable."""
+
+    def __init__(self, barrier: threading.Barrier) -> None:
+        self.barrier = barrier
+        self.threads: set[str] = set()
+
+    def predict(self, *, actigraphy_data: list[float]) -> str:
+        self.threads.add(threading.current_thread().name)
+        self.barrier.wait(timeout=5)
+        return f"{len(actigraphy_data)} samples"
+
+
+async def test_sync_predictions_run_concurrently() -> None:
+    barrier = threading.Barrier(3)
+    model = LoadedModel(
+        LEGACY_PAT_MODELS["PAT-L"],
+        BlockingPAT(barrier),
+        ModelLoadConfig(max_concurrent_inferences=3),
+    )
+
+    # Would break the barrier if predictions were serialized
+    results = await asyncio.gather(
+        *(model.predict(actigraphy_data=[0.0] * 4) for _ in range(3))
+    )
+
+    assert results == ["4 samples"] * 3
+    assert model.metrics.total_inferences == 3
+    assert model.in_flight == 0
+
+
+async def test_concurrency_is_bounded_by_semaphore() -> None:
+    running = peak = 0
+
+    class CountingPAT:
+        async def predict(self) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    model = LoadedModel(
+        LEGACY_PAT_MODELS["PAT-S"],
+        CountingPAT(),
+        ModelLoadConfig(max_concurrent_inferences=2),
+    )
+
+    await asyncio.gather(*(model.predict() for _ in range(6)))
+
+    assert peak == 2
+    assert model.metrics.total_inferences == 6
+
+
+async def test_replicas_use_their_own_thread_pools() -> None:
+    barrier = threading.Barrier(2)
+    first, second = BlockingPAT(barrier), BlockingPAT(barrier)
+    model = LoadedModel(
+        LEGACY_PAT_MODELS["PAT-M"],
+        first,
+        ModelLoadConfig(max_concurrent_inferences=2),
+        replicas=[second],
+    )
+
+    await asyncio.gather(*(model.predict(actigraphy_data=[1.0]) for _ in range(2)))
+    model.close()
+
+    assert [len(replica.instance.threads) for replica in model.replicas] == [1, 1]
+    assert next(iter(first.threads)).startswith("pat:1.1.0-replica0")
+    assert next(iter(second.threads)).startswith("pat:1.1.0-replica1")
@@ -0,0 +1,112 @@
+"""Tests for ModelMonitoringService and its per-model metric store."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import numpy as np
+import pytest
+
+from clarity.ml.models.metric_store import (
+    SKETCH_RELATIVE_ACCURACY,
+    LatencySketch,
+    ModelMetricStore,
+    SampleRing,
+)
+from clarity.ml.models.monitoring import ModelMonitoringConfig, ModelMonitoringService
+
+
+@pytest.fixture
+def service() -> ModelMonitoringService:
+    return ModelMonitoringService(
+        ModelMonitoringConfig(enable_prometheus=False, latency_threshold_ms=500)
+    )
+
+
+def test_sketch_quantiles_within_relative_accuracy() -> None:
+    rng = random.Random(7)
+    latencies = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    sketch = LatencySketch()
+    for latency in latencies:
+        sketch.add(latency)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = float(np.quantile(latencies, q))
+        assert sketch.quantile(q) == pytest.approx(
+            exact, rel=SKETCH_RELATIVE_ACCURACY * 1.5
+        )
+    assert sketch.quantile(1.0) == max(latencies)
+    assert LatencySketch().quantile(0.99) == 0.0
+
+
+def test_sample_ring_keeps_latest_samples() -> None:
+    ring = SampleRing(3)
+    for i in range(5):
+        ring.append(float(i), i * 10.0, 0.0, success=i % 2 == 0)
+
+    assert len(ring) == 3
+    assert [sample[1] for sample in ring.latest(10)] == [20.0, 30.0, 40.0]
+    assert [sample[3] for sample in ring.latest(2)] == [False, True]
+
+
+def test_store_window_drops_old_minutes() -> None:
+    store = ModelMetricStore(window_minutes=10, sample_capacity=100)
+    now = time.time()
+    store.record(now - 30 * 60, 100.0, success=False, error_type="Timeout")
+    store.record(now - 3 * 60, 20.0, success=True)
+    store.record(now, 40.0, success=False, error_type="ValueError")
+
+    assert store.window(5, now).count == 2
+    assert store.window(60, now).count == 2  # Clamped to the store's window
+    assert dict(store.window(5, now).error_types) == {"ValueError": 1}
+    assert store.window(1, now).count == 1
+    assert (store.total, store.errors) == (3, 2)
+
+
+async def test_model_metrics_summary(service: ModelMonitoringService) -> None:
+    for i in range(1, 101):
+        service.record_inference(
+            "pat",
+            "1.0",
+            float(i),
+            success=i % 10 != 0,
+            error_type="ValueError" if i % 10 == 0 else None,
+            memory_usage_mb=100.0,
+        )
+
+    metrics = await service.get_model_metrics("pat", "1.0")
+    summary = metrics["summary"]
+    assert summary["total_inferences"] == 100
+    assert summary["failed_inferences"] == 10
+    assert summary["success_rate"] == pytest.approx(0.9)
+    assert summary["avg_latency_ms"] == pytest.approx(50.5)
+    assert summary["p95_latency_ms"] == pytest.approx(95, rel=0.02)
+    assert summary["avg_memory_mb"] == 100.0
+    assert metrics["errors"] == {"ValueError": 10}
+    assert metrics["trends"]["latency"][-1] == 100.0
+    assert metrics["trends"]["error_rate"][-1] == 1.0
+
+    assert list(await service.get_all_models_metrics()) == ["pat:1.0"]
+    assert "error" in await service.get_model_metrics("pat", "2.0")
+
+
+async def test_alerts_evaluated_on_tick(service: ModelMonitoringService) -> None:
+    tasks_before = len(asyncio.all_tasks())
+    for _ in range(10):
+        service.record_inference("pat", "1.0", 50.0, success=False)
+    service.record_inference("pat", "1.0", 900.0, success=True)
+
+    assert len(asyncio.all_tasks()) == tasks_before  # No task per inference
+    assert service.alert_state == {}
+
+    service.check_alerts()
+    alerts = service.alert_state["pat:1.0"]
+    assert set(alerts) == {"high_latency_warning", "high_error_rate_critical"}
+    assert "900.00ms" in alerts["high_latency_warning"]["message"]
+
+    # Peaks reset each tick; the error rate still covers the recent window
+    service.alert_state.clear()
+    service.check_alerts()
+    assert set(service.alert_state["pat:1.0"]) == {"high_error_rate_critical"}
@@ -0,0 +1,151 @@
+"""Tests for parallel ranged model downloads and recorded digests."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import hashlib
+import os
+from pathlib import Path
+import random
+
+import pytest
+
+from clarity.ml.models import downloader
+from clarity.ml.models.registry import (
+    DIGEST_SUFFIX,
+    ModelMetadata,
+    ModelRegistry,
+    ModelRegistryConfig,
+    ModelTier,
+)
+from tests.fakes.model_server import FakeModelServer
+
+DATA = random.Random(3).randbytes(3 * 1024 * 1024 + 123)
+
+
+@pytest.fixture
+def server() -> Iterator[FakeModelServer]:
+    with FakeModelServer(DATA) as server:
+        yield server
+
+
+@pytest.fixture
+def registry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ModelRegistry:
+    monkeypatch.setattr(downloader, "RETRY_BACKOFF_SECONDS", 0.0)
+    return ModelRegistry(
+        ModelRegistryConfig(
+            base_path=tmp_path,
+            cache_dir=tmp_path / "cache",
+            registry_file=tmp_path / "registry.json",
+            download_connections=4,
+            download_min_range_bytes=512 * 1024,
+        )
+    )
+
+
+async def register(
+    registry: ModelRegistry, server: FakeModelServer, checksum: str | None = None
+) -> ModelMetadata:
+    metadata = ModelMetadata(
+        model_id="pat",
+        name="PAT Test",
+        version="9.9.9",
+        tier=ModelTier.SMALL,
+        size_bytes=len(DATA),
+        checksum_sha256=checksum or hashlib.sha256(DATA).hexdigest(),
+        source_url=server.url,
+    )
+    await registry.register_model(metadata)
+    return metadata
+
+
+async def test_downloads_ranges_in_parallel(
+    registry: ModelRegistry, server: FakeModelServer
+) -> None:
+    metadata = await register(registry, server)
+
+    assert await registry.download_model("pat", "9.9.9")
+
+    local_path = Path(metadata.local_path)
+    assert local_path.read_bytes() == DATA
+    assert not local_path.with_suffix(".bin.partial").exists()
+    assert server.ranges[0] == "bytes=0-0"  # Size probe
+    assert len(server.ranges) == 5
+    starts = sorted(int(r.split("=")[1].split("-")[0]) for r in server.ranges[1:])
+    step = -(-len(DATA) // 4)
+    assert starts == [0, step, 2 * step, 3 * step]
+
+    (progress,) = registry.download_progress.values()
+    assert progress["downloaded_bytes"] == len(DATA)
+    assert progress["progress_percent"] == 100.0
+
+
+async def test_truncated_ranges_resume(
+    registry: ModelRegistry, server: FakeModelServer
+) -> None:
+    metadata = await register(registry, server)
+    server.truncate_responses = 2
+
+    assert await registry.download_model("pat", "9.9.9")
+    assert Path(metadata.local_path).read_bytes() == DATA
+    assert len(server.ranges) == 7  # Probe, four ranges, two resumed ranges
+
+
+async def test_server_without_range_support(
+    registry: ModelRegistry, server: FakeModelServer
+) -> None:
+    metadata = await register(registry, server)
+    server.support_ranges = False
+
+    assert await registry.download_model("pat", "9.9.9")
+    assert Path(metadata.local_path).read_bytes() == DATA
+    assert len(server.ranges) == 2
+
+    # A single stream cannot resume, so a cut-off response fails the download
+    server.truncate_responses = 2  # The full-body size probe, then the download
+    assert not await registry.download_model("pat", "9.9.9", force=True)
+
+
+async def test_rejects_bad_checksum_and_size(
+    registry: ModelRegistry, server: FakeModelServer
+) -> None:
+    metadata = await register(registry, server, checksum="0" * 64)
+    assert not await registry.download_model("pat", "9.9.9")
+    assert list(registry._get_model_cache_path(metadata).parent.iterdir()) == []
+
+    server.data = DATA[:-1]
+    metadata = await register(registry, server)
+    assert not await registry.download_model("pat", "9.9.9")
+    assert len(server.ranges) == 6  # The size probe stopped the second download
+
+
+async def test_cache_check_uses_recorded_digest(
+    registry: ModelRegistry, server: FakeModelServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    metadata = await register(registry, server)
+    assert await registry.download_model("pat", "9.9.9")
+    local_path = Path(metadata.local_path)
+    assert local_path.with_name(local_path.name + DIGEST_SUFFIX).exists()
+
+    rehashed: list[Path] = []
+    calculate_checksum = registry._calculate_checksum
+
+    async def tracking_checksum(file_path: Path) -> str:
+        rehashed.append(file_path)
+        return await calculate_checksum(file_path)
+
+    monkeypatch.setattr(registry, "_calculate_checksum", tracking_checksum)
+
+    assert await registry._is_model_cached(metadata, local_path)
+    assert rehashed == []
+
+    # A touched file is rehashed once, then trusted again
+    stat = local_path.stat()
+    os.utime(local_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert await registry._is_model_cached(metadata, local_path)
+    assert await registry._is_model_cached(metadata, local_path)
+    assert rehashed == [local_path]
+
+    # Corrupted contents with a stale record fail the check
+    local_path.write_bytes(b"x" * len(DATA))
+    assert not await registry._is_model_cached(metadata, local_path)
@@ -0,0 +1,188 @@
+"""Parity tests for the ONNX Runtime PAT backend against the torch path."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+pytest.importorskip("onnxruntime")
+
+from clarity.ml import pat_onnx
+from clarity.ml.model_integrity import ModelIntegrityError
+from clarity.ml.pat_onnx import (
+    ONNX_OUTPUT_NAMES,
+    PATOnnxService,
+    export_pat_to_onnx,
+    onnx_digest_path,
+)
+from clarity.ml.pat_service import ActigraphyInput, PATModelService
+from clarity.ml.preprocessing import ActigraphyDataPoint
+from clarity.services.health_data_service import MLPredictionError
+
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def actigraphy_input(minutes: int = 1440) -> ActigraphyInput:
+    rng = np.random.default_rng(7)
+    return ActigraphyInput(
+        user_id="user-1",
+        data_points=[
+            ActigraphyDataPoint(
+                timestamp=START + timedelta(minutes=i), value=float(value)
+            )
+            for i, value in enumerate(rng.gamma(2.0, 50.0, minutes))
+        ],
+    )
+
+
+async def torch_service(size: str) -> PATModelService:
+    service = PATModelService(model_size=size, device="cpu")
+    await service.load_model()
+    return service
+
+
+@pytest.mark.parametrize("size", ["small", "medium", "large"])
+async def test_exported_graph_matches_torch(size: str, tmp_path: Path) -> None:
+    service = await torch_service(size)
+    assert service.model is not None
+    path = export_pat_to_onnx(service.model, tmp_path / f"{size}.onnx")
+
+    onnx_service = PATOnnxService(
+        onnx_path=str(path), model_size=size, export_if_missing=False
+    )
+    await onnx_service.load_model()
+
+    # Batch and sequence length both differ from the traced example
+    for shape in [(1, 10080), (3, 1440)]:
+        batch = torch.randn(*shape)
+        with torch.no_grad():
+            expected = service.model(batch)
+        actual = onnx_service._run_inference(batch)
+
+        for name in ONNX_OUTPUT_NAMES:
+            np.testing.assert_allclose(
+                actual[name].numpy(), expected[name].numpy(), atol=1e-4
+            )
+
+
+async def test_analyze_actigraphy_matches_torch(tmp_path: Path) -> None:
+    service = await torch_service("small")
+    assert service.model is not None
+    path = export_pat_to_onnx(service.model, tmp_path / "PAT-S.onnx")
+    onnx_service = PATOnnxService(
+        onnx_path=str(path),
+        model_size="small",
+        intra_op_threads=1,
+        inter_op_threads=1,
+        export_if_missing=False,
+    )
+    await onnx_service.load_model()
+    input_data = actigraphy_input()
+
+    expected = await service.analyze_actigraphy(input_data)
+    actual = await onnx_service.analyze_actigraphy(input_data)
+
+    assert onnx_service.model is None
+    assert onnx_service.session.get_session_options().intra_op_num_threads == 1
+    assert actual.sleep_efficiency == pytest.approx(expected.sleep_efficiency, abs=1e-3)
+    assert actual.depression_risk_score == pytest.approx(
+        expected.depression_risk_score, abs=1e-4
+    )
+    assert actual.clinical_insights == expected.clinical_insights
+    assert actual.embedding == pytest.approx(expected.embedding, abs=1e-4)
+
+
+async def test_missing_graph_is_exported_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "onnx" / "PAT-S.onnx"
+    service = PATOnnxService(onnx_path=str(path), model_size="small")
+
+    await service.load_model()
+
+    assert path.exists()
+    assert await service.verify_weights_loaded()
+    health = await service.health_check()
+    assert health["backend"] == "onnxruntime"
+    assert health["execution_provider"] == "CPUExecutionProvider"
+    assert health["model_loaded"] is True
+
+
+async def test_missing_graph_without_export_fails(tmp_path: Path) -> None:
+    service = PATOnnxService(
+        onnx_path=str(tmp_path / "missing.onnx"),
+        model_size="small",
+        export_if_missing=False,
+    )
+
+    with pytest.raises(FileNotFoundError):
+        await service.load_model()
+    with pytest.raises(MLPredictionError, match="not loaded"):
+        await service.analyze_actigraphy(actigraphy_input(60))
+
+
+async def test_tampered_graph_is_refused_or_reexported(tmp_path: Path) -> None:
+    service = await torch_service("small")
+    assert service.model is not None
+    path = export_pat_to_onnx(service.model, tmp_path / "PAT-S.onnx")
+    assert json.loads(onnx_digest_path(path).read_text())["weights_checksum"] is None
+    path.write_bytes(path.read_bytes() + b"\0")
+
+    strict = PATOnnxService(
+        onnx_path=str(path), model_size="small", export_if_missing=False
+    )
+    with pytest.raises(ModelIntegrityError, match="SHA-256"):
+        await strict.load_model()
+
+    onnx_digest_path(path).unlink()
+    with pytest.raises(ModelIntegrityError, match="digest record"):
+        await strict.load_model()
+
+    reexporting = PATOnnxService(onnx_path=str(path), model_size="small")
+    await reexporting.load_model()
+    assert await reexporting.verify_weights_loaded()
+    await strict.load_model()
+
+
+async def test_graph_from_unexpected_weights_is_refused(tmp_path: Path) -> None:
+    service = await torch_service("small")
+    assert service.model is not None
+    path = export_pat_to_onnx(
+        service.model, tmp_path / "PAT-S.onnx", weights_checksum="0" * 64
+    )
+
+    with pytest.raises(ModelIntegrityError, match="unexpected PAT weights"):
+        await PATOnnxService(
+            onnx_path=str(path), model_size="small", export_if_missing=False
+        ).load_model()
+
+
+async def test_concurrent_workers_export_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    exports: list[Path] = []
+    export = pat_onnx.export_pat_to_onnx
+
+    def counting_export(model: torch.nn.Module, path: Path, **kwargs: object) -> Path:
+        exports.append(path)
+        return export(model, path, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(pat_onnx, "export_pat_to_onnx", counting_export)
+    path = tmp_path / "onnx" / "PAT-S.onnx"
+    workers = [
+        PATOnnxService(onnx_path=str(path), model_size="small") for _ in range(3)
+    ]
+
+    await asyncio.gather(*(worker.load_model() for worker in workers))
+
+    assert exports == [path]
+    assert len({worker.weights_version for worker in workers}) == 1
+    assert sorted(p.name for p in path.parent.iterdir()) == [
+        "PAT-S.onnx",
+        "PAT-S.onnx.lock",
+        "PAT-S.onnx.sha256.json",
+    ]
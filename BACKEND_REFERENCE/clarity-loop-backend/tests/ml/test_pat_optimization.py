@@ -20,8 +20,10 @@ import pytest
 import torch
 
 from clarity.ml.pat_optimization import (
+    AccuracyReport,
     BatchAnalysisProcessor,
     PATPerformanceOptimizer,
+    build_reference_set,
     initialize_pat_optimizer,
 )
 from clarity.ml.pat_service import ActigraphyAnalysis, ActigraphyInput, PATModelService
@@ -551,3 +553,104 @@ class TestErrorHandling:
         assert cache_key in optimizer._cache  # New valid entry was cached
         cached_result, _timestamp = optimizer._cache[cache_key]
         assert cached_result is mock_result  # Cached the correct result
+
+
+@pytest.fixture
+async def small_pat_service() -> PATModelService:
+    """Real PAT-S service with random weights, on CPU."""
+    service = PATModelService(model_size="small", device="cpu")
+    await service.load_model()
+    return service
+
+
+class TestOptimizedInference:
+    """Test quantized/compiled inference with the accuracy guard."""
+
+    @staticmethod
+    def test_quantize_model_keeps_fp32_model(
+        small_pat_service: PATModelService,
+    ) -> None:
+        """Quantization works on a copy; the fp32 reference is untouched."""
+        fp32 = small_pat_service.model
+        quantized = PATPerformanceOptimizer.quantize_model(fp32)  # type: ignore[arg-type]
+
+        assert quantized is not fp32
+        assert isinstance(fp32.encoder.patch_embedding, torch.nn.Linear)  # type: ignore[union-attr]
+        assert type(quantized.encoder.patch_embedding).__module__.startswith(
+            "torch.ao.nn.quantized.dynamic"
+        )
+
+    @staticmethod
+    def test_traced_model_accepts_any_batch_size(
+        small_pat_service: PATModelService,
+    ) -> None:
+        """The traced graph is not pinned to the tracing batch size."""
+        optimizer = PATPerformanceOptimizer(small_pat_service)
+        traced = optimizer._compile_torchscript(small_pat_service.model)  # type: ignore[arg-type]
+
+        assert traced is not None
+        with torch.no_grad():
+            outputs = traced(build_reference_set(size=3))
+        assert outputs["embeddings"].shape == (3, 96)
+
+    @staticmethod
+    async def test_enable_optimized_inference_serves_through_quantized_model(
+        small_pat_service: PATModelService,
+        sample_actigraphy_input: ActigraphyInput,
+    ) -> None:
+        """A model that passes the guard serves analyze_actigraphy."""
+        fp32_result = await small_pat_service.analyze_actigraphy(
+            sample_actigraphy_input
+        )
+        optimizer = PATPerformanceOptimizer(small_pat_service)
+
+        report = await optimizer.enable_optimized_inference()
+
+        assert report is not None
+        assert report.passed
+        assert small_pat_service.inference_model is optimizer.compiled_model
+        result = await small_pat_service.analyze_actigraphy(sample_actigraphy_input)
+        assert result.depression_risk_score == pytest.approx(
+            fp32_result.depression_risk_score, abs=0.02
+        )
+        assert (await small_pat_service.health_check())["optimized_inference"]
+
+    @staticmethod
+    async def test_failed_accuracy_guard_keeps_fp32(
+        small_pat_service: PATModelService,
+    ) -> None:
+        """A model outside tolerance is not put into service."""
+        optimizer = PATPerformanceOptimizer(small_pat_service)
+        failing = AccuracyReport(
+            passed=False,
+            reference_size=8,
+            min_embedding_cosine=0.5,
+            max_embedding_abs_error=1.0,
+            max_score_abs_error=0.3,
+        )
+
+        with patch.object(optimizer, "verify_accuracy", return_value=failing):
+            report = await optimizer.enable_optimized_inference(compiler="none")
+
+        assert report is failing
+        assert small_pat_service.inference_model is None
+        assert optimizer.optimization_enabled is False
+
+    @staticmethod
+    def test_verify_accuracy_flags_divergent_model(
+        small_pat_service: PATModelService,
+    ) -> None:
+        """Tolerances are enforced against the fp32 outputs."""
+        optimizer = PATPerformanceOptimizer(small_pat_service)
+        reference = build_reference_set(size=2)
+
+        same = optimizer.verify_accuracy(small_pat_service.model, reference)  # type: ignore[arg-type]
+        strict = optimizer.verify_accuracy(
+            small_pat_service.model,  # type: ignore[arg-type]
+            reference,
+            min_embedding_cosine=1.01,
+        )
+
+        assert same.passed
+        assert same.max_embedding_abs_error == 0.0
+        assert not strict.passed
@@ -14,6 +14,7 @@ from clarity.utils.time_window import (
     pad_to_week,
     prepare_for_pat_inference,
     slice_to_weeks,
+    sliding_weeks,
 )
 
 
@@ -109,6 +110,40 @@ class TestSliceToWeeks:
             slice_to_weeks(arr)
 
 
+class TestSlidingWeeks:
+    """Test the sliding_weeks function."""
+
+    def test_default_stride_matches_slice_to_weeks(self):
+        """Week stride yields the slice_to_weeks(keep="all") chunks as a view."""
+        arr = np.arange(3 * WEEK_MINUTES + 17, dtype=np.float32)
+
+        windows = sliding_weeks(arr)
+        chunks = slice_to_weeks(arr, keep="all")
+
+        assert windows.shape == (3, WEEK_MINUTES)
+        for window, chunk in zip(windows, chunks, strict=True):
+            np.testing.assert_array_equal(window, chunk)
+        assert np.shares_memory(windows, arr)
+
+    def test_overlapping_windows_end_at_latest_sample(self):
+        """Smaller strides overlap and the last window is the latest week."""
+        arr = np.arange(2 * WEEK_MINUTES + 100)
+
+        windows = sliding_weeks(arr, stride=1440)
+
+        assert windows.shape == (8, WEEK_MINUTES)
+        np.testing.assert_array_equal(windows[-1], arr[-WEEK_MINUTES:])
+        assert windows[1][0] - windows[0][0] == 1440
+
+    def test_short_and_invalid_input(self):
+        """Short input has no windows; bad stride or shape raises."""
+        assert sliding_weeks(np.arange(100)).shape == (0, WEEK_MINUTES)
+        with pytest.raises(ValueError, match="Stride"):
+            sliding_weeks(np.arange(WEEK_MINUTES), stride=0)
+        with pytest.raises(ValueError, match="1-D"):
+            sliding_weeks(np.zeros((WEEK_MINUTES, 2)))
+
+
 class TestPadToWeek:
     """Test the pad_to_week function."""
 
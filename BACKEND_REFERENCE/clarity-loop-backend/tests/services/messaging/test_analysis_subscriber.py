@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import io
 import json
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import boto3
 from fastapi import HTTPException, Request
+from moto import mock_aws
 import pytest
 
 from clarity.services.messaging.analysis_subscriber import AnalysisSubscriber
+from clarity.services.messaging.publisher import HealthDataPublisher
+from clarity.services.messaging.sqs_consumer import SQSBatchConsumer
+from clarity.services.sqs_messaging_service import SQSMessagingService
 
 
 @pytest.fixture
@@ -71,6 +78,31 @@ async def test_download_health_data_not_found(subscriber: AnalysisSubscriber):
             await subscriber._download_health_data(gcs_path)
 
 
+@pytest.mark.asyncio
+async def test_stream_health_data_parses_blob_into_columns(
+    subscriber: AnalysisSubscriber,
+):
+    upload = {
+        "user_id": "user-1",
+        "quantity_samples": [
+            {"type": "heartrate", "value": 72, "timestamp": "2025-01-06T08:00:00"},
+            {"type": "oxygensaturation", "value": 97, "timestamp": "2025-01-06T08:01"},
+        ],
+    }
+    mock_blob = MagicMock()
+    mock_blob.exists.return_value = True
+    mock_blob.open.return_value = io.BytesIO(json.dumps(upload).encode())
+
+    with patch.object(subscriber.storage_client, "bucket") as mock_bucket:
+        mock_bucket.return_value.blob.return_value = mock_blob
+        columns = await subscriber._stream_health_data("gs://bucket/upload.json")
+
+    mock_blob.open.assert_called_once_with("rb")
+    assert columns.user_id == "user-1"
+    assert columns.sample_count == 2
+    assert columns.has_modality("respiratory")
+
+
 @pytest.mark.asyncio
 async def test_process_health_data_message(subscriber: AnalysisSubscriber):
     user_id = "test_user"
@@ -95,6 +127,7 @@ async def test_process_health_data_message(subscriber: AnalysisSubscriber):
     }
     subscriber.publisher = AsyncMock()
     subscriber.environment = "production"
+    subscriber.streaming_ingest = False
 
     with (
         patch.object(subscriber, "_download_health_data", return_value=health_data),
@@ -115,3 +148,87 @@ async def test_process_health_data_message(subscriber: AnalysisSubscriber):
         analysis_results=analysis_results,
     )
     mock_verify_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_consumes_events_from_real_publisher(
+    subscriber: AnalysisSubscriber, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("CLARITY_HEALTH_DATA_QUEUE", "clarity-test-uploads")
+    monkeypatch.delenv("CLARITY_SNS_TOPIC_ARN", raising=False)
+    subscriber.publisher = AsyncMock()
+    subscriber.streaming_ingest = False
+    health_data = {"metrics": [{"value": 80}]}
+    completed = asyncio.Event()
+
+    async def handler(message: dict[str, Any]) -> None:
+        await subscriber.process_queue_message(message)
+        completed.set()
+
+    with (
+        mock_aws(),
+        patch.object(
+            subscriber, "_download_health_data", return_value=health_data
+        ) as mock_download,
+        patch(
+            "clarity.services.messaging.analysis_subscriber.run_analysis_pipeline",
+            return_value={"hrv": 50},
+        ),
+    ):
+        publisher = HealthDataPublisher()
+        await publisher.publish_health_data_upload(
+            user_id="user-1",
+            upload_id="upload-1",
+            s3_path="gs://bucket/upload.json",
+        )
+        queue_url = boto3.client("sqs", region_name="us-east-1").get_queue_url(
+            QueueName="clarity-test-uploads"
+        )["QueueUrl"]
+        consumer = SQSBatchConsumer(
+            SQSMessagingService(queue_url=queue_url), handler, wait_time_seconds=0
+        )
+        task = asyncio.create_task(consumer.run())
+        await asyncio.wait_for(completed.wait(), timeout=5)
+        consumer.stop()
+        await task
+
+    mock_download.assert_called_once_with("gs://bucket/upload.json")
+    subscriber.publisher.publish_insight_request.assert_called_once_with(
+        user_id="user-1", upload_id="upload-1", analysis_results={"hrv": 50}
+    )
+    stats = consumer.get_stats()
+    assert stats["succeeded"] == 1
+    assert stats["failed"] == 0
+    assert stats["deleted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_queue_message_accepts_legacy_gcs_path(
+    subscriber: AnalysisSubscriber,
+):
+    message = {
+        "body": {
+            "user_id": "user-1",
+            "upload_id": "upload-1",
+            "gcs_path": "gs://bucket/legacy.json",
+        }
+    }
+
+    with patch.object(subscriber, "process_health_data_event") as mock_process:
+        await subscriber.process_queue_message(message)
+
+    mock_process.assert_called_once_with(message["body"])
+
+
+@pytest.mark.asyncio
+async def test_process_queue_message_requires_data_path(
+    subscriber: AnalysisSubscriber,
+):
+    message = {"body": {"user_id": "user-1", "upload_id": "upload-1"}}
+
+    with pytest.raises(ValueError, match="Missing required field: s3_path"):
+        await subscriber.process_queue_message(message)
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Generator
+import json
 from unittest.mock import AsyncMock, Mock, patch
 import uuid
 
+import boto3
+from moto import mock_aws
 import pytest
 
 import clarity.services.messaging.publisher
@@ -14,6 +18,7 @@ from clarity.services.messaging.publisher import (
     HealthDataPublisher,
     InsightRequestEvent,
     get_publisher,
+    shutdown_publisher,
 )
 
 
@@ -90,6 +95,8 @@ class TestHealthDataPublisherInit:
                 health_data_queue="clarity-health-data-processing",
                 insight_queue="clarity-insight-generation",
                 sns_topic_arn=None,
+                batch_linger_seconds=0.02,
+                payload_bucket=None,
             )
 
     @patch.dict(
@@ -119,6 +126,8 @@ class TestHealthDataPublisherInit:
                 health_data_queue="custom-health-queue",
                 insight_queue="custom-insight-queue",
                 sns_topic_arn="arn:aws:sns:eu-west-1:123456789012:clarity-topic",
+                batch_linger_seconds=0.02,
+                payload_bucket=None,
             )
 
 
@@ -279,12 +288,14 @@ class TestHealthCheckAndClose:
 class TestGetPublisher:
     """Test get_publisher singleton function."""
 
+    @pytest.fixture(autouse=True)
+    def reset_publisher(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Keep mock-backed publishers out of the global singleton."""
+        monkeypatch.setattr(clarity.services.messaging.publisher, "_publisher", None)
+
     @pytest.mark.asyncio
     async def test_get_publisher_singleton(self) -> None:
         """Test get_publisher returns singleton."""
-        # Reset global state
-        clarity.services.messaging.publisher._publisher = None
-
         with patch("clarity.services.messaging.publisher.AWSMessagingService"):
             publisher1 = await get_publisher()
             publisher2 = await get_publisher()
@@ -294,9 +305,6 @@ class TestGetPublisher:
     @pytest.mark.asyncio
     async def test_get_publisher_creates_instance(self) -> None:
         """Test get_publisher creates new instance when needed."""
-        # Reset global state
-        clarity.services.messaging.publisher._publisher = None
-
         with patch(
             "clarity.services.messaging.publisher.AWSMessagingService"
         ) as mock_aws:
@@ -354,3 +362,79 @@ class TestLoggingIntegration:
                 "Failed to publish health data event"
                 in mock_logger.exception.call_args[0][0]
             )
+
+
+class TestShutdown:
+    """Test flushing batched events on shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_shutdown_sends_batched_events(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test events still lingering in a batcher reach the queue."""
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+        monkeypatch.setenv("AWS_REGION", "us-east-1")
+        monkeypatch.setenv("CLARITY_HEALTH_DATA_QUEUE", "clarity-test-uploads")
+        monkeypatch.delenv("CLARITY_SNS_TOPIC_ARN", raising=False)
+        monkeypatch.setattr(clarity.services.messaging.publisher, "_publisher", None)
+
+        with mock_aws():
+            sqs = boto3.client("sqs", region_name="us-east-1")
+            queue_url = sqs.create_queue(QueueName="clarity-test-uploads")["QueueUrl"]
+            publisher = await get_publisher()
+            # Linger far beyond the test so only the shutdown flush sends
+            publisher.messaging_service.batch_linger_seconds = 60.0
+            publish = asyncio.create_task(
+                publisher.publish_health_data_upload(
+                    user_id="user-1",
+                    upload_id="upload-1",
+                    s3_path="s3://bucket/data.json",
+                )
+            )
+            await asyncio.sleep(0.05)
+            assert not publish.done()
+
+            await shutdown_publisher()
+
+            assert clarity.services.messaging.publisher._publisher is None
+            messages = sqs.receive_message(QueueUrl=queue_url).get("Messages", [])
+            message_id = await asyncio.wait_for(publish, timeout=1)
+
+        assert [json.loads(m["Body"])["upload_id"] for m in messages] == ["upload-1"]
+        assert message_id == messages[0]["MessageId"]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_logs_flush_failures(
+        self, monkeypatch: pytest.MonkeyPatch, mock_messaging_service: Mock
+    ) -> None:
+        """Test a failed flush does not abort shutdown."""
+        mock_messaging_service.flush = AsyncMock(side_effect=RuntimeError("down"))
+        with patch(
+            "clarity.services.messaging.publisher.AWSMessagingService",
+            return_value=mock_messaging_service,
+        ):
+            monkeypatch.setattr(
+                clarity.services.messaging.publisher,
+                "_publisher",
+                HealthDataPublisher(),
+            )
+
+        await shutdown_publisher()
+
+        mock_messaging_service.close.assert_called_once()
+        assert clarity.services.messaging.publisher._publisher is None
+
+    @pytest.mark.asyncio
+    async def test_shutdown_without_publisher_is_noop(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test shutdown does not create a publisher."""
+        monkeypatch.setattr(clarity.services.messaging.publisher, "_publisher", None)
+
+        with patch(
+            "clarity.services.messaging.publisher.AWSMessagingService"
+        ) as mock_aws:
+            await shutdown_publisher()
+
+        mock_aws.assert_not_called()
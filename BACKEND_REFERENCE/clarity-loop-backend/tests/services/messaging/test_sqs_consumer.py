@@ -0,0 +1,371 @@
+"""Tests for the batched SQS consumer runtime (against moto's SQS)."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Iterator
+import json
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import boto3
+from botocore.exceptions import EndpointConnectionError, ReadTimeoutError
+from fastapi import FastAPI
+from moto import mock_aws
+import pytest
+
+from clarity.services.messaging import sqs_consumer
+from clarity.services.messaging.sqs_consumer import (
+    SQSBatchConsumer,
+    extract_event_data,
+    sqs_consumer_lifespan,
+)
+from clarity.services.sqs_messaging_service import (
+    MessagingError,
+    SQSMessagingService,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sqs_service(monkeypatch: pytest.MonkeyPatch) -> Iterator[SQSMessagingService]:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        queue_url = boto3.client("sqs", region_name="us-east-1").create_queue(
+            QueueName="clarity-test-queue"
+        )["QueueUrl"]
+        yield SQSMessagingService(queue_url=queue_url)
+
+
+def send(service: SQSMessagingService, count: int) -> None:
+    for i in range(count):
+        service.sqs_client.send_message(
+            QueueUrl=service.queue_url,
+            MessageBody=json.dumps({"user_id": f"user-{i}", "upload_id": str(i)}),
+        )
+
+
+def queue_counts(service: SQSMessagingService) -> tuple[int, int]:
+    attributes = service.sqs_client.get_queue_attributes(
+        QueueUrl=service.queue_url, AttributeNames=["All"]
+    )["Attributes"]
+    return (
+        int(attributes["ApproximateNumberOfMessages"]),
+        int(attributes["ApproximateNumberOfMessagesNotVisible"]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_processes_batches_and_deletes(
+    sqs_service: SQSMessagingService,
+) -> None:
+    send(sqs_service, 25)
+    seen: list[str] = []
+    active = 0
+    peak = 0
+
+    async def handler(message: dict[str, Any]) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        seen.append(message["body"]["user_id"])
+        active -= 1
+
+    consumer = SQSBatchConsumer(
+        sqs_service, handler, concurrency=4, wait_time_seconds=0
+    )
+    task = asyncio.create_task(consumer.run())
+    for _ in range(200):
+        if len(seen) == 25:
+            break
+        await asyncio.sleep(0.01)
+    consumer.stop()
+    await task
+
+    assert len(set(seen)) == 25
+    assert peak <= 4
+    assert consumer.get_stats()["deleted"] == 25
+    assert queue_counts(sqs_service) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_not_deleted(
+    sqs_service: SQSMessagingService,
+) -> None:
+    send(sqs_service, 3)
+
+    async def handler(message: dict[str, Any]) -> None:
+        if message["body"]["user_id"] == "user-1":
+            msg = "analysis failed"
+            raise RuntimeError(msg)
+
+    consumer = SQSBatchConsumer(sqs_service, handler, wait_time_seconds=0)
+    assert await consumer.poll_once() == 3
+    await consumer.drain()
+
+    stats = consumer.get_stats()
+    assert stats["succeeded"] == 2
+    assert stats["failed"] == 1
+    assert stats["deleted"] == 2
+    # The failed message stays leased until its visibility timeout expires
+    assert queue_counts(sqs_service) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_receive_respects_free_concurrency_slots(
+    sqs_service: SQSMessagingService,
+) -> None:
+    send(sqs_service, 10)
+    gate = asyncio.Event()
+
+    async def handler(message: dict[str, Any]) -> None:  # noqa: ARG001
+        await gate.wait()
+
+    consumer = SQSBatchConsumer(
+        sqs_service, handler, concurrency=3, wait_time_seconds=0
+    )
+    assert await consumer.poll_once() == 3
+    assert await consumer.poll_once() == 0
+    assert consumer.in_flight == 3
+
+    gate.set()
+    await consumer.drain()
+    assert consumer.in_flight == 0
+    assert consumer.get_stats()["deleted"] == 3
+
+
+@pytest.mark.asyncio
+async def test_long_jobs_get_visibility_extended(
+    sqs_service: SQSMessagingService,
+) -> None:
+    send(sqs_service, 2)
+    clock = FakeClock()
+    gate = asyncio.Event()
+
+    async def handler(message: dict[str, Any]) -> None:  # noqa: ARG001
+        await gate.wait()
+
+    consumer = SQSBatchConsumer(
+        sqs_service,
+        handler,
+        wait_time_seconds=0,
+        visibility_timeout=60,
+        clock=clock,
+    )
+    await consumer.poll_once()
+
+    assert await consumer.extend_visibility() == 0
+    clock.now = 40.0
+    assert await consumer.extend_visibility() == 2
+    # Renewed leases are not extended again until they near expiry
+    assert await consumer.extend_visibility() == 0
+
+    gate.set()
+    await consumer.drain()
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_releases_unfinished_messages(
+    sqs_service: SQSMessagingService,
+) -> None:
+    send(sqs_service, 2)
+
+    async def handler(message: dict[str, Any]) -> None:  # noqa: ARG001
+        await asyncio.Event().wait()
+
+    consumer = SQSBatchConsumer(sqs_service, handler, wait_time_seconds=0)
+    await consumer.poll_once()
+    await consumer.drain(timeout=0.01)
+
+    assert consumer.in_flight == 0
+    assert consumer.get_stats()["released"] == 2
+    assert queue_counts(sqs_service) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_progress_ack_flush(
+    sqs_service: SQSMessagingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    send(sqs_service, 6)
+    deleted: list[str] = []
+    batch_taken = asyncio.Event()
+    release = asyncio.Event()
+    batch_delete = sqs_service.batch_delete_messages
+
+    async def slow_batch_delete(receipt_handles: list[str]) -> dict[str, Any]:
+        deleted.extend(receipt_handles)
+        batch_taken.set()
+        await release.wait()
+        return await batch_delete(receipt_handles)
+
+    monkeypatch.setattr(sqs_service, "batch_delete_messages", slow_batch_delete)
+
+    async def handler(message: dict[str, Any]) -> None:
+        pass
+
+    consumer = SQSBatchConsumer(
+        sqs_service, handler, wait_time_seconds=0, ack_linger_seconds=0.02
+    )
+    task = asyncio.create_task(consumer.run())
+    # The ack loop's linger flush takes the batch and stalls on the delete
+    await asyncio.wait_for(batch_taken.wait(), timeout=5)
+    consumer.stop()
+    await asyncio.sleep(0.05)  # drain's flush_acks now races the stalled one
+    assert not task.done()
+
+    release.set()
+    await task
+
+    assert len(deleted) == 6
+    assert Counter(deleted).most_common(1)[0][1] == 1
+    assert consumer.get_stats()["deleted"] == 6
+    assert queue_counts(sqs_service) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_messaging_errors(
+    sqs_service: SQSMessagingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def unreachable(**kwargs: Any) -> dict[str, Any]:  # noqa: ARG001
+        raise EndpointConnectionError(endpoint_url=sqs_service.queue_url)
+
+    monkeypatch.setattr(sqs_service.sqs_client, "receive_message", unreachable)
+    monkeypatch.setattr(sqs_service.sqs_client, "delete_message", unreachable)
+
+    with pytest.raises(MessagingError, match="Failed to receive messages"):
+        await sqs_service.receive_messages(wait_time_seconds=0)
+    with pytest.raises(MessagingError, match="Failed to delete message"):
+        await sqs_service.delete_message("receipt")
+
+
+@pytest.mark.asyncio
+async def test_run_keeps_polling_after_receive_errors(
+    sqs_service: SQSMessagingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    send(sqs_service, 2)
+    monkeypatch.setattr(sqs_consumer, "MAX_BACKOFF_SECONDS", 0.01)
+    receive_message = sqs_service.sqs_client.receive_message
+    receive_messages = sqs_service.receive_messages
+    failures = [
+        ReadTimeoutError(endpoint_url=sqs_service.queue_url),
+        RuntimeError("connection pool closed"),
+    ]
+
+    def flaky_receive_message(**kwargs: Any) -> dict[str, Any]:
+        if failures and isinstance(failures[0], ReadTimeoutError):
+            raise failures.pop(0)
+        return receive_message(**kwargs)
+
+    async def flaky_receive_messages(**kwargs: Any) -> list[dict[str, Any]]:
+        if failures and isinstance(failures[0], RuntimeError):
+            raise failures.pop(0)
+        return await receive_messages(**kwargs)
+
+    monkeypatch.setattr(
+        sqs_service.sqs_client, "receive_message", flaky_receive_message
+    )
+    monkeypatch.setattr(sqs_service, "receive_messages", flaky_receive_messages)
+    seen: list[str] = []
+
+    async def handler(message: dict[str, Any]) -> None:
+        seen.append(message["body"]["user_id"])
+
+    consumer = SQSBatchConsumer(sqs_service, handler, wait_time_seconds=0)
+    task = asyncio.create_task(consumer.run())
+    for _ in range(200):
+        if len(seen) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert not task.done()
+    consumer.stop()
+    await task
+
+    assert not failures
+    assert sorted(seen) == ["user-0", "user-1"]
+    assert consumer.get_stats()["deleted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_lifespan_flushes_publisher_after_consumer_stops(
+    sqs_service: SQSMessagingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    send(sqs_service, 1)
+    monkeypatch.setattr(
+        sqs_consumer,
+        "get_settings",
+        lambda: SimpleNamespace(
+            sqs_consumer_enabled=True,
+            sqs_queue_url=sqs_service.queue_url,
+            aws_region="us-east-1",
+            sqs_endpoint_url=None,
+            sqs_consumer_concurrency=1,
+            sqs_consumer_wait_time_seconds=0,
+            sqs_consumer_visibility_timeout=30,
+            sqs_consumer_drain_timeout_seconds=1.0,
+        ),
+    )
+    shutdown_publisher = AsyncMock()
+    monkeypatch.setattr(sqs_consumer, "shutdown_publisher", shutdown_publisher)
+    handled = asyncio.Event()
+
+    async def handler(message: dict[str, Any]) -> None:  # noqa: ARG001
+        handled.set()
+
+    app = FastAPI()
+    async with sqs_consumer_lifespan(lambda: handler)(app):
+        await asyncio.wait_for(handled.wait(), timeout=5)
+        shutdown_publisher.assert_not_awaited()
+
+    assert not app.state.sqs_consumer.get_stats()["running"]
+    shutdown_publisher.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_flushes_publisher_in_push_mode(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        sqs_consumer,
+        "get_settings",
+        lambda: SimpleNamespace(sqs_consumer_enabled=False, sqs_queue_url=None),
+    )
+    shutdown_publisher = AsyncMock()
+    monkeypatch.setattr(sqs_consumer, "shutdown_publisher", shutdown_publisher)
+
+    async with sqs_consumer_lifespan(AsyncMock)(FastAPI()):
+        pass
+
+    shutdown_publisher.assert_awaited_once()
+
+
+def test_extract_event_data_unwraps_envelopes() -> None:
+    event = {"user_id": "user-1"}
+    sns_body = {
+        "Type": "Notification",
+        "Message": json.dumps({"type": "analysis_requested", "data": event}),
+    }
+
+    assert extract_event_data({"body": event}) == event
+    assert extract_event_data({"body": sns_body}) == event
+    with pytest.raises(ValueError, match="JSON object"):
+        extract_event_data({"body": ["not", "an", "object"]})
+
+
+def test_invalid_batch_size_rejected(sqs_service: SQSMessagingService) -> None:
+    async def handler(message: dict[str, Any]) -> None:
+        pass
+
+    with pytest.raises(ValueError, match="max_messages"):
+        SQSBatchConsumer(sqs_service, handler, max_messages=11)
@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
+import itertools
 import json
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 from botocore.exceptions import ClientError
@@ -14,6 +18,11 @@ from clarity.services.aws_messaging_service import (
     InsightRequestEvent,
     get_messaging_service,
 )
+from clarity.services.messaging.sqs_consumer import (
+    extract_event_data,
+    load_event_data,
+)
+from clarity.services.sqs_messaging_service import MessagingError
 
 
 @pytest.fixture
@@ -264,6 +273,23 @@ class TestPublishHealthDataUpload:
                 "user-123", "upload-456", "s3://bucket/data.json"
             )
 
+    @pytest.mark.asyncio
+    async def test_publish_sns_error_after_queue_send(
+        self,
+        aws_messaging_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+        mock_sns_client: MagicMock,
+    ) -> None:
+        """Test an SNS failure is raised even though the queue leg succeeded."""
+        mock_sqs_client.send_message.return_value = {"MessageId": "msg-123"}
+        mock_sns_client.publish.side_effect = Exception("SNS error")
+
+        with pytest.raises(Exception, match="SNS error"):
+            await aws_messaging_service.publish_health_data_upload(
+                "user-123", "upload-456", "s3://bucket/data.json"
+            )
+        mock_sqs_client.send_message.assert_called_once()
+
 
 class TestPublishInsightRequest:
     """Test insight request publishing."""
@@ -628,3 +654,213 @@ class TestPydanticModels:
         assert event.analysis_results == {"risk_score": 0.5}
         assert event.event_type == "insight_request"
         assert event.metadata == {"version": "1.0"}
+
+
+def _batch_responder(fail_ids: set[str] | None = None) -> Any:
+    """Fake SendMessageBatch/PublishBatch that echoes unique message IDs."""
+    counter = itertools.count()
+
+    def respond(**kwargs: Any) -> dict[str, Any]:
+        entries = kwargs.get("Entries") or kwargs["PublishBatchRequestEntries"]
+        successful = []
+        failed = []
+        for entry in entries:
+            if fail_ids and entry["Id"] in fail_ids:
+                failed.append(
+                    {"Id": entry["Id"], "Code": "InternalError", "SenderFault": False}
+                )
+            else:
+                successful.append(
+                    {"Id": entry["Id"], "MessageId": f"msg-{next(counter)}"}
+                )
+        return {"Successful": successful, "Failed": failed}
+
+    return respond
+
+
+@pytest.fixture
+def batching_service(
+    aws_messaging_service: AWSMessagingService,
+    mock_sqs_client: MagicMock,
+    mock_sns_client: MagicMock,
+) -> AWSMessagingService:
+    """AWS messaging service with batched publishing enabled."""
+    aws_messaging_service.batch_linger_seconds = 0.01
+    mock_sqs_client.send_message_batch.side_effect = _batch_responder()
+    mock_sns_client.publish_batch.side_effect = _batch_responder()
+    return aws_messaging_service
+
+
+class TestBatchedPublishing:
+    """Test batched SQS/SNS publishing and payload encoding."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_publishes_share_batch_calls(
+        self,
+        batching_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+        mock_sns_client: MagicMock,
+    ) -> None:
+        """Test 25 concurrent publishes use 3 SendMessageBatch calls."""
+        message_ids = await asyncio.gather(
+            *(
+                batching_service.publish_health_data_upload(
+                    f"user-{i}", f"upload-{i}", f"s3://bucket/{i}.json"
+                )
+                for i in range(25)
+            )
+        )
+
+        assert len(set(message_ids)) == 25
+        mock_sqs_client.send_message.assert_not_called()
+        assert mock_sqs_client.send_message_batch.call_count == 3
+        assert mock_sns_client.publish_batch.call_count == 3
+        mock_sns_client.publish.assert_not_called()
+
+        entry = mock_sqs_client.send_message_batch.call_args_list[0][1]["Entries"][0]
+        assert entry["MessageAttributes"]["event_type"]["StringValue"] == (
+            "health_data_upload"
+        )
+
+    @pytest.mark.asyncio
+    async def test_queue_send_and_fan_out_overlap(
+        self,
+        batching_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+        mock_sns_client: MagicMock,
+    ) -> None:
+        """Test one publish waits for a single linger, not one per leg."""
+        batching_service.batch_linger_seconds = 0.2
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        await batching_service.publish_insight_request("user-1", "upload-1", {})
+        elapsed = loop.time() - started
+
+        assert mock_sqs_client.send_message_batch.call_count == 1
+        assert mock_sns_client.publish_batch.call_count == 1
+        assert 0.2 <= elapsed < 0.35
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_entry_fails_only_its_caller(
+        self,
+        batching_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+    ) -> None:
+        """Test a per-entry failure surfaces as MessagingError."""
+        batching_service.sns_client = None
+        mock_sqs_client.send_message_batch.side_effect = _batch_responder({"1"})
+
+        results = await asyncio.gather(
+            *(
+                batching_service.publish_health_data_upload(
+                    f"user-{i}", f"upload-{i}", "s3://bucket/data.json"
+                )
+                for i in range(3)
+            ),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], MessagingError)
+        assert isinstance(results[0], str)
+        assert isinstance(results[2], str)
+
+    @pytest.mark.asyncio
+    async def test_send_message_batch_chunks_bulk_backfill(
+        self,
+        batching_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+    ) -> None:
+        """Test explicit bulk sends are packed 10 per call."""
+        message_ids = await batching_service.send_message_batch(
+            "test-health-queue", [{"n": i} for i in range(23)]
+        )
+
+        assert len(message_ids) == 23
+        sizes = [
+            len(call[1]["Entries"])
+            for call in mock_sqs_client.send_message_batch.call_args_list
+        ]
+        assert sizes == [10, 10, 3]
+
+    @pytest.mark.asyncio
+    async def test_large_payload_is_compressed(
+        self,
+        aws_messaging_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+    ) -> None:
+        """Test payloads above the threshold are sent gzip-compressed."""
+        aws_messaging_service.sns_client = None
+        aws_messaging_service.compress_threshold_bytes = 1024
+        mock_sqs_client.send_message.return_value = {"MessageId": "msg-1"}
+        analysis_results = {"embedding": [0.5] * 5000}
+
+        await aws_messaging_service.publish_insight_request(
+            "user-1", "upload-1", analysis_results
+        )
+
+        raw_body = mock_sqs_client.send_message.call_args[1]["MessageBody"]
+        body = json.loads(raw_body)
+        assert "clarity_payload" in body
+        assert len(raw_body) < len(json.dumps(analysis_results))
+        assert extract_event_data({"body": body})["analysis_results"] == (
+            analysis_results
+        )
+
+    @pytest.mark.asyncio
+    async def test_oversized_payload_offloaded_to_s3(
+        self,
+        aws_messaging_service: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+    ) -> None:
+        """Test payloads that stay too large after gzip go to S3."""
+        aws_messaging_service.sns_client = None
+        aws_messaging_service.payload_bucket = "payload-bucket"
+        aws_messaging_service.s3_client = MagicMock()
+        mock_sqs_client.send_message.return_value = {"MessageId": "msg-1"}
+        # Random-looking data does not compress below the SQS limit
+        analysis_results = {"blob": [str(i * 7919 % 104729) for i in range(80000)]}
+
+        await aws_messaging_service.publish_insight_request(
+            "user-1", "upload-1", analysis_results
+        )
+
+        put_kwargs = aws_messaging_service.s3_client.put_object.call_args[1]
+        assert put_kwargs["Bucket"] == "payload-bucket"
+        body = json.loads(mock_sqs_client.send_message.call_args[1]["MessageBody"])
+        assert body["clarity_payload"]["s3_path"].startswith("s3://payload-bucket/")
+
+        s3_client = MagicMock()
+        s3_client.get_object.return_value = {"Body": io.BytesIO(put_kwargs["Body"])}
+        event = await load_event_data({"body": body}, s3_client=s3_client)
+        assert event["analysis_results"] == analysis_results
+
+    @pytest.mark.asyncio
+    async def test_oversized_payload_without_bucket_raises(
+        self, aws_messaging_service: AWSMessagingService
+    ) -> None:
+        """Test oversized payloads fail fast without a payload bucket."""
+        aws_messaging_service.sns_client = None
+        analysis_results = {"blob": [str(i * 7919 % 104729) for i in range(80000)]}
+
+        with pytest.raises(MessagingError, match="payload bucket"):
+            await aws_messaging_service.publish_insight_request(
+                "user-1", "upload-1", analysis_results
+            )
+
+    @pytest.mark.asyncio
+    async def test_queue_url_resolved_once_under_concurrency(
+        self,
+        aws_messaging_service_no_sns: AWSMessagingService,
+        mock_sqs_client: MagicMock,
+    ) -> None:
+        """Test concurrent first publishes share one GetQueueUrl call."""
+        mock_sqs_client.get_queue_url.return_value = {
+            "QueueUrl": "https://sqs.us-east-1.amazonaws.com/123456789012/q"
+        }
+
+        await asyncio.gather(
+            *(aws_messaging_service_no_sns._get_queue_url("q") for _ in range(5))
+        )
+
+        mock_sqs_client.get_queue_url.assert_called_once_with(QueueName="q")
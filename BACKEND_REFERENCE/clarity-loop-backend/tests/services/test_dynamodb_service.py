@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 import time
 from typing import Any
 from unittest.mock import MagicMock, patch
@@ -11,6 +11,11 @@ import uuid
 from botocore.exceptions import ClientError
 import pytest
 
+from clarity.ml.feature_store import (
+    DayPartial,
+    FeatureStoreSingleton,
+    InMemoryFeatureStore,
+)
 from clarity.services.dynamodb_service import (
     DocumentNotFoundError,
     DynamoDBConnectionError,
@@ -789,6 +794,28 @@ class TestHealthDataRepository:
         # Should query for items then delete each
         mock_table.query.assert_called()
 
+    @pytest.mark.asyncio
+    async def test_delete_user_data_clears_feature_partials(
+        self,
+        dynamodb_service: DynamoDBService,
+        mock_table: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test erasing a user also drops their cached feature partials."""
+        store = InMemoryFeatureStore()
+        monkeypatch.setattr(FeatureStoreSingleton, "_instance", store)
+        day = date(2025, 1, 6)
+        await store.put_days("user123", {day: DayPartial("a")})
+        await store.put_days("user456", {day: DayPartial("b")})
+        mock_table.query.return_value = {"Items": [{"id": "1"}, {"id": "2"}]}
+
+        repository = DynamoDBHealthDataRepository()
+        repository._dynamodb_service = dynamodb_service
+
+        assert await repository.delete_user_data("user123") == 2
+        assert await store.get_days("user123", [day]) == {}
+        assert list(await store.get_days("user456", [day])) == [day]
+
 
 # Removed TestScanOperation as scan_table method doesn't exist
 
@@ -418,6 +418,43 @@ class TestBatchDeleteMessages:
         assert "Failed to batch delete messages" in str(exc_info.value)
 
 
+class TestChangeMessageVisibility:
+    """Test batch visibility timeout changes."""
+
+    @pytest.mark.asyncio
+    async def test_change_message_visibility_batch_success(
+        self, sqs_service: SQSMessagingService, mock_sqs_client: MagicMock
+    ) -> None:
+        """Test extending the lease on in-flight messages."""
+        mock_sqs_client.change_message_visibility_batch.return_value = {
+            "Successful": [{"Id": "0"}],
+            "Failed": [],
+        }
+
+        result = await sqs_service.change_message_visibility_batch(["handle-1"], 300)
+
+        assert len(result["successful"]) == 1
+        call_args = mock_sqs_client.change_message_visibility_batch.call_args[1]
+        assert call_args["Entries"] == [
+            {"Id": "0", "ReceiptHandle": "handle-1", "VisibilityTimeout": 300}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_change_message_visibility_batch_client_error(
+        self, sqs_service: SQSMessagingService, mock_sqs_client: MagicMock
+    ) -> None:
+        """Test visibility change with ClientError."""
+        mock_sqs_client.change_message_visibility_batch.side_effect = ClientError(
+            {"Error": {"Code": "ReceiptHandleIsInvalid", "Message": "Invalid"}},
+            "ChangeMessageVisibilityBatch",
+        )
+
+        with pytest.raises(MessagingError) as exc_info:
+            await sqs_service.change_message_visibility_batch(["handle-1"], 0)
+
+        assert "Failed to change message visibility" in str(exc_info.value)
+
+
 class TestPublishToSNS:
     """Test SNS publishing functionality."""
 